@@ -18,28 +18,57 @@ from .core.namespaces import (
     NS_XBRLI,
 )
 from .core.streaming import stream_xml
+from .core.scanner import scan_xml
+from .core.parser import StreamingParser
+from .core.zipfs import ZipFS, ZipPath
+from .core.cache import ArtifactCache
 
 # Linkbase parsers
 from .linkbases import (
     # Label
+    AllLabelsHandler,
+    LabelHandler,
     parse_label_linkbase,
     parse_all_labels,
+    LabelStore,
+    parse_label_store,
     # Reference
     Reference,
+    ReferenceHandler,
+    ReferencePool,
+    CitationIndex,
     parse_reference_linkbase,
     parse_reference_linkbase_flat,
+    build_citation_index,
+    ReferenceTable,
+    parse_reference_table,
     # Definition / Presentation
     ConceptNode,
     ConceptTree,
+    DefinitionHandler,
+    PresentationHandler,
     parse_definition_linkbase,
     parse_presentation_linkbase,
+    DimensionalModel,
+    parse_dimensional_model,
     get_hierarchy_dataframe,
+    CompactConceptTree,
+    compact_tree,
     # Calculation
     CalculationRelationship,
     CalculationNode,
     CalculationTree,
+    CalculationNetwork,
+    CalculationHandler,
+    CalculationNetworkHandler,
     parse_calculation_linkbase,
+    parse_calculation_network,
     get_calculation_dataframe,
+    CalculationMatrix,
+    compile_calculation_tree,
+    facts_to_matrix,
+    RollupResult,
+    rollup_calculation,
     # Helper
     get_specific_role_tree,
 )
@@ -47,7 +76,11 @@ from .linkbases import (
 # Taxonomy schema parsers
 from .taxonomy import (
     ConceptSchema,
+    ConceptSchemaTable,
     parse_schema,
+    parse_schema_table,
+    iter_schema,
+    parse_schema_index,
     parse_schema_to_dict,
     get_concept_types,
     get_schema_dataframe,
@@ -59,10 +92,29 @@ from .taxonomy import (
     find_file_by_pattern,
     build_stm_dis_trees,
     find_concept_stm_dis,
+    TaxonomyIndex,
     build_taxonomy_dataframe,
     build_taxonomy_dataframe_from_zip,
 )
 
+# Instance documents
+from .instance import (
+    Context,
+    Unit,
+    FactTable,
+    parse_instance,
+    get_instance_dataframe,
+    parse_inline,
+    get_inline_dataframe,
+)
+
+# Batch processing
+from .batch import (
+    Filing,
+    BatchResult,
+    run_batch,
+)
+
 # Utilities
 from .utils import extract_concept_from_href
 
@@ -77,30 +129,64 @@ __all__ = [
     'NS_XLINK',
     'NS_XBRLI',
     'stream_xml',
+    'scan_xml',
+    'StreamingParser',
+    'ZipFS',
+    'ZipPath',
+    'ArtifactCache',
     # Linkbases - Label
+    'AllLabelsHandler',
+    'LabelHandler',
     'parse_label_linkbase',
     'parse_all_labels',
+    'LabelStore',
+    'parse_label_store',
     # Linkbases - Reference
     'Reference',
+    'ReferenceHandler',
+    'ReferencePool',
+    'CitationIndex',
     'parse_reference_linkbase',
     'parse_reference_linkbase_flat',
+    'build_citation_index',
+    'ReferenceTable',
+    'parse_reference_table',
     # Linkbases - Definition/Presentation
     'ConceptNode',
     'ConceptTree',
+    'DefinitionHandler',
+    'PresentationHandler',
     'parse_definition_linkbase',
     'parse_presentation_linkbase',
+    'DimensionalModel',
+    'parse_dimensional_model',
     'get_hierarchy_dataframe',
+    'CompactConceptTree',
+    'compact_tree',
     # Linkbases - Calculation
     'CalculationRelationship',
     'CalculationNode',
     'CalculationTree',
+    'CalculationNetwork',
+    'CalculationHandler',
+    'CalculationNetworkHandler',
     'parse_calculation_linkbase',
+    'parse_calculation_network',
     'get_calculation_dataframe',
+    'CalculationMatrix',
+    'compile_calculation_tree',
+    'facts_to_matrix',
+    'RollupResult',
+    'rollup_calculation',
     # Linkbases - Helper
     'get_specific_role_tree',
     # Taxonomy Schema
     'ConceptSchema',
+    'ConceptSchemaTable',
     'parse_schema',
+    'parse_schema_table',
+    'iter_schema',
+    'parse_schema_index',
     'parse_schema_to_dict',
     'get_concept_types',
     'get_schema_dataframe',
@@ -113,8 +199,21 @@ __all__ = [
     'find_file_by_pattern',
     'build_stm_dis_trees',
     'find_concept_stm_dis',
+    'TaxonomyIndex',
     'build_taxonomy_dataframe',
     'build_taxonomy_dataframe_from_zip',
+    # Instance
+    'Context',
+    'Unit',
+    'FactTable',
+    'parse_instance',
+    'get_instance_dataframe',
+    'parse_inline',
+    'get_inline_dataframe',
+    # Batch
+    'Filing',
+    'BatchResult',
+    'run_batch',
     # Utils
     'extract_concept_from_href',
 ]
\ No newline at end of file
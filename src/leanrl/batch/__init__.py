@@ -0,0 +1,30 @@
+"""
+Batch Processing
+
+Extract facts from many filings in parallel into a partitioned dataset,
+with checkpoint and resume.
+"""
+
+from .pipeline import (
+    CHECKPOINT_FILE,
+    DEFAULT_TAXONOMY_COLUMNS,
+    Filing,
+    BatchResult,
+    iter_filings,
+    find_instance,
+    load_taxonomy,
+    extract_filing,
+    run_batch,
+)
+
+__all__ = [
+    'CHECKPOINT_FILE',
+    'DEFAULT_TAXONOMY_COLUMNS',
+    'Filing',
+    'BatchResult',
+    'iter_filings',
+    'find_instance',
+    'load_taxonomy',
+    'extract_filing',
+    'run_batch',
+]
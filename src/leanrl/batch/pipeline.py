@@ -0,0 +1,551 @@
+"""
+Batch Filing Pipeline
+
+Extract the facts of many filings (EDGAR filing archives from a local
+mirror) with a pool of worker processes, and stream them into a
+partitioned Parquet (or CSV) dataset.
+
+Layout of the output directory:
+
+    output/
+        partition=2023Q1/part-00000.parquet
+        partition=2023Q1/part-00003.parquet
+        partition=2023Q2/part-00001.parquet
+        _checkpoint.jsonl
+
+Each worker loads the standard taxonomy once (in its initializer) and
+joins the selected taxonomy columns onto every filing it processes.
+Rows are buffered per partition and written as part files of about
+``rows_per_file`` rows. A part file is written atomically, then recorded
+in the checkpoint with the filings it contains, so a crashed run resumes
+where it stopped: recorded filings are skipped, and part files missing
+from the checkpoint (written just before a crash) are deleted.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+import csv
+import json
+import os
+import re
+
+import pandas as pd
+
+from ..core.zipfs import ZipFS, ZipPath
+from ..core.cache import ArtifactCache
+from ..instance import parse_inline, parse_instance
+
+
+# Name of the checkpoint file in the output directory
+CHECKPOINT_FILE = '_checkpoint.jsonl'
+
+# Partition of filings that have none (from a manifest or the mirror layout)
+DEFAULT_PARTITION = 'default'
+
+# Taxonomy columns joined onto the facts by default
+DEFAULT_TAXONOMY_COLUMNS = ('label', 'balance', 'period_type', 'data_type')
+
+FORMATS = {'parquet': '.parquet', 'csv': '.csv'}
+
+# Bytes read to tell a native instance from an Inline XBRL document
+_SNIFF_BYTES = 16 * 1024
+_LINKBASE_SUFFIX = re.compile(r'_(cal|def|lab|pre|ref)\.xml$', re.IGNORECASE)
+_PART_NAME = re.compile(r'^part-(\d+)\.')
+
+
+@dataclass
+class Filing:
+    """
+    One filing to process.
+    
+    Attributes:
+        path: Filing archive (.zip) or instance document (.xml / .htm)
+        filing_id: Unique id, stored in the filing_id column and the
+                   checkpoint (default: file stem, e.g. the accession number)
+        partition: Output partition (e.g. '2023Q1')
+    """
+    path: str
+    filing_id: str
+    partition: str = DEFAULT_PARTITION
+
+
+@dataclass
+class BatchResult:
+    """
+    Summary of a run_batch() call.
+    
+    Attributes:
+        processed: Filings processed in this run
+        skipped: Filings skipped because the checkpoint has them
+        rows: Fact rows written in this run
+        files: Part files written in this run
+        failed: filing_id -> error message, for this run's failures
+    """
+    processed: int = 0
+    skipped: int = 0
+    rows: int = 0
+    files: List[Path] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+# --- filing discovery ---
+
+def iter_filings(source: str | Path | Iterable[Filing], pattern: str = '*.zip') -> Iterator[Filing]:
+    """
+    List the filings of a mirror directory or a manifest.
+    
+    Args:
+        source: One of
+            - a directory: every file matching pattern below it; the
+              partition is the sub-directory ('2023/QTR1' -> '2023-QTR1')
+            - a manifest: .csv with a 'path' column, .jsonl with 'path'
+              keys, or .txt with one path per line. Optional 'filing_id'
+              and 'partition' fields. Relative paths are relative to the
+              manifest.
+            - an iterable of Filing objects (passed through)
+        pattern: File pattern for directories
+    
+    Yields:
+        Filing objects, in a stable order
+    """
+    if not isinstance(source, (str, Path)):
+        yield from source
+        return
+    
+    source = Path(source)
+    if source.is_dir():
+        for path in sorted(source.rglob(pattern)):
+            parent = path.parent.relative_to(source).as_posix()
+            partition = parent.replace('/', '-') if parent != '.' else DEFAULT_PARTITION
+            yield Filing(str(path), path.stem, partition)
+        return
+    
+    suffix = source.suffix.lower()
+    with open(source, encoding='utf-8', newline='') as f:
+        if suffix == '.csv':
+            records: Iterable[Dict[str, Any]] = csv.DictReader(f)
+        elif suffix in ('.jsonl', '.ndjson'):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = ({'path': line.strip()} for line in f if line.strip())
+        for record in records:
+            path = Path(record['path'])
+            if not path.is_absolute():
+                path = source.parent / path
+            yield Filing(
+                str(path),
+                record.get('filing_id') or path.stem,
+                record.get('partition') or DEFAULT_PARTITION,
+            )
+
+
+def _sniff(path: Path | ZipPath) -> Optional[str]:
+    """'instance', 'inline' or None, from the start of the document."""
+    with path.open('rb') as f:
+        head = f.read(_SNIFF_BYTES)
+    if b'http://www.xbrl.org/2013/inlineXBRL' in head or b'http://www.xbrl.org/2008/inlineXBRL' in head:
+        return 'inline'
+    if b'http://www.xbrl.org/2003/instance' in head and re.search(rb'<(?:[\w.-]+:)?xbrl[\s>]', head):
+        return 'instance'
+    return None
+
+
+def find_instance(path: str | Path) -> tuple[Path | ZipPath, str]:
+    """
+    Locate the instance document of a filing.
+    
+    In an archive, a native instance (the EDGAR '_htm.xml' file) is
+    preferred over the Inline XBRL document, as it is faster to read.
+    
+    Args:
+        path: Filing archive (.zip) or an instance document
+    
+    Returns:
+        Tuple of (document, kind) with kind 'instance' or 'inline'
+    
+    Raises:
+        FileNotFoundError: If the filing contains no instance document
+    """
+    path = Path(path)
+    if path.suffix.lower() != '.zip':
+        kind = _sniff(path)
+        if kind is None:
+            raise FileNotFoundError(f"Not an XBRL instance: {path}")
+        return path, kind
+    
+    fs = ZipFS(path)
+    try:
+        members = fs.find()
+        candidates = [m for m in members if m.lower().endswith('.xml') and not _LINKBASE_SUFFIX.search(m)]
+        candidates += [m for m in members if m.lower().endswith(('.htm', '.html', '.xhtml'))]
+        inline = None
+        for member in candidates:
+            kind = _sniff(fs.path(member))
+            if kind == 'instance':
+                return fs.path(member), kind
+            if kind == 'inline' and inline is None:
+                inline = fs.path(member)
+        if inline is not None:
+            return inline, 'inline'
+        raise FileNotFoundError(f"No XBRL instance in {path}")
+    except Exception:
+        # The returned document keeps the archive open; on error nothing does
+        fs.close()
+        raise
+
+
+# --- extraction ---
+
+def load_taxonomy(taxonomy: str | Path, cache: ArtifactCache | str | Path | None = None) -> pd.DataFrame:
+    """
+    Load a standard taxonomy as a concept table (build_taxonomy_dataframe).
+    
+    Args:
+        taxonomy: Taxonomy folder, or taxonomy .zip
+        cache: Optional ArtifactCache (or cache directory); with a warm
+               cache every worker loads the taxonomy without parsing XML
+    
+    Returns:
+        DataFrame indexed by concept name
+    """
+    from ..taxonomy.helper import build_taxonomy_dataframe, build_taxonomy_dataframe_from_zip
+    if str(taxonomy).lower().endswith('.zip'):
+        df = build_taxonomy_dataframe_from_zip(str(taxonomy), cache=cache)
+    else:
+        df = build_taxonomy_dataframe(taxonomy, cache=cache)
+    return df.set_index('concept')
+
+
+def _dimensions_text(dimensions: tuple) -> str:
+    """(('us-gaap_XAxis', 'us-gaap_YMember'),) -> 'us-gaap_XAxis=us-gaap_YMember'"""
+    return ';'.join(f'{axis}={member}' for axis, member in dimensions)
+
+
+def extract_filing(
+    path: str | Path,
+    filing_id: str | None = None,
+    concepts: Set[str] | None = None,
+    taxonomy: pd.DataFrame | None = None,
+    taxonomy_columns: Iterable[str] = DEFAULT_TAXONOMY_COLUMNS,
+) -> pd.DataFrame:
+    """
+    Extract the facts of one filing as a flat DataFrame.
+    
+    The instance document is found with find_instance() and read with
+    parse_instance() or parse_inline(). Dimensions are flattened to text
+    ('axis=member;...') so every filing has the same columns.
+    
+    Args:
+        path: Filing archive (.zip) or instance document
+        filing_id: Value of the filing_id column (default: file stem)
+        concepts: Optional set of concept names to keep
+        taxonomy: Optional concept table (see load_taxonomy()) whose
+                  taxonomy_columns are joined on by concept
+        taxonomy_columns: Columns of taxonomy to add (prefixed with
+                          'concept_' if a fact column has the same name)
+    
+    Returns:
+        DataFrame with filing_id, the FACT_COLUMNS (dimensions as text)
+        and the taxonomy columns
+    """
+    document, kind = find_instance(path)
+    try:
+        parse = parse_inline if kind == 'inline' else parse_instance
+        df = parse(document, concepts=concepts).to_dataframe()
+    finally:
+        if isinstance(document, ZipPath):
+            document.fs.close()
+    
+    df['dimensions'] = df['dimensions'].map(_dimensions_text).astype(object)
+    df.insert(0, 'filing_id', filing_id or Path(path).stem)
+    if taxonomy is not None:
+        columns = [c for c in taxonomy_columns if c in taxonomy.columns]
+        concept = df['concept'].astype(object)
+        for column in columns:
+            # The facts have their own period_type (of the context)
+            name = f'concept_{column}' if column in df.columns else column
+            df[name] = concept.map(taxonomy[column]).to_numpy()
+    return df
+
+
+# Per-process state of the workers, set by _init_worker()
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(
+    taxonomy: str | Path | Callable[[], pd.DataFrame] | None,
+    cache: ArtifactCache | str | Path | None,
+    concepts: Set[str] | None,
+    taxonomy_columns: tuple,
+) -> None:
+    """Worker initializer: load the standard taxonomy once per process."""
+    if taxonomy is None:
+        table = None
+    elif callable(taxonomy):
+        table = taxonomy()
+    else:
+        table = load_taxonomy(taxonomy, cache=cache)
+    _WORKER.update(taxonomy=table, concepts=concepts, taxonomy_columns=taxonomy_columns)
+
+
+def _process_filing(filing: Filing) -> tuple[Filing, Optional[pd.DataFrame], Optional[str]]:
+    """Worker function: (filing, facts, None) or (filing, None, error)."""
+    try:
+        df = extract_filing(
+            filing.path,
+            filing.filing_id,
+            concepts=_WORKER.get('concepts'),
+            taxonomy=_WORKER.get('taxonomy'),
+            taxonomy_columns=_WORKER.get('taxonomy_columns', DEFAULT_TAXONOMY_COLUMNS),
+        )
+    except Exception as e:
+        return filing, None, f"{type(e).__name__}: {e}"
+    return filing, df, None
+
+
+def _imap_unordered(executor: ProcessPoolExecutor, fn: Callable, items: Iterator, window: int) -> Iterator:
+    """executor.map() with at most `window` tasks in flight, yielding in completion order."""
+    pending = set()
+    for item in items:
+        pending.add(executor.submit(fn, item))
+        if len(pending) >= window:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+# --- output ---
+
+class Checkpoint:
+    """
+    Append-only log of the filings whose rows are safely on disk.
+    
+    One JSON record per line:
+        {"file": "partition=2023Q1/part-00000.parquet", "rows": 12345, "filings": [...]}
+        {"file": null, "rows": 0, "filings": ["0000320193-23-000106"]}
+        {"failed": "0000320193-23-000107", "error": "FileNotFoundError: ..."}
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.done: Set[str] = set()
+        self.failed: Dict[str, str] = {}
+        self.files: Set[str] = set()
+        if path.exists():
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line of a crashed run
+                    if 'failed' in record:
+                        self.failed[record['failed']] = record.get('error', '')
+                        continue
+                    self.done.update(record['filings'])
+                    if record.get('file'):
+                        self.files.add(record['file'])
+        for filing_id in self.done:
+            self.failed.pop(filing_id, None)
+    
+    def record(self, **record: Any) -> None:
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class PartitionWriter:
+    """
+    Buffers fact rows per partition and writes them as part files.
+    
+    Part files are written to a temporary name and renamed, then recorded
+    in the checkpoint together with the filings they contain.
+    """
+    
+    def __init__(self, output_dir: Path, checkpoint: Checkpoint, format: str = 'parquet', rows_per_file: int = 1_000_000):
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {sorted(FORMATS)}, got {format!r}")
+        if format == 'parquet':
+            _require_parquet()
+        self.output_dir = output_dir
+        self.checkpoint = checkpoint
+        self.format = format
+        self.rows_per_file = rows_per_file
+        self.files: List[Path] = []
+        self.rows = 0
+        # partition -> (filing ids, frames, buffered rows)
+        self._buffers: Dict[str, tuple[List[str], List[pd.DataFrame], int]] = {}
+        self._next_part = _next_part_number(output_dir)
+    
+    def add(self, filing: Filing, df: pd.DataFrame) -> None:
+        if df.empty:
+            self.checkpoint.record(file=None, rows=0, filings=[filing.filing_id])
+            return
+        ids, frames, rows = self._buffers.get(filing.partition, ([], [], 0))
+        ids.append(filing.filing_id)
+        frames.append(df)
+        rows += len(df)
+        self._buffers[filing.partition] = (ids, frames, rows)
+        if rows >= self.rows_per_file:
+            self.flush(filing.partition)
+    
+    def flush(self, partition: str | None = None) -> None:
+        """Write the buffered rows of one partition (or of all)."""
+        partitions = list(self._buffers) if partition is None else [partition]
+        for name in partitions:
+            ids, frames, rows = self._buffers.pop(name)
+            df = pd.concat(frames, ignore_index=True)
+            relative = f"partition={name}/part-{self._next_part:05d}{FORMATS[self.format]}"
+            self._next_part += 1
+            target = self.output_dir / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f'.{target.name}.tmp')
+            if self.format == 'parquet':
+                df.to_parquet(tmp, index=False)
+            else:
+                df.to_csv(tmp, index=False)
+            os.replace(tmp, target)
+            self.checkpoint.record(file=relative, rows=rows, filings=ids)
+            self.files.append(target)
+            self.rows += rows
+
+
+def _require_parquet() -> None:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        try:
+            import fastparquet  # noqa: F401
+        except ImportError:
+            raise ImportError("pyarrow (or fastparquet) is required for Parquet output; use format='csv' without it")
+
+
+def _next_part_number(output_dir: Path) -> int:
+    numbers = [
+        int(match.group(1))
+        for path in output_dir.glob('partition=*/part-*')
+        if (match := _PART_NAME.match(path.name))
+    ]
+    return max(numbers, default=-1) + 1
+
+
+def _remove_orphans(output_dir: Path, checkpoint: Checkpoint) -> int:
+    """Delete part files (and temp files) that the checkpoint does not list."""
+    removed = 0
+    for path in output_dir.glob('partition=*/*'):
+        if path.relative_to(output_dir).as_posix() not in checkpoint.files:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+# --- pipeline ---
+
+def run_batch(
+    source: str | Path | Iterable[Filing],
+    output_dir: str | Path,
+    workers: int | None = None,
+    taxonomy: str | Path | Callable[[], pd.DataFrame] | None = None,
+    cache: ArtifactCache | str | Path | None = None,
+    concepts: Set[str] | None = None,
+    taxonomy_columns: Iterable[str] = DEFAULT_TAXONOMY_COLUMNS,
+    format: str = 'parquet',
+    rows_per_file: int = 1_000_000,
+    retry_failed: bool = False,
+    pattern: str = '*.zip',
+    debug: bool = False,
+) -> BatchResult:
+    """
+    Extract the facts of many filings into a partitioned dataset.
+    
+    Filings are processed by a pool of worker processes, each of which
+    loads the standard taxonomy once. Results stream back to this process,
+    which writes them as part files per partition and records every
+    written file in a checkpoint. Running again with the same output
+    directory resumes: filings already written are skipped.
+    
+    Args:
+        source: Mirror directory, manifest file or iterable of Filing
+                (see iter_filings())
+        output_dir: Dataset directory (created if needed)
+        workers: Worker processes (None or 1 = run in this process)
+        taxonomy: Standard taxonomy folder or .zip (see load_taxonomy()),
+                  or a picklable callable returning the concept table.
+                  Loaded once per worker.
+        cache: ArtifactCache (or cache directory) used to load the taxonomy
+        concepts: Optional set of concept names to keep
+        taxonomy_columns: Taxonomy columns joined onto the facts
+        format: 'parquet' (needs pyarrow or fastparquet) or 'csv'
+        rows_per_file: Approximate number of rows per part file
+        retry_failed: Also retry filings that failed in an earlier run
+        pattern: File pattern when source is a directory
+        debug: Print progress
+    
+    Returns:
+        BatchResult for this run
+    
+    Examples:
+        >>> result = run_batch('edgar/2023', 'facts/', workers=8,
+        ...                    taxonomy='us-gaap-2023.zip', cache='~/.cache/leanrl')
+        >>> result.processed, result.rows, len(result.failed)
+        >>>
+        >>> # Read the dataset back (pyarrow)
+        >>> df = pd.read_parquet('facts/', filters=[('partition', '=', '2023-QTR1')])
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint = Checkpoint(output_dir / CHECKPOINT_FILE)
+    removed = _remove_orphans(output_dir, checkpoint)
+    writer = PartitionWriter(output_dir, checkpoint, format=format, rows_per_file=rows_per_file)
+    result = BatchResult()
+    if debug and (checkpoint.done or removed):
+        print(f"Resuming: {len(checkpoint.done)} filings done, {removed} unrecorded files removed")
+    
+    def _todo() -> Iterator[Filing]:
+        for filing in iter_filings(source, pattern):
+            if filing.filing_id in checkpoint.done or (
+                not retry_failed and filing.filing_id in checkpoint.failed
+            ):
+                result.skipped += 1
+                continue
+            yield filing
+    
+    initargs = (taxonomy, cache, concepts, tuple(taxonomy_columns))
+    if workers is not None and workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs)
+        results = _imap_unordered(executor, _process_filing, _todo(), window=4 * workers)
+    else:
+        executor = None
+        _init_worker(*initargs)
+        results = map(_process_filing, _todo())
+    
+    try:
+        for filing, df, error in results:
+            result.processed += 1
+            if error is not None:
+                result.failed[filing.filing_id] = error
+                checkpoint.record(failed=filing.filing_id, error=error)
+                if debug:
+                    print(f"Failed {filing.filing_id}: {error}")
+                continue
+            writer.add(filing, df)
+            if debug and result.processed % 100 == 0:
+                print(f"{result.processed} filings processed")
+        writer.flush()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        _WORKER.clear()
+    
+    result.rows = writer.rows
+    result.files = writer.files
+    if debug:
+        print(f"Done: {result.processed} processed, {result.skipped} skipped, "
+              f"{len(result.failed)} failed, {result.rows:,} rows in {len(result.files)} files")
+    return result
@@ -16,6 +16,7 @@ from .namespaces import (
     NS_XBRLI,
     NS_XBRLDI,
     NS_XBRLDT,
+    NS_IX,
     NS_XS,
     NS_XSD,
     NS_XSI,
@@ -33,6 +34,34 @@ from .namespaces import (
 from .streaming import (
     stream_xml,
     stream_xml_with_ancestors,
+    stream_children,
+)
+
+from .parser import (
+    ElementHandler,
+    LinkbaseHandler,
+    StreamingParser,
+)
+
+from .scanner import (
+    ENGINES,
+    EXTENDED_LINK_TAGS,
+    role_matcher,
+    scan_xml,
+    stream_fields,
+)
+
+from .zipfs import (
+    Source,
+    ZipFS,
+    ZipPath,
+    as_sources,
+    open_source,
+)
+
+from .cache import (
+    ArtifactCache,
+    DEFAULT_MAX_BYTES,
 )
 
 __all__ = [
@@ -45,6 +74,7 @@ __all__ = [
     'NS_XBRLI',
     'NS_XBRLDI',
     'NS_XBRLDT',
+    'NS_IX',
     'NS_XS',
     'NS_XSD',
     'NS_XSI',
@@ -59,4 +89,24 @@ __all__ = [
     # Streaming
     'stream_xml',
     'stream_xml_with_ancestors',
+    'stream_children',
+    # Single-pass dispatcher
+    'ElementHandler',
+    'LinkbaseHandler',
+    'StreamingParser',
+    # Fast scanner
+    'ENGINES',
+    'EXTENDED_LINK_TAGS',
+    'role_matcher',
+    'scan_xml',
+    'stream_fields',
+    # Zip-backed filesystem
+    'Source',
+    'ZipFS',
+    'ZipPath',
+    'as_sources',
+    'open_source',
+    # Persistent cache
+    'ArtifactCache',
+    'DEFAULT_MAX_BYTES',
 ]
\ No newline at end of file
@@ -0,0 +1,295 @@
+"""
+Persistent Artifact Cache
+
+Content-addressed on-disk cache for parsed taxonomy artifacts (schema
+tables, label and reference maps, concept trees).
+
+Released taxonomies never change, so a parsed result can be reused for as
+long as the file's content is the same. Every entry is keyed by a
+fingerprint of the source file's content, the artifact kind (which
+encodes the parser options) and the library version, and is stored as one
+pickle file. A warm start therefore reads a few binary files instead of
+re-parsing XML.
+
+Fingerprints:
+- local files: blake2b of the content, memoized by (size, mtime_ns) in the
+  cache directory so unchanged files are not re-hashed
+- zip members (ZipPath): the CRC-32 and size stored in the archive, so
+  nothing has to be decompressed to look an entry up
+
+The directory is kept under ``max_bytes`` by evicting the least recently
+used entries. Each hit refreshes the entry's mtime, which is the LRU
+clock.
+"""
+
+from typing import Any, Callable, Dict, Iterator, TypeVar
+from pathlib import Path
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+
+from .zipfs import Source, ZipPath, open_source
+
+
+# Bumped whenever the layout of cached entries changes
+CACHE_FORMAT = 1
+
+# Default size limit of a cache directory
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Suffix of entry files, and name of the fingerprint memo
+ENTRY_SUFFIX = '.pkl'
+FINGERPRINTS_FILE = 'fingerprints.json'
+
+# Bytes hashed per read
+_HASH_CHUNK = 1024 * 1024
+
+T = TypeVar('T')
+
+
+def _library_version() -> str:
+    from .. import __version__
+    return __version__
+
+
+class ArtifactCache:
+    """
+    Size-limited, content-addressed cache of parsed artifacts.
+    
+    Args:
+        directory: Cache directory (created if needed)
+        max_bytes: Total size limit of the entries; least recently used
+                   entries are evicted beyond it
+    
+    Examples:
+        >>> cache = ArtifactCache('~/.cache/leanrl')
+        >>> labels = cache.get_or_parse(
+        ...     'us-gaap-lab-2020-01-31.xml', f'labels:{Roles.LABEL}',
+        ...     lambda: parse_label_linkbase('us-gaap-lab-2020-01-31.xml', Roles.LABEL),
+        ... )
+        >>>
+        >>> # Or drive it by hand
+        >>> key = cache.key('us-gaap-2020-01-31.xsd', 'schema')
+        >>> schemas = cache.get(key)
+        >>> if schemas is None:
+        ...     schemas = parse_schema('us-gaap-2020-01-31.xsd', include_abstract=True)
+        ...     cache.put(key, schemas)
+    
+    Note:
+        get() returns None on a miss, so None itself cannot be cached.
+        Entries are written atomically (temp file + rename), so several
+        processes may share one directory.
+    """
+    
+    def __init__(self, directory: str | Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._fingerprints: Dict[str, list] | None = None
+        self._fingerprints_dirty = False
+        # Running total of entry sizes (None = not counted yet)
+        self._total: int | None = None
+        self._lock = threading.Lock()
+    
+    def __repr__(self) -> str:
+        return f"ArtifactCache({str(self.directory)!r}, max_bytes={self.max_bytes})"
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self._entries())
+    
+    @property
+    def size(self) -> int:
+        """Total size in bytes of the cached entries."""
+        return sum(st.st_size for _, st in self._entries())
+    
+    # --- keys ---
+    
+    def fingerprint(self, source: Source) -> str:
+        """
+        Content fingerprint of a source file.
+        
+        Raises:
+            TypeError: For file objects, which cannot be fingerprinted
+                       without consuming them
+        """
+        if isinstance(source, ZipPath):
+            info = source.fs.info(source.at)
+            return f"zip-crc32:{info['crc']:08x}:{info['size']}"
+        if hasattr(source, 'read'):
+            raise TypeError("ArtifactCache needs a path or ZipPath, not a file object")
+        
+        path = str(Path(source).resolve())
+        st = os.stat(path)
+        memo = self._load_fingerprints()
+        known = memo.get(path)
+        if known is not None and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            return known[2]
+        
+        digest = hashlib.blake2b(digest_size=20)
+        with open_source(path) as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+                digest.update(chunk)
+        fingerprint = f"blake2b:{digest.hexdigest()}"
+        with self._lock:
+            memo[path] = [st.st_size, st.st_mtime_ns, fingerprint]
+            self._fingerprints_dirty = True
+        self._save_fingerprints()
+        return fingerprint
+    
+    def key(self, source: Source, kind: str) -> str:
+        """
+        Cache key for one artifact of a source file.
+        
+        Args:
+            source: The parsed file (path or ZipPath)
+            kind: Artifact kind, including every parser option that changes
+                  the result (e.g. 'labels:<role URI>', 'def-tree')
+        """
+        text = f"{CACHE_FORMAT}\0{_library_version()}\0{kind}\0{self.fingerprint(source)}"
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=20).hexdigest()
+    
+    # --- entries ---
+    
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{ENTRY_SUFFIX}"
+    
+    def _entries(self) -> Iterator[tuple[str, os.stat_result]]:
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(ENTRY_SUFFIX) and entry.is_file():
+                    try:
+                        yield entry.path, entry.stat()
+                    except FileNotFoundError:
+                        continue  # Evicted by another process meanwhile
+    
+    def get(self, key: str) -> Any:
+        """Load an entry, or return None if it is missing or unreadable."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Corrupt or written by an incompatible version: drop it
+            self._remove(path)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+    
+    def put(self, key: str, value: Any) -> None:
+        """Store an entry, then evict old entries if over the size limit."""
+        if self._total is None:
+            self._total = self.size
+        path = self._path(key)
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                written = f.tell()
+            os.replace(tmp, path)
+        except BaseException:
+            self._remove(tmp)
+            raise
+        
+        self._total += written - replaced
+        if self._total > self.max_bytes:
+            self.evict()
+    
+    def get_or_parse(self, source: Source, kind: str, parse: Callable[[], T]) -> T:
+        """Return the cached artifact, or run parse() and cache its result."""
+        key = self.key(source, kind)
+        value = self.get(key)
+        if value is None:
+            value = parse()
+            self.put(key, value)
+        return value
+    
+    def evict(self, max_bytes: int | None = None) -> int:
+        """
+        Delete least recently used entries until the total size fits.
+        
+        Returns:
+            Number of entries removed
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = list(self._entries())
+        total = sum(st.st_size for _, st in entries)
+        removed = 0
+        for path, st in sorted(entries, key=lambda e: e[1].st_mtime_ns):
+            if total <= limit:
+                break
+            self._remove(path)
+            total -= st.st_size
+            removed += 1
+        self._total = total
+        return removed
+    
+    def clear(self) -> None:
+        """Delete every entry and the fingerprint memo."""
+        for path, _ in list(self._entries()):
+            self._remove(path)
+        self._remove(self.directory / FINGERPRINTS_FILE)
+        with self._lock:
+            self._fingerprints = {}
+            self._fingerprints_dirty = False
+        self._total = 0
+    
+    @staticmethod
+    def _remove(path: str | Path) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    
+    # --- fingerprint memo ---
+    
+    def _load_fingerprints(self) -> Dict[str, list]:
+        if self._fingerprints is None:
+            try:
+                with open(self.directory / FINGERPRINTS_FILE, 'rb') as f:
+                    data = json.loads(f.read())
+                memo = data['files'] if data.get('version') == CACHE_FORMAT else {}
+            except (OSError, ValueError, KeyError, TypeError):
+                memo = {}
+            with self._lock:
+                if self._fingerprints is None:
+                    self._fingerprints = memo
+        return self._fingerprints
+    
+    def _save_fingerprints(self) -> None:
+        with self._lock:
+            if not self._fingerprints_dirty:
+                return
+            data = json.dumps({'version': CACHE_FORMAT, 'files': self._fingerprints})
+            self._fingerprints_dirty = False
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp, self.directory / FINGERPRINTS_FILE)
+        except OSError:
+            self._remove(tmp)
+
+
+def as_cache(cache: 'ArtifactCache | str | Path | None') -> 'ArtifactCache | None':
+    """Accept a cache object, a cache directory, or None (no caching)."""
+    if cache is None or isinstance(cache, ArtifactCache):
+        return cache
+    return ArtifactCache(cache)
@@ -75,6 +75,12 @@ class Namespaces:
         uri='http://xbrl.org/2005/xbrldt'
     )
     
+    # Inline XBRL 1.1 (facts embedded in XHTML)
+    IX: ClassVar[Namespace] = Namespace(
+        prefix='ix',
+        uri='http://www.xbrl.org/2013/inlineXBRL'
+    )
+    
     # XML Schema Namespaces
     XS: ClassVar[Namespace] = Namespace(
         prefix='xs',
@@ -156,6 +162,7 @@ NS_XLINK = Namespaces.XLINK.tag
 NS_XBRLI = Namespaces.XBRLI.tag
 NS_XBRLDI = Namespaces.XBRLDI.tag
 NS_XBRLDT = Namespaces.XBRLDT.tag
+NS_IX = Namespaces.IX.tag
 NS_XS = Namespaces.XS.tag
 NS_XSD = Namespaces.XSD.tag
 NS_XSI = Namespaces.XSI.tag
@@ -260,6 +267,7 @@ class ArcRoles:
     DOMAIN_MEMBER = 'http://xbrl.org/int/dim/arcrole/domain-member'
     ALL = 'http://xbrl.org/int/dim/arcrole/all'
     NOT_ALL = 'http://xbrl.org/int/dim/arcrole/notAll'
+    DIMENSION_DEFAULT = 'http://xbrl.org/int/dim/arcrole/dimension-default'
     CONCEPT_LABEL = 'http://www.xbrl.org/2003/arcrole/concept-label'
     CONCEPT_REFERENCE = 'http://www.xbrl.org/2003/arcrole/concept-reference'
     FACT_FOOTNOTE = 'http://www.xbrl.org/2003/arcrole/fact-footnote'
@@ -1,30 +1,166 @@
 # src/easyrl/core/parser.py
 from abc import ABC, abstractmethod
-from typing import Iterator, Any
-import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, List, Sequence, Set
 from pathlib import Path
 
-#This is an abstract base class (ABC) — it cannot be instantiated directly. Subclasses must implement the parse() method.
-class StreamingParser(ABC):
-    """Base class for memory-efficient XML parsing."""
-    
-    def __init__(self, source: str | Path):
-        self.source = Path(source)
-    
-    def _iter_elements(self, tags: set[str]) -> Iterator[ET.Element]:
-        """Stream elements, clearing memory after each."""
-        try:        
-            context = ET.iterparse(self.source, events=('end',))
-            for event, elem in context:
-                if elem.tag in tags:
-                    yield elem
-                    elem.clear()
-        except ET.ParseError as e:
-            raise ValueError(f"Invalid XML in {self.source}: {e}")
-        except Exception as e:
-            raise ValueError(f"Error parsing {self.source}: {e}")
+from .namespaces import qname
+from .scanner import EXTENDED_LINK_TAGS, RoleFilter, stream_fields
+from .zipfs import Source
+from ..utils import extract_concept_from_href
+
+
+class ElementHandler(ABC):
+    """
+    Consumer of streamed elements, registered with a StreamingParser.
+
+    Subclasses declare what they read in ``fields``, a mapping of qualified
+    tag to attribute names, plus the tags whose text they need in
+    ``text_tags``. handle() then receives each matching element as the
+    tuple of its attribute values (None when missing), with the text
+    appended for the tags in ``text_tags``, as stream_fields() reports it.
+    A tag mapped to None is handed over as the Element itself, with its
+    subtree; such handlers need the 'etree' engine.
+
+    The output is built in result(). Subclasses call super().__init__()
+    and then add to their own ``fields`` and ``text_tags``.
+    """
+
+    fields: Dict[str, Sequence[str] | None]
+    text_tags: Set[str]
+
+    def __init__(self):
+        self.fields = {}
+        self.text_tags = set()
+
+    @abstractmethod
+    def handle(self, tag: str, values: Any) -> None:
+        """Process one element's values (or the Element, see above)."""
+        pass
+
     @abstractmethod
-    def parse(self) -> Any:
-        """Subclasses implement specific parsing logic."""
+    def result(self) -> Any:
+        """Return the handler's output once the pass is complete."""
         pass
 
+
+class LinkbaseHandler(ElementHandler):
+    """
+    Base handler for linkbases: collects link:loc locators into loc_map.
+
+    Locator labels are only unique within their extended link, so the
+    handler follows the links (``link_role`` is the role of the current
+    one) and calls end_link() before the next link starts. Subclasses
+    resolve the arcs of the link there against loc_map, call
+    super().end_link(), and call end_link() once more in result() for
+    the last link.
+
+    Subclasses add their own arc/resource tags to ``fields`` and call
+    super().handle() for anything they do not process themselves.
+    """
+
+    TAG_LOC = qname('link', 'loc')
+    ATTR_ROLE = qname('xlink', 'role')
+    ATTR_LABEL = qname('xlink', 'label')
+    ATTR_HREF = qname('xlink', 'href')
+
+    def __init__(self):
+        super().__init__()
+        self.link_role = ''
+        self.loc_map: Dict[str, str] = {}  # label_id -> concept_name
+        # Extended links are reported at their start, before their locators
+        self.fields.update(dict.fromkeys(EXTENDED_LINK_TAGS, (self.ATTR_ROLE,)))
+        self.fields[self.TAG_LOC] = (self.ATTR_LABEL, self.ATTR_HREF)
+
+    def handle(self, tag: str, values: Any) -> None:
+        if tag == self.TAG_LOC:
+            label_id, href = values
+            if label_id and href:
+                self.loc_map[label_id] = extract_concept_from_href(href)
+
+        elif tag in EXTENDED_LINK_TAGS:
+            self.end_link()
+            self.link_role = values[0] or ''
+
+    def end_link(self) -> None:
+        """Close the current extended link: its locators go out of scope."""
+        self.loc_map.clear()
+
+
+class StreamingParser:
+    """
+    Single-pass dispatcher for memory-efficient XML parsing.
+
+    Several handlers register for the fields they need and are all fed
+    from one stream_fields() pass over the file, so a file is read once
+    no matter how many results are extracted from it. The linkbase
+    parse_*() functions are thin wrappers registering a single handler.
+
+    The source can be a local path, a binary file object (read once) or
+    a ZipPath into a taxonomy archive.
+
+    Args:
+        source: The XML file to parse
+        engine: Scanning engine, 'etree' (default) or 'expat'
+        roles: Optional extended link role filter, applied while streaming
+               (see role_matcher())
+
+    Raises:
+        ValueError: On an unknown engine, when two handlers read different
+                    fields of the same tag, or when a handler needs whole
+                    Elements with the 'expat' engine
+
+    Examples:
+        >>> parser = StreamingParser('us-gaap-stm-soi-def-2020-01-31.xml')
+        >>> members = parser.register(DefinitionHandler(ArcRoles.DOMAIN_MEMBER))
+        >>> dims = parser.register(DefinitionHandler(ArcRoles.HYPERCUBE_DIMENSION))
+        >>> member_tree, dim_tree = parser.parse()
+    """
+
+    def __init__(self, source: Source, engine: str = 'etree', roles: RoleFilter | None = None):
+        # Paths, file objects and ZipPaths are all streamed by stream_fields()
+        self.source = Path(source) if isinstance(source, str) else source
+        self.engine = engine
+        self.roles = roles
+        self.handlers: List[ElementHandler] = []
+
+    def register(self, handler: ElementHandler) -> ElementHandler:
+        """Register a handler for the next pass and return it."""
+        self.handlers.append(handler)
+        return handler
+
+    def parse(self) -> List[Any]:
+        """
+        Run one pass over the source and feed every registered handler.
+
+        Returns:
+            List of handler results, in registration order.
+        """
+        fields: Dict[str, Sequence[str] | None] = {}
+        text_tags: Set[str] = set()
+        dispatch: Dict[str, List[Callable[[str, Any], None]]] = {}
+        for handler in self.handlers:
+            for tag, names in handler.fields.items():
+                if names is not None:
+                    names = tuple(names)
+                wants_text = tag in handler.text_tags
+                if tag in dispatch and (fields[tag] != names or (tag in text_tags) != wants_text):
+                    raise ValueError(f"Handlers read different fields of {tag}")
+                fields[tag] = names
+                if wants_text:
+                    text_tags.add(tag)
+                dispatch.setdefault(tag, []).append(handler.handle)
+
+        stream = stream_fields(
+            self.source, fields, text_tags, engine=self.engine, roles=self.roles
+        )
+        if len(self.handlers) == 1:
+            # The parse_*() functions: no per-tag lookup needed
+            handle = self.handlers[0].handle
+            for tag, values in stream:
+                handle(tag, values)
+        else:
+            for tag, values in stream:
+                for handle in dispatch[tag]:
+                    handle(tag, values)
+
+        return [handler.result() for handler in self.handlers]
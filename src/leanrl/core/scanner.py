@@ -0,0 +1,352 @@
+"""
+Expat-based Fast Scanner
+
+Zero-Element scanning engine built directly on pyexpat handlers.
+
+ET.iterparse builds a full Element (with an attribute dict) for every node,
+even though the linkbase parsers only read two or three attributes from
+locators, arcs and resources. The scanner instead reports, for each tag of
+interest, just the requested attribute values as a tuple.
+
+For speed, expat runs without namespace processing and prefixes are
+resolved once from the namespace declarations on the document element
+(where every published XBRL linkbase declares them).
+"""
+
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Sequence, Set, Union
+from itertools import count
+from operator import itemgetter
+import xml.etree.ElementTree as ET
+import pyexpat
+
+from .namespaces import Namespaces, qname
+from .streaming import stream_xml
+from .zipfs import Source, open_source
+
+
+# Names accepted by the engine= switch of the linkbase parsers
+ENGINES = ('etree', 'expat')
+
+# Bytes fed to expat per chunk
+_CHUNK_SIZE = 64 * 1024
+
+# Standard XBRL extended link elements (the scope of a roles= filter)
+EXTENDED_LINK_TAGS = frozenset(
+    qname('link', local) for local in (
+        'presentationLink',
+        'definitionLink',
+        'calculationLink',
+        'labelLink',
+        'referenceLink',
+        'footnoteLink',
+    )
+)
+
+_ATTR_ROLE = qname('xlink', 'role')
+
+# A roles= filter: one role URI, several role URIs, or a predicate on the URI
+RoleFilter = Union[str, Iterable[str], Callable[[str], bool]]
+
+
+def role_matcher(roles: RoleFilter | None) -> Callable[[str], bool] | None:
+    """
+    Normalize a roles= argument into a predicate on extended link role URIs.
+    
+    Args:
+        roles: None (no filter), a role URI, an iterable of role URIs,
+               or a callable taking the role URI and returning a bool
+    
+    Returns:
+        Predicate, or None when no filtering is requested
+    
+    Examples:
+        >>> match = role_matcher('http://fasb.org/us-gaap/role/statement/StatementOfIncome')
+        >>> match = role_matcher(lambda role: 'Parenthetical' not in role)
+    """
+    if roles is None:
+        return None
+    if callable(roles):
+        return roles
+    if isinstance(roles, str):
+        return roles.__eq__
+    return frozenset(roles).__contains__
+
+
+def _split_qname(name: str) -> tuple[str, str]:
+    """Split an ElementTree QName '{uri}local' into (uri, local)."""
+    if name[:1] == '{':
+        uri, local = name[1:].split('}', 1)
+        return uri, local
+    return '', name
+
+
+def scan_xml(
+    xml_file: Source,
+    fields: Dict[str, Sequence[str]],
+    text_tags: Set[str] | None = None,
+    roles: RoleFilter | None = None,
+) -> Iterator[tuple[str, tuple]]:
+    """
+    Scan an XML file with expat, yielding selected attribute values.
+    
+    No Element objects are created. For every element whose tag is a key
+    of ``fields``, the values of the listed attributes are reported as a
+    tuple (None for missing attributes). Tags and attribute names use the
+    same '{uri}local' form as ElementTree, so qname() constants work as-is.
+    
+    Args:
+        xml_file: Path to the XML file, a binary file object or a ZipPath
+        fields: Mapping of tag -> attribute names to extract
+        text_tags: Subset of tags whose text content is also needed
+                   (e.g. link:label). Their text is appended as the last
+                   tuple item and the tuple is emitted at the end tag.
+        roles: Optional extended link role filter (see role_matcher()).
+               Links whose xlink:role does not match are skipped whole:
+               expat stops calling back into Python until the link ends.
+    
+    Yields:
+        Tuple of (tag, values). ``tag`` is the very string object used as
+        the key in ``fields`` (so identity checks are possible).
+    
+    Examples:
+        >>> TAG_LOC = qname('link', 'loc')
+        >>> fields = {TAG_LOC: (qname('xlink', 'label'), qname('xlink', 'href'))}
+        >>> for tag, (label_id, href) in scan_xml('def.xml', fields):
+        ...     print(label_id, href)
+    
+    Note:
+        Namespace declarations are read from the document element only.
+        Use the 'etree' engine for documents that bind the XBRL namespaces
+        on nested elements.
+    """
+    text_tags = text_tags or set()
+    events: List[tuple[str, tuple]] = []
+    append = events.append
+    
+    parser = pyexpat.ParserCreate()
+    parser.buffer_text = True
+    
+    # Raw (prefixed) name -> (tag, raw attribute names, wants_text)
+    lookup: Dict[str, tuple[str, tuple[str, ...], bool]] = {}
+    
+    # Raw extended link name -> raw xlink:role attribute name
+    match_role = role_matcher(roles)
+    link_lookup: Dict[str, str] = {}
+    skipped_link: List[str] = []
+    
+    # Text capture state (text tags do not nest in linkbases)
+    text_parts: List[str] = []
+    pending: List[tuple[str, str, tuple]] = []
+    
+    def _build_lookup(attrs: Dict[str, str]) -> None:
+        """Resolve the requested QNames against the root's xmlns declarations."""
+        # The xml: prefix is bound implicitly (xml:lang on labels)
+        uri_to_prefix: Dict[str, str] = {Namespaces.XML.uri: 'xml'}
+        default_uri = None
+        for key, value in attrs.items():
+            if key == 'xmlns':
+                default_uri = value
+            elif key.startswith('xmlns:'):
+                uri_to_prefix.setdefault(value, key[6:])
+        
+        def _raw_attr(name: str) -> str:
+            uri, local = _split_qname(name)
+            if not uri:
+                return local
+            prefix = uri_to_prefix.get(uri)
+            # Undeclared namespace: the attribute can never match
+            return f'{prefix}:{local}' if prefix else name
+        
+        for tag, attr_names in fields.items():
+            uri, local = _split_qname(tag)
+            raw_attrs = tuple(_raw_attr(a) for a in attr_names)
+            wants_text = tag in text_tags
+            if not uri or uri == default_uri:
+                lookup[local] = (tag, raw_attrs, wants_text)
+            prefix = uri_to_prefix.get(uri)
+            if uri and prefix:
+                lookup[f'{prefix}:{local}'] = (tag, raw_attrs, wants_text)
+        
+        if match_role is not None:
+            raw_role = _raw_attr(_ATTR_ROLE)
+            for tag in EXTENDED_LINK_TAGS:
+                uri, local = _split_qname(tag)
+                if uri == default_uri:
+                    link_lookup[local] = raw_role
+                prefix = uri_to_prefix.get(uri)
+                if prefix:
+                    link_lookup[f'{prefix}:{local}'] = raw_role
+    
+    def _start(name: str, attrs: Dict[str, str]) -> None:
+        entry = lookup.get(name)
+        if entry is None:
+            return
+        tag, raw_attrs, wants_text = entry
+        values = tuple(map(attrs.get, raw_attrs))
+        if wants_text:
+            pending.append((name, tag, values))
+            text_parts.clear()
+            parser.CharacterDataHandler = text_parts.append
+        else:
+            append((tag, values))
+    
+    def _end(name: str) -> None:
+        if pending and pending[-1][0] == name:
+            _, tag, values = pending.pop()
+            parser.CharacterDataHandler = None
+            append((tag, values + (''.join(text_parts),)))
+    
+    def _filtered_start(name: str, attrs: Dict[str, str]) -> None:
+        raw_role = link_lookup.get(name)
+        if raw_role is not None and not match_role(attrs.get(raw_role, '')):
+            # Silence start callbacks until this extended link ends
+            skipped_link.append(name)
+            parser.StartElementHandler = None
+            parser.EndElementHandler = _skip_end
+            return
+        _start(name, attrs)
+    
+    def _skip_end(name: str) -> None:
+        # Extended links do not nest, so the first end tag with this name closes it
+        if name == skipped_link[-1]:
+            skipped_link.pop()
+            parser.StartElementHandler = _filtered_start
+            parser.EndElementHandler = _end if text_tags else None
+    
+    def _root_start(name: str, attrs: Dict[str, str]) -> None:
+        _build_lookup(attrs)
+        start = _start if match_role is None else _filtered_start
+        parser.StartElementHandler = start
+        start(name, attrs)
+    
+    parser.StartElementHandler = _root_start
+    if text_tags:
+        parser.EndElementHandler = _end
+    
+    def _chunks(f: IO[bytes]) -> Iterator[bytes]:
+        while True:
+            data = f.read(_CHUNK_SIZE)
+            if not data:
+                return
+            yield data
+    
+    with open_source(xml_file) as f:
+        try:
+            for data in _chunks(f):
+                parser.Parse(data, False)
+                if events:
+                    yield from events
+                    events.clear()
+            parser.Parse(b'', True)
+            yield from events
+            events.clear()
+        except pyexpat.ExpatError as e:
+            raise ET.ParseError(f"Invalid XML: {e}") from e
+
+
+def stream_fields(
+    xml_file: Source,
+    fields: Dict[str, Sequence[str] | None],
+    text_tags: Set[str] | None = None,
+    engine: str = 'etree',
+    roles: RoleFilter | None = None,
+) -> Iterator[tuple[str, tuple | ET.Element]]:
+    """
+    Yield (tag, attribute values) tuples using the selected engine.
+    
+    Same contract as scan_xml(), so parsers can switch engines without
+    changing their loop:
+    
+    - 'etree': ElementTree iterparse via stream_xml()
+    - 'expat': the zero-Element scan_xml() scanner
+    
+    Both engines stream in bounded memory: the 'etree' engine needs start
+    events to track links and nesting, so it always runs stream_xml()'s
+    pruned mode, and the 'expat' engine never holds finished elements.
+    
+    ``roles`` skips extended links whose role does not match, at stream
+    time, with either engine (see role_matcher()).
+    
+    Extended link tags (EXTENDED_LINK_TAGS) listed in ``fields`` are
+    reported when the link starts, before its locators and arcs, so a
+    parser can track the role of the link it is in.
+    
+    Tags of interest nested in one another (e.g. the element declarations
+    of a tuple's content model) are all reported in document order of
+    their start tags, outer first, with either engine. The one exception
+    is an 'expat' tag in ``text_tags``: it is reported at its end tag,
+    after any tags nested in it.
+    
+    A tag mapped to None in ``fields`` is reported with the Element itself,
+    subtree included, instead of a tuple ('etree' engine only).
+    
+    Raises:
+        ValueError: If engine is not one of ENGINES, or if a tag is mapped
+                    to None with the 'expat' engine
+    """
+    if engine == 'expat':
+        element_tags = [tag for tag, names in fields.items() if names is None]
+        if element_tags:
+            raise ValueError(f"The expat engine cannot report whole elements: {', '.join(element_tags)}")
+        yield from scan_xml(xml_file, fields, text_tags, roles=roles)
+        return
+    if engine != 'etree':
+        raise ValueError(f"Unknown engine: {engine!r}. Available engines: {', '.join(ENGINES)}")
+    
+    match_role = role_matcher(roles)
+    link_fields = {tag: names for tag, names in fields.items() if tag in EXTENDED_LINK_TAGS}
+    # Links reported at their start, waiting to be yielded
+    started: List[tuple[str, tuple]] = []
+    
+    skip = None
+    if match_role is not None:
+        def skip(elem: ET.Element) -> bool:
+            return elem.tag in EXTENDED_LINK_TAGS and not match_role(elem.get(_ATTR_ROLE, ''))
+    
+    text_tags = text_tags or set()
+    tags = set(fields).difference(link_fields)
+    
+    # A tag of interest nested in an open one ends, and is yielded by
+    # stream_xml(), first: hold it back with its start position until the
+    # outermost one is reported, so that nested tags come out outer first
+    open_tags = 0
+    positions: Dict[ET.Element, int] = {}
+    held: List[tuple[int, str, tuple | ET.Element]] = []
+    next_position = count().__next__
+    
+    def on_start(elem: ET.Element) -> None:
+        nonlocal open_tags
+        tag = elem.tag
+        if tag in tags:
+            if open_tags:
+                positions[elem] = next_position()
+            open_tags += 1
+        elif tag in link_fields:
+            started.append((tag, tuple(map(elem.get, link_fields[tag]))))
+    
+    def _values(tag: str, elem: ET.Element) -> tuple | ET.Element:
+        names = fields[tag]
+        if names is None:
+            return elem
+        values = tuple(map(elem.get, names))
+        if tag in text_tags:
+            values += (elem.text or '',)
+        return values
+    
+    # on_start selects stream_xml()'s pruned mode
+    for tag, elem in stream_xml(xml_file, tags_of_interest=tags, skip=skip, on_start=on_start):
+        if started:
+            yield from started
+            started.clear()
+        open_tags -= 1
+        if open_tags:
+            held.append((positions.pop(elem), tag, _values(tag, elem)))
+            continue
+        yield tag, _values(tag, elem)
+        if held:
+            held.sort(key=itemgetter(0))
+            for _position, tag, values in held:
+                yield tag, values
+            held.clear()
+    # Links with nothing of interest after them
+    yield from started
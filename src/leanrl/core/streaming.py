@@ -4,14 +4,18 @@ Base XML Streaming Utilities
 Memory-efficient XML parsing using iterparse with automatic cleanup.
 """
 
-from typing import Iterator, Set
-from pathlib import Path
+from typing import Callable, Dict, Iterator, Set
 import xml.etree.ElementTree as ET
 
+from .zipfs import Source, open_source
+
 
 def stream_xml(
-    xml_file: str | Path,
+    xml_file: Source,
     tags_of_interest: Set[str] | None = None,
+    prune: bool = False,
+    skip: Callable[[ET.Element], bool] | None = None,
+    on_start: Callable[[ET.Element], None] | None = None,
 ) -> Iterator[tuple[str, ET.Element]]:
     """
     Stream XML elements with automatic memory cleanup.
@@ -21,10 +25,25 @@ def stream_xml(
     into memory.
     
     Args:
-        xml_file: Path to the XML file to parse
+        xml_file: Path to the XML file to parse, a binary file object,
+                  or a ZipPath into a zip archive
         tags_of_interest: Optional set of qualified tag names to yield.
                          If None, yields all elements.
                          Use qname() to build qualified names.
+        prune: If True, run in bounded-memory mode. Finished elements are
+               detached from their parent (and so from the document root)
+               instead of only being cleared, so memory stays constant
+               regardless of file size. Yielded elements keep their full
+               subtree (e.g. the part children of a link:reference), and
+               the same elements are yielded as without prune.
+        skip: Optional predicate evaluated when an element starts (its
+              attributes are available, its children are not). If it
+              returns True, the element and its whole subtree are
+              dropped without being yielded. Implies prune=True.
+        on_start: Optional callback invoked when an element starts (after
+                  skip, and not for elements inside a skipped subtree),
+                  e.g. to note the role of the extended link being entered
+                  before its children are yielded. Implies prune=True.
     
     Yields:
         Tuple of (tag, element) for each matching element.
@@ -41,13 +60,24 @@ def stream_xml(
         >>> # Stream all elements
         >>> for tag, elem in stream_xml('document.xml'):
         ...     print(tag)
+        
+        >>> # Constant memory on very large files
+        >>> for tag, elem in stream_xml('us-gaap-ref-2023.xml', tags, prune=True):
+        ...     print(tag)
     
     Note:
         Elements are cleared after yielding to keep memory usage low.
         Do not store references to yielded elements - extract needed
         data immediately.
+        
+        Without prune, cleared elements stay attached to their parents,
+        so the (empty) element skeleton still grows with the file.
     """
-    context = ET.iterparse(xml_file, events=('end',))
+    if prune or skip is not None or on_start is not None:
+        yield from _stream_xml_pruned(xml_file, tags_of_interest, skip, on_start)
+        return
+    
+    context = _iterparse(xml_file, ('end',))
     
     for event, elem in context:
         # Skip if not in our interest set
@@ -61,8 +91,91 @@ def stream_xml(
         elem.clear()
 
 
+def _iterparse(xml_file: Source, events: tuple[str, ...]) -> Iterator[tuple[str, ET.Element]]:
+    """ET.iterparse over any Source, closing the file if it was opened here."""
+    with open_source(xml_file) as f:
+        yield from ET.iterparse(f, events=events)
+
+
+def _stream_xml_pruned(
+    xml_file: Source,
+    tags_of_interest: Set[str] | None,
+    skip: Callable[[ET.Element], bool] | None = None,
+    on_start: Callable[[ET.Element], None] | None = None,
+) -> Iterator[tuple[str, ET.Element]]:
+    """
+    Bounded-memory variant of stream_xml().
+    
+    Tracks the open-element stack via 'start' events so every finished
+    element can be removed from its parent. Since finished siblings are
+    detached as soon as they end, a parent never holds more than its one
+    in-progress child and ``remove()`` stays O(1).
+    
+    Elements inside a subtree of interest are kept until that subtree is
+    yielded, so callers can still read child elements. Elements of interest
+    nested in it are yielded at their own end, as in the unpruned mode,
+    and stay attached (and uncleared) until the outer one ends. Subtrees
+    rejected by ``skip`` are detached without being yielded; ``on_start``
+    sees every other element at its start event.
+    """
+    stack: list[ET.Element] = []
+    # Depth of the outermost open element of interest (-1 = none open)
+    capture_depth = -1
+    # Depth of the subtree being skipped (-1 = none)
+    skip_depth = -1
+    
+    context = _iterparse(xml_file, ('start', 'end'))
+    
+    for event, elem in context:
+        if event == 'start':
+            if skip_depth < 0:
+                if skip is not None and skip(elem):
+                    skip_depth = len(stack)
+                else:
+                    if on_start is not None:
+                        on_start(elem)
+                    if (
+                        capture_depth < 0
+                        and tags_of_interest is not None
+                        and elem.tag in tags_of_interest
+                    ):
+                        capture_depth = len(stack)
+            stack.append(elem)
+            continue
+        
+        # event == 'end'
+        stack.pop()
+        depth = len(stack)
+        
+        if skip_depth >= 0:
+            if depth == skip_depth:
+                # Drop the finished skipped subtree in one go
+                skip_depth = -1
+                elem.clear()
+                if stack:
+                    stack[-1].remove(elem)
+            continue
+        
+        if capture_depth >= 0 and depth > capture_depth:
+            # Inside an element of interest: yielded if it is one too, but
+            # kept attached until the owner ends
+            if elem.tag in tags_of_interest:
+                yield elem.tag, elem
+            continue
+        
+        if tags_of_interest is None or elem.tag in tags_of_interest:
+            yield elem.tag, elem
+        
+        if depth == capture_depth:
+            capture_depth = -1
+        
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+
 def stream_xml_with_ancestors(
-    xml_file: str | Path,
+    xml_file: Source,
     tags_of_interest: Set[str] | None = None,
 ) -> Iterator[tuple[str, ET.Element, list[ET.Element]]]:
     """
@@ -72,7 +185,7 @@ def stream_xml_with_ancestors(
     in the document hierarchy.
     
     Args:
-        xml_file: Path to the XML file
+        xml_file: Path to the XML file, a binary file object or a ZipPath
         tags_of_interest: Optional set of tags to yield
     
     Yields:
@@ -88,7 +201,7 @@ def stream_xml_with_ancestors(
     # Track the element stack
     path: list[ET.Element] = []
     
-    context = ET.iterparse(xml_file, events=('start', 'end'))
+    context = _iterparse(xml_file, ('start', 'end'))
     
     for event, elem in context:
         if event == 'start':
@@ -101,4 +214,53 @@ def stream_xml_with_ancestors(
                 # Yield with copy of current ancestor path
                 yield elem.tag, elem, list(path)
             
-            elem.clear()
\ No newline at end of file
+            elem.clear()
+
+
+def stream_children(
+    xml_file: Source,
+    namespaces: Dict[str, str] | None = None,
+) -> Iterator[tuple[str, ET.Element]]:
+    """
+    Stream the children of the document element, each with its full subtree.
+    
+    Suited to flat documents whose records are the root's children and can
+    have any tag, like XBRL instances (contexts, units and facts directly
+    under <xbrli:xbrl>). Each child is yielded once it is complete, then
+    cleared and detached, so memory stays bounded by the largest single
+    record regardless of file size.
+    
+    Args:
+        xml_file: Path to the XML file, a binary file object or a ZipPath
+        namespaces: Optional dict filled with the document's prefix -> URI
+                    declarations as they are read (all of the root's are
+                    known before its first child is yielded)
+    
+    Yields:
+        Tuple of (tag, element) for each child of the document element.
+    
+    Examples:
+        >>> ns = {}
+        >>> for tag, elem in stream_children('aapl-20230930.xml', ns):
+        ...     if elem.get('contextRef'):
+        ...         print(tag, elem.text)
+    """
+    events = ('start', 'end', 'start-ns') if namespaces is not None else ('start', 'end')
+    root = None
+    depth = 0
+    
+    for event, item in _iterparse(xml_file, events):
+        if event == 'start-ns':
+            prefix, uri = item
+            namespaces.setdefault(prefix, uri)
+        elif event == 'start':
+            if root is None:
+                root = item
+            depth += 1
+        else:  # event == 'end'
+            depth -= 1
+            if depth == 1:
+                yield item.tag, item
+                item.clear()
+                # Finished children are detached at once, so this is the last one
+                root.remove(item)
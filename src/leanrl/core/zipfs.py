@@ -0,0 +1,343 @@
+"""
+Zip-backed Virtual Filesystem
+
+Read taxonomy packages straight out of their .zip archive, without
+extracting anything to disk.
+
+ZipFS is a read-only, fsspec-like filesystem (open/info/ls/glob) over one
+archive, so it can be passed wherever a parser takes ``fs=``. ZipPath
+implements the subset of pathlib.Path used to walk a taxonomy folder
+(``/``, exists, iterdir, glob, open, name, parent, ...), so directory-level
+helpers work on a zip unchanged. Members are streamed through
+``zipfile.ZipFile.open`` and decompressed chunk by chunk as they are read.
+"""
+
+from typing import IO, Dict, Iterable, Iterator, List, Set, Union
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
+from pathlib import Path
+import os
+import posixpath
+import threading
+import time
+import zipfile
+
+
+# Anything the XML readers accept: a local path, a binary file object,
+# or an object with a pathlib-style open() such as ZipPath
+Source = Union[str, Path, IO[bytes], 'ZipPath']
+
+
+@contextmanager
+def open_source(source: Source) -> Iterator[IO[bytes]]:
+    """
+    Open any supported source as a binary file object.
+    
+    Local paths are opened with open(); objects with an ``open()`` method
+    (Path, ZipPath, zipfile.Path) are opened in 'rb' mode. File objects
+    are passed through and left open for the caller.
+    
+    Examples:
+        >>> with open_source('us-gaap-lab-2020-01-31.xml') as f:
+        ...     head = f.read(64)
+        >>>
+        >>> fs = ZipFS('us-gaap-2020-01-31.zip')
+        >>> with open_source(fs.path('us-gaap-2020-01-31/elts/us-gaap-2020-01-31.xsd')) as f:
+        ...     head = f.read(64)
+    """
+    if hasattr(source, 'read'):
+        yield source
+        return
+    if isinstance(source, (str, os.PathLike)):
+        f = open(source, 'rb')
+    else:
+        f = source.open('rb')
+    try:
+        yield f
+    finally:
+        f.close()
+
+
+def as_sources(sources: Source | Iterable[Source]) -> List[Source]:
+    """
+    List of sources from one source or an iterable of sources.
+    
+    Strings, bytes, file objects and anything with an ``open()`` method
+    (Path, ZipPath) are single sources, not iterables of them.
+    
+    Examples:
+        >>> as_sources('us-gaap-lab-2020-01-31.xml')
+        ['us-gaap-lab-2020-01-31.xml']
+    """
+    if isinstance(sources, (str, bytes)) or hasattr(sources, 'read') or hasattr(sources, 'open'):
+        return [sources]
+    return list(sources)
+
+
+def _normalize(path: str) -> str:
+    """Archive-relative POSIX path without leading/trailing slashes."""
+    path = str(path).replace('\\', '/').strip('/')
+    return '' if path in ('', '.') else posixpath.normpath(path)
+
+
+class ZipFS:
+    """
+    Read-only filesystem view of a zip archive.
+    
+    The archive is opened lazily and kept open; the central directory is
+    read once. Paths are relative to the archive root ('a/b.xml').
+    Instances pickle as the archive path only, so they can be handed to
+    worker processes, which reopen the archive on first use.
+    
+    Args:
+        archive: Path to the .zip file
+    
+    Examples:
+        >>> fs = ZipFS('us-gaap-2020-01-31.zip')
+        >>> fs.ls('us-gaap-2020-01-31')
+        ['us-gaap-2020-01-31/dis', 'us-gaap-2020-01-31/elts', ...]
+        >>> with fs.open('us-gaap-2020-01-31/elts/us-gaap-2020-01-31.xsd') as f:
+        ...     schemas = parse_schema(f)
+        >>>
+        >>> # Directory-style access
+        >>> base = fs.path('us-gaap-2020-01-31')
+        >>> sorted(p.name for p in (base / 'stm').glob('*-def-*.xml'))
+    """
+    
+    def __init__(self, archive: str | Path):
+        self.archive = str(archive)
+        self._zip: zipfile.ZipFile | None = None
+        self._members: Dict[str, zipfile.ZipInfo] = {}
+        # Directory -> names of its direct children (files and directories)
+        self._children: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+    
+    def __getstate__(self) -> dict:
+        return {'archive': self.archive}
+    
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state['archive'])
+    
+    def __repr__(self) -> str:
+        return f"ZipFS({self.archive!r})"
+    
+    def __enter__(self) -> 'ZipFS':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+    
+    @property
+    def zip(self) -> zipfile.ZipFile:
+        """The underlying ZipFile, opened (and indexed) on first use."""
+        if self._zip is None:
+            with self._lock:
+                if self._zip is None:
+                    self._index(zipfile.ZipFile(self.archive))
+        return self._zip
+    
+    def _index(self, zf: zipfile.ZipFile) -> None:
+        members: Dict[str, zipfile.ZipInfo] = {}
+        children: Dict[str, Set[str]] = {'': set()}
+        for info in zf.infolist():
+            name = _normalize(info.filename)
+            if not name:
+                continue
+            if not info.is_dir():
+                members[name] = info
+            # Register the member and all its parent directories, which
+            # many archives do not store as entries of their own
+            while name:
+                parent, _, child = name.rpartition('/')
+                siblings = children.setdefault(parent, set())
+                if child in siblings:
+                    break
+                siblings.add(child)
+                name = parent
+        for name in list(members):
+            if name in children:
+                del members[name]  # Both a file and a directory: treat as directory
+        self._members = members
+        self._children = children
+        self._zip = zf
+    
+    def close(self) -> None:
+        """Close the archive (it is reopened on next use)."""
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+    
+    # --- fsspec-like API ---
+    
+    def open(self, path: str, mode: str = 'rb') -> IO[bytes]:
+        """
+        Open a member for streaming reads.
+        
+        Raises:
+            OSError: For any mode other than 'rb' (the archive is read-only)
+            FileNotFoundError: If the member does not exist
+            IsADirectoryError: If the path is a directory
+        """
+        if mode not in ('r', 'rb'):
+            raise OSError(f"ZipFS is read-only, cannot open {path!r} with mode {mode!r}")
+        return self.zip.open(self._member(path))
+    
+    def info(self, path: str) -> Dict:
+        """Size, type, mtime (and CRC-32 for files) of a path, as fsspec's info() reports them."""
+        name = _normalize(path)
+        members, children = self._tree()
+        if name in members:
+            member = members[name]
+            mtime = time.mktime(member.date_time + (0, 0, -1))
+            return {
+                'name': name,
+                'size': member.file_size,
+                'type': 'file',
+                'mtime': mtime,
+                'crc': member.CRC,
+            }
+        if name in children:
+            return {'name': name, 'size': 0, 'type': 'directory', 'mtime': 0.0}
+        raise FileNotFoundError(f"{name!r} not found in {self.archive}")
+    
+    def exists(self, path: str) -> bool:
+        members, children = self._tree()
+        name = _normalize(path)
+        return name in members or name in children
+    
+    def isfile(self, path: str) -> bool:
+        return _normalize(path) in self._tree()[0]
+    
+    def isdir(self, path: str) -> bool:
+        return _normalize(path) in self._tree()[1]
+    
+    def ls(self, path: str = '') -> List[str]:
+        """Full paths of the direct children of a directory, sorted."""
+        name = _normalize(path)
+        children = self._tree()[1]
+        if name not in children:
+            raise FileNotFoundError(f"Directory {name!r} not found in {self.archive}")
+        return [posixpath.join(name, child) for child in sorted(children[name])]
+    
+    def glob(self, pattern: str) -> List[str]:
+        """
+        Paths matching a glob pattern, matched one path component at a time
+        ('*' does not cross '/'), sorted.
+        """
+        children = self._tree()[1]
+        matches = ['']
+        for part in _normalize(pattern).split('/'):
+            matches = [
+                posixpath.join(parent, child)
+                for parent in matches if parent in children
+                for child in sorted(children[parent])
+                if fnmatchcase(child, part)
+            ]
+        return matches
+    
+    def find(self, path: str = '') -> List[str]:
+        """Full paths of all files below a directory (recursively), sorted."""
+        prefix = _normalize(path)
+        prefix = f'{prefix}/' if prefix else ''
+        return sorted(name for name in self._tree()[0] if name.startswith(prefix))
+    
+    def _tree(self) -> tuple[Dict[str, zipfile.ZipInfo], Dict[str, Set[str]]]:
+        """(file members, directory children), opening the archive if needed."""
+        self.zip  # Opens and indexes the archive on first use
+        return self._members, self._children
+    
+    def _member(self, path: str) -> zipfile.ZipInfo:
+        name = _normalize(path)
+        members, children = self._tree()
+        member = members.get(name)
+        if member is None:
+            if name in children:
+                raise IsADirectoryError(f"{name!r} is a directory in {self.archive}")
+            raise FileNotFoundError(f"{name!r} not found in {self.archive}")
+        return member
+    
+    def path(self, at: str = '') -> 'ZipPath':
+        """A pathlib-style handle on a path inside the archive."""
+        return ZipPath(self, at)
+
+
+class ZipPath:
+    """
+    pathlib-style path inside a ZipFS.
+    
+    Supports the operations the taxonomy helpers use on a folder: joining
+    with ``/``, name/stem/suffix/parent, exists/is_file/is_dir, iterdir,
+    glob and open. ``open()`` always returns a binary stream.
+    
+    Examples:
+        >>> base = ZipFS('us-gaap-2020-01-31.zip').path('us-gaap-2020-01-31')
+        >>> xsd = base / 'elts' / 'us-gaap-2020-01-31.xsd'
+        >>> xsd.exists(), xsd.suffix
+        (True, '.xsd')
+        >>> tree = parse_definition_linkbase(base / 'stm' / 'us-gaap-stm-soi-def-2020-01-31.xml')
+    """
+    
+    __slots__ = ('fs', 'at')
+    
+    def __init__(self, fs: ZipFS, at: str = ''):
+        self.fs = fs
+        self.at = _normalize(at)
+    
+    def __truediv__(self, other: str) -> 'ZipPath':
+        return ZipPath(self.fs, posixpath.join(self.at, str(other)))
+    
+    def __str__(self) -> str:
+        return posixpath.join(self.fs.archive, self.at) if self.at else self.fs.archive
+    
+    def __repr__(self) -> str:
+        return f"ZipPath({self.fs.archive!r}, {self.at!r})"
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ZipPath) and (self.fs.archive, self.at) == (other.fs.archive, other.at)
+    
+    def __hash__(self) -> int:
+        return hash((self.fs.archive, self.at))
+    
+    def __reduce__(self):
+        return (ZipPath, (self.fs, self.at))
+    
+    @property
+    def name(self) -> str:
+        return posixpath.basename(self.at)
+    
+    @property
+    def suffix(self) -> str:
+        return posixpath.splitext(self.name)[1]
+    
+    @property
+    def stem(self) -> str:
+        return posixpath.splitext(self.name)[0]
+    
+    @property
+    def parent(self) -> 'ZipPath':
+        return ZipPath(self.fs, posixpath.dirname(self.at))
+    
+    def exists(self) -> bool:
+        return self.fs.exists(self.at)
+    
+    def is_file(self) -> bool:
+        return self.fs.isfile(self.at)
+    
+    def is_dir(self) -> bool:
+        return self.fs.isdir(self.at)
+    
+    def iterdir(self) -> Iterator['ZipPath']:
+        for path in self.fs.ls(self.at):
+            yield ZipPath(self.fs, path)
+    
+    def glob(self, pattern: str) -> Iterator['ZipPath']:
+        for path in self.fs.glob(posixpath.join(self.at, pattern)):
+            yield ZipPath(self.fs, path)
+    
+    def open(self, mode: str = 'rb') -> IO[bytes]:
+        return self.fs.open(self.at, mode)
+    
+    def read_bytes(self) -> bytes:
+        with self.open() as f:
+            return f.read()
@@ -0,0 +1,38 @@
+"""
+XBRL Instance Parsers
+
+Extract facts, contexts and units from XBRL instance documents,
+native (.xml) or Inline XBRL (.htm).
+"""
+
+from .facts import (
+    FACT_COLUMNS,
+    Context,
+    Unit,
+    FactTable,
+    parse_instance,
+    get_instance_dataframe,
+)
+
+from .inline import (
+    parse_inline,
+    get_inline_dataframe,
+)
+
+from .transforms import (
+    TRANSFORMS,
+    apply_transform,
+)
+
+__all__ = [
+    'FACT_COLUMNS',
+    'Context',
+    'Unit',
+    'FactTable',
+    'parse_instance',
+    'get_instance_dataframe',
+    'parse_inline',
+    'get_inline_dataframe',
+    'TRANSFORMS',
+    'apply_transform',
+]
@@ -0,0 +1,444 @@
+"""
+XBRL Instance Fact Extractor
+
+Stream the facts of an XBRL instance document into a columnar table.
+
+An instance is flat: contexts, units and facts are all children of the
+<xbrli:xbrl> root. The document is read once with stream_children(), so
+memory stays bounded by the output columns rather than the XML tree.
+Contexts and units are resolved in the same pass. Facts refer to them by
+integer codes, which stay valid even when a context is defined after the
+facts that use it.
+
+Relational model (see docs/thoughts.md):
+    Fact -> Context (entity, period, dimensions) -> Unit
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+from array import array
+from dataclasses import dataclass, field
+import math
+import xml.etree.ElementTree as ET
+
+from ..core.namespaces import Namespaces, qname
+from ..core.streaming import stream_children
+from ..core.zipfs import Source
+
+
+# Root children in these namespaces are never facts or tuples
+_XBRLI = f'{{{Namespaces.XBRLI.uri}}}'
+_LINK = f'{{{Namespaces.LINK.uri}}}'
+
+TAG_CONTEXT = qname('xbrli', 'context')
+TAG_UNIT = qname('xbrli', 'unit')
+TAG_ENTITY = qname('xbrli', 'entity')
+TAG_IDENTIFIER = qname('xbrli', 'identifier')
+TAG_PERIOD = qname('xbrli', 'period')
+TAG_INSTANT = qname('xbrli', 'instant')
+TAG_START = qname('xbrli', 'startDate')
+TAG_END = qname('xbrli', 'endDate')
+TAG_FOREVER = qname('xbrli', 'forever')
+TAG_MEASURE = qname('xbrli', 'measure')
+TAG_DIVIDE = qname('xbrli', 'divide')
+TAG_NUMERATOR = qname('xbrli', 'unitNumerator')
+TAG_DENOMINATOR = qname('xbrli', 'unitDenominator')
+TAG_EXPLICIT_MEMBER = qname('xbrldi', 'explicitMember')
+TAG_TYPED_MEMBER = qname('xbrldi', 'typedMember')
+
+ATTR_NIL = qname('xsi', 'nil')
+
+# Columns of FactTable.to_dataframe(), in order
+FACT_COLUMNS = [
+    'fact_id', 'concept', 'value', 'text', 'decimals', 'unit',
+    'context_id', 'entity', 'period_type', 'start', 'end', 'instant', 'dimensions',
+]
+
+
+@dataclass
+class Context:
+    """
+    An instance context: who (entity), when (period) and under which
+    dimensional qualifiers a fact is reported.
+    
+    Attributes:
+        id: Context id (the facts' contextRef)
+        entity: Entity identifier (e.g. a CIK)
+        scheme: Identifier scheme URI
+        period_type: 'instant', 'duration' or 'forever'
+        start: Start date of a duration (ISO string)
+        end: End date of a duration (ISO string)
+        instant: Date of an instant (ISO string)
+        dimensions: (axis, member) pairs from the segment and scenario.
+                    Explicit members are concept names ('us-gaap_XxxMember');
+                    typed members are their text value.
+    """
+    id: str
+    entity: Optional[str] = None
+    scheme: Optional[str] = None
+    period_type: Optional[str] = None
+    start: Optional[str] = None
+    end: Optional[str] = None
+    instant: Optional[str] = None
+    dimensions: Tuple[Tuple[str, str], ...] = ()
+
+
+@dataclass
+class Unit:
+    """
+    An instance unit.
+    
+    Attributes:
+        id: Unit id (the facts' unitRef)
+        measure: Measures as text: 'iso4217:USD', 'iso4217:USD/xbrli:shares'
+                 for a divide, and multiplied measures joined with '*'
+    """
+    id: str
+    measure: Optional[str] = None
+
+
+@dataclass
+class FactTable:
+    """
+    Columnar facts of one instance document.
+    
+    Per-fact columns are flat arrays. Concepts, contexts and units are
+    stored once and referenced by integer codes (-1 = none). Numeric facts
+    (those with a unitRef) have their value in ``value``. Non-numeric facts
+    have NaN there and their content in ``text``.
+    
+    Attributes:
+        concepts: Distinct concept names ('us-gaap_Assets'), indexed by concept code
+        contexts: Contexts, indexed by context code
+        units: Units, indexed by unit code
+        concept: Concept code per fact
+        context: Context code per fact
+        unit: Unit code per fact (-1 for non-numeric facts)
+        value: Numeric value per fact (NaN if non-numeric or nil)
+        decimals: decimals attribute per fact (NaN if absent, inf for 'INF')
+        text: Text content per non-numeric fact (None for numeric facts)
+        fact_id: id attribute per fact (None if absent)
+    """
+    concepts: List[str] = field(default_factory=list)
+    contexts: List[Context] = field(default_factory=list)
+    units: List[Unit] = field(default_factory=list)
+    concept: array = field(default_factory=lambda: array('i'))
+    context: array = field(default_factory=lambda: array('i'))
+    unit: array = field(default_factory=lambda: array('i'))
+    value: array = field(default_factory=lambda: array('d'))
+    decimals: array = field(default_factory=lambda: array('d'))
+    text: List[Optional[str]] = field(default_factory=list)
+    fact_id: List[Optional[str]] = field(default_factory=list)
+    
+    def __len__(self) -> int:
+        return len(self.concept)
+    
+    def context_of(self, i: int) -> Context:
+        """Context of the i-th fact."""
+        return self.contexts[self.context[i]]
+    
+    def unit_of(self, i: int) -> Optional[Unit]:
+        """Unit of the i-th fact (None for non-numeric facts)."""
+        code = self.unit[i]
+        return self.units[code] if code >= 0 else None
+    
+    def to_dataframe(self, dimension_columns: bool = False):
+        """
+        Convert to a pandas DataFrame with one row per fact.
+        
+        Context and unit attributes are expanded per fact from the (small)
+        context and unit tables, and period dates become datetime64 columns.
+        Concept, unit, context and entity columns are categoricals.
+        
+        Args:
+            dimension_columns: Add one column per dimension axis, holding
+                               each fact's member (None if not qualified)
+        
+        Returns:
+            pandas DataFrame with the FACT_COLUMNS columns
+            (+ one column per axis with dimension_columns=True)
+        """
+        try:
+            import numpy as np
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas is required for to_dataframe()")
+        
+        # Per-context attributes, expanded to one row per fact with one take()
+        contexts = pd.DataFrame({
+            'context_id': pd.Categorical([c.id for c in self.contexts]),
+            'entity': pd.Categorical([c.entity for c in self.contexts]),
+            'period_type': pd.Categorical([c.period_type for c in self.contexts]),
+            'start': _to_datetime([c.start for c in self.contexts]),
+            'end': _to_datetime([c.end for c in self.contexts]),
+            'instant': _to_datetime([c.instant for c in self.contexts]),
+            'dimensions': pd.Series([c.dimensions for c in self.contexts], dtype=object),
+        })
+        per_fact = contexts.take(np.asarray(self.context, dtype=np.intp)).reset_index(drop=True)
+        
+        # Unit codes -> measure categories; code -1 (no unit) becomes NaN
+        measures = pd.Categorical([u.measure for u in self.units])
+        measure_codes = np.append(measures.codes, -1).astype(np.int32)
+        unit_codes = measure_codes[np.asarray(self.unit, dtype=np.intp)]
+        
+        df = pd.DataFrame({
+            'fact_id': pd.Series(self.fact_id, dtype=object),
+            'concept': pd.Categorical.from_codes(np.asarray(self.concept, dtype=np.int32), categories=self.concepts),
+            'value': np.asarray(self.value, dtype=np.float64),
+            'text': pd.Series(self.text, dtype=object),
+            'decimals': np.asarray(self.decimals, dtype=np.float64),
+            'unit': pd.Categorical.from_codes(unit_codes, categories=measures.categories),
+            **{column: per_fact[column] for column in per_fact.columns},
+        })[FACT_COLUMNS]
+        
+        if dimension_columns:
+            for axis in sorted({axis for c in self.contexts for axis, _ in c.dimensions}):
+                members = pd.Series([dict(c.dimensions).get(axis) for c in self.contexts], dtype=object)
+                df[axis] = members.take(np.asarray(self.context, dtype=np.intp)).to_numpy()
+        return df
+
+
+def _to_datetime(values: List[Optional[str]]):
+    """ISO date(time) strings to datetime64; None becomes NaT."""
+    import pandas as pd
+    return pd.to_datetime(pd.Series(values, dtype=object), format='ISO8601')
+
+
+def _concept_from_qname(value: str) -> str:
+    """'us-gaap:SegmentsAxis' -> 'us-gaap_SegmentsAxis' (the taxonomy naming)."""
+    prefix, sep, local = value.strip().partition(':')
+    return f'{prefix}_{local}' if sep else prefix
+
+
+def _read_context(elem: ET.Element, context: Context) -> None:
+    """Fill a Context from its <xbrli:context> element."""
+    identifier = elem.find(f'{TAG_ENTITY}/{TAG_IDENTIFIER}')
+    if identifier is not None:
+        context.entity = (identifier.text or '').strip()
+        context.scheme = identifier.get('scheme')
+    
+    period = elem.find(TAG_PERIOD)
+    if period is not None:
+        instant = period.findtext(TAG_INSTANT)
+        if instant is not None:
+            context.period_type = 'instant'
+            context.instant = instant.strip()
+        elif period.find(TAG_FOREVER) is not None:
+            context.period_type = 'forever'
+        else:
+            context.period_type = 'duration'
+            context.start = (period.findtext(TAG_START) or '').strip() or None
+            context.end = (period.findtext(TAG_END) or '').strip() or None
+    
+    # Dimensions can sit in the segment (under entity) or the scenario
+    dimensions = [
+        (_concept_from_qname(member.get('dimension', '')), _concept_from_qname(member.text or ''))
+        for member in elem.iter(TAG_EXPLICIT_MEMBER)
+    ]
+    dimensions += [
+        (_concept_from_qname(member.get('dimension', '')), ''.join(member.itertext()).strip())
+        for member in elem.iter(TAG_TYPED_MEMBER)
+    ]
+    context.dimensions = tuple(sorted(dimensions))
+
+
+def _read_unit(elem: ET.Element, unit: Unit) -> None:
+    """Fill a Unit from its <xbrli:unit> element."""
+    def _measures(parent: ET.Element) -> str:
+        return '*'.join((m.text or '').strip() for m in parent.iter(TAG_MEASURE))
+    
+    divide = elem.find(TAG_DIVIDE)
+    if divide is not None:
+        numerator = divide.find(TAG_NUMERATOR)
+        denominator = divide.find(TAG_DENOMINATOR)
+        unit.measure = (
+            f"{_measures(numerator) if numerator is not None else ''}"
+            f"/{_measures(denominator) if denominator is not None else ''}"
+        )
+    else:
+        unit.measure = _measures(elem)
+
+
+def _decimals(value: Optional[str]) -> float:
+    if value is None:
+        return math.nan
+    value = value.strip()
+    if value == 'INF':
+        return math.inf
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
+class _TableBuilder:
+    """
+    Appends facts to a FactTable, assigning integer codes to concepts,
+    contexts and units as they are first seen.
+    
+    A context or unit referenced before its definition gets a placeholder
+    (with only its id), which is filled in when the definition is read.
+    """
+    
+    def __init__(self, concepts: Set[str] | None = None):
+        self.table = FactTable()
+        # Concepts to keep (None = all)
+        self.keep = concepts
+        self.concept_codes: Dict[str, int | None] = {}
+        self.context_codes: Dict[str, int] = {}
+        self.unit_codes: Dict[str, int] = {}
+    
+    def concept(self, name: str) -> int | None:
+        """Code of a concept, or None if it is filtered out."""
+        if name in self.concept_codes:
+            return self.concept_codes[name]
+        if self.keep is not None and name not in self.keep:
+            code = None
+        else:
+            code = len(self.table.concepts)
+            self.table.concepts.append(name)
+        self.concept_codes[name] = code
+        return code
+    
+    def context(self, ref: str) -> Context:
+        """The context with this id (a placeholder until it is read)."""
+        return self.table.contexts[self._context_code(ref)]
+    
+    def unit(self, ref: str) -> Unit:
+        """The unit with this id (a placeholder until it is read)."""
+        return self.table.units[self._unit_code(ref)]
+    
+    def _context_code(self, ref: str) -> int:
+        code = self.context_codes.get(ref)
+        if code is None:
+            code = self.context_codes[ref] = len(self.table.contexts)
+            self.table.contexts.append(Context(id=ref))
+        return code
+    
+    def _unit_code(self, ref: str) -> int:
+        code = self.unit_codes.get(ref)
+        if code is None:
+            code = self.unit_codes[ref] = len(self.table.units)
+            self.table.units.append(Unit(id=ref))
+        return code
+    
+    def add(
+        self,
+        concept: int,
+        context_ref: str,
+        unit_ref: Optional[str],
+        value: float,
+        decimals: float,
+        text: Optional[str],
+        fact_id: Optional[str],
+    ) -> int:
+        """Append one fact; returns its row index."""
+        table = self.table
+        table.concept.append(concept)
+        table.context.append(self._context_code(context_ref))
+        table.unit.append(-1 if unit_ref is None else self._unit_code(unit_ref))
+        table.value.append(value)
+        table.decimals.append(decimals)
+        table.text.append(text)
+        table.fact_id.append(fact_id)
+        return len(table.concept) - 1
+
+
+def parse_instance(
+    xml_file: Source,
+    concepts: Set[str] | None = None,
+) -> FactTable:
+    """
+    Extract all facts of an XBRL instance into a columnar FactTable.
+    
+    Streams the document once. Contexts and units are resolved as they
+    are read (in any order relative to the facts), and each fact is
+    appended to flat per-column arrays. Facts inside tuples are
+    flattened. Footnote links and schema/role references are skipped.
+    
+    Args:
+        xml_file: Path to the instance XML file, a binary file object or
+                  a ZipPath
+        concepts: Optional set of concept names ('us-gaap_Assets') to keep;
+                  all other facts are dropped while streaming
+    
+    Returns:
+        FactTable with one entry per fact
+    
+    Examples:
+        >>> facts = parse_instance('aapl-20230930_htm.xml')
+        >>> len(facts), len(facts.contexts), len(facts.units)
+        (2435, 312, 8)
+        >>> df = facts.to_dataframe()
+        >>> df[(df.concept == 'us-gaap_Assets') & df.dimensions.str.len().eq(0)][['instant', 'value']]
+        
+        >>> # Only the facts needed, for very large instances
+        >>> facts = parse_instance('big-instance.xml', concepts={'us-gaap_Revenues'})
+    """
+    builder = _TableBuilder(concepts)
+    namespaces: Dict[str, str] = {}
+    uri_to_prefix: Dict[str, str] = {}
+    # tag -> concept code (None = rejected by the concepts filter)
+    tag_codes: Dict[str, int | None] = {}
+    
+    def _concept_code(tag: str) -> int | None:
+        if tag in tag_codes:
+            return tag_codes[tag]
+        if len(uri_to_prefix) != len(namespaces):
+            uri_to_prefix.clear()
+            for prefix, uri in namespaces.items():
+                uri_to_prefix.setdefault(uri, prefix)
+        uri, _, local = tag[1:].partition('}')
+        prefix = uri_to_prefix.get(uri)
+        code = tag_codes[tag] = builder.concept(f'{prefix}_{local}' if prefix else local)
+        return code
+    
+    def _read_fact(tag: str, elem: ET.Element) -> None:
+        context_ref = elem.get('contextRef')
+        if context_ref is None:
+            # A tuple: its child facts are facts in their own right
+            if not tag.startswith((_XBRLI, _LINK)):
+                for child in elem:
+                    _read_fact(child.tag, child)
+            return
+        
+        concept = _concept_code(tag)
+        if concept is None:
+            return
+        
+        nil = elem.get(ATTR_NIL) in ('true', '1')
+        text = ''.join(elem.itertext()) if len(elem) else (elem.text or '')
+        unit_ref = elem.get('unitRef')
+        value = math.nan
+        if unit_ref is not None:
+            try:
+                value = math.nan if nil else float(text)
+                text = None
+            except ValueError:
+                pass
+        elif nil:
+            text = None
+        
+        builder.add(concept, context_ref, unit_ref, value, _decimals(elem.get('decimals')), text, elem.get('id'))
+    
+    for tag, elem in stream_children(xml_file, namespaces):
+        if tag == TAG_CONTEXT:
+            _read_context(elem, builder.context(elem.get('id', '')))
+        elif tag == TAG_UNIT:
+            _read_unit(elem, builder.unit(elem.get('id', '')))
+        else:
+            _read_fact(tag, elem)
+    
+    return builder.table
+
+
+def get_instance_dataframe(xml_file: Source, dimension_columns: bool = False, **kwargs):
+    """
+    Parse an instance and return its facts as a pandas DataFrame.
+    
+    Same parameters as parse_instance(), plus dimension_columns (see
+    FactTable.to_dataframe()).
+    
+    Returns:
+        pandas DataFrame with one row per fact
+    """
+    return parse_instance(xml_file, **kwargs).to_dataframe(dimension_columns=dimension_columns)
@@ -0,0 +1,245 @@
+"""
+Inline XBRL Transformation Rules
+
+Convert displayed values ("1,234.5", "September 30, 2023", "☒") into
+their XBRL values ("1234.5", "2023-09-30", "true").
+
+Rules are looked up by the local name of the ``format`` QName, with
+hyphens removed and lower-cased, so the same function serves every
+registry version: 'ixt:num-dot-decimal' (ixt-4/5), 'ixt:numdotdecimal'
+(ixt-3) and 'ixt:numcommadot' (ixt-1) all map to one rule. The SEC
+rules (ixt-sec) live in the same table.
+
+Only the commonly used rules are implemented. Unknown formats leave the
+text unchanged; add entries to TRANSFORMS to support more.
+"""
+
+from typing import Callable, Dict, List
+import re
+
+
+_DIGITS = re.compile(r'\d+')
+_WORDS = re.compile(r'[^\W\d_]+')
+# Digits with thousands separators: '1,234', '1 234', '1.234'
+_DIGIT_GROUPS = re.compile(r'\d(?:[\d,.\s\u00a0]*\d)?')
+
+_MONTHS = {
+    name: i for i, names in enumerate((
+        ('jan', 'january'), ('feb', 'february'), ('mar', 'march'), ('apr', 'april'),
+        ('may',), ('jun', 'june'), ('jul', 'july'), ('aug', 'august'),
+        ('sep', 'sept', 'september'), ('oct', 'october'), ('nov', 'november'), ('dec', 'december'),
+    ), start=1) for name in names
+}
+
+_NUMBER_WORDS = {
+    word: i for i, word in enumerate((
+        'zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine',
+        'ten', 'eleven', 'twelve', 'thirteen', 'fourteen', 'fifteen', 'sixteen',
+        'seventeen', 'eighteen', 'nineteen',
+    ))
+}
+_NUMBER_WORDS.update({
+    'twenty': 20, 'thirty': 30, 'forty': 40, 'fifty': 50,
+    'sixty': 60, 'seventy': 70, 'eighty': 80, 'ninety': 90,
+    'no': 0, 'none': 0,
+})
+_SCALE_WORDS = {'thousand': 10**3, 'million': 10**6, 'billion': 10**9, 'trillion': 10**12}
+
+
+# --- numbers ---
+
+def _num_dot_decimal(text: str) -> str:
+    """'1,234.50' / '1 234.50' -> '1234.50'"""
+    value = re.sub(r'[^\d.]', '', text)
+    if not _DIGITS.search(value):
+        raise ValueError(f"not a number: {text!r}")
+    return value
+
+
+def _num_comma_decimal(text: str) -> str:
+    """'1.234,50' / '1 234,50' -> '1234.50'"""
+    value = re.sub(r'[^\d,]', '', text).replace(',', '.')
+    if not _DIGITS.search(value):
+        raise ValueError(f"not a number: {text!r}")
+    return value
+
+
+def _num_unit_decimal(text: str) -> str:
+    """'5 dollars 25 cents' -> '5.25' (the integer part may use separators)"""
+    groups = _DIGIT_GROUPS.findall(text)
+    if not groups or len(groups) > 2:
+        raise ValueError(f"not a number with units: {text!r}")
+    integer = re.sub(r'\D', '', groups[0])
+    return f'{integer}.{groups[1]}' if len(groups) == 2 else integer
+
+
+def _num_words_en(text: str) -> str:
+    """'three' / 'twenty-one' / 'no' -> '3' / '21' / '0'"""
+    total = current = 0
+    words = _WORDS.findall(text.lower())
+    if not words:
+        raise ValueError(f"not a number in words: {text!r}")
+    for word in words:
+        if word in _NUMBER_WORDS:
+            current += _NUMBER_WORDS[word]
+        elif word == 'hundred':
+            current = (current or 1) * 100
+        elif word in _SCALE_WORDS:
+            total += (current or 1) * _SCALE_WORDS[word]
+            current = 0
+        elif word != 'and':
+            raise ValueError(f"not a number in words: {text!r}")
+    return str(total + current)
+
+
+def _fixed(value: str) -> Callable[[str], str]:
+    return lambda text: value
+
+
+# --- dates ---
+
+def _year(value: str) -> int:
+    year = int(value)
+    # Two-digit years are in the 21st century
+    return year + 2000 if len(value) <= 2 else year
+
+
+def _month(word: str) -> int:
+    month = _MONTHS.get(word.lower()) or _MONTHS.get(word.lower()[:3])
+    if month is None:
+        raise ValueError(f"not a month name: {word!r}")
+    return month
+
+
+def _date(order: str, monthname: bool = False) -> Callable[[str], str]:
+    """
+    Build a date rule from the order of its parts: 'dmy', 'mdy', 'ymd',
+    'my', 'dm', 'md'. With monthname, the month is a word and the other
+    parts are the digit groups in order.
+    """
+    def transform(text: str) -> str:
+        numbers: List[str] = _DIGITS.findall(text)
+        parts: Dict[str, int] = {}
+        if monthname:
+            words = _WORDS.findall(text)
+            if not words:
+                raise ValueError(f"no month name in {text!r}")
+            parts['m'] = _month(words[0])
+            fields = order.replace('m', '')
+        else:
+            fields = order
+        if len(numbers) < len(fields):
+            raise ValueError(f"not a date ({order}): {text!r}")
+        for key, number in zip(fields, numbers):
+            parts[key] = _year(number) if key == 'y' else int(number)
+        
+        if not 1 <= parts['m'] <= 12 or ('d' in parts and not 1 <= parts['d'] <= 31):
+            raise ValueError(f"not a date ({order}): {text!r}")
+        if 'y' not in parts:
+            return f"--{parts['m']:02d}-{parts['d']:02d}"
+        if 'd' not in parts:
+            return f"{parts['y']:04d}-{parts['m']:02d}"
+        return f"{parts['y']:04d}-{parts['m']:02d}-{parts['d']:02d}"
+    return transform
+
+
+# --- booleans ---
+
+def _ballot_box(text: str) -> str:
+    """'☒' / '☑' -> 'true', '☐' -> 'false'"""
+    value = text.strip()
+    if value in ('☒', '☑'):
+        return 'true'
+    if value == '☐':
+        return 'false'
+    raise ValueError(f"not a ballot box: {text!r}")
+
+
+# Normalized format local name -> rule
+TRANSFORMS: Dict[str, Callable[[str], str]] = {
+    # Numbers
+    'numdotdecimal': _num_dot_decimal,
+    'numcommadot': _num_dot_decimal,
+    'numspacedot': _num_dot_decimal,
+    'numcommadecimal': _num_comma_decimal,
+    'numdotcomma': _num_comma_decimal,
+    'numspacecomma': _num_comma_decimal,
+    'numcomma': _num_comma_decimal,
+    'numunitdecimal': _num_unit_decimal,
+    'numwordsen': _num_words_en,
+    'numinf': _fixed('INF'),
+    'numneginf': _fixed('-INF'),
+    'zerodash': _fixed('0'),
+    'fixedzero': _fixed('0'),
+    'numdash': _fixed('0'),
+    # Booleans and empty values
+    'fixedtrue': _fixed('true'),
+    'booleantrue': _fixed('true'),
+    'fixedfalse': _fixed('false'),
+    'booleanfalse': _fixed('false'),
+    'fixedempty': _fixed(''),
+    'nocontent': _fixed(''),
+    'boolballotbox': _ballot_box,
+    # Dates with numeric months
+    'datedaymonthyear': _date('dmy'),
+    'dateslasheu': _date('dmy'),
+    'datedoteu': _date('dmy'),
+    'datemonthdayyear': _date('mdy'),
+    'dateslashus': _date('mdy'),
+    'datedotus': _date('mdy'),
+    'dateyearmonthday': _date('ymd'),
+    'datemonthyear': _date('my'),
+    'datedaymonth': _date('dm'),
+    'datemonthday': _date('md'),
+    # Dates with English month names
+    'datedaymonthnameyearen': _date('dmy', monthname=True),
+    'datedaymonthyearen': _date('dmy', monthname=True),
+    'datelonguk': _date('dmy', monthname=True),
+    'dateshortuk': _date('dmy', monthname=True),
+    'datemonthnamedayyearen': _date('mdy', monthname=True),
+    'datemonthdayyearen': _date('mdy', monthname=True),
+    'datelongus': _date('mdy', monthname=True),
+    'dateshortus': _date('mdy', monthname=True),
+    'datemonthnameyearen': _date('my', monthname=True),
+    'datemonthyearen': _date('my', monthname=True),
+    'datelongmonthyear': _date('my', monthname=True),
+    'dateshortmonthyear': _date('my', monthname=True),
+    'datedaymonthnameen': _date('dm', monthname=True),
+    'datedaymonthen': _date('dm', monthname=True),
+    'datemonthnamedayen': _date('md', monthname=True),
+    'datemonthdayen': _date('md', monthname=True),
+}
+
+
+def transform_name(format_qname: str) -> str:
+    """'ixt:num-dot-decimal' -> 'numdotdecimal' (the TRANSFORMS key)."""
+    return format_qname.rpartition(':')[2].replace('-', '').lower()
+
+
+def apply_transform(format_qname: str | None, text: str) -> str:
+    """
+    Apply the transformation rule named by a ``format`` attribute.
+    
+    Args:
+        format_qname: The format attribute ('ixt:num-dot-decimal'), or None
+        text: Displayed text of the fact
+    
+    Returns:
+        The XBRL value as text; unchanged when there is no format or the
+        rule is not implemented
+    
+    Raises:
+        ValueError: If the text does not fit the rule
+    
+    Examples:
+        >>> apply_transform('ixt:num-dot-decimal', '1,234.5')
+        '1234.5'
+        >>> apply_transform('ixt:date-monthname-day-year-en', 'September 30, 2023')
+        '2023-09-30'
+        >>> apply_transform('ixt-sec:boolballotbox', '☒')
+        'true'
+    """
+    if not format_qname:
+        return text
+    rule = TRANSFORMS.get(transform_name(format_qname))
+    return text if rule is None else rule(text)
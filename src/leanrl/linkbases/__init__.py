@@ -13,49 +13,122 @@ Parsers for the various XBRL linkbase types:
 from .hierarchy import (
     ConceptNode,
     ConceptTree,
+    AncestorIndex,
     get_hierarchy_dataframe,
 )
+from .compact import (
+    SymbolTable,
+    CompactConceptTree,
+    compact_tree,
+)
 
 # Individual linkbase parsers
-from .label import parse_label_linkbase, parse_all_labels
+from .label import AllLabelsHandler, LabelHandler, parse_label_linkbase, parse_all_labels
+from .label_store import LabelStore, parse_label_store
 from .reference import (
     Reference,
+    ReferenceHandler,
+    ReferencePool,
+    CitationIndex,
     parse_reference_linkbase,
     parse_reference_linkbase_flat,
+    build_citation_index,
+)
+from .reference_table import ReferenceTable, parse_reference_table
+from .definition import DefinitionHandler, parse_definition_linkbase
+from .dimensions import (
+    DIMENSIONAL_ARCROLES,
+    DimensionalRelationship,
+    DimensionalModel,
+    parse_dimensional_model,
 )
-from .definition import parse_definition_linkbase
-from .presentation import parse_presentation_linkbase
+from .presentation import PresentationHandler, parse_presentation_linkbase
 from .calculation import (
     CalculationRelationship,
     CalculationNode,
     CalculationTree,
+    CalculationNetwork,
+    CalculationHandler,
+    CalculationNetworkHandler,
     parse_calculation_linkbase,
+    parse_calculation_network,
     get_calculation_dataframe,
 )
+from .calculation_matrix import (
+    CalculationMatrix,
+    compile_calculation_tree,
+    facts_to_matrix,
+)
+from .rollup import RollupPlan, RollupResult, rollup_calculation
 from .helper import get_specific_role_tree
+from .role_index import (
+    LinkRange,
+    RoleIndex,
+    build_role_index,
+    load_role_index,
+    find_role_link,
+)
 
 __all__ = [
     # Shared hierarchy structures
     'ConceptNode',
     'ConceptTree',
+    'AncestorIndex',
     'get_hierarchy_dataframe',
+    # Compact hierarchy
+    'SymbolTable',
+    'CompactConceptTree',
+    'compact_tree',
     # Label
+    'AllLabelsHandler',
+    'LabelHandler',
     'parse_label_linkbase',
     'parse_all_labels',
+    'LabelStore',
+    'parse_label_store',
     # Reference
     'Reference',
+    'ReferenceHandler',
+    'ReferencePool',
+    'CitationIndex',
     'parse_reference_linkbase',
     'parse_reference_linkbase_flat',
+    'build_citation_index',
+    'ReferenceTable',
+    'parse_reference_table',
     # Definition
+    'DefinitionHandler',
     'parse_definition_linkbase',
+    # Dimensions
+    'DIMENSIONAL_ARCROLES',
+    'DimensionalRelationship',
+    'DimensionalModel',
+    'parse_dimensional_model',
     # Presentation
+    'PresentationHandler',
     'parse_presentation_linkbase',
     # Calculation
     'CalculationRelationship',
     'CalculationNode',
     'CalculationTree',
+    'CalculationNetwork',
+    'CalculationHandler',
+    'CalculationNetworkHandler',
     'parse_calculation_linkbase',
+    'parse_calculation_network',
     'get_calculation_dataframe',
+    'CalculationMatrix',
+    'compile_calculation_tree',
+    'facts_to_matrix',
+    'RollupPlan',
+    'RollupResult',
+    'rollup_calculation',
     # Helper
     'get_specific_role_tree',
+    # Role index
+    'LinkRange',
+    'RoleIndex',
+    'build_role_index',
+    'load_role_index',
+    'find_role_link',
 ]
\ No newline at end of file
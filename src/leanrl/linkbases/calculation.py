@@ -3,14 +3,23 @@ Calculation Linkbase Parser
 
 Extract calculation relationships from XBRL calculation linkbases.
 Calculation linkbases define summation relationships with weights.
+
+Summations belong to an extended link role: the same total can have a
+different breakdown in another role, and a concept can contribute to
+several totals. CalculationNetwork keeps them apart, keyed by
+(role, parent); CalculationTree is the single-hierarchy view of one role
+(CalculationNetwork.tree()) or of all roles merged.
 """
 
-from typing import Dict, List, Set, Any
+from typing import Dict, Iterator, List, Mapping, Set, Tuple
 from dataclasses import dataclass, field
-import xml.etree.ElementTree as ET
+from bisect import insort
 
 from ..core.namespaces import qname, ArcRoles
-from ..utils import extract_concept_from_href
+from ..core.parser import LinkbaseHandler, StreamingParser
+from ..core.scanner import RoleFilter
+from ..core.zipfs import Source
+from .rollup import DEFAULT_TOLERANCE, RollupPlan, RollupResult
 
 
 @dataclass
@@ -23,11 +32,13 @@ class CalculationRelationship:
         child: A contributing concept (e.g., 'us-gaap_ResearchAndDevelopmentExpense')
         weight: 1.0 (adds) or -1.0 (subtracts)
         order: Sort order among siblings
+        role: Extended link role of the summation ('' if unknown)
     """
     parent: str
     child: str
     weight: float = 1.0
     order: float = 0.0
+    role: str = ''
     
     def __repr__(self) -> str:
         sign = '+' if self.weight >= 0 else '-'
@@ -41,16 +52,18 @@ class CalculationNode:
     
     Attributes:
         concept: The concept name
-        parent: Parent concept (the sum)
+        parent: Parent concept (the sum); the first one if there are several
         weight: Weight in parent's calculation (1.0 or -1.0)
         children: List of (child_concept, weight) tuples
         order: Sort order among siblings
+        parents: Every concept this one contributes to, in order of appearance
     """
     concept: str
     parent: str | None = None
     weight: float = 1.0
     children: List[tuple[str, float]] = field(default_factory=list)
     order: float = 0.0
+    parents: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -65,9 +78,15 @@ class CalculationTree:
     Example:
         NetIncome = Revenues * 1.0 + Expenses * (-1.0)
         OperatingExpenses = R&D * 1.0 + SG&A * 1.0 + D&A * 1.0
+    
+    ``role`` is set on the role-scoped views of a CalculationNetwork and
+    None for a tree merging all roles.
     """
     nodes: Dict[str, CalculationNode] = field(default_factory=dict)
     roots: List[str] = field(default_factory=list)
+    role: str | None = None
+    _children_sorted: bool = field(default=False, init=False, repr=False, compare=False)
+    _rollup_plan: RollupPlan | None = field(default=None, init=False, repr=False, compare=False)
     
     def __contains__(self, concept: str) -> bool:
         """Check if a concept exists in the tree."""
@@ -87,6 +106,12 @@ class CalculationTree:
             return self.nodes[concept].parent
         return None
     
+    def get_parents(self, concept: str) -> List[str]:
+        """Get every sum this concept contributes to (empty list if none)."""
+        if concept in self.nodes:
+            return list(self.nodes[concept].parents)
+        return []
+    
     def get_weight(self, concept: str) -> float | None:
         """Get the weight of this concept in its parent's calculation."""
         if concept in self.nodes:
@@ -103,6 +128,8 @@ class CalculationTree:
         """
         if concept in self.nodes:
             children = self.nodes[concept].children
+            if self._children_sorted:
+                return list(children)
             # Sort by order
             return sorted(
                 children,
@@ -208,6 +235,39 @@ class CalculationTree:
         
         return (is_valid, expected, actual)
     
+    def rollup_plan(self) -> RollupPlan:
+        """
+        Bottom-up evaluation order of the totals, built on first use.
+        
+        The plan is cached on the tree; call clear_rollup_plan() after
+        changing the tree's relationships.
+        """
+        if self._rollup_plan is None:
+            self._rollup_plan = RollupPlan.from_tree(self)
+        return self._rollup_plan
+    
+    def clear_rollup_plan(self) -> None:
+        """Drop the cached roll-up plan."""
+        self._rollup_plan = None
+    
+    def rollup(
+        self,
+        values: Mapping[str, float],
+        tolerance: float = DEFAULT_TOLERANCE,
+        missing: str = 'skip',
+    ) -> RollupResult:
+        """
+        Compute every total from leaf (and reported) values.
+        
+        See rollup_calculation() for details.
+        
+        Example:
+            >>> result = tree.rollup({'us-gaap_Revenues': 500, 'us-gaap_CostOfRevenue': 300})
+            >>> result.status['us-gaap_GrossProfit'], result.values['us-gaap_GrossProfit']
+            ('computed', 200.0)
+        """
+        return self.rollup_plan().rollup(values, tolerance=tolerance, missing=missing)
+    
     def print_tree(self, concept: str | None = None, indent: str = "  ") -> str:
         """
         Print the calculation tree with weights.
@@ -239,7 +299,189 @@ class CalculationTree:
         return "\n".join(lines)
 
 
-def parse_calculation_linkbase(xml_file: str) -> CalculationTree:
+@dataclass
+class CalculationNetwork:
+    """
+    Calculation relationships of all extended link roles.
+    
+    Each summation is keyed by (role, parent), so a total with different
+    breakdowns in different roles keeps them apart, and a concept can
+    contribute to any number of totals. Relationships are deduplicated
+    through a hashed (role, parent, child) set and each summation's
+    children are kept sorted by order as they are added.
+    
+    Attributes:
+        summations: (role, parent) -> child relationships, sorted by order
+        contributions: concept -> relationships where it is the child
+    
+    Examples:
+        >>> network = parse_calculation_network('aapl-20230930_cal.xml')
+        >>> network.get_summations('us-gaap_Revenues')
+        {'http://www.apple.com/role/CONSOLIDATEDSTATEMENTSOFOPERATIONS': [...],
+         'http://www.apple.com/role/RevenueDetails': [...]}
+        >>> 
+        >>> # The existing tree API, scoped to one role
+        >>> tree = network.tree('http://www.apple.com/role/RevenueDetails')
+        >>> tree.get_components('us-gaap_Revenues')
+    """
+    summations: Dict[Tuple[str, str], List[CalculationRelationship]] = field(default_factory=dict)
+    contributions: Dict[str, List[CalculationRelationship]] = field(default_factory=dict)
+    _edges: Set[Tuple[str, str, str]] = field(default_factory=set, repr=False, compare=False)
+    _parent_roles: Dict[str, List[str]] = field(default_factory=dict, repr=False, compare=False)
+    _trees: Dict[str, CalculationTree] = field(default_factory=dict, repr=False, compare=False)
+    
+    def __len__(self) -> int:
+        """Return the number of relationships."""
+        return len(self._edges)
+    
+    def __contains__(self, concept: str) -> bool:
+        """Check if a concept takes part in any summation."""
+        return concept in self.contributions or concept in self._parent_roles
+    
+    def add(self, relationship: CalculationRelationship) -> bool:
+        """
+        Add a relationship. Returns False if the same (role, parent, child)
+        is already present.
+        """
+        edge = (relationship.role, relationship.parent, relationship.child)
+        if edge in self._edges:
+            return False
+        self._edges.add(edge)
+        children = self.summations.get(edge[:2])
+        if children is None:
+            children = self.summations[edge[:2]] = []
+            self._parent_roles.setdefault(relationship.parent, []).append(relationship.role)
+        # Equal orders keep their document order
+        insort(children, relationship, key=_order)
+        self.contributions.setdefault(relationship.child, []).append(relationship)
+        self._trees.pop(relationship.role, None)
+        return True
+    
+    @property
+    def roles(self) -> List[str]:
+        """Roles with at least one summation, in order of appearance."""
+        return list(dict.fromkeys(role for role, _ in self.summations))
+    
+    def relationships(self, role: str | None = None) -> Iterator[CalculationRelationship]:
+        """Iterate over the relationships, of one role or of all roles."""
+        for (r, _), children in self.summations.items():
+            if role is None or r == role:
+                yield from children
+    
+    def get_children(self, parent: str, role: str) -> List[tuple[str, float]]:
+        """
+        Get the (child, weight) tuples of a summation, sorted by order.
+        Empty list if the parent has no summation in that role.
+        """
+        return [(rel.child, rel.weight) for rel in self.summations.get((role, parent), ())]
+    
+    def get_summations(self, parent: str) -> Dict[str, List[tuple[str, float]]]:
+        """Get every breakdown of a total: role -> [(child, weight), ...]."""
+        return {role: self.get_children(parent, role) for role in self._parent_roles.get(parent, ())}
+    
+    def get_parents(self, concept: str, role: str | None = None) -> List[CalculationRelationship]:
+        """Get the relationships in which a concept contributes to a total."""
+        return [
+            rel for rel in self.contributions.get(concept, ())
+            if role is None or rel.role == role
+        ]
+    
+    def validate_calculation(
+        self,
+        concept: str,
+        values: Dict[str, float]
+    ) -> Dict[str, tuple[bool, float, float] | None]:
+        """
+        Validate every breakdown of a total.
+        
+        Returns:
+            role -> result of CalculationTree.validate_calculation() in that role
+        """
+        return {
+            role: self.tree(role).validate_calculation(concept, values)
+            for role in self._parent_roles.get(concept, ())
+        }
+    
+    def tree(self, role: str) -> CalculationTree:
+        """
+        CalculationTree view of one role, built on first use and cached.
+        
+        A concept with several parents in the role gets the first as its
+        ``parent``; all of them are in its ``parents``.
+        """
+        tree = self._trees.get(role)
+        if tree is None:
+            tree = _tree_from_relationships(self.relationships(role), role=role)
+            self._trees[role] = tree
+        return tree
+    
+    def trees(self) -> Dict[str, CalculationTree]:
+        """One CalculationTree view per role."""
+        return {role: self.tree(role) for role in self.roles}
+    
+    def to_tree(self) -> CalculationTree:
+        """
+        Single CalculationTree merging all roles (what
+        parse_calculation_linkbase() returns).
+        
+        Breakdowns of the same total from different roles are combined,
+        so prefer tree(role) for validation when a total has several.
+        """
+        return _tree_from_relationships(self.relationships())
+
+
+def _order(relationship: CalculationRelationship) -> float:
+    return relationship.order
+
+
+def _tree_from_relationships(
+    relationships: Iterator[CalculationRelationship],
+    role: str | None = None,
+) -> CalculationTree:
+    """Build a CalculationTree; a child's first parent sets its parent, weight and order."""
+    tree = CalculationTree(role=role)
+    nodes = tree.nodes
+    # (parent, child, weight) already linked: the same arc from several roles
+    linked: Set[Tuple[str, str, float]] = set()
+    # Sort key of each parent's children, from that parent's own arcs
+    child_orders: Dict[Tuple[str, str], float] = {}
+    
+    for rel in relationships:
+        parent, child = rel.parent, rel.child
+        if parent not in nodes:
+            nodes[parent] = CalculationNode(concept=parent)
+        if child not in nodes:
+            nodes[child] = CalculationNode(concept=child)
+        
+        child_node = nodes[child]
+        if child_node.parent is None:
+            child_node.parent = parent
+            child_node.weight = rel.weight
+            child_node.order = rel.order
+        if parent not in child_node.parents:
+            child_node.parents.append(parent)
+        
+        key = (parent, child, rel.weight)
+        if key not in linked:
+            linked.add(key)
+            nodes[parent].children.append((child, rel.weight))
+            child_orders.setdefault((parent, child), rel.order)
+    
+    for concept, node in nodes.items():
+        node.children.sort(key=lambda c: child_orders[(concept, c[0])])
+    tree._children_sorted = True
+    
+    # Roots: concepts that are sums but not components of anything else
+    tree.roots = [concept for concept, node in nodes.items() if node.parent is None]
+    tree.roots.sort(key=lambda c: nodes[c].order)
+    return tree
+
+
+def parse_calculation_linkbase(
+    xml_file: Source,
+    engine: str = 'etree',
+    roles: RoleFilter | None = None,
+) -> CalculationTree:
     """
     Parse a calculation linkbase and build a calculation tree.
     
@@ -248,7 +490,14 @@ def parse_calculation_linkbase(xml_file: str) -> CalculationTree:
     - Weight is 1.0 (add) or -1.0 (subtract)
     
     Args:
-        xml_file: Path to the calculation linkbase XML file
+        xml_file: Path to the calculation linkbase XML file, a binary file
+                  object or a ZipPath
+        engine: Scanning engine, 'etree' (default) or 'expat'.
+                'expat' skips Element construction and is faster.
+        roles: Optional extended link role filter: a role URI, an iterable
+               of role URIs, or a predicate on the role URI. Applied while
+               streaming, so non-matching links contribute no locators
+               or arcs at all.
     
     Returns:
         CalculationTree with the parsed relationships
@@ -268,103 +517,121 @@ def parse_calculation_linkbase(xml_file: str) -> CalculationTree:
         >>> # Validate a calculation
         >>> values = {'us-gaap_NetIncome': 100, 'us-gaap_Revenue': 500, ...}
         >>> tree.validate_calculation('us-gaap_NetIncome', values)
+    
+    Note:
+        All roles are merged into one tree. Use parse_calculation_network()
+        when a total has different breakdowns in different roles.
+    """
+    return parse_calculation_network(xml_file, engine=engine, roles=roles).to_tree()
+
+
+def parse_calculation_network(
+    xml_file: Source,
+    engine: str = 'etree',
+    roles: RoleFilter | None = None,
+) -> CalculationNetwork:
+    """
+    Parse a calculation linkbase into a role-aware CalculationNetwork.
+    
+    Locator labels are resolved within their own extended link, and every
+    relationship keeps the role of its link.
+    
+    Args:
+        xml_file: Path to the calculation linkbase XML file, a binary file
+                  object or a ZipPath
+        engine: Scanning engine, 'etree' (default) or 'expat'
+        roles: Optional extended link role filter (see
+               parse_calculation_linkbase())
+    
+    Returns:
+        CalculationNetwork with the parsed relationships
+    
+    Examples:
+        >>> network = parse_calculation_network('aapl-20230930_cal.xml')
+        >>> network.roles[:2]
+        ['http://www.apple.com/role/CONSOLIDATEDSTATEMENTSOFOPERATIONS', ...]
+        >>> for role, children in network.get_summations('us-gaap_Revenues').items():
+        ...     print(role, children)
+    """
+    parser = StreamingParser(xml_file, engine=engine, roles=roles)
+    parser.register(CalculationNetworkHandler())
+    network, = parser.parse()
+    return network
+
+
+class CalculationNetworkHandler(LinkbaseHandler):
+    """
+    StreamingParser handler building a CalculationNetwork from summation-item arcs.
+    
+    Used by parse_calculation_network(); register it directly to share a
+    pass over the file with other handlers. Every relationship keeps the
+    role of its extended link.
     """
-    # Pre-compute qualified names
-    TAG_LOC = qname('link', 'loc')
-    TAG_ARC = qname('link', 'calculationArc')
     
-    ATTR_LABEL = qname('xlink', 'label')
-    ATTR_HREF = qname('xlink', 'href')
+    TAG_ARC = qname('link', 'calculationArc')
     ATTR_ARCROLE = qname('xlink', 'arcrole')
     ATTR_FROM = qname('xlink', 'from')
     ATTR_TO = qname('xlink', 'to')
     
-    # Storage
-    loc_map: Dict[str, str] = {}  # label_id -> concept_name
-    arcs: List[tuple[str, str, float, float]] = []  # (parent, child, weight, order)
+    def __init__(self):
+        super().__init__()
+        self.network = CalculationNetwork()
+        self.arcs: List[tuple[str, str, float, float]] = []  # (from, to, weight, order)
+        self.fields[self.TAG_ARC] = (self.ATTR_ARCROLE, self.ATTR_FROM, self.ATTR_TO, 'weight', 'order')
     
-    context = ET.iterparse(xml_file, events=('end',))
-    
-    for event, elem in context:
-        tag = elem.tag
-        
-        if tag == TAG_LOC:
-            label_id = elem.get(ATTR_LABEL)
-            href = elem.get(ATTR_HREF)
-            if label_id and href:
-                loc_map[label_id] = extract_concept_from_href(href)
-        
-        elif tag == TAG_ARC:
-            arc_role = elem.get(ATTR_ARCROLE)
+    def handle(self, tag: str, values: tuple) -> None:
+        if tag == self.TAG_ARC:
+            arc_role, from_id, to_id, weight_str, order_str = values
             if arc_role == ArcRoles.SUMMATION_ITEM:
-                from_id = elem.get(ATTR_FROM)
-                to_id = elem.get(ATTR_TO)
-                
-                weight_str = elem.get('weight', '1.0')
-                order_str = elem.get('order', '0')
-                
                 try:
-                    weight = float(weight_str)
+                    weight = float(weight_str or '1.0')
                 except ValueError:
                     weight = 1.0
                 
                 try:
-                    order = float(order_str)
+                    order = float(order_str or '0')
                 except ValueError:
                     order = 0.0
                 
                 if from_id and to_id:
-                    arcs.append((from_id, to_id, weight, order))
-        
-        elem.clear()
-    
-    # Build the tree
-    tree = CalculationTree()
-    has_parent: Set[str] = set()
-    
-    for from_label, to_label, weight, order in arcs:
-        if from_label not in loc_map or to_label not in loc_map:
-            continue
-        
-        parent_concept = loc_map[from_label]
-        child_concept = loc_map[to_label]
-        
-        # Ensure parent node exists
-        if parent_concept not in tree.nodes:
-            tree.nodes[parent_concept] = CalculationNode(concept=parent_concept)
-        
-        # Ensure child node exists
-        if child_concept not in tree.nodes:
-            tree.nodes[child_concept] = CalculationNode(concept=child_concept)
-        
-        # Set relationship
-        tree.nodes[child_concept].parent = parent_concept
-        tree.nodes[child_concept].weight = weight
-        tree.nodes[child_concept].order = order
-        
-        # Add to parent's children
-        child_tuple = (child_concept, weight)
-        if child_tuple not in tree.nodes[parent_concept].children:
-            tree.nodes[parent_concept].children.append(child_tuple)
-        
-        has_parent.add(child_concept)
-    
-    # Find roots (concepts that are sums but not components of anything else)
-    for concept in tree.nodes:
-        if concept not in has_parent:
-            tree.roots.append(concept)
+                    self.arcs.append((from_id, to_id, weight, order))
+        else:
+            super().handle(tag, values)
+    
+    def end_link(self) -> None:
+        # Arcs may precede their locators, so resolve at the end of the link
+        loc_map = self.loc_map
+        for from_id, to_id, weight, order in self.arcs:
+            if from_id in loc_map and to_id in loc_map:
+                self.network.add(CalculationRelationship(
+                    loc_map[from_id], loc_map[to_id], weight, order, self.link_role,
+                ))
+        self.arcs.clear()
+        super().end_link()
+    
+    def result(self) -> CalculationNetwork:
+        self.end_link()
+        return self.network
+
+
+class CalculationHandler(CalculationNetworkHandler):
+    """
+    StreamingParser handler building a CalculationTree from summation-item arcs.
     
-    # Sort roots by order
-    tree.roots.sort(key=lambda c: tree.nodes[c].order if c in tree.nodes else 0)
+    Used by parse_calculation_linkbase(): the network with all roles
+    merged into one tree.
+    """
     
-    return tree
+    def result(self) -> CalculationTree:
+        return super().result().to_tree()
 
 
-def get_calculation_dataframe(tree: CalculationTree):
+def get_calculation_dataframe(tree: CalculationTree | CalculationNetwork):
     """
-    Convert a CalculationTree to a pandas DataFrame.
+    Convert a CalculationTree (or CalculationNetwork) to a pandas DataFrame.
     
     Returns DataFrame with columns:
+    - role: Extended link role (CalculationNetwork only)
     - parent: Parent (sum) concept
     - child: Child (component) concept
     - weight: Weight (1.0 or -1.0)
@@ -374,12 +641,22 @@ def get_calculation_dataframe(tree: CalculationTree):
         >>> tree = parse_calculation_linkbase('cal.xml')
         >>> df = get_calculation_dataframe(tree)
         >>> df[df['parent'].str.contains('OperatingExpenses')]
+        
+        >>> # One row per relationship and role
+        >>> df = get_calculation_dataframe(parse_calculation_network('cal.xml'))
     """
     try:
         import pandas as pd
     except ImportError:
         raise ImportError("pandas is required for get_calculation_dataframe()")
     
+    if isinstance(tree, CalculationNetwork):
+        rows = [
+            (rel.role, rel.parent, rel.child, rel.weight, rel.order)
+            for rel in tree.relationships()
+        ]
+        return pd.DataFrame(rows, columns=['role', 'parent', 'child', 'weight', 'order'])
+    
     rows = []
     for concept, node in tree.nodes.items():
         for child, weight in node.children:
@@ -391,4 +668,4 @@ def get_calculation_dataframe(tree: CalculationTree):
                 'order': child_node.order if child_node else 0,
             })
     
-    return pd.DataFrame(rows)
\ No newline at end of file
+    return pd.DataFrame(rows)
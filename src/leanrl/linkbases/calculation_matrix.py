@@ -0,0 +1,320 @@
+"""
+Vectorized Calculation Validation
+
+Compile a CalculationTree into a sparse parent-by-child weight matrix and
+check every summation of many contexts at once.
+
+    values   : (contexts x concepts) reported values, NaN = not reported
+    W        : (parents x concepts) summation weights
+    computed = values @ W.T          (one column per parent)
+
+Rows are typically (filing, context) pairs, so one call validates every
+period of every filing of a batch. Rounding tolerances follow the
+reported decimals: a value reported with decimals=d may be off by half a
+unit of 10^-d, and the tolerance of a summation is the sum of the
+parent's and the (weighted) children's uncertainties.
+
+scipy.sparse is used for the products when it is installed; otherwise
+an equivalent numpy gather + reduceat is used.
+"""
+
+from typing import Dict, Iterable, List, Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .calculation import CalculationTree
+
+
+# Absolute tolerance when decimals are not known
+DEFAULT_ABS_TOL = 0.01
+
+# Without scipy: largest parents x concepts weight matrix built densely,
+# and number of gathered terms per chunk beyond that
+_DENSE_LIMIT = 4_000_000
+_CHUNK_TERMS = 4_000_000
+
+# Columns of CalculationMatrix.validate()
+INCONSISTENCY_COLUMNS = [
+    'row', 'parent', 'reported', 'computed', 'difference', 'tolerance', 'consistent',
+]
+
+
+def _sparse():
+    """scipy.sparse, or None if scipy is not installed."""
+    try:
+        import scipy.sparse
+    except ImportError:
+        return None
+    return scipy.sparse
+
+
+@dataclass
+class CalculationMatrix:
+    """
+    A CalculationTree compiled to CSR arrays (one row per parent).
+    
+    Attributes:
+        concepts: Column order of the values matrix
+        parents: Parent (sum) concepts, one per matrix row
+        parent_columns: Column of each parent in concepts
+        indptr: Children of parent i are indices[indptr[i]:indptr[i+1]]
+        indices: Column of each child in concepts
+        weights: Weight of each child
+    """
+    concepts: List[str]
+    parents: List[str]
+    parent_columns: 'np.ndarray'
+    indptr: 'np.ndarray'
+    indices: 'np.ndarray'
+    weights: 'np.ndarray'
+    
+    _columns: Dict[str, int] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._columns = {concept: i for i, concept in enumerate(self.concepts)}
+    
+    def __len__(self) -> int:
+        """Number of summations."""
+        return len(self.parents)
+    
+    @property
+    def nnz(self) -> int:
+        """Number of (parent, child) weights."""
+        return len(self.indices)
+    
+    def column(self, concept: str) -> int:
+        """Column of a concept in the values matrix."""
+        return self._columns[concept]
+    
+    def to_sparse(self, weights: 'np.ndarray | None' = None):
+        """The weights (or other per-arc data) as a scipy.sparse CSR matrix (parents x concepts)."""
+        sparse = _sparse()
+        if sparse is None:
+            raise ImportError("scipy is required for to_sparse()")
+        data = self.weights if weights is None else weights
+        return sparse.csr_matrix((data, self.indices, self.indptr), shape=(len(self.parents), len(self.concepts)))
+    
+    def _product(self, values: 'np.ndarray', weights: 'np.ndarray') -> 'np.ndarray':
+        """values @ W.T for a (rows x concepts) matrix -> (rows x parents)."""
+        if self.nnz == 0:
+            return np.zeros((values.shape[0], len(self.parents)))
+        sparse = _sparse()
+        if sparse is not None:
+            return np.asarray(self.to_sparse(weights) @ values.T).T
+        if len(self.parents) * len(self.concepts) <= _DENSE_LIMIT:
+            # Small enough for a dense W: one BLAS matrix product
+            dense = np.zeros((len(self.parents), len(self.concepts)))
+            np.add.at(dense, (np.repeat(np.arange(len(self.parents)), np.diff(self.indptr)), self.indices), weights)
+            return values @ dense.T
+        # Gather each child's column, weight it, and sum per parent segment,
+        # in row chunks so the (rows x nnz) terms stay small
+        out = np.empty((values.shape[0], len(self.parents)))
+        step = max(1, _CHUNK_TERMS // self.nnz)
+        for start in range(0, values.shape[0], step):
+            terms = values[start:start + step, self.indices] * weights
+            out[start:start + step] = np.add.reduceat(terms, self.indptr[:-1], axis=1)
+        return out
+    
+    def compute(self, values: 'np.ndarray', missing: str = 'skip') -> tuple['np.ndarray', 'np.ndarray']:
+        """
+        Computed sum of every parent for every row.
+        
+        Args:
+            values: (rows x concepts) matrix, NaN where not reported
+            missing: 'skip' - a sum is only computable when every child is
+                     reported (like CalculationTree.validate_calculation);
+                     'zero' - unreported children count as 0, and a sum is
+                     computable when at least one child is reported
+        
+        Returns:
+            Tuple of (computed, computable), both (rows x parents)
+        """
+        if missing not in ('skip', 'zero'):
+            raise ValueError(f"missing must be 'skip' or 'zero', got {missing!r}")
+        values = np.asarray(values, dtype=np.float64)
+        reported = ~np.isnan(values)
+        computed = self._product(np.where(reported, values, 0.0), self.weights)
+        # Number of reported children per (row, parent)
+        present = np.rint(self._product(reported.astype(np.float64), np.ones(self.nnz))).astype(np.int64)
+        if missing == 'skip':
+            computable = present == np.diff(self.indptr)
+        else:
+            computable = present > 0
+        return computed, computable
+    
+    def tolerance(self, decimals: 'np.ndarray', abs_tol: float = DEFAULT_ABS_TOL) -> 'np.ndarray':
+        """
+        Rounding tolerance of every summation for every row.
+        
+        A value with decimals=d is uncertain by 0.5 * 10^-d (0 for INF).
+        The tolerance of parent = sum(w * child) is the parent's
+        uncertainty plus the sum of |w| * child uncertainty, and never
+        less than abs_tol. Unknown decimals (NaN) count as 0.
+        
+        Args:
+            decimals: (rows x concepts) matrix of decimals attributes
+            abs_tol: Minimum tolerance
+        
+        Returns:
+            (rows x parents) matrix of tolerances
+        """
+        decimals = np.asarray(decimals, dtype=np.float64)
+        with np.errstate(over='ignore'):
+            uncertainty = np.where(np.isfinite(decimals), 0.5 * np.power(10.0, -decimals), 0.0)
+        tol = uncertainty[:, self.parent_columns] + self._product(uncertainty, np.abs(self.weights))
+        return np.maximum(tol, abs_tol)
+    
+    def validate(
+        self,
+        values: 'np.ndarray',
+        decimals: 'np.ndarray | None' = None,
+        rows: Sequence | None = None,
+        abs_tol: float = DEFAULT_ABS_TOL,
+        missing: str = 'skip',
+        only_inconsistent: bool = True,
+    ):
+        """
+        Check every summation of every row at once.
+        
+        Args:
+            values: (rows x concepts) matrix in the column order of
+                    self.concepts, NaN where not reported
+            decimals: Optional (rows x concepts) matrix of decimals
+                      (NaN = unknown, inf = INF); without it every check
+                      uses abs_tol
+            rows: Optional labels of the rows (e.g. a pandas Index of
+                  (filing_id, context_id)), used in the 'row' column
+            abs_tol: Minimum tolerance
+            missing: How unreported children are treated, see compute()
+            only_inconsistent: Only return the failed checks
+        
+        Returns:
+            pandas DataFrame with INCONSISTENCY_COLUMNS: one row per
+            checked (row, parent) whose parent is reported and whose sum
+            is computable
+        
+        Examples:
+            >>> matrix = compile_calculation_tree(tree)
+            >>> values, decimals, rows = facts_to_matrix(df, matrix.concepts, by=['filing_id', 'context_id'])
+            >>> matrix.validate(values, decimals, rows=rows)
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas is required for validate()")
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.shape[1] != len(self.concepts):
+            raise ValueError(f"values must have shape (rows, {len(self.concepts)}), got {values.shape}")
+        
+        computed, computable = self.compute(values, missing=missing)
+        reported = values[:, self.parent_columns]
+        difference = reported - computed
+        if decimals is None:
+            tolerance = np.full_like(computed, abs_tol)
+        else:
+            tolerance = self.tolerance(decimals, abs_tol)
+        consistent = np.abs(difference) <= tolerance
+        
+        checked = computable & ~np.isnan(reported)
+        selected = checked & ~consistent if only_inconsistent else checked
+        row_idx, parent_idx = np.nonzero(selected)
+        
+        labels = np.arange(values.shape[0]) if rows is None else np.asarray(rows, dtype=object)
+        return pd.DataFrame({
+            'row': labels[row_idx],
+            'parent': pd.Categorical.from_codes(parent_idx, categories=self.parents),
+            'reported': reported[row_idx, parent_idx],
+            'computed': computed[row_idx, parent_idx],
+            'difference': difference[row_idx, parent_idx],
+            'tolerance': tolerance[row_idx, parent_idx],
+            'consistent': consistent[row_idx, parent_idx],
+        }, columns=INCONSISTENCY_COLUMNS)
+
+
+def compile_calculation_tree(
+    tree: CalculationTree,
+    concepts: Iterable[str] | None = None,
+) -> CalculationMatrix:
+    """
+    Compile the summations of a CalculationTree into a CalculationMatrix.
+    
+    Args:
+        tree: Parsed calculation tree
+        concepts: Optional column order of the values matrix. Defaults to
+                  all concepts of the tree; concepts of the tree missing
+                  from it are appended.
+    
+    Returns:
+        CalculationMatrix with one row per concept that has children
+    
+    Examples:
+        >>> tree = parse_calculation_linkbase('us-gaap-stm-soi-cal-2020-01-31.xml')
+        >>> matrix = compile_calculation_tree(tree)
+        >>> len(matrix), matrix.nnz
+    """
+    columns: Dict[str, int] = {}
+    for concept in (concepts if concepts is not None else ()):
+        columns.setdefault(concept, len(columns))
+    for concept in tree.nodes:
+        columns.setdefault(concept, len(columns))
+    
+    parents: List[str] = []
+    indptr = [0]
+    indices: List[int] = []
+    weights: List[float] = []
+    for concept, node in tree.nodes.items():
+        if not node.children:
+            continue
+        parents.append(concept)
+        for child, weight in node.children:
+            indices.append(columns[child])
+            weights.append(weight)
+        indptr.append(len(indices))
+    
+    return CalculationMatrix(
+        concepts=list(columns),
+        parents=parents,
+        parent_columns=np.array([columns[p] for p in parents], dtype=np.intp),
+        indptr=np.array(indptr, dtype=np.intp),
+        indices=np.array(indices, dtype=np.intp),
+        weights=np.array(weights, dtype=np.float64),
+    )
+
+
+def facts_to_matrix(df, concepts: Sequence[str], by: str | List[str] = 'context_id'):
+    """
+    Pivot a facts DataFrame (FactTable.to_dataframe()) into values and
+    decimals matrices.
+    
+    Args:
+        df: Facts with 'concept', 'value' and 'decimals' columns
+        concepts: Column order (e.g. CalculationMatrix.concepts)
+        by: Column(s) identifying a row, e.g. ['filing_id', 'context_id'].
+            Duplicate facts of one row keep their first value.
+    
+    Returns:
+        Tuple of (values, decimals, rows): two (rows x concepts) float
+        matrices (NaN where not reported) and the row labels
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("pandas is required for facts_to_matrix()")
+    by = [by] if isinstance(by, str) else list(by)
+    
+    columns = pd.Index(concepts)
+    codes = columns.get_indexer(df['concept'].astype(object))
+    keep = (codes >= 0) & df['value'].notna().to_numpy()
+    facts = df.loc[keep, by]
+    codes = codes[keep]
+    
+    rows = pd.MultiIndex.from_frame(facts) if len(by) > 1 else pd.Index(facts[by[0]])
+    row_codes, row_labels = pd.factorize(rows)
+    
+    values = np.full((len(row_labels), len(columns)), np.nan)
+    decimals = np.full_like(values, np.nan)
+    # Assign in reverse so the first of duplicate facts wins
+    values[row_codes[::-1], codes[::-1]] = df['value'].to_numpy()[keep][::-1]
+    decimals[row_codes[::-1], codes[::-1]] = df['decimals'].to_numpy(dtype=np.float64)[keep][::-1]
+    return values, decimals, row_labels
@@ -0,0 +1,471 @@
+"""
+Compact Hierarchy Representation
+
+Array-backed, read-only variant of ConceptTree for keeping many trees in
+memory at once (e.g. every stm/dis definition and presentation tree of
+several taxonomy years).
+
+ConceptTree keeps one ConceptNode dataclass (with its own children list)
+per concept. CompactConceptTree instead:
+- maps concept names to integer ids in an interned SymbolTable; trees
+  built with the same table store a concept name once no matter how many
+  of them contain it
+- stores parent, order and depth in typed arrays (one slot per node)
+- stores children in CSR form: an offsets array plus one flat child array,
+  with each node's children already sorted by order
+
+The public query API is the same as ConceptTree's.
+"""
+
+from typing import IO, Any, Dict, Iterator, List, Mapping
+from array import array
+
+from .hierarchy import (
+    AncestorIndex,
+    ConceptNode,
+    ConceptTree,
+    _emit_lines,
+    _iter_bfs,
+    _iter_dfs,
+    _nested_dict,
+)
+
+
+class SymbolTable:
+    """
+    Interned concept-name table shared by compact trees.
+    
+    Each distinct name is stored once and gets a stable integer id.
+    
+    Examples:
+        >>> symbols = SymbolTable()
+        >>> symbols.intern('us-gaap_Assets')
+        0
+        >>> symbols.name(0)
+        'us-gaap_Assets'
+    """
+    
+    __slots__ = ('_ids', '_names')
+    
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+    
+    def __len__(self) -> int:
+        return len(self._names)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+    
+    def intern(self, name: str) -> int:
+        """Get the id of a name, adding it to the table if needed."""
+        sid = self._ids.get(name)
+        if sid is None:
+            sid = len(self._names)
+            self._ids[name] = sid
+            self._names.append(name)
+        return sid
+    
+    def id(self, name: str) -> int | None:
+        """Get the id of a name, or None if it was never interned."""
+        return self._ids.get(name)
+    
+    def name(self, sid: int) -> str:
+        """Get the (interned) name for an id."""
+        return self._names[sid]
+    
+    def copy(self) -> 'SymbolTable':
+        """Independent table with the same ids."""
+        table = SymbolTable()
+        table._ids = dict(self._ids)
+        table._names = list(self._names)
+        return table
+
+
+class _NodeView(Mapping):
+    """Read-only ``nodes`` mapping of a CompactConceptTree, built on access."""
+    
+    __slots__ = ('_tree',)
+    
+    def __init__(self, tree: 'CompactConceptTree'):
+        self._tree = tree
+    
+    def __getitem__(self, concept: str) -> ConceptNode:
+        node = self._tree.get(concept)
+        if node is None:
+            raise KeyError(concept)
+        return node
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._tree._index)
+    
+    def __len__(self) -> int:
+        return len(self._tree._index)
+    
+    def __contains__(self, concept: object) -> bool:
+        return concept in self._tree._index
+
+
+class CompactConceptTree:
+    """
+    Read-only, array-backed concept hierarchy with ConceptTree's API.
+    
+    Build one from a ConceptTree with compact_tree(). Nodes are numbered
+    0..n-1 in the order of the source tree's ``nodes``; parent, order and
+    depth are arrays indexed by node number, and the children of node i
+    are ``child_ids[child_offsets[i]:child_offsets[i + 1]]``.
+    
+    ``nodes`` is a read-only mapping that materializes ConceptNode objects
+    on access, so code written against ConceptTree keeps working.
+    
+    Attributes:
+        symbols: SymbolTable holding the concept names
+        concept_ids: Symbol id of each node
+        parents: Node number of each node's parent (-1 for none)
+        orders: Sibling order of each node
+        depths: Depth of each node (0 = root)
+        child_offsets: CSR offsets into child_ids (length n + 1)
+        child_ids: Node numbers of all children, grouped by parent
+        root_ids: Node numbers of the roots, sorted by order
+    """
+    
+    __slots__ = (
+        'symbols',
+        'concept_ids',
+        'parents',
+        'orders',
+        'depths',
+        'child_offsets',
+        'child_ids',
+        'root_ids',
+        '_index',
+        '_ancestor_index',
+    )
+    
+    def __init__(
+        self,
+        symbols: SymbolTable,
+        concept_ids: array,
+        parents: array,
+        orders: array,
+        depths: array,
+        child_offsets: array,
+        child_ids: array,
+        root_ids: array,
+    ):
+        self.symbols = symbols
+        self.concept_ids = concept_ids
+        self.parents = parents
+        self.orders = orders
+        self.depths = depths
+        self.child_offsets = child_offsets
+        self.child_ids = child_ids
+        self.root_ids = root_ids
+        # Interned name -> node number
+        self._index: Dict[str, int] = {
+            symbols.name(sid): i for i, sid in enumerate(concept_ids)
+        }
+        self._ancestor_index: AncestorIndex | None = None
+    
+    # ------------------------------------------------------------------
+    # Node number helpers
+    # ------------------------------------------------------------------
+    
+    def _name(self, i: int) -> str:
+        return self.symbols.name(self.concept_ids[i])
+    
+    def _children_of(self, i: int) -> array:
+        return self.child_ids[self.child_offsets[i]:self.child_offsets[i + 1]]
+    
+    # ------------------------------------------------------------------
+    # ConceptTree API
+    # ------------------------------------------------------------------
+    
+    @property
+    def nodes(self) -> Mapping[str, ConceptNode]:
+        """Read-only mapping of concept -> ConceptNode (built on access)."""
+        return _NodeView(self)
+    
+    @property
+    def roots(self) -> List[str]:
+        """Root concepts, sorted by order."""
+        return [self._name(i) for i in self.root_ids]
+    
+    def __contains__(self, concept: str) -> bool:
+        """Check if a concept exists in the tree."""
+        return concept in self._index
+    
+    def __len__(self) -> int:
+        """Return the number of concepts in the tree."""
+        return len(self._index)
+    
+    def get(self, concept: str) -> ConceptNode | None:
+        """Get a detached ConceptNode (children sorted by order), or None if not found."""
+        i = self._index.get(concept)
+        if i is None:
+            return None
+        parent = self.parents[i]
+        return ConceptNode(
+            concept=self._name(i),
+            parent=self._name(parent) if parent >= 0 else None,
+            children=[self._name(c) for c in self._children_of(i)],
+            order=self.orders[i],
+            depth=self.depths[i],
+        )
+    
+    def get_parent(self, concept: str) -> str | None:
+        """Get the parent of a concept (None if not found or root)."""
+        i = self._index.get(concept)
+        if i is None or self.parents[i] < 0:
+            return None
+        return self._name(self.parents[i])
+    
+    def get_children(self, concept: str) -> List[str]:
+        """Get children of a concept, sorted by order."""
+        i = self._index.get(concept)
+        if i is None:
+            return []
+        return [self._name(c) for c in self._children_of(i)]
+    
+    def build_index(self) -> AncestorIndex:
+        """Build the AncestorIndex used by the ancestry queries (see ConceptTree)."""
+        self._ancestor_index = AncestorIndex(self)
+        return self._ancestor_index
+    
+    def is_ancestor(self, ancestor: str, concept: str) -> bool:
+        """Check whether ``ancestor`` is a (proper) ancestor of ``concept``."""
+        if self._ancestor_index is not None:
+            return self._ancestor_index.is_ancestor(ancestor, concept)
+        return ancestor in (self.get_ancestors(concept) or ())
+    
+    def get_ancestors(self, concept: str) -> List[str] | None:
+        """
+        Get all ancestors from concept to root.
+        
+        Returns:
+            List from immediate parent to root
+            None if concept is not in the tree
+            Empty list [] if concept is a root (has no ancestors)
+        """
+        i = self._index.get(concept)
+        if i is None:
+            return None
+        if self._ancestor_index is not None:
+            return self._ancestor_index.ancestors(concept)
+        
+        ancestors = []
+        seen = {i}  # Prevent infinite loops
+        parent = self.parents[i]
+        while parent >= 0 and parent not in seen:
+            seen.add(parent)
+            ancestors.append(self._name(parent))
+            parent = self.parents[parent]
+        return ancestors
+    
+    def get_ancestor_path(self, concept: str) -> List[str] | None:
+        """Get path from root to concept (inclusive), or None if not found."""
+        ancestors = self.get_ancestors(concept)
+        if ancestors is None:
+            return None
+        return list(reversed(ancestors)) + [concept]
+    
+    def get_descendants(self, concept: str, max_depth: int | None = None) -> List[str] | None:
+        """
+        Get all descendants of a concept (breadth-first order).
+        
+        Returns:
+            List of descendant concepts
+            None if concept is not in the tree
+        """
+        if concept not in self._index:
+            return None
+        return list(self.iter_descendants(concept, max_depth))
+    
+    def iter_descendants(self, concept: str, max_depth: int | None = None) -> Iterator[str]:
+        """Lazily yield the descendants of a concept, breadth-first."""
+        if concept not in self._index:
+            return
+        for descendant, level in _iter_bfs([concept], self.get_children, max_depth):
+            if level:
+                yield descendant
+    
+    def iter_dfs(
+        self,
+        root: str | None = None,
+        max_depth: int | None = None,
+    ) -> Iterator[tuple[str, int]]:
+        """Lazily walk the tree depth-first, yielding (concept, level) (see ConceptTree)."""
+        yield from _iter_dfs(self._starts(root), self.get_children, max_depth)
+    
+    def iter_bfs(
+        self,
+        root: str | None = None,
+        max_depth: int | None = None,
+    ) -> Iterator[tuple[str, int]]:
+        """Lazily walk the tree breadth-first, yielding (concept, level) (see ConceptTree)."""
+        yield from _iter_bfs(self._starts(root), self.get_children, max_depth)
+    
+    def _starts(self, root: str | None) -> List[str]:
+        """Starting concepts of a traversal: [root] if present, else all roots."""
+        if root is None:
+            return self.roots
+        return [root] if root in self._index else []
+    
+    def get_siblings(self, concept: str) -> List[str] | None:
+        """Get siblings of a concept (excluding self), or None if not found."""
+        if concept not in self._index:
+            return None
+        parent = self.get_parent(concept)
+        if parent:
+            return [c for c in self.get_children(parent) if c != concept]
+        return []
+    
+    def get_depth(self, concept: str) -> int | None:
+        """Get depth of a concept (0 = root), or None if not found."""
+        i = self._index.get(concept)
+        if i is None:
+            return None
+        return self.depths[i]
+    
+    def find_common_ancestor(self, concept1: str, concept2: str) -> str | None:
+        """Find the lowest common ancestor of two concepts."""
+        i = self._index.get(concept1)
+        j = self._index.get(concept2)
+        if i is None or j is None:
+            return None
+        if self._ancestor_index is not None:
+            return self._ancestor_index.common_ancestor(concept1, concept2)
+        
+        ancestors1 = {i}
+        while self.parents[i] >= 0 and self.parents[i] not in ancestors1:
+            i = self.parents[i]
+            ancestors1.add(i)
+        
+        seen = set()
+        while j >= 0 and j not in seen:
+            if j in ancestors1:
+                return self._name(j)
+            seen.add(j)
+            j = self.parents[j]
+        return None
+    
+    def print_tree(
+        self,
+        root: str | None = None,
+        indent: str = "  ",
+        file: IO[str] | None = None,
+    ) -> str | None:
+        """Print the tree structure as a string, or stream it to file (see ConceptTree)."""
+        if root and root not in self._index:
+            message = f"<concept '{root}' not found>"
+            if file is None:
+                return message
+            file.write(message + "\n")
+            return None
+        
+        lines = (f"{indent * level}{concept}" for concept, level in self.iter_dfs(root or None))
+        return _emit_lines(lines, file)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert tree to nested dictionary."""
+        return {
+            'roots': _nested_dict(self.roots, self.get_children)
+        }
+    
+    def to_tree(self) -> ConceptTree:
+        """Expand back into a regular (mutable) ConceptTree."""
+        # Plain lists index faster than arrays in a Python loop
+        names = list(self._index)
+        parents = self.parents.tolist()
+        orders = self.orders.tolist()
+        depths = self.depths.tolist()
+        offsets = self.child_offsets.tolist()
+        child_names = [names[c] for c in self.child_ids]
+        
+        tree = ConceptTree()
+        nodes = tree.nodes
+        for i, concept in enumerate(names):
+            parent = parents[i]
+            nodes[concept] = ConceptNode(
+                concept,
+                names[parent] if parent >= 0 else None,
+                child_names[offsets[i]:offsets[i + 1]],
+                orders[i],
+                depths[i],
+            )
+        tree.roots = [names[i] for i in self.root_ids]
+        # Children come out of the CSR arrays already sorted
+        tree._children_sorted = True
+        return tree
+    
+    def __getstate__(self) -> tuple:
+        # Pickle names and arrays only: symbol ids are process-local and
+        # the name index is rebuilt on load
+        names = [self._name(i) for i in range(len(self.concept_ids))]
+        return (
+            names,
+            self.parents,
+            self.orders,
+            self.depths,
+            self.child_offsets,
+            self.child_ids,
+            self.root_ids,
+        )
+    
+    def __setstate__(self, state: tuple) -> None:
+        # Each unpickled tree gets a table of its own, freed with the tree
+        names, *arrays = state
+        symbols = SymbolTable()
+        self.__init__(symbols, array('i', map(symbols.intern, names)), *arrays)
+
+
+def compact_tree(tree: ConceptTree, symbols: SymbolTable | None = None) -> CompactConceptTree:
+    """
+    Convert a ConceptTree into a CompactConceptTree.
+    
+    Args:
+        tree: Source tree (left unchanged)
+        symbols: Symbol table to intern concept names into. Pass the same
+                 table when converting several trees so they share one copy
+                 of each concept name; by default the tree gets a table of
+                 its own.
+    
+    Returns:
+        CompactConceptTree answering the same queries as ``tree``
+    
+    Examples:
+        >>> tree = compact_tree(parse_presentation_linkbase('us-gaap-stm-soi-pre-2020.xml'))
+        >>> tree.get_children('us-gaap_IncomeStatementAbstract')
+    """
+    if symbols is None:
+        symbols = SymbolTable()
+    
+    index = {concept: i for i, concept in enumerate(tree.nodes)}
+    
+    concept_ids = array('i', (symbols.intern(concept) for concept in tree.nodes))
+    parents = array('i')
+    orders = array('d')
+    depths = array('i')
+    child_offsets = array('i', [0])
+    child_ids = array('i')
+    
+    for concept, node in tree.nodes.items():
+        parents.append(index.get(node.parent, -1) if node.parent else -1)
+        orders.append(node.order)
+        depths.append(node.depth)
+        # Pre-sorted like ConceptTree.get_children()
+        child_ids.extend(index[c] for c in tree.get_children(concept) if c in index)
+        child_offsets.append(len(child_ids))
+    
+    root_ids = array('i', (index[r] for r in tree.roots if r in index))
+    
+    return CompactConceptTree(
+        symbols,
+        concept_ids,
+        parents,
+        orders,
+        depths,
+        child_offsets,
+        child_ids,
+        root_ids,
+    )
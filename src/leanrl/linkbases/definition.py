@@ -4,17 +4,20 @@ Definition Linkbase Parser
 Extract hierarchical relationships from XBRL definition linkbases.
 """
 
-from typing import Dict, List, Set
-import xml.etree.ElementTree as ET
+from typing import List, Set
 
 from ..core.namespaces import qname, ArcRoles
-from ..utils import extract_concept_from_href
+from ..core.parser import LinkbaseHandler, StreamingParser
+from ..core.scanner import RoleFilter
+from ..core.zipfs import Source
 from .hierarchy import ConceptNode, ConceptTree
 
 
 def parse_definition_linkbase(
-    xml_file: str,
+    xml_file: Source,
     arcrole: str | None = None,
+    engine: str = 'etree',
+    roles: RoleFilter | None = None,
 ) -> ConceptTree:
     """
     Parse a definition linkbase and build a concept hierarchy tree.
@@ -25,12 +28,19 @@ def parse_definition_linkbase(
     - hypercube-dimension: Table to dimension
     
     Args:
-        xml_file: Path to the definition linkbase XML file
+        xml_file: Path to the definition linkbase XML file, a binary file
+                  object or a ZipPath
         arcrole: Optional arc role to filter by. If None, uses domain-member.
                 Common values:
                 - ArcRoles.DOMAIN_MEMBER (default)
                 - ArcRoles.DIMENSION_DOMAIN
                 - ArcRoles.HYPERCUBE_DIMENSION
+        engine: Scanning engine, 'etree' (default) or 'expat'.
+                'expat' skips Element construction and is faster.
+        roles: Optional extended link role filter: a role URI, an iterable
+               of role URIs, or a predicate on the role URI. Applied while
+               streaming, so non-matching links contribute no locators
+               or arcs at all.
     
     Returns:
         ConceptTree with the parsed hierarchy
@@ -50,69 +60,75 @@ def parse_definition_linkbase(
         >>> # Print tree
         >>> print(tree.print_tree())
     """
-    if arcrole is None:
-        arcrole = ArcRoles.DOMAIN_MEMBER
+    parser = StreamingParser(xml_file, engine=engine, roles=roles)
+    parser.register(DefinitionHandler(arcrole))
+    tree, = parser.parse()
+    return tree
+
+
+class DefinitionHandler(LinkbaseHandler):
+    """
+    StreamingParser handler building a ConceptTree for one definition arcrole.
     
-    # Pre-compute qualified names
-    TAG_LOC = qname('link', 'loc')
-    TAG_ARC = qname('link', 'definitionArc')
+    Used by parse_definition_linkbase(). Register one handler per arcrole
+    to collect several dimensional relationships in a single pass over
+    the file.
     
-    ATTR_LABEL = qname('xlink', 'label')
-    ATTR_HREF = qname('xlink', 'href')
+    Example:
+        >>> parser = StreamingParser('us-gaap-stm-soi-def-2020-01-31.xml')
+        >>> parser.register(DefinitionHandler(ArcRoles.DOMAIN_MEMBER))
+        >>> parser.register(DefinitionHandler(ArcRoles.DIMENSION_DOMAIN))
+        >>> member_tree, domain_tree = parser.parse()
+    """
+    
+    TAG_ARC = qname('link', 'definitionArc')
     ATTR_ARCROLE = qname('xlink', 'arcrole')
     ATTR_FROM = qname('xlink', 'from')
     ATTR_TO = qname('xlink', 'to')
     
-    # Storage
-    loc_map: Dict[str, str] = {}  # label_id -> concept_name
-    arcs: List[tuple[str, str, float]] = []  # (parent_label, child_label, order)
-    
-    context = ET.iterparse(xml_file, events=('end',))
-    
-    for event, elem in context:
-        tag = elem.tag
-        
-        if tag == TAG_LOC:
-            label_id = elem.get(ATTR_LABEL)
-            href = elem.get(ATTR_HREF)
-            if label_id and href:
-                loc_map[label_id] = extract_concept_from_href(href)
-        
-        elif tag == TAG_ARC:
-            arc_role = elem.get(ATTR_ARCROLE)
-            if arc_role == arcrole:
-                from_id = elem.get(ATTR_FROM)
-                to_id = elem.get(ATTR_TO)
-                order_str = elem.get('order', '0')
+    def __init__(self, arcrole: str | None = None):
+        super().__init__()
+        self.arcrole = arcrole or ArcRoles.DOMAIN_MEMBER
+        self.arcs: List[tuple[str, str, float]] = []           # (from_id, to_id, order)
+        self.relationships: List[tuple[str, str, float]] = []  # (parent, child, order)
+        self.fields[self.TAG_ARC] = (self.ATTR_ARCROLE, self.ATTR_FROM, self.ATTR_TO, 'order')
+    
+    def handle(self, tag: str, values: tuple) -> None:
+        if tag == self.TAG_ARC:
+            arc_role, from_id, to_id, order_str = values
+            if arc_role == self.arcrole:
                 try:
-                    order = float(order_str)
+                    order = float(order_str or '0')
                 except ValueError:
                     order = 0.0
                 
                 if from_id and to_id:
-                    arcs.append((from_id, to_id, order))
-        
-        elem.clear()
-    
-    # Build the tree
-    return _build_tree(loc_map, arcs)
+                    self.arcs.append((from_id, to_id, order))
+        else:
+            super().handle(tag, values)
+    
+    def end_link(self) -> None:
+        # Arcs may precede their locators, so resolve at the end of the link
+        loc_map = self.loc_map
+        self.relationships.extend(
+            (loc_map[from_id], loc_map[to_id], order)
+            for from_id, to_id, order in self.arcs
+            if from_id in loc_map and to_id in loc_map
+        )
+        self.arcs.clear()
+        super().end_link()
+    
+    def result(self) -> ConceptTree:
+        self.end_link()
+        return _build_tree(self.relationships)
 
 
-def _build_tree(
-    loc_map: Dict[str, str],
-    arcs: List[tuple[str, str, float]]
-) -> ConceptTree:
-    """Build a ConceptTree from locators and arcs."""
+def _build_tree(relationships: List[tuple[str, str, float]]) -> ConceptTree:
+    """Build a ConceptTree from resolved (parent, child, order) relationships."""
     tree = ConceptTree()
     has_parent: Set[str] = set()
     
-    for from_label, to_label, order in arcs:
-        if from_label not in loc_map or to_label not in loc_map:
-            continue
-        
-        parent_concept = loc_map[from_label]
-        child_concept = loc_map[to_label]
-        
+    for parent_concept, child_concept, order in relationships:
         # Ensure parent node exists
         if parent_concept not in tree.nodes:
             tree.nodes[parent_concept] = ConceptNode(concept=parent_concept)
@@ -139,13 +155,7 @@ def _build_tree(
     tree.roots.sort(key=lambda c: tree.nodes[c].order if c in tree.nodes else 0)
     
     # Calculate depths
-    def _set_depth(concept: str, depth: int):
-        if concept in tree.nodes:
-            tree.nodes[concept].depth = depth
-            for child in tree.nodes[concept].children:
-                _set_depth(child, depth + 1)
-    
-    for root in tree.roots:
-        _set_depth(root, 0)
+    tree.set_depths()
+    tree.sort_children()
     
     return tree
\ No newline at end of file
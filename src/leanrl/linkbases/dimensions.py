@@ -0,0 +1,433 @@
+"""
+Dimensional Model
+
+All dimensional relationships of one or more definition linkbases,
+collected in a single pass per file:
+
+    all / notAll          primary item (line items) -> hypercube (table)
+    hypercube-dimension   hypercube -> dimension (axis)
+    dimension-domain      dimension -> domain
+    domain-member         domain -> member, and line items -> line item
+    dimension-default     dimension -> default member
+
+Relationships keep the role of their extended link. A consecutive
+relationship is looked up in the xbrldt:targetRole of the previous arc
+when it has one, in the same role otherwise.
+
+Query results (tables of a concept, axes of a table, member closure of an
+axis, dimensional validity of a combination) only depend on the model, so
+they are memoized until the model changes.
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Set, Tuple
+from dataclasses import dataclass, field
+from bisect import insort
+
+from ..core.namespaces import qname, ArcRoles
+from ..core.scanner import RoleFilter, stream_fields
+from ..core.zipfs import Source, as_sources
+from ..utils import extract_concept_from_href
+
+
+# Arcroles collected by DimensionalModel
+DIMENSIONAL_ARCROLES = frozenset({
+    ArcRoles.ALL,
+    ArcRoles.NOT_ALL,
+    ArcRoles.HYPERCUBE_DIMENSION,
+    ArcRoles.DIMENSION_DOMAIN,
+    ArcRoles.DOMAIN_MEMBER,
+    ArcRoles.DIMENSION_DEFAULT,
+})
+
+
+@dataclass(frozen=True)
+class DimensionalRelationship:
+    """
+    A single dimensional arc.
+    
+    Attributes:
+        arcrole: One of DIMENSIONAL_ARCROLES
+        source: Concept the arc starts from
+        target: Concept the arc points to
+        role: Extended link role of the arc
+        order: Arc order
+        target_role: xbrldt:targetRole, where the next relationships are
+        closed: xbrldt:closed (all / notAll)
+        context_element: xbrldt:contextElement, 'segment' or 'scenario'
+                         (all / notAll)
+        usable: xbrldt:usable (dimension-domain / domain-member); an
+                unusable member is not a valid value of the axis, its
+                descendants still are
+    """
+    arcrole: str
+    source: str
+    target: str
+    role: str = ''
+    order: float = 0.0
+    target_role: str | None = None
+    closed: bool = False
+    context_element: str | None = None
+    usable: bool = True
+    
+    @property
+    def next_role(self) -> str:
+        """Role in which the relationships following this arc are found."""
+        return self.target_role or self.role
+
+
+def _order(rel: DimensionalRelationship) -> float:
+    return rel.order
+
+
+def _flag(value: str | None, default: bool) -> bool:
+    if value is None:
+        return default
+    return value.strip() in ('true', '1')
+
+
+@dataclass
+class DimensionalModel:
+    """
+    Tables, axes, domains and defaults of a taxonomy, indexed for queries.
+    
+    Attributes:
+        relationships: arcrole -> (role, source) -> relationships, by order
+        defaults: Default member of each dimension (dimension-default
+                  arcs apply in every role)
+    
+    Examples:
+        >>> model = parse_dimensional_model(['us-gaap-stm-soi-def-2020.xml', 'us-gaap-dim-2020.xml'])
+        >>> model.tables('us-gaap_Revenues')
+        ['us-gaap_StatementTable']
+        >>> model.axes('us-gaap_StatementTable')
+        ['srt_RestatementAxis', 'srt_ProductOrServiceAxis']
+        >>> model.default('srt_ProductOrServiceAxis')
+        'srt_ProductsAndServicesDomain'
+        >>> model.is_valid('us-gaap_Revenues', {'srt_ProductOrServiceAxis': 'us-gaap_ServiceMember'})
+        True
+    """
+    relationships: Dict[str, Dict[Tuple[str, str], List[DimensionalRelationship]]] = field(default_factory=dict)
+    defaults: Dict[str, str] = field(default_factory=dict)
+    # domain-member: (role, target) -> sources, for line item inheritance
+    _parents: Dict[Tuple[str, str], List[str]] = field(default_factory=dict, repr=False, compare=False)
+    _edges: Set[DimensionalRelationship] = field(default_factory=set, repr=False, compare=False)
+    # Memoized query results, dropped by add()
+    _cache: Dict[tuple, object] = field(default_factory=dict, init=False, repr=False, compare=False)
+    
+    def __len__(self) -> int:
+        return len(self._edges)
+    
+    def add(self, rel: DimensionalRelationship) -> bool:
+        """Add a relationship. Returns False if it is already in the model."""
+        if rel.arcrole not in DIMENSIONAL_ARCROLES or rel in self._edges:
+            return False
+        self._edges.add(rel)
+        self._cache.clear()
+        if rel.arcrole == ArcRoles.DIMENSION_DEFAULT:
+            # The first default declared for a dimension wins
+            self.defaults.setdefault(rel.source, rel.target)
+            return True
+        by_source = self.relationships.setdefault(rel.arcrole, {})
+        insort(by_source.setdefault((rel.role, rel.source), []), rel, key=_order)
+        if rel.arcrole == ArcRoles.DOMAIN_MEMBER:
+            self._parents.setdefault((rel.role, rel.target), []).append(rel.source)
+        return True
+    
+    def _arcs(self, arcrole: str, role: str | None, source: str) -> List[DimensionalRelationship]:
+        """Relationships of one arcrole from source, in one role or in every role."""
+        by_source = self.relationships.get(arcrole, {})
+        if role is not None:
+            return by_source.get((role, source), [])
+        return [rel for (_, src), rels in by_source.items() if src == source for rel in rels]
+    
+    @property
+    def roles(self) -> List[str]:
+        """Roles with has-hypercube (all / notAll) relationships."""
+        seen: Dict[str, None] = {}
+        for arcrole in (ArcRoles.ALL, ArcRoles.NOT_ALL):
+            for role, _ in self.relationships.get(arcrole, {}):
+                seen[role] = None
+        return list(seen)
+    
+    # ------------------------------------------------------------------
+    # Line items and tables
+    # ------------------------------------------------------------------
+    
+    def hypercubes(self, concept: str) -> List[DimensionalRelationship]:
+        """
+        Has-hypercube (all / notAll) relationships applying to a concept.
+        
+        A concept inherits the hypercubes of its domain-member ancestors
+        in the role of the has-hypercube arc (e.g. every line item below
+        a LineItems abstract gets its table).
+        """
+        key = ('hypercubes', concept)
+        cached = self._cache.get(key)
+        if cached is None:
+            found: List[DimensionalRelationship] = []
+            for role in self.roles:
+                visited = {concept}
+                stack = [concept]
+                while stack:
+                    current = stack.pop()
+                    for arcrole in (ArcRoles.ALL, ArcRoles.NOT_ALL):
+                        found.extend(self.relationships.get(arcrole, {}).get((role, current), ()))
+                    for parent in self._parents.get((role, current), ()):
+                        if parent not in visited:
+                            visited.add(parent)
+                            stack.append(parent)
+            cached = self._cache[key] = tuple(found)
+        return list(cached)
+    
+    def tables(self, concept: str) -> List[str]:
+        """Tables (hypercubes of 'all' relationships) of a line item."""
+        seen: Dict[str, None] = {}
+        for rel in self.hypercubes(concept):
+            if rel.arcrole == ArcRoles.ALL:
+                seen[rel.target] = None
+        return list(seen)
+    
+    def axes(self, table: str, role: str | None = None) -> List[str]:
+        """
+        Axes (dimensions) of a table.
+        
+        Args:
+            table: Hypercube concept
+            role: Role of the hypercube-dimension arcs (the targetRole or
+                  role of the has-hypercube arc); None for every role
+        """
+        seen: Dict[str, None] = {}
+        for rel in self._arcs(ArcRoles.HYPERCUBE_DIMENSION, role, table):
+            seen[rel.target] = None
+        return list(seen)
+    
+    def domains(self, axis: str, role: str | None = None) -> List[str]:
+        """Domains of an axis (dimension-domain targets)."""
+        seen: Dict[str, None] = {}
+        for rel in self._arcs(ArcRoles.DIMENSION_DOMAIN, role, axis):
+            seen[rel.target] = None
+        return list(seen)
+    
+    # ------------------------------------------------------------------
+    # Members
+    # ------------------------------------------------------------------
+    
+    def _member_set(self, axis: str, role: str | None) -> Tuple[Tuple[str, ...], FrozenSet[str]]:
+        """Usable members of an axis in order, and as a set (memoized)."""
+        key = ('members', axis, role)
+        cached = self._cache.get(key)
+        if cached is None:
+            usable: Dict[str, None] = {}
+            unusable: Set[str] = set()
+            visited: Set[Tuple[str, str]] = set()
+            domain_members = self.relationships.get(ArcRoles.DOMAIN_MEMBER, {})
+            
+            def _visit(rel: DimensionalRelationship) -> None:
+                stack = [rel]
+                while stack:
+                    current = stack.pop()
+                    if current.usable:
+                        usable[current.target] = None
+                    else:
+                        unusable.add(current.target)
+                    step = (current.next_role, current.target)
+                    if step in visited:
+                        continue
+                    visited.add(step)
+                    # Reversed, so children come off the stack in order
+                    stack.extend(reversed(domain_members.get(step, ())))
+            
+            for rel in self._arcs(ArcRoles.DIMENSION_DOMAIN, role, axis):
+                _visit(rel)
+            ordered = tuple(member for member in usable if member not in unusable)
+            cached = self._cache[key] = (ordered, frozenset(ordered))
+        return cached
+    
+    def members(self, axis: str, role: str | None = None) -> List[str]:
+        """
+        Member closure of an axis: its domains and every member below them,
+        depth first, without unusable members.
+        
+        Args:
+            axis: Dimension concept
+            role: Role of the dimension-domain arcs; None for every role
+        """
+        return list(self._member_set(axis, role)[0])
+    
+    def is_member(self, axis: str, member: str, role: str | None = None) -> bool:
+        """True if member is a usable value of axis (a set lookup once memoized)."""
+        return member in self._member_set(axis, role)[1]
+    
+    def default(self, axis: str) -> str | None:
+        """Default member of an axis, or None."""
+        return self.defaults.get(axis)
+    
+    # ------------------------------------------------------------------
+    # Validation
+    # ------------------------------------------------------------------
+    
+    def _satisfies(self, rel: DimensionalRelationship, dimensions: Mapping[str, str]) -> bool:
+        """True if the combination is a member of the hypercube of a has-hypercube arc."""
+        axes = self._arcs(ArcRoles.HYPERCUBE_DIMENSION, rel.next_role, rel.target)
+        for hd in axes:
+            member = dimensions.get(hd.target) or self.defaults.get(hd.target)
+            if member is None or not self.is_member(hd.target, member, hd.next_role):
+                return False
+        if rel.closed and not set(dimensions).issubset(hd.target for hd in axes):
+            return False
+        return True
+    
+    def is_valid(self, concept: str, dimensions: Mapping[str, str] | None = None) -> bool:
+        """
+        Dimensional validity of a concept with explicit members.
+        
+        Valid when, in at least one role, every 'all' hypercube of the
+        concept is satisfied and no 'notAll' hypercube is: each axis has a
+        usable member (given, or its default), and closed hypercubes
+        allow no other axes. A concept without hypercubes is valid.
+        
+        Args:
+            concept: Primary item (line item)
+            dimensions: {axis: member} of the context, without defaults
+        
+        Returns:
+            bool (memoized per concept and combination)
+        """
+        dimensions = dimensions or {}
+        key = ('valid', concept, frozenset(dimensions.items()))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        
+        by_role: Dict[str, List[DimensionalRelationship]] = {}
+        for rel in self.hypercubes(concept):
+            by_role.setdefault(rel.role, []).append(rel)
+        valid = not any(rel.arcrole == ArcRoles.ALL for rels in by_role.values() for rel in rels)
+        for rels in by_role.values():
+            if not any(rel.arcrole == ArcRoles.ALL for rel in rels):
+                continue
+            if all(
+                self._satisfies(rel, dimensions) == (rel.arcrole == ArcRoles.ALL)
+                for rel in rels
+            ):
+                valid = True
+                break
+        self._cache[key] = valid
+        return valid
+    
+    def read(
+        self,
+        xml_file: Source,
+        engine: str = 'etree',
+        roles: RoleFilter | None = None,
+    ) -> 'DimensionalModel':
+        """
+        Add the dimensional relationships of one definition linkbase, in a
+        single streaming pass.
+        
+        Args:
+            xml_file: Path to the definition linkbase, a binary file object
+                      or a ZipPath
+            engine: Scanning engine, 'etree' (default) or 'expat'
+            roles: Optional extended link role filter (see
+                   parse_definition_linkbase())
+        
+        Returns:
+            self, for chaining
+        """
+        TAG_LINK = qname('link', 'definitionLink')
+        TAG_LOC = qname('link', 'loc')
+        TAG_ARC = qname('link', 'definitionArc')
+        
+        ATTR_ROLE = qname('xlink', 'role')
+        ATTR_LABEL = qname('xlink', 'label')
+        ATTR_HREF = qname('xlink', 'href')
+        ATTR_ARCROLE = qname('xlink', 'arcrole')
+        ATTR_FROM = qname('xlink', 'from')
+        ATTR_TO = qname('xlink', 'to')
+        ATTR_TARGET_ROLE = qname('xbrldt', 'targetRole')
+        ATTR_CLOSED = qname('xbrldt', 'closed')
+        ATTR_CONTEXT_ELEMENT = qname('xbrldt', 'contextElement')
+        ATTR_USABLE = qname('xbrldt', 'usable')
+        
+        # Locators and arcs of the current extended link
+        role = ''
+        loc_map: Dict[str, str] = {}  # label_id -> concept_name
+        arcs: List[tuple] = []
+        
+        def _flush() -> None:
+            # Arcs may precede their locators, so resolve at the end of the link
+            for arc_role, from_id, to_id, order, target_role, closed, context_element, usable in arcs:
+                if from_id in loc_map and to_id in loc_map:
+                    self.add(DimensionalRelationship(
+                        arc_role, loc_map[from_id], loc_map[to_id], role, order,
+                        target_role or None, _flag(closed, False), context_element, _flag(usable, True),
+                    ))
+            loc_map.clear()
+            arcs.clear()
+        
+        fields = {
+            TAG_LINK: (ATTR_ROLE,),
+            TAG_LOC: (ATTR_LABEL, ATTR_HREF),
+            TAG_ARC: (
+                ATTR_ARCROLE, ATTR_FROM, ATTR_TO, 'order',
+                ATTR_TARGET_ROLE, ATTR_CLOSED, ATTR_CONTEXT_ELEMENT, ATTR_USABLE,
+            ),
+        }
+        
+        for tag, values in stream_fields(xml_file, fields, engine=engine, roles=roles):
+            
+            if tag == TAG_LOC:
+                label_id, href = values
+                if label_id and href:
+                    loc_map[label_id] = extract_concept_from_href(href)
+            
+            elif tag == TAG_ARC:
+                arc_role, from_id, to_id, order_str = values[:4]
+                if arc_role in DIMENSIONAL_ARCROLES and from_id and to_id:
+                    try:
+                        order = float(order_str or '0')
+                    except ValueError:
+                        order = 0.0
+                    arcs.append((arc_role, from_id, to_id, order, *values[4:]))
+            
+            elif tag == TAG_LINK:
+                _flush()
+                role = values[0] or ''
+        
+        _flush()
+        return self
+
+
+def parse_dimensional_model(
+    xml_files: Source | Iterable[Source],
+    engine: str = 'etree',
+    roles: RoleFilter | None = None,
+) -> DimensionalModel:
+    """
+    Read the dimensional relationships of one or more definition linkbases.
+    
+    Every dimensional arcrole (all, notAll, hypercube-dimension,
+    dimension-domain, domain-member, dimension-default) is collected in the
+    same pass, so each file is streamed once.
+    
+    Args:
+        xml_files: A definition linkbase (path, file object or ZipPath), or
+                   an iterable of them (e.g. the statement definition files
+                   plus the file declaring the dimension defaults)
+        engine: Scanning engine, 'etree' (default) or 'expat'
+        roles: Optional extended link role filter
+    
+    Returns:
+        DimensionalModel
+    
+    Examples:
+        >>> model = parse_dimensional_model('us-gaap-stm-soi-def-2020-01-31.xml')
+        >>> for table in model.tables('us-gaap_Revenues'):
+        ...     for axis in model.axes(table):
+        ...         print(axis, model.default(axis), len(model.members(axis)))
+    """
+    model = DimensionalModel()
+    for xml_file in as_sources(xml_files):
+        model.read(xml_file, engine=engine, roles=roles)
+    return model
@@ -7,20 +7,64 @@ import xml.etree.ElementTree as ET
 # from ..core.namespaces import qname, ArcRoles
 # from ..utils import extract_concept_from_href
 # from .hierarchy import ConceptNode, ConceptTree
+from .role_index import load_role_index, read_link_fragment
 
-def get_specific_role_tree(memfs, pre_filename, role_keywords):
+def get_specific_role_tree(memfs, pre_filename, role_keywords, use_index=True):
     """
     Parses the _pre.xml file and extracts the hierarchy ONLY for the presentationLink 
     that matches the role_keywords.
     
+    With use_index=True (default), a byte-offset index of the file's extended
+    links (see role_index.load_role_index) is used to locate the matching role
+    and only that <link:presentationLink> fragment is parsed. The index is
+    kept in a "<pre_filename>.roles.json" sidecar and rebuilt when the file's
+    size or mtime changes.
+    
+    Args:
+        memfs: Filesystem object with open() (e.g. fsspec MemoryFileSystem
+               or a ZipFS over a taxonomy archive),
+               or None to read from the local disk
+        pre_filename: Path of the presentation linkbase
+        role_keywords: Lowercase keywords that must all appear in the role URI
+        use_index: Use the role index instead of parsing the whole file
+    
     Returns:
         tuple: (root_node, adjacency_map)
         - root_node: The starting concept name (str)
         - adjacency_map: Dict {parent: [children]} ordered by the 'order' attribute
     """
-    with memfs.open(pre_filename, 'rb') as f:
-        tree = ET.parse(f)
+    target_link = None
+    
+    if use_index:
+        index = load_role_index(pre_filename, fs=memfs)
+        for link in index.links:
+            if link.tag != 'presentationLink':
+                continue
+            role = link.role.lower()
+            # Check if ALL keywords exist in the role string
+            # Exclusion filters (avoid Parentheticals)
+            if all(k in role for k in role_keywords) and "parenthetical" not in role:
+                target_link = read_link_fragment(pre_filename, link, index, fs=memfs)
+                print(f"Found Role: {role}")
+                break
+    else:
+        target_link = _find_role_link_full(memfs, pre_filename, role_keywords)
+    
+    if target_link is None:
+        return None, None
+
+    return _build_role_adjacency(target_link)
+
+
+def _find_role_link_full(memfs, pre_filename, role_keywords):
+    """Parse the whole file and return the first presentationLink matching role_keywords."""
+    if memfs is None:
+        tree = ET.parse(pre_filename)
         root_xml = tree.getroot()
+    else:
+        with memfs.open(pre_filename, 'rb') as f:
+            tree = ET.parse(f)
+            root_xml = tree.getroot()
     
     # Namespaces usually found in XBRL
     ns = {'xlink': 'http://www.w3.org/1999/xlink'}
@@ -39,9 +83,11 @@ def get_specific_role_tree(memfs, pre_filename, role_keywords):
                 print(f"Found Role: {role}")
                 break
     
-    if target_link is None:
-        return None, None
+    return target_link
+
 
+def _build_role_adjacency(target_link):
+    """Build (root, adjacency_map) from one presentationLink element."""
     # 2. Build the Adjacency List for THIS role only
     # Structure: parent -> list of (order, child)
     adj = {}
@@ -5,8 +5,10 @@ Shared data structures for hierarchical linkbases (definition, presentation).
 These linkbases define parent-child relationships forming tree structures.
 """
 
-from typing import Dict, List, Any
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List
 from dataclasses import dataclass, field
+from collections import deque
+from array import array
 
 
 @dataclass
@@ -43,6 +45,10 @@ class ConceptTree:
     """
     nodes: Dict[str, ConceptNode] = field(default_factory=dict)
     roots: List[str] = field(default_factory=list)
+    _ancestor_index: 'AncestorIndex | None' = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _children_sorted: bool = field(default=False, init=False, repr=False, compare=False)
     
     def __contains__(self, concept: str) -> bool:
         """Check if a concept exists in the tree."""
@@ -74,10 +80,73 @@ class ConceptTree:
         """
         if concept in self.nodes:
             children = self.nodes[concept].children
+            if self._children_sorted:
+                return list(children)
             # Sort by order
             return sorted(children, key=lambda c: self.nodes[c].order if c in self.nodes else 0)
         return []
     
+    def sort_children(self) -> None:
+        """
+        Sort every node's children list by order, once.
+        
+        get_children() then returns the stored lists without re-sorting.
+        The parsers call this when they finish building a tree; call it
+        again after adding children by hand.
+        """
+        nodes = self.nodes
+        
+        def _order(concept: str) -> float:
+            node = nodes.get(concept)
+            return node.order if node is not None else 0
+        
+        for node in nodes.values():
+            node.children.sort(key=_order)
+        self._children_sorted = True
+    
+    def set_depths(self) -> None:
+        """
+        Set each node's depth from the roots down (iteratively).
+        
+        Children are walked in stored order and a concept reached through
+        several parents keeps the depth of its last visit. Concepts already
+        on the current path are skipped, so parent cycles cannot recurse.
+        """
+        nodes = self.nodes
+        
+        def _children(concept: str) -> List[str]:
+            node = nodes.get(concept)
+            return node.children if node is not None else []
+        
+        starts = [r for r in self.roots if r in nodes]
+        for concept, level in _iter_dfs(starts, _children):
+            if concept in nodes:
+                nodes[concept].depth = level
+    
+    def build_index(self) -> 'AncestorIndex':
+        """
+        Build the ancestor index used by the ancestry queries.
+        
+        Once built, get_ancestors(), get_ancestor_path(), is_ancestor() and
+        find_common_ancestor() answer from the index instead of walking
+        parent pointers. Call again after modifying the tree.
+        
+        Returns:
+            The new AncestorIndex
+        """
+        self._ancestor_index = AncestorIndex(self)
+        return self._ancestor_index
+    
+    def is_ancestor(self, ancestor: str, concept: str) -> bool:
+        """
+        Check whether ``ancestor`` is a (proper) ancestor of ``concept``.
+        
+        O(1) once build_index() has been called.
+        """
+        if self._ancestor_index is not None:
+            return self._ancestor_index.is_ancestor(ancestor, concept)
+        return ancestor in (self.get_ancestors(concept) or ())
+    
     def get_ancestors(self, concept: str) -> List[str] | None:
         """
         Get all ancestors from concept to root.
@@ -89,6 +158,8 @@ class ConceptTree:
         """
         if concept not in self.nodes:
             return None
+        if self._ancestor_index is not None:
+            return self._ancestor_index.ancestors(concept)
         
         ancestors = []
         current = concept
@@ -137,19 +208,63 @@ class ConceptTree:
         """
         if concept not in self.nodes:
             return None
+        return list(self.iter_descendants(concept, max_depth))
+    
+    def iter_descendants(self, concept: str, max_depth: int | None = None) -> Iterator[str]:
+        """
+        Lazily yield the descendants of a concept, breadth-first.
+        
+        Same order as get_descendants(); yields nothing if the concept is
+        not in the tree.
+        """
+        if concept not in self.nodes:
+            return
+        for descendant, level in _iter_bfs([concept], self.get_children, max_depth):
+            if level:
+                yield descendant
+    
+    def iter_dfs(
+        self,
+        root: str | None = None,
+        max_depth: int | None = None,
+    ) -> Iterator[tuple[str, int]]:
+        """
+        Lazily walk the tree depth-first (pre-order), children in order.
         
-        descendants = []
-        queue = [(c, 1) for c in self.get_children(concept)]
+        Uses an explicit stack, so deep trees cannot hit the recursion
+        limit. A concept already on the current path is skipped, so parent
+        cycles in malformed trees do not loop forever.
         
-        while queue:
-            child, depth = queue.pop(0)
-            if max_depth is not None and depth > max_depth:
-                continue
-            descendants.append(child)
-            for grandchild in self.get_children(child):
-                queue.append((grandchild, depth + 1))
+        Args:
+            root: Starting concept (None = every root, in order)
+            max_depth: Deepest level to yield (None = unlimited)
+        
+        Yields:
+            Tuple of (concept, level) with level 0 for the starting concept(s)
         
-        return descendants
+        Examples:
+            >>> for concept, level in tree.iter_dfs(max_depth=2):
+            ...     print('  ' * level + concept)
+        """
+        yield from _iter_dfs(self._starts(root), self.get_children, max_depth)
+    
+    def iter_bfs(
+        self,
+        root: str | None = None,
+        max_depth: int | None = None,
+    ) -> Iterator[tuple[str, int]]:
+        """
+        Lazily walk the tree breadth-first, children in order.
+        
+        Same arguments, yields and cycle handling as iter_dfs().
+        """
+        yield from _iter_bfs(self._starts(root), self.get_children, max_depth)
+    
+    def _starts(self, root: str | None) -> List[str]:
+        """Starting concepts of a traversal: [root] if present, else all roots."""
+        if root is None:
+            return list(self.roots)
+        return [root] if root in self.nodes else []
     
     def get_siblings(self, concept: str) -> List[str] | None:
         """
@@ -184,95 +299,421 @@ class ConceptTree:
         """
         Find the lowest common ancestor of two concepts.
         
+        A concept counts as its own ancestor here, so the result is concept1
+        when concept2 lies under it. O(1) once build_index() has been called.
+        
         Returns None if either concept is not in the tree or no common ancestor exists.
         """
         if concept1 not in self.nodes or concept2 not in self.nodes:
             return None
+        if self._ancestor_index is not None:
+            return self._ancestor_index.common_ancestor(concept1, concept2)
         
         ancestors1 = set(self.get_ancestors(concept1) or [])
         ancestors1.add(concept1)
         
         current = concept2
-        while current:
+        seen = set()  # Prevent infinite loops
+        while current and current not in seen:
             if current in ancestors1:
                 return current
+            seen.add(current)
             current = self.get_parent(current)
         
         return None
     
-    def print_tree(self, root: str | None = None, indent: str = "  ") -> str:
+    def print_tree(
+        self,
+        root: str | None = None,
+        indent: str = "  ",
+        file: IO[str] | None = None,
+    ) -> str | None:
         """
         Print the tree structure as a string.
         
         Args:
             root: Starting node (None = print all roots)
             indent: Indentation string
+            file: Optional text file object. If given, lines are written to
+                  it as they are produced (one per line, nothing is kept in
+                  memory) and None is returned.
         
         Returns:
-            String representation of the tree
-        """
-        lines = []
-        
-        def _print_node(concept: str, level: int):
-            prefix = indent * level
-            lines.append(f"{prefix}{concept}")
-            for child in self.get_children(concept):
-                _print_node(child, level + 1)
+            String representation of the tree (None when writing to file)
         
-        if root:
-            if root in self.nodes:
-                _print_node(root, 0)
-            else:
-                return f"<concept '{root}' not found>"
-        else:
-            for r in self.roots:
-                _print_node(r, 0)
+        Examples:
+            >>> with open('tree.txt', 'w') as f:
+            ...     tree.print_tree(file=f)
+        """
+        if root and root not in self.nodes:
+            message = f"<concept '{root}' not found>"
+            if file is None:
+                return message
+            file.write(message + "\n")
+            return None
         
-        return "\n".join(lines)
+        lines = (f"{indent * level}{concept}" for concept, level in self.iter_dfs(root or None))
+        return _emit_lines(lines, file)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert tree to nested dictionary."""
-        def _node_to_dict(concept: str) -> Dict[str, Any]:
-            return {
-                'concept': concept,
-                'children': [_node_to_dict(c) for c in self.get_children(concept)]
-            }
-        
         return {
-            'roots': [_node_to_dict(r) for r in self.roots]
+            'roots': _nested_dict(self._starts(None), self.get_children)
         }
 
 
-def get_hierarchy_dataframe(tree: ConceptTree):
+def _iter_dfs(
+    starts: Iterable[str],
+    children_of: Callable[[str], Iterable[str]],
+    max_depth: int | None = None,
+) -> Iterator[tuple[str, int]]:
+    """Pre-order DFS with an explicit stack, skipping concepts already on the path."""
+    for start in starts:
+        yield start, 0
+        if max_depth is not None and max_depth <= 0:
+            continue
+        path = [start]
+        on_path = {start}
+        stack = [iter(children_of(start))]
+        while stack:
+            for child in stack[-1]:
+                if child in on_path:
+                    continue
+                level = len(stack)
+                yield child, level
+                if max_depth is None or level < max_depth:
+                    path.append(child)
+                    on_path.add(child)
+                    stack.append(iter(children_of(child)))
+                break
+            else:
+                stack.pop()
+                on_path.discard(path.pop())
+
+
+def _iter_bfs(
+    starts: Iterable[str],
+    children_of: Callable[[str], Iterable[str]],
+    max_depth: int | None = None,
+) -> Iterator[tuple[str, int]]:
+    """Level-order walk with a deque, skipping concepts already on the path."""
+    # Queue entries: (concept, level, path) with path a linked (concept, parent_path) tuple
+    queue = deque((start, 0, None) for start in starts)
+    while queue:
+        concept, level, up = queue.popleft()
+        yield concept, level
+        if max_depth is not None and level >= max_depth:
+            continue
+        path = (concept, up)
+        for child in children_of(concept):
+            link = path
+            while link is not None and link[0] != child:
+                link = link[1]
+            if link is None:
+                queue.append((child, level + 1, path))
+
+
+def _emit_lines(lines: Iterable[str], file: IO[str] | None) -> str | None:
+    """Join lines into a string, or stream them to file (returning None)."""
+    if file is None:
+        return "\n".join(lines)
+    for line in lines:
+        file.write(line)
+        file.write("\n")
+    return None
+
+
+def _nested_dict(
+    starts: Iterable[str],
+    children_of: Callable[[str], Iterable[str]],
+) -> List[Dict[str, Any]]:
+    """Build to_dict()-style nested {'concept', 'children'} dicts without recursion."""
+    result: List[Dict[str, Any]] = []
+    branch: List[Dict[str, Any]] = []  # Open node per level
+    for concept, level in _iter_dfs(starts, children_of):
+        node = {'concept': concept, 'children': []}
+        del branch[level:]
+        (branch[-1]['children'] if branch else result).append(node)
+        branch.append(node)
+    return result
+
+
+class AncestorIndex:
+    """
+    Precomputed ancestry index for a concept tree.
+    
+    Built once from the parent pointers of a ConceptTree (or a
+    CompactConceptTree) with an iterative Euler tour:
+    - entry/exit numbers answer "is X under Y" in O(1)
+    - a sparse table over the tour's depths answers lowest common
+      ancestor queries in O(1)
+    - ancestor lists are read off a flat parent array in O(depth)
+    
+    Parent cycles (malformed extension trees) are broken where the tour
+    first enters them.
+    
+    Examples:
+        >>> index = AncestorIndex(tree)   # or tree.build_index()
+        >>> index.is_ancestor('us-gaap_IncomeStatementAbstract', 'us-gaap_Revenues')
+        True
+        >>> index.common_ancestor('us-gaap_Revenues', 'us-gaap_CostOfRevenue')
+        'us-gaap_IncomeStatementLineItems'
+    """
+    
+    __slots__ = (
+        '_ids',
+        '_names',
+        '_parent',
+        '_depth',
+        '_tin',
+        '_tout',
+        '_component',
+        '_first',
+        '_sparse',
+    )
+    
+    def __init__(self, tree):
+        ids: Dict[str, int] = {concept: i for i, concept in enumerate(tree.nodes)}
+        n = len(ids)
+        
+        # Children by parent pointer, so the index agrees with get_parent()
+        kids: List[List[int]] = [[] for _ in range(n)]
+        starts: List[int] = []
+        for concept, i in ids.items():
+            parent = ids.get(tree.get_parent(concept))
+            if parent is None:
+                starts.append(i)
+            else:
+                kids[parent].append(i)
+        # Nodes only reachable through a parent cycle come last
+        starts.extend(range(n))
+        
+        parent_of = array('i', [-1]) * n
+        depth = array('i', [0]) * n
+        tin = array('i', [-1]) * n
+        tout = array('i', [0]) * n
+        component = array('i', [0]) * n
+        first = array('i', [0]) * n
+        euler = array('i')
+        clock = 0
+        n_components = 0
+        
+        for start in starts:
+            if tin[start] >= 0:
+                continue
+            tin[start] = clock
+            clock += 1
+            component[start] = n_components
+            first[start] = len(euler)
+            euler.append(start)
+            stack = [(start, iter(kids[start]))]
+            while stack:
+                node, children = stack[-1]
+                for child in children:
+                    if tin[child] < 0:
+                        parent_of[child] = node
+                        depth[child] = depth[node] + 1
+                        component[child] = n_components
+                        tin[child] = clock
+                        clock += 1
+                        first[child] = len(euler)
+                        euler.append(child)
+                        stack.append((child, iter(kids[child])))
+                        break
+                else:
+                    stack.pop()
+                    tout[node] = clock
+                    clock += 1
+                    if stack:
+                        euler.append(stack[-1][0])
+            n_components += 1
+        
+        # sparse[k][i]: shallowest node in euler[i:i + 2**k]
+        sparse = [euler]
+        span = 1
+        while 2 * span <= len(euler):
+            prev = sparse[-1]
+            sparse.append(array('i', (
+                a if depth[a] <= depth[b] else b
+                for a, b in zip(prev, prev[span:])
+            )))
+            span *= 2
+        
+        self._ids = ids
+        self._names = list(ids)
+        self._parent = parent_of
+        self._depth = depth
+        self._tin = tin
+        self._tout = tout
+        self._component = component
+        self._first = first
+        self._sparse = sparse
+    
+    def __contains__(self, concept: str) -> bool:
+        return concept in self._ids
+    
+    def __len__(self) -> int:
+        return len(self._names)
+    
+    def depth(self, concept: str) -> int | None:
+        """Depth of a concept in the index's forest (0 = root), or None."""
+        i = self._ids.get(concept)
+        return None if i is None else self._depth[i]
+    
+    def is_ancestor(self, ancestor: str, concept: str) -> bool:
+        """True if ``ancestor`` is a proper ancestor of ``concept`` (O(1))."""
+        a = self._ids.get(ancestor)
+        c = self._ids.get(concept)
+        if a is None or c is None:
+            return False
+        return self._tin[a] < self._tin[c] and self._tout[c] < self._tout[a]
+    
+    def ancestors(self, concept: str) -> List[str] | None:
+        """Ancestors from immediate parent to root, or None if not indexed."""
+        i = self._ids.get(concept)
+        if i is None:
+            return None
+        names = self._names
+        parent_of = self._parent
+        result = []
+        i = parent_of[i]
+        while i >= 0:
+            result.append(names[i])
+            i = parent_of[i]
+        return result
+    
+    def path(self, concept: str) -> List[str] | None:
+        """Path from root to concept (inclusive), or None if not indexed."""
+        ancestors = self.ancestors(concept)
+        if ancestors is None:
+            return None
+        ancestors.reverse()
+        ancestors.append(concept)
+        return ancestors
+    
+    def common_ancestor(self, concept1: str, concept2: str) -> str | None:
+        """
+        Lowest common ancestor of two concepts (O(1)).
+        
+        A concept counts as its own ancestor. Returns None if either concept
+        is not indexed or they are in different trees.
+        """
+        i = self._ids.get(concept1)
+        j = self._ids.get(concept2)
+        if i is None or j is None or self._component[i] != self._component[j]:
+            return None
+        lo, hi = self._first[i], self._first[j]
+        if lo > hi:
+            lo, hi = hi, lo
+        k = (hi - lo + 1).bit_length() - 1
+        row = self._sparse[k]
+        a = row[lo]
+        b = row[hi - (1 << k) + 1]
+        return self._names[a if self._depth[a] <= self._depth[b] else b]
+
+
+def get_hierarchy_dataframe(tree: ConceptTree, path_strings: bool = True):
     """
     Convert a ConceptTree to a pandas DataFrame.
     
-    Returns DataFrame with columns:
-    - concept: Concept name
-    - parent: Parent concept name
+    Built in one iterative DFS pass that carries each node's path down to
+    its children, instead of walking the ancestors of every node.
+    
+    Returns DataFrame (one row per concept, in ``tree.nodes`` order; sort by
+    path_id for depth-first order) with columns:
+    - concept: Concept name (categorical)
+    - parent: Parent concept name (categorical)
     - depth: Depth in tree
     - order: Sort order among siblings
-    - path: Full path from root as string
+    - path: Full path from root as string (only if path_strings=True)
+    - path_id: Integer id of the root-to-concept path. Ids are assigned in
+      depth-first order, so a subtree's paths form a contiguous id range.
+    - parent_id: path_id of the parent's path (-1 for roots)
+    - root_id: path_id of the root the concept hangs under
+    
+    Together, path_id/parent_id form a path table: the full path of a row
+    is its concept, preceded by the path its parent_id refers to.
+    
+    Args:
+        tree: The tree to convert (ConceptTree or CompactConceptTree)
+        path_strings: Also build the legacy ' > '-joined ``path`` column.
+                      Skip it to save memory on large taxonomies.
     
     Example:
         >>> tree = parse_definition_linkbase('def.xml')
         >>> df = get_hierarchy_dataframe(tree)
         >>> df[df['concept'].str.contains('Research')]
+        >>> 
+        >>> # All rows under a concept, via the path-id range of its subtree
+        >>> df = get_hierarchy_dataframe(tree, path_strings=False).set_index('path_id')
     """
     try:
         import pandas as pd
+        import numpy as np
     except ImportError:
         raise ImportError("pandas is required for get_hierarchy_dataframe()")
     
-    rows = []
-    for concept, node in tree.nodes.items():
-        path = ' > '.join(tree.get_ancestor_path(concept) or [concept])
-        rows.append({
-            'concept': concept,
-            'parent': node.parent,
-            'depth': node.depth,
-            'order': node.order,
-            'path': path,
-        })
-    
-    return pd.DataFrame(rows)
\ No newline at end of file
+    nodes = list(tree.nodes.values())
+    ids = {node.concept: i for i, node in enumerate(nodes)}
+    n = len(nodes)
+    
+    # Children by parent pointer (the relation get_ancestor_path() follows)
+    kids: List[List[int]] = [[] for _ in range(n)]
+    starts: List[int] = []
+    for i, node in enumerate(nodes):
+        parent = ids.get(node.parent) if node.parent else None
+        if parent is None:
+            starts.append(i)
+        else:
+            kids[parent].append(i)
+    for group in kids:
+        if len(group) > 1:
+            group.sort(key=lambda k: nodes[k].order)
+    # Nodes only reachable through a parent cycle come last
+    starts.extend(range(n))
+    
+    path_id = [-1] * n
+    parent_id = [-1] * n
+    root_id = [0] * n
+    paths: List[str | None] = [None] * n
+    next_id = 0
+    
+    for start in starts:
+        if path_id[start] >= 0:
+            continue
+        root = next_id
+        stack = [start]
+        while stack:
+            i = stack.pop()
+            if path_id[i] >= 0:
+                continue
+            pid = path_id[i] = next_id
+            root_id[i] = root
+            next_id += 1
+            if path_strings:
+                concept = nodes[i].concept
+                parent = nodes[i].parent
+                if i == start:
+                    # A parent outside the tree still heads the path
+                    paths[i] = f"{parent} > {concept}" if parent and parent not in ids else concept
+                else:
+                    paths[i] = f"{paths[ids[parent]]} > {concept}"
+            children = kids[i]
+            for k in reversed(children):
+                if path_id[k] < 0:
+                    parent_id[k] = pid
+                    stack.append(k)
+    
+    data = {
+        'concept': pd.Categorical([node.concept for node in nodes]),
+        'parent': pd.Categorical([node.parent for node in nodes]),
+        'depth': [node.depth for node in nodes],
+        'order': [node.order for node in nodes],
+    }
+    if path_strings:
+        data['path'] = paths
+    data['path_id'] = np.array(path_id, dtype=np.int32)
+    data['parent_id'] = np.array(parent_id, dtype=np.int32)
+    data['root_id'] = np.array(root_id, dtype=np.int32)
+    
+    return pd.DataFrame(data)
@@ -5,14 +5,16 @@ Extract labels and documentation from XBRL label linkbase files.
 """
 
 from typing import Dict
+
 from ..core.namespaces import qname, Roles
-from ..core.streaming import stream_xml
-from ..utils import extract_concept_from_href
+from ..core.parser import LinkbaseHandler, StreamingParser
+from ..core.zipfs import Source
 
 
 def parse_label_linkbase(
-    xml_file: str,
+    xml_file: Source,
     role: str = Roles.DOCUMENTATION,
+    engine: str = 'etree',
 ) -> Dict[str, str]:
     """
     Extract labels from a label linkbase file.
@@ -21,13 +23,15 @@ def parse_label_linkbase(
     to their label text for the specified role.
     
     Args:
-        xml_file: Path to the label linkbase XML file
+        xml_file: Path to the label linkbase XML file, a binary file
+                  object or a ZipPath
         role: The label role URI to extract. Defaults to documentation role.
               Common roles:
               - Roles.DOCUMENTATION: Detailed concept descriptions
               - Roles.LABEL: Standard display labels
               - Roles.TERSE_LABEL: Short labels
               - Roles.VERBOSE_LABEL: Extended labels
+        engine: Scanning engine, 'etree' (default) or 'expat'.
     
     Returns:
         Dict mapping concept names to label text.
@@ -42,54 +46,16 @@ def parse_label_linkbase(
         >>> from easyrl.core.namespaces import Roles
         >>> labels = parse_label_linkbase('us-gaap-lab-2023.xml', role=Roles.LABEL)
     """
-    # Pre-compute qualified names for speed
-    TAG_LOC = qname('link', 'loc')
-    TAG_LABEL = qname('link', 'label')
-    TAG_ARC = qname('link', 'labelArc')
-    
-    ATTR_LABEL = qname('xlink', 'label')
-    ATTR_HREF = qname('xlink', 'href')
-    ATTR_ROLE = qname('xlink', 'role')
-    ATTR_FROM = qname('xlink', 'from')
-    ATTR_TO = qname('xlink', 'to')
-    
-    # Storage
-    loc_map: Dict[str, str] = {}    # label_id -> concept_name
-    label_map: Dict[str, str] = {}  # label_id -> text
-    arc_links: list[tuple[str, str]] = []  # (from_id, to_id)
-    
-    # Tags we care about
-    tags = {TAG_LOC, TAG_LABEL, TAG_ARC}
-    
-    for tag, elem in stream_xml(xml_file, tags_of_interest=tags):
-        
-        if tag == TAG_LOC:
-            label_id = elem.get(ATTR_LABEL)
-            href = elem.get(ATTR_HREF)
-            if label_id and href:
-                loc_map[label_id] = extract_concept_from_href(href)
-        
-        elif tag == TAG_LABEL:
-            elem_role = elem.get(ATTR_ROLE)
-            label_id = elem.get(ATTR_LABEL)
-            if elem_role == role and label_id:
-                label_map[label_id] = elem.text or ''
-        
-        elif tag == TAG_ARC:
-            from_id = elem.get(ATTR_FROM)
-            to_id = elem.get(ATTR_TO)
-            if from_id and to_id:
-                arc_links.append((from_id, to_id))
-    
-    # Resolution Phase: join locators with labels via arcs
-    return {
-        loc_map[loc]: label_map[lbl]
-        for loc, lbl in arc_links
-        if loc in loc_map and lbl in label_map
-    }
+    parser = StreamingParser(xml_file, engine=engine)
+    parser.register(LabelHandler(role))
+    labels, = parser.parse()
+    return labels
 
 
-def parse_all_labels(xml_file: str) -> Dict[str, Dict[str, str]]:
+def parse_all_labels(
+    xml_file: Source,
+    engine: str = 'etree',
+) -> Dict[str, Dict[str, str]]:
     """
     Extract all label types from a label linkbase.
     
@@ -97,7 +63,9 @@ def parse_all_labels(xml_file: str) -> Dict[str, Dict[str, str]]:
     this function extracts all available label roles.
     
     Args:
-        xml_file: Path to the label linkbase XML file
+        xml_file: Path to the label linkbase XML file, a binary file
+                  object or a ZipPath
+        engine: Scanning engine, 'etree' (default) or 'expat'.
     
     Returns:
         Nested dict: {concept_name: {role: text, ...}, ...}
@@ -108,52 +76,122 @@ def parse_all_labels(xml_file: str) -> Dict[str, Dict[str, str]]:
         >>> print(concept[Roles.LABEL])        # "Assets"
         >>> print(concept[Roles.DOCUMENTATION]) # "Sum of the carrying..."
     """
-    TAG_LOC = qname('link', 'loc')
+    parser = StreamingParser(xml_file, engine=engine)
+    parser.register(AllLabelsHandler())
+    labels, = parser.parse()
+    return labels
+
+
+class LabelHandler(LinkbaseHandler):
+    """
+    StreamingParser handler extracting one label role from a label linkbase.
+    
+    Used by parse_label_linkbase(); register it directly to share a pass
+    over the file with other handlers.
+    
+    Example:
+        >>> parser = StreamingParser('us-gaap-lab-2020-01-31.xml')
+        >>> parser.register(LabelHandler(Roles.LABEL))
+        >>> parser.register(LabelHandler(Roles.TERSE_LABEL))
+        >>> labels, terse = parser.parse()
+    """
+    
     TAG_LABEL = qname('link', 'label')
     TAG_ARC = qname('link', 'labelArc')
-    
-    ATTR_LABEL = qname('xlink', 'label')
-    ATTR_HREF = qname('xlink', 'href')
-    ATTR_ROLE = qname('xlink', 'role')
     ATTR_FROM = qname('xlink', 'from')
     ATTR_TO = qname('xlink', 'to')
     
-    loc_map: Dict[str, str] = {}
-    label_map: Dict[str, tuple[str, str]] = {}  # label_id -> (role, text)
-    arc_links: list[tuple[str, str]] = []
-    
-    tags = {TAG_LOC, TAG_LABEL, TAG_ARC}
-    
-    for tag, elem in stream_xml(xml_file, tags_of_interest=tags):
-        
-        if tag == TAG_LOC:
-            label_id = elem.get(ATTR_LABEL)
-            href = elem.get(ATTR_HREF)
-            if label_id and href:
-                loc_map[label_id] = extract_concept_from_href(href)
-        
-        elif tag == TAG_LABEL:
-            role = elem.get(ATTR_ROLE)
-            label_id = elem.get(ATTR_LABEL)
-            if role and label_id:
-                label_map[label_id] = (role, elem.text or '')
+    def __init__(self, role: str = Roles.DOCUMENTATION):
+        super().__init__()
+        self.role = role
+        self.labels: Dict[str, str] = {}               # concept_name -> text
+        self.label_map: Dict[str, str] = {}            # label_id -> text
+        self.arc_links: list[tuple[str, str]] = []     # (from_id, to_id)
+        self.fields[self.TAG_LABEL] = (self.ATTR_ROLE, self.ATTR_LABEL)
+        self.fields[self.TAG_ARC] = (self.ATTR_FROM, self.ATTR_TO)
+        self.text_tags.add(self.TAG_LABEL)
+    
+    def handle(self, tag: str, values: tuple) -> None:
+        if tag == self.TAG_LABEL:
+            elem_role, label_id, text = values
+            if elem_role == self.role and label_id:
+                self.label_map[label_id] = text
         
-        elif tag == TAG_ARC:
-            from_id = elem.get(ATTR_FROM)
-            to_id = elem.get(ATTR_TO)
+        elif tag == self.TAG_ARC:
+            from_id, to_id = values
             if from_id and to_id:
-                arc_links.append((from_id, to_id))
+                self.arc_links.append((from_id, to_id))
+        
+        else:
+            super().handle(tag, values)
+    
+    def end_link(self) -> None:
+        # Resolution Phase: join locators with labels via arcs
+        loc_map = self.loc_map
+        label_map = self.label_map
+        self.labels.update(
+            (loc_map[loc], label_map[lbl])
+            for loc, lbl in self.arc_links
+            if loc in loc_map and lbl in label_map
+        )
+        label_map.clear()
+        self.arc_links.clear()
+        super().end_link()
+    
+    def result(self) -> Dict[str, str]:
+        self.end_link()
+        return self.labels
+
+
+class AllLabelsHandler(LinkbaseHandler):
+    """
+    StreamingParser handler extracting every label role from a label
+    linkbase, as {concept_name: {role: text}}.
     
-    # Build nested result
-    result: Dict[str, Dict[str, str]] = {}
+    Used by parse_all_labels(). Locator and resource labels are resolved
+    per extended link, and one resource label may name several resources
+    (e.g. one per role), as in LabelStore.read().
+    """
     
-    for loc_id, label_id in arc_links:
-        if loc_id in loc_map and label_id in label_map:
-            concept = loc_map[loc_id]
-            role, text = label_map[label_id]
-            
-            if concept not in result:
-                result[concept] = {}
-            result[concept][role] = text
+    TAG_LABEL = qname('link', 'label')
+    TAG_ARC = qname('link', 'labelArc')
+    ATTR_FROM = qname('xlink', 'from')
+    ATTR_TO = qname('xlink', 'to')
     
-    return result
\ No newline at end of file
+    def __init__(self):
+        super().__init__()
+        self.labels: Dict[str, Dict[str, str]] = {}                 # concept_name -> {role: text}
+        self.label_map: Dict[str, list[tuple[str, str]]] = {}       # label_id -> [(role, text)]
+        self.arc_links: list[tuple[str, str]] = []                  # (from_id, to_id)
+        self.fields[self.TAG_LABEL] = (self.ATTR_ROLE, self.ATTR_LABEL)
+        self.fields[self.TAG_ARC] = (self.ATTR_FROM, self.ATTR_TO)
+        self.text_tags.add(self.TAG_LABEL)
+    
+    def handle(self, tag: str, values: tuple) -> None:
+        if tag == self.TAG_LABEL:
+            role, label_id, text = values
+            if role and label_id:
+                self.label_map.setdefault(label_id, []).append((role, text))
+        
+        elif tag == self.TAG_ARC:
+            from_id, to_id = values
+            if from_id and to_id:
+                self.arc_links.append((from_id, to_id))
+        
+        else:
+            super().handle(tag, values)
+    
+    def end_link(self) -> None:
+        loc_map = self.loc_map
+        label_map = self.label_map
+        labels = self.labels
+        for loc, lbl in self.arc_links:
+            if loc in loc_map and lbl in label_map:
+                labels.setdefault(loc_map[loc], {}).update(label_map[lbl])
+        label_map.clear()
+        self.arc_links.clear()
+        super().end_link()
+    
+    def result(self) -> Dict[str, Dict[str, str]]:
+        self.end_link()
+        return self.labels
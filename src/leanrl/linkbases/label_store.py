@@ -0,0 +1,443 @@
+"""
+Columnar Label Store
+
+All labels of one or more label linkbases, every role and language, in
+flat columns filled in a single pass per file:
+
+    concept_codes  array('i')  -> concepts (SymbolTable)
+    role_codes     array('H')  -> roles    (SymbolTable)
+    lang_codes     array('H')  -> langs    (SymbolTable)
+    texts          list[str]
+
+Roles and languages are interned to small integers, so a multilingual
+taxonomy (IFRS: a dozen languages x a dozen roles) costs one text per
+label plus three integers, instead of a dict per concept. ``roles=`` and
+``langs=`` filters are applied while streaming: filtered-out labels are
+never stored.
+
+Lookups over many concepts, with fallback chains such as
+terse label -> standard label, run on numpy arrays.
+"""
+
+from typing import Dict, Iterable, List, Sequence
+from array import array
+
+import numpy as np
+
+from ..core.namespaces import Namespaces, Roles, qname
+from ..core.scanner import RoleFilter, role_matcher, stream_fields
+from ..core.zipfs import Source, as_sources
+from ..utils import extract_concept_from_href
+from .compact import SymbolTable
+
+
+# xml:lang of a label resource
+ATTR_LANG = f'{Namespaces.XML.tag}lang'
+
+# Columns of LabelStore.to_dataframe()
+LABEL_COLUMNS = ['concept', 'role', 'lang', 'text']
+
+# Packing of (concept, role, lang) into one int for the duplicate check
+_ROLE_BITS = 16
+_LANG_BITS = 16
+
+
+class LabelStore:
+    """
+    Columnar store of labels: one row per (concept, role, language).
+    
+    Fill it with read() (or parse_label_store()); the first label seen for
+    a (concept, role, language) is kept.
+    
+    Attributes:
+        concepts: SymbolTable of concept names
+        roles: SymbolTable of label role URIs
+        langs: SymbolTable of language codes ('' when xml:lang is missing)
+        concept_codes: Concept id of each label
+        role_codes: Role id of each label
+        lang_codes: Language id of each label
+        texts: Text of each label
+    
+    Examples:
+        >>> store = parse_label_store(['ifrs_lab-en.xml', 'ifrs_lab-fr.xml'])
+        >>> store.get('ifrs-full_Assets', lang='fr')
+        'Total des actifs'
+        >>> # Terse label where there is one, standard label otherwise
+        >>> store.lookup(concepts, roles=[Roles.TERSE_LABEL, Roles.LABEL], lang='en')
+        ['Assets', 'Revenue', None, ...]
+        >>> store.to_dataframe().head()
+    """
+    
+    __slots__ = (
+        'concepts',
+        'roles',
+        'langs',
+        'concept_codes',
+        'role_codes',
+        'lang_codes',
+        'texts',
+        '_keys',
+    )
+    
+    def __init__(self):
+        self.concepts = SymbolTable()
+        self.roles = SymbolTable()
+        self.langs = SymbolTable()
+        self.concept_codes = array('i')
+        self.role_codes = array('H')
+        self.lang_codes = array('H')
+        self.texts: List[str] = []
+        # Packed (concept, role, lang) of every stored label, for the
+        # duplicate check; only kept while adding (see _key_set())
+        self._keys: set | None = None
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def __contains__(self, concept: str) -> bool:
+        return concept in self.concepts
+    
+    def __getstate__(self) -> tuple:
+        # The duplicate check is rebuilt when needed
+        return (
+            [self.concepts.name(i) for i in range(len(self.concepts))],
+            [self.roles.name(i) for i in range(len(self.roles))],
+            [self.langs.name(i) for i in range(len(self.langs))],
+            self.concept_codes,
+            self.role_codes,
+            self.lang_codes,
+            self.texts,
+        )
+    
+    def __setstate__(self, state: tuple) -> None:
+        concepts, roles, langs, self.concept_codes, self.role_codes, self.lang_codes, self.texts = state
+        self.concepts = SymbolTable()
+        self.roles = SymbolTable()
+        self.langs = SymbolTable()
+        for table, names in ((self.concepts, concepts), (self.roles, roles), (self.langs, langs)):
+            for name in names:
+                table.intern(name)
+        self._keys = None
+    
+    @staticmethod
+    def _pack(concept_id: int, role_id: int, lang_id: int) -> int:
+        return (concept_id << (_ROLE_BITS + _LANG_BITS)) | (role_id << _LANG_BITS) | lang_id
+    
+    def _key_set(self) -> set:
+        if self._keys is None:
+            self._keys = set(map(self._pack, self.concept_codes, self.role_codes, self.lang_codes))
+        return self._keys
+    
+    def compact(self) -> None:
+        """Drop the duplicate-check set (about a third of the store's memory); add() rebuilds it."""
+        self._keys = None
+    
+    def add(self, concept: str, role: str, lang: str, text: str) -> bool:
+        """
+        Add one label. Returns False if the concept already has a label
+        for this role and language.
+        """
+        concept_id = self.concepts.intern(concept)
+        role_id = self.roles.intern(role)
+        lang_id = self.langs.intern(lang)
+        key = self._pack(concept_id, role_id, lang_id)
+        keys = self._key_set()
+        if key in keys:
+            return False
+        keys.add(key)
+        self.concept_codes.append(concept_id)
+        self.role_codes.append(role_id)
+        self.lang_codes.append(lang_id)
+        self.texts.append(text)
+        return True
+    
+    def _accept(self, role: str | None, lang: str | None, match_role, match_lang) -> tuple[int, int] | None:
+        """Role and language ids of a label resource, or None if filtered out."""
+        # No role: standard label; no xml:lang: ''
+        role = role or Roles.LABEL
+        lang = lang or ''
+        if match_role is not None and not match_role(role):
+            return None
+        if match_lang is not None and not match_lang(lang):
+            return None
+        return self.roles.intern(role), self.langs.intern(lang)
+    
+    def read(
+        self,
+        xml_file: Source,
+        roles: RoleFilter | None = None,
+        langs: RoleFilter | None = None,
+        engine: str = 'etree',
+    ) -> 'LabelStore':
+        """
+        Add the labels of one label linkbase, in a single streaming pass.
+        
+        Args:
+            xml_file: Path to the label linkbase, a binary file object or a ZipPath
+            roles: Optional label role filter: a role URI, an iterable of
+                   role URIs, or a predicate on the role URI
+            langs: Optional language filter, in the same forms ('en',
+                   ['en', 'en-US'], or a predicate)
+            engine: Scanning engine, 'etree' (default) or 'expat'
+        
+        Returns:
+            self, for chaining
+        """
+        TAG_LINK = qname('link', 'labelLink')
+        TAG_LOC = qname('link', 'loc')
+        TAG_LABEL = qname('link', 'label')
+        TAG_ARC = qname('link', 'labelArc')
+        
+        ATTR_LABEL = qname('xlink', 'label')
+        ATTR_HREF = qname('xlink', 'href')
+        ATTR_ROLE = qname('xlink', 'role')
+        ATTR_FROM = qname('xlink', 'from')
+        ATTR_TO = qname('xlink', 'to')
+        
+        match_role = role_matcher(roles)
+        match_lang = role_matcher(langs)
+        
+        # (role, lang) as found in the file -> (role id, lang id), or None
+        # when filtered out; evaluated once per distinct pair
+        accepted: Dict[tuple, tuple[int, int] | None] = {}
+        
+        # Locators, label resources and arcs of the current extended link.
+        # One xlink:label can name several resources (e.g. one per role).
+        loc_map: Dict[str, str] = {}
+        label_map: Dict[str, List[tuple[int, int, str]]] = {}  # label_id -> [(role id, lang id, text)]
+        arcs: List[tuple[str, str]] = []
+        
+        intern_concept = self.concepts.intern
+        keys = self._key_set()
+        concept_codes = self.concept_codes
+        role_codes = self.role_codes
+        lang_codes = self.lang_codes
+        texts = self.texts
+        
+        def _flush() -> None:
+            for from_id, to_id in arcs:
+                concept = loc_map.get(from_id)
+                resources = label_map.get(to_id)
+                if concept is None or resources is None:
+                    continue
+                concept_key = intern_concept(concept) << (_ROLE_BITS + _LANG_BITS)
+                for role_id, lang_id, text in resources:
+                    key = concept_key | (role_id << _LANG_BITS) | lang_id
+                    if key in keys:
+                        continue
+                    keys.add(key)
+                    concept_codes.append(concept_key >> (_ROLE_BITS + _LANG_BITS))
+                    role_codes.append(role_id)
+                    lang_codes.append(lang_id)
+                    texts.append(text)
+            loc_map.clear()
+            label_map.clear()
+            arcs.clear()
+        
+        fields = {
+            TAG_LINK: (),
+            TAG_LOC: (ATTR_LABEL, ATTR_HREF),
+            TAG_LABEL: (ATTR_ROLE, ATTR_LABEL, ATTR_LANG),
+            TAG_ARC: (ATTR_FROM, ATTR_TO),
+        }
+        
+        for tag, values in stream_fields(
+            xml_file, fields, text_tags={TAG_LABEL}, engine=engine
+        ):
+            
+            if tag == TAG_LABEL:
+                role, label_id, lang, text = values
+                if not label_id:
+                    continue
+                codes = accepted.get((role, lang), False)
+                if codes is False:
+                    codes = accepted[(role, lang)] = self._accept(role, lang, match_role, match_lang)
+                if codes is not None:
+                    label_map.setdefault(label_id, []).append((*codes, text))
+            
+            elif tag == TAG_LOC:
+                label_id, href = values
+                if label_id and href:
+                    loc_map[label_id] = extract_concept_from_href(href)
+            
+            elif tag == TAG_ARC:
+                from_id, to_id = values
+                if from_id and to_id:
+                    arcs.append((from_id, to_id))
+            
+            elif tag == TAG_LINK:
+                _flush()
+        
+        _flush()
+        return self
+    
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    
+    def _rows_by_concept(self, role: str, lang: str | None) -> 'np.ndarray':
+        """Row of each concept id's label in (role, lang), -1 if none."""
+        rows = np.full(len(self.concepts), -1, dtype=np.int64)
+        role_id = self.roles.id(role)
+        if role_id is None or not self.texts:
+            return rows
+        mask = np.frombuffer(self.role_codes, dtype=np.uint16) == role_id
+        if lang is not None:
+            lang_id = self.langs.id(lang)
+            if lang_id is None:
+                return rows
+            mask &= np.frombuffer(self.lang_codes, dtype=np.uint16) == lang_id
+        matches = np.flatnonzero(mask)
+        codes = np.frombuffer(self.concept_codes, dtype=np.int32)[matches]
+        # With any language allowed, the first label read wins
+        codes, first = np.unique(codes, return_index=True)
+        rows[codes] = matches[first]
+        return rows
+    
+    def lookup(
+        self,
+        concepts: Sequence[str],
+        roles: str | Sequence[str] = (Roles.LABEL,),
+        lang: str | Sequence[str] | None = None,
+        default: str | None = None,
+    ) -> List[str | None]:
+        """
+        Labels of many concepts at once, with fallbacks.
+        
+        Every (role, lang) combination is tried in order - roles first,
+        then languages - and each concept gets the first label found.
+        
+        Args:
+            concepts: Concept names
+            roles: Role URI, or roles in order of preference
+                   (e.g. [Roles.TERSE_LABEL, Roles.LABEL])
+            lang: Language, languages in order of preference
+                  (e.g. ['en-US', 'en']), or None for any language
+            default: Value for concepts without any matching label
+        
+        Returns:
+            List of labels, aligned with concepts
+        
+        Examples:
+            >>> store.lookup(['us-gaap_Assets', 'us-gaap_Nope'], roles=[Roles.TERSE_LABEL, Roles.LABEL])
+            ['Assets', None]
+        """
+        roles = [roles] if isinstance(roles, str) else list(roles)
+        langs = [lang] if lang is None or isinstance(lang, str) else list(lang)
+        
+        ids = np.fromiter(
+            (-1 if (i := self.concepts.id(c)) is None else i for c in concepts),
+            dtype=np.int64,
+            count=len(concepts),
+        )
+        known = ids >= 0
+        rows = np.full(len(ids), -1, dtype=np.int64)
+        for role in roles:
+            for lang_ in langs:
+                todo = known & (rows < 0)
+                if not todo.any():
+                    break
+                rows[todo] = self._rows_by_concept(role, lang_)[ids[todo]]
+        
+        texts = self.texts
+        return [texts[r] if r >= 0 else default for r in rows.tolist()]
+    
+    def get(
+        self,
+        concept: str,
+        role: str | Sequence[str] = Roles.LABEL,
+        lang: str | Sequence[str] | None = None,
+        default: str | None = None,
+    ) -> str | None:
+        """Label of one concept (same fallbacks as lookup())."""
+        return self.lookup([concept], roles=role, lang=lang, default=default)[0]
+    
+    def to_dict(self, role: str = Roles.LABEL, lang: str | None = None) -> Dict[str, str]:
+        """
+        {concept: text} for one role, like parse_label_linkbase().
+        
+        Args:
+            role: Label role URI
+            lang: Language, or None for any (first label read wins)
+        """
+        rows = self._rows_by_concept(role, lang)
+        found = np.flatnonzero(rows >= 0)
+        name = self.concepts.name
+        texts = self.texts
+        return {name(i): texts[r] for i, r in zip(found.tolist(), rows[found].tolist())}
+    
+    def to_dataframe(self, wide: bool = False, lang: str | None = None):
+        """
+        Convert the store to a pandas DataFrame.
+        
+        Args:
+            wide: False (default): long format, one row per label
+                  (LABEL_COLUMNS; role and lang are categoricals).
+                  True: one row per concept, one column per role.
+            lang: Keep only this language (wide format needs a single
+                  label per concept and role: without lang, the first
+                  label read is kept)
+        
+        Returns:
+            pandas DataFrame
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas is required for LabelStore.to_dataframe()")
+        
+        def _categories(table: SymbolTable, codes: array):
+            names = [table.name(i) for i in range(len(table))]
+            return pd.Categorical.from_codes(np.frombuffer(codes, dtype=np.uint16).astype(np.int32), names)
+        
+        concept_names = np.array([self.concepts.name(i) for i in range(len(self.concepts))], dtype=object)
+        df = pd.DataFrame({
+            'concept': concept_names[np.frombuffer(self.concept_codes, dtype=np.int32)],
+            'role': _categories(self.roles, self.role_codes),
+            'lang': _categories(self.langs, self.lang_codes),
+            'text': pd.Series(self.texts, dtype=object),
+        }, columns=LABEL_COLUMNS)
+        if lang is not None:
+            df = df[df['lang'] == lang].reset_index(drop=True)
+        if not wide:
+            return df
+        
+        df = df.drop_duplicates(['concept', 'role'])
+        wide_df = df.pivot(index='concept', columns='role', values='text')
+        wide_df.columns = wide_df.columns.astype(str)
+        wide_df.columns.name = None
+        return wide_df
+
+
+def parse_label_store(
+    xml_files: Source | Iterable[Source],
+    roles: RoleFilter | None = None,
+    langs: RoleFilter | None = None,
+    engine: str = 'etree',
+) -> LabelStore:
+    """
+    Read one or more label linkbases into a LabelStore.
+    
+    Each file is streamed once, whatever the number of roles and
+    languages it holds.
+    
+    Args:
+        xml_files: A label linkbase (path, file object or ZipPath), or an
+                   iterable of them (e.g. one file per language)
+        roles: Optional label role filter (see LabelStore.read())
+        langs: Optional language filter (see LabelStore.read())
+        engine: Scanning engine, 'etree' (default) or 'expat'
+    
+    Returns:
+        LabelStore with the labels of all files
+    
+    Examples:
+        >>> store = parse_label_store('us-gaap-lab-2023.xml', roles=[Roles.LABEL, Roles.TERSE_LABEL])
+        >>> store.to_dict(Roles.TERSE_LABEL)['us-gaap_Assets']
+        'Assets'
+    """
+    store = LabelStore()
+    for xml_file in as_sources(xml_files):
+        store.read(xml_file, roles=roles, langs=langs, engine=engine)
+    store.compact()
+    return store
@@ -3,30 +3,61 @@ Reference Linkbase Parser
 
 Extract references from XBRL reference linkbase files.
 References link concepts to authoritative literature (FASB, SEC, IFRS, etc.)
+
+Thousands of concepts cite the same paragraphs, so references are
+flyweights: a ReferencePool hands out one immutable Reference per
+distinct (role, parts), with part names and values interned. A
+CitationIndex maps Topic / SubTopic / Section back to the citing concepts.
 """
 
-from typing import Dict, List, Any
+from typing import Dict, Iterable, List, Any, Mapping, Tuple
 from dataclasses import dataclass, field
-from ..core.namespaces import qname, Roles
-from ..core.streaming import stream_xml
-from ..utils import extract_concept_from_href
+from types import MappingProxyType
+
+from ..core.namespaces import qname
+from ..core.parser import LinkbaseHandler, StreamingParser
+from ..core.zipfs import Source
 
 
 # Reference part namespace
 NS_REF = '{http://www.xbrl.org/2006/ref}'
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False)
 class Reference:
     """
     A single reference to authoritative literature.
     
+    Immutable and hashable: equal references (same role and parts, in the
+    same order) compare and hash equal, so they can be pooled and used as
+    dict keys.
+    
     Attributes:
         role: The reference role URI (e.g., Roles.REFERENCE)
-        parts: Dict of reference parts (Publisher, Name, Topic, Section, etc.)
+        parts: Read-only mapping of reference parts (Publisher, Name,
+               Topic, Section, etc.)
     """
     role: str
-    parts: Dict[str, str] = field(default_factory=dict)
+    parts: Mapping[str, str] = field(default_factory=dict)
+    _key: Tuple = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        parts = self.parts if isinstance(self.parts, MappingProxyType) else MappingProxyType(dict(self.parts))
+        object.__setattr__(self, 'parts', parts)
+        object.__setattr__(self, '_key', (self.role, tuple(parts.items())))
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Reference):
+            return NotImplemented
+        return self._key == other._key
+    
+    def __hash__(self) -> int:
+        return hash(self._key)
+    
+    def __reduce__(self):
+        # The read-only parts mapping cannot be pickled as such. Pickle keeps
+        # one copy of a Reference shared by many concepts.
+        return (Reference, (self.role, dict(self.parts)))
     
     def __repr__(self) -> str:
         publisher = self.parts.get('Publisher', '')
@@ -86,9 +117,128 @@ class Reference:
         return ' '.join(parts)
 
 
+class ReferencePool:
+    """
+    Interning pool of Reference objects.
+    
+    reference() returns the one Reference for a given role and parts,
+    creating it on first request. Role URIs, part names and part values
+    are interned too, so repeated strings are stored once per pool.
+    
+    Examples:
+        >>> pool = ReferencePool()
+        >>> a = pool.reference(Roles.REFERENCE, [('Topic', '730'), ('Section', '10')])
+        >>> a is pool.reference(Roles.REFERENCE, [('Topic', '730'), ('Section', '10')])
+        True
+    """
+    
+    __slots__ = ('_strings', '_references')
+    
+    def __init__(self):
+        self._strings: Dict[str, str] = {}
+        self._references: Dict[Tuple, Reference] = {}
+    
+    def __len__(self) -> int:
+        """Return the number of distinct references."""
+        return len(self._references)
+    
+    def __iter__(self):
+        return iter(self._references.values())
+    
+    def string(self, value: str) -> str:
+        """Get the pooled copy of a string."""
+        return self._strings.setdefault(value, value)
+    
+    def reference(self, role: str, parts: Iterable[Tuple[str, str]] | Mapping[str, str]) -> Reference:
+        """Get the pooled Reference for role and parts (name, value) pairs."""
+        items = parts.items() if isinstance(parts, Mapping) else parts
+        string = self.string
+        key = (string(role), tuple((string(name), string(value)) for name, value in items))
+        ref = self._references.get(key)
+        if ref is None:
+            ref = Reference(key[0], dict(key[1]))
+            self._references[key] = ref
+        return ref
+
+
+class ReferenceHandler(LinkbaseHandler):
+    """
+    StreamingParser handler extracting Reference objects from a reference linkbase.
+    
+    Used by parse_reference_linkbase(); register it directly to share a
+    pass over the file with other handlers.
+    
+    Args:
+        role: Optional role URI to filter by. If None, keeps all references.
+        pool: ReferencePool to draw the references from. Defaults to a new
+              pool per handler; pass one to share references across files.
+    """
+    
+    TAG_REFERENCE = qname('link', 'reference')
+    TAG_ARC = qname('link', 'referenceArc')
+    ATTR_FROM = qname('xlink', 'from')
+    ATTR_TO = qname('xlink', 'to')
+    
+    def __init__(self, role: str | None = None, pool: ReferencePool | None = None):
+        super().__init__()
+        self.role = role
+        self.pool = pool if pool is not None else ReferencePool()
+        self.references: Dict[str, List[Reference]] = {}  # concept_name -> references
+        self.ref_map: Dict[str, Reference] = {}      # label_id -> Reference
+        self.arc_links: List[tuple[str, str]] = []   # (from_id, to_id)
+        # A link:reference is handed over as an Element, with its part
+        # children (Publisher, Topic, ...) still attached
+        self.fields[self.TAG_REFERENCE] = None
+        self.fields[self.TAG_ARC] = (self.ATTR_FROM, self.ATTR_TO)
+    
+    def handle(self, tag: str, values: Any) -> None:
+        if tag == self.TAG_REFERENCE:
+            elem = values
+            ref_label = elem.get(self.ATTR_LABEL)
+            ref_role = elem.get(self.ATTR_ROLE)
+            # Filter by role if specified
+            if ref_label and (self.role is None or ref_role == self.role):
+                parts: Dict[str, str] = {}
+                for part in elem:
+                    part_tag = part.tag
+                    local_name = part_tag.split('}')[-1] if '}' in part_tag else part_tag
+                    if part.text:
+                        parts[local_name] = part.text.strip()
+                self.ref_map[ref_label] = self.pool.reference(ref_role or '', parts)
+        
+        elif tag == self.TAG_ARC:
+            from_id, to_id = values
+            if from_id and to_id:
+                self.arc_links.append((from_id, to_id))
+        
+        else:
+            super().handle(tag, values)
+    
+    def end_link(self) -> None:
+        # Resolution Phase: join locators with references via arcs
+        result = self.references
+        for loc_id, ref_id in self.arc_links:
+            if loc_id in self.loc_map and ref_id in self.ref_map:
+                concept = self.loc_map[loc_id]
+                ref = self.ref_map[ref_id]
+                
+                if concept not in result:
+                    result[concept] = []
+                result[concept].append(ref)
+        
+        self.ref_map.clear()
+        self.arc_links.clear()
+        super().end_link()
+    
+    def result(self) -> Dict[str, List[Reference]]:
+        self.end_link()
+        return self.references
+
+
 def parse_reference_linkbase(
-    xml_file: str,
+    xml_file: Source,
     role: str | None = None,
+    pool: ReferencePool | None = None,
     ) -> Dict[str, List[Reference]]:
     """
     Extract references from a reference linkbase file.
@@ -100,13 +250,17 @@ def parse_reference_linkbase(
     child elements like Publisher, Name, Topic, Section, Paragraph.
     
     Args:
-        xml_file: Path to the reference linkbase XML file
+        xml_file: Path to the reference linkbase XML file, a binary file
+                  object or a ZipPath
         role: Optional role URI to filter by (e.g., Roles.REFERENCE).
               If None, returns all references.
+        pool: Optional ReferencePool; pass the same pool when parsing
+              several files so that shared references are stored once.
     
     Returns:
         Dict mapping concept names to lists of Reference objects.
-        A concept can have multiple references.
+        A concept can have multiple references. Equal references are
+        the same (immutable) object.
         Example: {
             'us-gaap_Assets': [Reference(...), Reference(...)],
             'us-gaap_Cash': [Reference(...)]
@@ -125,100 +279,112 @@ def parse_reference_linkbase(
         ...     role=Roles.DISCLOSURE_REF
         ... )
     """
-    import xml.etree.ElementTree as ET
+    parser = StreamingParser(xml_file)
+    parser.register(ReferenceHandler(role=role, pool=pool))
+    refs, = parser.parse()
+    return refs
+
+
+class CitationIndex:
+    """
+    Reverse index from cited literature to the citing concepts.
     
-    # Pre-compute qualified names
-    TAG_LOC = qname('link', 'loc')
-    TAG_REFERENCE = qname('link', 'reference')
-    TAG_ARC = qname('link', 'referenceArc')
+    Concepts are indexed by Topic, by (Topic, SubTopic) and by
+    (Topic, SubTopic, Section), so "every concept citing ASC 730" is a
+    dict lookup. Concepts are listed once each, in first-citation order.
     
-    ATTR_LABEL = qname('xlink', 'label')
-    ATTR_HREF = qname('xlink', 'href')
-    ATTR_ROLE = qname('xlink', 'role')
-    ATTR_FROM = qname('xlink', 'from')
-    ATTR_TO = qname('xlink', 'to')
+    Examples:
+        >>> index = build_citation_index(parse_reference_linkbase('us-gaap-ref-2023.xml'))
+        >>> index.concepts('730')
+        ['us-gaap_ResearchAndDevelopmentExpense', ...]
+        >>> index.concepts('730', '10', '50')
+        [...]
+    """
+    
+    def __init__(self):
+        self._by_key: Dict[Tuple[str, ...], Dict[str, None]] = {}
+        self._by_reference: Dict[Reference, Dict[str, None]] = {}
     
-    # Storage
-    loc_map: Dict[str, str] = {}           # label_id -> concept_name
-    ref_map: Dict[str, Reference] = {}      # label_id -> Reference
-    arc_links: List[tuple[str, str]] = []   # (from_id, to_id)
+    def __len__(self) -> int:
+        """Return the number of distinct references indexed."""
+        return len(self._by_reference)
     
-    # For reference linkbases, we need to capture child elements.
-    # Use iterparse with start/end to track when we're inside a reference element
-    current_ref_label: str | None = None
-    current_ref_role: str | None = None
-    current_ref_parts: Dict[str, str] = {}
+    def add(self, concept: str, ref: Reference) -> None:
+        """Index one citation of ref by concept."""
+        self._by_reference.setdefault(ref, {})[concept] = None
+        topic = ref.parts.get('Topic')
+        if topic is None:
+            return
+        subtopic = ref.parts.get('SubTopic')
+        section = ref.parts.get('Section')
+        by_key = self._by_key
+        by_key.setdefault((topic,), {})[concept] = None
+        by_key.setdefault((topic, subtopic), {})[concept] = None
+        by_key.setdefault((topic, subtopic, section), {})[concept] = None
     
-    context = ET.iterparse(xml_file, events=('start', 'end'))
+    def update(self, refs: Mapping[str, Iterable[Reference]]) -> None:
+        """Index every citation of a parse_reference_linkbase() result."""
+        for concept, ref_list in refs.items():
+            for ref in ref_list:
+                self.add(concept, ref)
     
-    for event, elem in context:
-        tag = elem.tag
+    def concepts(
+        self,
+        topic: str,
+        subtopic: str | None = None,
+        section: str | None = None,
+    ) -> List[str]:
+        """
+        Concepts citing a Topic, optionally narrowed to a SubTopic and Section.
         
-        if event == 'start':
-            if tag == TAG_REFERENCE:
-                # Starting a reference element - capture its attributes
-                current_ref_label = elem.get(ATTR_LABEL)
-                current_ref_role = elem.get(ATTR_ROLE)
-                current_ref_parts = {}
+        Args:
+            topic: Topic part, e.g. '730'
+            subtopic: Optional SubTopic part, e.g. '10'
+            section: Optional Section part (requires subtopic), e.g. '50'
         
-        elif event == 'end':
-            if tag == TAG_LOC:
-                label_id = elem.get(ATTR_LABEL)
-                href = elem.get(ATTR_HREF)
-                if label_id and href:
-                    loc_map[label_id] = extract_concept_from_href(href)
-                elem.clear()
-            
-            elif tag == TAG_REFERENCE:
-                # Ending a reference element - store it if it passes filters
-                if current_ref_label:
-                    # Filter by role if specified
-                    if role is None or current_ref_role == role:
-                        ref_map[current_ref_label] = Reference(
-                            role=current_ref_role or '',
-                            parts=current_ref_parts.copy()
-                        )
-                
-                current_ref_label = None
-                current_ref_role = None
-                current_ref_parts = {}
-                elem.clear()
-            
-            elif tag == TAG_ARC:
-                from_id = elem.get(ATTR_FROM)
-                to_id = elem.get(ATTR_TO)
-                if from_id and to_id:
-                    arc_links.append((from_id, to_id))
-                elem.clear()
-            
-            elif current_ref_label is not None:
-                # We're inside a reference element - this is a child part
-                local_name = tag.split('}')[-1] if '}' in tag else tag
-                if elem.text:
-                    current_ref_parts[local_name] = elem.text.strip()
-                elem.clear()
-            
-            else:
-                # Some other element - just clear it
-                elem.clear()
-    
-    # Resolution Phase: join locators with references via arcs
-    result: Dict[str, List[Reference]] = {}
-    
-    for loc_id, ref_id in arc_links:
-        if loc_id in loc_map and ref_id in ref_map:
-            concept = loc_map[loc_id]
-            ref = ref_map[ref_id]
-            
-            if concept not in result:
-                result[concept] = []
-            result[concept].append(ref)
-    
-    return result
+        Returns:
+            List of concept names (empty if nothing cites it)
+        """
+        if section is not None:
+            key: Tuple[str, ...] = (topic, subtopic, section)
+        elif subtopic is not None:
+            key = (topic, subtopic)
+        else:
+            key = (topic,)
+        return list(self._by_key.get(key, ()))
+    
+    def citing(self, ref: Reference) -> List[str]:
+        """Concepts citing exactly this reference."""
+        return list(self._by_reference.get(ref, ()))
+    
+    def topics(self) -> List[str]:
+        """Every cited Topic."""
+        return [key[0] for key in self._by_key if len(key) == 1]
+
+
+def build_citation_index(refs: Mapping[str, Iterable[Reference]]) -> CitationIndex:
+    """
+    Build a CitationIndex from the result of parse_reference_linkbase().
+    
+    Args:
+        refs: Dict mapping concept names to lists of Reference objects
+    
+    Returns:
+        CitationIndex
+    
+    Examples:
+        >>> refs = parse_reference_linkbase('us-gaap-ref-2023.xml')
+        >>> index = build_citation_index(refs)
+        >>> 'us-gaap_ResearchAndDevelopmentExpense' in index.concepts('730')
+        True
+    """
+    index = CitationIndex()
+    index.update(refs)
+    return index
 
 
 def parse_reference_linkbase_flat(
-    xml_file: str,
+    xml_file: Source,
     role: str | None = None,
     ) -> Dict[str, List[Dict[str, str]]]:
     """
@@ -228,7 +394,8 @@ def parse_reference_linkbase_flat(
     Reference objects.
     
     Args:
-        xml_file: Path to the reference linkbase XML file
+        xml_file: Path to the reference linkbase XML file, a binary file
+                  object or a ZipPath
         role: Optional role URI to filter by
     
     Returns:
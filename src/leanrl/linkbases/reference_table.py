@@ -0,0 +1,509 @@
+"""
+Columnar Reference Table
+
+The references of one or more reference linkbases in flat columns, filled
+in a single pass per file, without a Reference object or dict per
+citation. Distinct references are stored once, their parts as rows:
+
+    reference_roles    array('H')  -> roles  (SymbolTable), per reference
+    reference_offsets  array('i')  first part row of each reference
+    name_codes         array('H')  -> names  (SymbolTable), per part
+    value_codes        array('i')  -> values (SymbolTable), per part
+
+and every citation (concept -> reference arc) is two integers:
+
+    citation_concepts    array('i')  -> concepts (SymbolTable)
+    citation_references  array('i')  reference id
+
+to_dataframe() expands this into the long (concept, citation, role,
+part, value) format, or pivots it to one row per citation, with numpy
+indexing only; to_arrow() builds a dictionary-encoded Arrow table
+(pyarrow required).
+"""
+
+from typing import Callable, Dict, Iterable, List, Mapping, Tuple
+from array import array
+
+import numpy as np
+
+from ..core.namespaces import qname
+from ..core.scanner import RoleFilter, role_matcher
+from ..core.streaming import stream_xml
+from ..core.zipfs import Source, as_sources
+from ..utils import extract_concept_from_href
+from .compact import SymbolTable
+from .reference import Reference
+
+
+# Columns of ReferenceTable.to_dataframe()
+REFERENCE_COLUMNS = ['concept', 'citation', 'role', 'part', 'value']
+
+
+def _names(table: SymbolTable) -> List[str]:
+    return [table.name(i) for i in range(len(table))]
+
+
+class ReferenceTable:
+    """
+    Columnar store of references: distinct references and their parts,
+    plus one (concept, reference) row per citation.
+    
+    Fill it with read() (or parse_reference_table()). As with
+    parse_reference_linkbase(), a concept citing the same reference twice
+    has two citations.
+    
+    Attributes:
+        concepts: SymbolTable of concept names
+        roles: SymbolTable of reference role URIs
+        names: SymbolTable of part names (Publisher, Topic, ...)
+        values: SymbolTable of part values
+        reference_roles: Role id of each distinct reference
+        reference_offsets: Part rows of reference i are
+                           reference_offsets[i]:reference_offsets[i + 1]
+        name_codes: Part name id of each part row
+        value_codes: Part value id of each part row
+        citation_concepts: Concept id of each citation
+        citation_references: Reference id of each citation
+    
+    Examples:
+        >>> table = parse_reference_table('us-gaap-ref-2023.xml')
+        >>> len(table), table.n_references
+        (41235, 6120)
+        >>> table.to_dataframe().head()
+        >>> table.to_dataframe(wide=True)[['concept', 'Topic', 'SubTopic', 'Section']]
+    """
+    
+    __slots__ = (
+        'concepts',
+        'roles',
+        'names',
+        'values',
+        'reference_roles',
+        'reference_offsets',
+        'name_codes',
+        'value_codes',
+        'citation_concepts',
+        'citation_references',
+        '_references',
+    )
+    
+    def __init__(self):
+        self.concepts = SymbolTable()
+        self.roles = SymbolTable()
+        self.names = SymbolTable()
+        self.values = SymbolTable()
+        self.reference_roles = array('H')
+        self.reference_offsets = array('i', [0])
+        self.name_codes = array('H')
+        self.value_codes = array('i')
+        self.citation_concepts = array('i')
+        self.citation_references = array('i')
+        # (role id, ((name id, value id), ...)) -> reference id, for
+        # deduplication; only kept while adding (see _reference_index())
+        self._references: Dict[Tuple, int] | None = None
+    
+    def __len__(self) -> int:
+        """Return the number of citations."""
+        return len(self.citation_concepts)
+    
+    def __contains__(self, concept: str) -> bool:
+        return concept in self.concepts
+    
+    @property
+    def n_references(self) -> int:
+        """Number of distinct references."""
+        return len(self.reference_roles)
+    
+    def __getstate__(self) -> tuple:
+        # The deduplication index is rebuilt when needed
+        return (
+            _names(self.concepts),
+            _names(self.roles),
+            _names(self.names),
+            _names(self.values),
+            self.reference_roles,
+            self.reference_offsets,
+            self.name_codes,
+            self.value_codes,
+            self.citation_concepts,
+            self.citation_references,
+        )
+    
+    def __setstate__(self, state: tuple) -> None:
+        (
+            concepts, roles, names, values,
+            self.reference_roles, self.reference_offsets, self.name_codes, self.value_codes,
+            self.citation_concepts, self.citation_references,
+        ) = state
+        self.concepts = SymbolTable()
+        self.roles = SymbolTable()
+        self.names = SymbolTable()
+        self.values = SymbolTable()
+        for table, symbols in (
+            (self.concepts, concepts), (self.roles, roles), (self.names, names), (self.values, values),
+        ):
+            for symbol in symbols:
+                table.intern(symbol)
+        self._references = None
+    
+    def _reference_index(self) -> Dict[Tuple, int]:
+        if self._references is None:
+            offsets = self.reference_offsets
+            self._references = {
+                (role_id, tuple(zip(self.name_codes[offsets[i]:offsets[i + 1]],
+                                    self.value_codes[offsets[i]:offsets[i + 1]]))): i
+                for i, role_id in enumerate(self.reference_roles)
+            }
+        return self._references
+    
+    def compact(self) -> None:
+        """Drop the deduplication index; adding references rebuilds it."""
+        self._references = None
+    
+    def _reference_id(self, role_id: int, parts: Tuple[Tuple[int, int], ...]) -> int:
+        """Id of the reference with these role and (name id, value id) parts, added if new."""
+        index = self._reference_index()
+        key = (role_id, parts)
+        ref_id = index.get(key)
+        if ref_id is None:
+            ref_id = index[key] = len(self.reference_roles)
+            self.reference_roles.append(role_id)
+            for name_id, value_id in parts:
+                self.name_codes.append(name_id)
+                self.value_codes.append(value_id)
+            self.reference_offsets.append(len(self.name_codes))
+        return ref_id
+    
+    def add(self, concept: str, role: str, parts: Mapping[str, str] | Iterable[Tuple[str, str]]) -> int:
+        """
+        Add one citation of a reference by concept.
+        
+        Args:
+            concept: Concept name
+            role: Reference role URI
+            parts: Reference parts, as a mapping or (name, value) pairs
+        
+        Returns:
+            Id of the (possibly shared) reference
+        """
+        items = parts.items() if isinstance(parts, Mapping) else parts
+        part_ids = {self.names.intern(name): self.values.intern(value) for name, value in items}
+        ref_id = self._reference_id(self.roles.intern(role), tuple(part_ids.items()))
+        self.citation_concepts.append(self.concepts.intern(concept))
+        self.citation_references.append(ref_id)
+        return ref_id
+    
+    def read(self, xml_file: Source, roles: RoleFilter | None = None) -> 'ReferenceTable':
+        """
+        Add the references of one reference linkbase, in a single streaming pass.
+        
+        Reference parts are child elements of arbitrary namespaces, so the
+        file is streamed with ElementTree (there is no 'expat' engine).
+        
+        Args:
+            xml_file: Path to the reference linkbase, a binary file object or a ZipPath
+            roles: Optional reference role filter: a role URI, an iterable
+                   of role URIs, or a predicate on the role URI
+        
+        Returns:
+            self, for chaining
+        """
+        TAG_LINK = qname('link', 'referenceLink')
+        TAG_LOC = qname('link', 'loc')
+        TAG_REFERENCE = qname('link', 'reference')
+        TAG_ARC = qname('link', 'referenceArc')
+        
+        ATTR_LABEL = qname('xlink', 'label')
+        ATTR_HREF = qname('xlink', 'href')
+        ATTR_ROLE = qname('xlink', 'role')
+        ATTR_FROM = qname('xlink', 'from')
+        ATTR_TO = qname('xlink', 'to')
+        
+        match_role = role_matcher(roles)
+        
+        # Role as found in the file -> role id, or None when filtered out
+        accepted: Dict[str | None, int | None] = {}
+        # Qualified part tag -> part name id
+        part_names: Dict[str, int] = {}
+        # Raw content of the reference resources read -> reference id
+        seen: Dict[tuple, int] = {}
+        
+        # Locators, reference resources and arcs of the current extended
+        # link. One xlink:label can name several resources.
+        loc_map: Dict[str, str] = {}
+        ref_map: Dict[str, List[int]] = {}  # label_id -> [reference id]
+        arcs: List[tuple[str, str]] = []
+        
+        intern_concept = self.concepts.intern
+        intern_name = self.names.intern
+        intern_value = self.values.intern
+        reference_id = self._reference_id
+        citation_concepts = self.citation_concepts
+        citation_references = self.citation_references
+        
+        def _flush() -> None:
+            for from_id, to_id in arcs:
+                concept = loc_map.get(from_id)
+                ref_ids = ref_map.get(to_id)
+                if concept is None or ref_ids is None:
+                    continue
+                concept_id = intern_concept(concept)
+                for ref_id in ref_ids:
+                    citation_concepts.append(concept_id)
+                    citation_references.append(ref_id)
+            loc_map.clear()
+            ref_map.clear()
+            arcs.clear()
+        
+        # Links only matter where they start: the content read so far
+        # belongs to the previous link and is flushed
+        link_started = []
+        
+        def _on_start(elem) -> None:
+            if elem.tag == TAG_LINK:
+                link_started.append(True)
+        
+        tags = {TAG_LOC, TAG_REFERENCE, TAG_ARC}
+        for tag, elem in stream_xml(xml_file, tags_of_interest=tags, on_start=_on_start):
+            if link_started:
+                _flush()
+                link_started.clear()
+            
+            if tag == TAG_REFERENCE:
+                label_id = elem.get(ATTR_LABEL)
+                if not label_id:
+                    continue
+                role = elem.get(ATTR_ROLE)
+                role_id = accepted.get(role, False)
+                if role_id is False:
+                    role_id = accepted[role] = (
+                        self.roles.intern(role or '')
+                        if match_role is None or match_role(role or '') else None
+                    )
+                if role_id is None:
+                    continue
+                # Most resources repeat a reference seen before: look up the
+                # raw (role, (tag, text), ...) first, intern only new ones
+                raw = (role_id, tuple((part.tag, part.text) for part in elem))
+                ref_id = seen.get(raw)
+                if ref_id is None:
+                    # Later parts of the same name replace earlier ones, as
+                    # in ReferenceHandler
+                    parts: Dict[int, int] = {}
+                    for part_tag, text in raw[1]:
+                        if not text:
+                            continue
+                        name_id = part_names.get(part_tag)
+                        if name_id is None:
+                            name_id = part_names[part_tag] = intern_name(part_tag.rpartition('}')[2])
+                        parts[name_id] = intern_value(text.strip())
+                    ref_id = seen[raw] = reference_id(role_id, tuple(parts.items()))
+                ref_map.setdefault(label_id, []).append(ref_id)
+            
+            elif tag == TAG_LOC:
+                label_id = elem.get(ATTR_LABEL)
+                href = elem.get(ATTR_HREF)
+                if label_id and href:
+                    loc_map[label_id] = extract_concept_from_href(href)
+            
+            elif tag == TAG_ARC:
+                from_id = elem.get(ATTR_FROM)
+                to_id = elem.get(ATTR_TO)
+                if from_id and to_id:
+                    arcs.append((from_id, to_id))
+        
+        _flush()
+        return self
+    
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+    
+    def reference(self, ref_id: int) -> Reference:
+        """Reference object of one distinct reference."""
+        start, end = self.reference_offsets[ref_id], self.reference_offsets[ref_id + 1]
+        name, value = self.names.name, self.values.name
+        return Reference(
+            self.roles.name(self.reference_roles[ref_id]),
+            {name(n): value(v) for n, v in zip(self.name_codes[start:end], self.value_codes[start:end])},
+        )
+    
+    def references(self) -> List[Reference]:
+        """Reference object of every distinct reference, by reference id."""
+        return [self.reference(i) for i in range(self.n_references)]
+    
+    def to_dict(self) -> Dict[str, List[Dict[str, str]]]:
+        """{concept: [{'role': ..., part: value, ...}]}, like parse_reference_linkbase_flat()."""
+        flat = [ref.to_dict() for ref in self.references()]
+        name = self.concepts.name
+        result: Dict[str, List[Dict[str, str]]] = {}
+        for concept_id, ref_id in zip(self.citation_concepts, self.citation_references):
+            result.setdefault(name(concept_id), []).append(dict(flat[ref_id]))
+        return result
+    
+    def joined(self, sep: str = ', ', fmt: Callable[[Reference], str] = str) -> Dict[str, str]:
+        """
+        One string per concept with all its references, each distinct
+        reference formatted once.
+        
+        Args:
+            sep: Separator between the references of a concept
+            fmt: Formatter of one Reference (default str(), as in
+                 build_taxonomy_dataframe(); e.g. Reference.format_citation)
+        
+        Returns:
+            Dict of concept -> joined references
+        """
+        texts = [fmt(ref) for ref in self.references()]
+        by_concept: Dict[int, List[str]] = {}
+        for concept_id, ref_id in zip(self.citation_concepts, self.citation_references):
+            by_concept.setdefault(concept_id, []).append(texts[ref_id])
+        name = self.concepts.name
+        return {name(concept_id): sep.join(refs) for concept_id, refs in by_concept.items()}
+    
+    # ------------------------------------------------------------------
+    # Columnar output
+    # ------------------------------------------------------------------
+    
+    def _long_codes(self) -> Dict[str, 'np.ndarray']:
+        """Code columns of the long format: one row per (citation, part)."""
+        offsets = np.frombuffer(self.reference_offsets, dtype=np.int32).astype(np.int64)
+        counts = np.diff(offsets)
+        refs = np.frombuffer(self.citation_references, dtype=np.int32)
+        row_counts = counts[refs]
+        citation = np.repeat(np.arange(len(refs), dtype=np.int32), row_counts)
+        # Part row of each output row: start of its reference + rank within it
+        starts = np.repeat(offsets[refs], row_counts)
+        rank = np.arange(len(citation), dtype=np.int64) - np.repeat(np.cumsum(row_counts) - row_counts, row_counts)
+        part_rows = starts + rank
+        return {
+            'concept': np.frombuffer(self.citation_concepts, dtype=np.int32)[citation],
+            'citation': citation,
+            'role': np.frombuffer(self.reference_roles, dtype=np.uint16)[refs][citation].astype(np.int32),
+            'part': np.frombuffer(self.name_codes, dtype=np.uint16)[part_rows].astype(np.int32),
+            'value': np.frombuffer(self.value_codes, dtype=np.int32)[part_rows],
+        }
+    
+    def _wide_values(self) -> 'np.ndarray':
+        """(references x part names) object matrix of part values, None where absent."""
+        matrix = np.full((self.n_references, len(self.names)), None, dtype=object)
+        offsets = np.frombuffer(self.reference_offsets, dtype=np.int32)
+        ref_of_part = np.repeat(np.arange(self.n_references), np.diff(offsets))
+        values = np.array(_names(self.values), dtype=object)
+        matrix[ref_of_part, np.frombuffer(self.name_codes, dtype=np.uint16)] = \
+            values[np.frombuffer(self.value_codes, dtype=np.int32)]
+        return matrix
+    
+    def to_dataframe(self, wide: bool = False):
+        """
+        Convert the table to a pandas DataFrame.
+        
+        Args:
+            wide: False (default): long format, one row per part of each
+                  citation (REFERENCE_COLUMNS; 'citation' numbers the
+                  citations, role and part are categoricals).
+                  True: one row per citation - concept, role, then one
+                  column per part name, in order of first appearance.
+        
+        Returns:
+            pandas DataFrame
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas is required for ReferenceTable.to_dataframe()")
+        
+        concept_names = np.array(_names(self.concepts), dtype=object)
+        role_names = _names(self.roles)
+        
+        if not wide:
+            codes = self._long_codes()
+            value_names = np.array(_names(self.values), dtype=object)
+            return pd.DataFrame({
+                'concept': concept_names[codes['concept']],
+                'citation': codes['citation'],
+                'role': pd.Categorical.from_codes(codes['role'], role_names),
+                'part': pd.Categorical.from_codes(codes['part'], _names(self.names)),
+                'value': value_names[codes['value']],
+            }, columns=REFERENCE_COLUMNS)
+        
+        refs = np.frombuffer(self.citation_references, dtype=np.int32)
+        role_codes = np.frombuffer(self.reference_roles, dtype=np.uint16)[refs].astype(np.int32)
+        columns = {
+            'concept': concept_names[np.frombuffer(self.citation_concepts, dtype=np.int32)],
+            'role': pd.Categorical.from_codes(role_codes, role_names),
+        }
+        matrix = self._wide_values()[refs]
+        for i, part in enumerate(_names(self.names)):
+            columns[part] = matrix[:, i]
+        return pd.DataFrame(columns)
+    
+    def to_arrow(self, wide: bool = False):
+        """
+        Convert the table to a pyarrow Table.
+        
+        The long format is built from the code columns directly:
+        concept, role, part and value are dictionary-encoded.
+        
+        Args:
+            wide: As for to_dataframe()
+        
+        Returns:
+            pyarrow.Table
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("pyarrow is required for ReferenceTable.to_arrow()")
+        
+        if wide:
+            return pa.Table.from_pandas(self.to_dataframe(wide=True), preserve_index=False)
+        
+        codes = self._long_codes()
+        dictionaries = {
+            'concept': self.concepts,
+            'role': self.roles,
+            'part': self.names,
+            'value': self.values,
+        }
+        arrays = []
+        for column in REFERENCE_COLUMNS:
+            if column == 'citation':
+                arrays.append(pa.array(codes[column]))
+            else:
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(codes[column], type=pa.int32()),
+                    pa.array(_names(dictionaries[column]), type=pa.string()),
+                ))
+        return pa.Table.from_arrays(arrays, names=REFERENCE_COLUMNS)
+
+
+def parse_reference_table(
+    xml_files: Source | Iterable[Source],
+    roles: RoleFilter | None = None,
+) -> ReferenceTable:
+    """
+    Read one or more reference linkbases into a ReferenceTable.
+    
+    Unlike parse_reference_linkbase_flat(), no Reference object or dict is
+    created per citation: rows go straight into typed columns.
+    
+    Args:
+        xml_files: A reference linkbase (path, file object or ZipPath), or
+                   an iterable of them
+        roles: Optional reference role filter (see ReferenceTable.read())
+    
+    Returns:
+        ReferenceTable with the references of all files
+    
+    Examples:
+        >>> table = parse_reference_table('us-gaap-ref-2023.xml', roles=Roles.DISCLOSURE_REF)
+        >>> df = table.to_dataframe()
+        >>> df[(df.part == 'Topic') & (df.value == '730')].concept.unique()
+        >>> table.to_arrow()  # needs pyarrow
+    """
+    table = ReferenceTable()
+    for xml_file in as_sources(xml_files):
+        table.read(xml_file, roles=roles)
+    table.compact()
+    return table
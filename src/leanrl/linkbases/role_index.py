@@ -0,0 +1,310 @@
+"""
+Extended Link Role Index
+
+Byte-offset index of the extended links (presentationLink, definitionLink,
+calculationLink, ...) in a linkbase file, keyed by role URI.
+
+With the index, role-specific extraction seeks straight to the matching
+<link:presentationLink> block and parses only that fragment instead of the
+whole file. The index is persisted in a sidecar JSON file next to the
+linkbase ("<file>.roles.json") and is rebuilt automatically when the
+linkbase's size or mtime changes.
+"""
+
+from typing import Any, Dict, IO, List, Optional
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+import json
+import os
+import pyexpat
+import weakref
+import xml.etree.ElementTree as ET
+
+from ..core.namespaces import Namespaces
+
+
+# Bumped whenever the sidecar layout changes
+INDEX_VERSION = 1
+
+# Suffix of the sidecar index file
+INDEX_SUFFIX = '.roles.json'
+
+# Separator used by expat for namespace-qualified names ("uri local")
+_NS_SEP = ' '
+
+_LINK_URI = Namespaces.LINK.uri
+_XLINK_ROLE = f'{Namespaces.XLINK.uri}{_NS_SEP}role'
+_XLINK_TYPE = f'{Namespaces.XLINK.uri}{_NS_SEP}type'
+
+# In-process LRU cache: (weak reference to fs or None, path) -> RoleIndex.
+# A reference to a dead fs never equals one to a live fs, so an entry
+# cannot be picked up by a new filesystem object; it just ages out.
+_INDEX_CACHE: 'OrderedDict[tuple[weakref.ref | None, str], RoleIndex]' = OrderedDict()
+INDEX_CACHE_SIZE = 64
+
+
+@dataclass
+class LinkRange:
+    """
+    Byte range of one extended link in a linkbase file.
+
+    Attributes:
+        tag: Local name of the link element (e.g., 'presentationLink')
+        role: The xlink:role URI of the link
+        start: Offset of the '<' of the start tag
+        end: Offset just past the '>' of the end tag
+    """
+    tag: str
+    role: str
+    start: int
+    end: int
+
+
+@dataclass
+class RoleIndex:
+    """
+    Index of the extended links in one linkbase file.
+
+    Attributes:
+        size: File size the index was built for
+        mtime: File modification time the index was built for
+        encoding: Declared XML encoding of the file
+        namespaces: Namespace declarations (prefix -> URI) of the document
+        links: Extended links in document order
+    """
+    size: int
+    mtime: float
+    encoding: str = 'UTF-8'
+    namespaces: Dict[str, str] = field(default_factory=dict)
+    links: List[LinkRange] = field(default_factory=list)
+
+    def roles(self, tag: str | None = None) -> List[str]:
+        """List role URIs in document order, optionally for one link type."""
+        return [link.role for link in self.links if tag is None or link.tag == tag]
+
+    def find(self, role: str, tag: str | None = None) -> List[LinkRange]:
+        """Get all links with the given role (and link type, if given)."""
+        return [
+            link for link in self.links
+            if link.role == role and (tag is None or link.tag == tag)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {'version': INDEX_VERSION, **asdict(self)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RoleIndex':
+        """Rebuild an index from to_dict() output."""
+        return cls(
+            size=data['size'],
+            mtime=data['mtime'],
+            encoding=data.get('encoding', 'UTF-8'),
+            namespaces=data.get('namespaces', {}),
+            links=[LinkRange(**link) for link in data.get('links', [])],
+        )
+
+
+def _open(fs, path: str, mode: str = 'rb') -> IO:
+    """Open a file on the local disk (fs=None) or on an fsspec-like filesystem."""
+    if fs is None:
+        return open(path, mode)
+    return fs.open(path, mode)
+
+
+def _file_stat(fs, path: str) -> tuple[int, float]:
+    """Return (size, mtime) of a file, locally or via fs.info()."""
+    if fs is None:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime
+    info = fs.info(path)
+    mtime = info.get('mtime', info.get('created', 0.0))
+    if hasattr(mtime, 'timestamp'):
+        mtime = mtime.timestamp()
+    return int(info['size']), float(mtime or 0.0)
+
+
+def build_role_index(xml_file: str, fs=None) -> RoleIndex:
+    """
+    Scan a linkbase once and record the byte range of every extended link.
+
+    Args:
+        xml_file: Path to the linkbase file
+        fs: Optional filesystem object with open()/info() (e.g. an fsspec
+            MemoryFileSystem or a ZipFS). None = local disk.
+
+    Returns:
+        RoleIndex for the file
+    """
+    size, mtime = _file_stat(fs, xml_file)
+    index = RoleIndex(size=size, mtime=mtime)
+
+    parser = pyexpat.ParserCreate(namespace_separator=_NS_SEP)
+    depth = 0
+    # (local name, role, start offset) of the link being scanned
+    open_link: list[tuple[str, str, int]] = []
+    # (local name, role, start, end-tag offset)
+    spans: list[tuple[str, str, int, int]] = []
+
+    def _xml_decl(version, encoding, standalone):
+        if encoding:
+            index.encoding = encoding
+
+    def _ns_decl(prefix, uri):
+        # Only the document element's declarations are needed to re-parse
+        # a fragment; nested ones are carried inside the fragment itself
+        if depth == 0:
+            index.namespaces[prefix or ''] = uri
+
+    def _start(name, attrs):
+        nonlocal depth
+        depth += 1
+        if depth == 2 and attrs.get(_XLINK_TYPE) == 'extended':
+            uri, _, local = name.rpartition(_NS_SEP)
+            if uri == _LINK_URI:
+                open_link.append((local, attrs.get(_XLINK_ROLE, ''), parser.CurrentByteIndex))
+
+    def _end(name):
+        nonlocal depth
+        if depth == 2 and open_link:
+            local, role, start = open_link.pop()
+            spans.append((local, role, start, parser.CurrentByteIndex))
+        depth -= 1
+
+    parser.XmlDeclHandler = _xml_decl
+    parser.StartNamespaceDeclHandler = _ns_decl
+    parser.StartElementHandler = _start
+    parser.EndElementHandler = _end
+
+    with _open(fs, xml_file) as f:
+        parser.ParseFile(f)
+
+        # expat reports the offset where the end tag starts; find its '>'
+        for local, role, start, end_tag in spans:
+            f.seek(end_tag)
+            tail = f.read(256)
+            end = end_tag + tail.index(b'>') + 1
+            index.links.append(LinkRange(tag=local, role=role, start=start, end=end))
+
+    return index
+
+
+def _cache_key(fs, path: str) -> Optional[tuple[weakref.ref | None, str]]:
+    """In-process cache key of a file, None if fs cannot be a cache key."""
+    if fs is None:
+        return None, str(path)
+    try:
+        key = weakref.ref(fs), str(path)
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def load_role_index(xml_file: str, fs=None, persist: bool = True) -> RoleIndex:
+    """
+    Get the role index for a linkbase, building it only when needed.
+
+    Looks in the in-process cache, then in the sidecar file
+    "<xml_file>.roles.json". An index is reused only if the linkbase's
+    current size and mtime match the ones it was built for; otherwise it
+    is rebuilt (and the sidecar rewritten when persist=True).
+
+    Args:
+        xml_file: Path to the linkbase file
+        fs: Optional filesystem object with open()/info(). None = local disk.
+        persist: Write the sidecar index file after (re)building
+
+    Returns:
+        Up-to-date RoleIndex for the file
+    """
+    size, mtime = _file_stat(fs, xml_file)
+    key = _cache_key(fs, xml_file)
+
+    index = _INDEX_CACHE.get(key) if key is not None else None
+    if index is not None and index.size == size and index.mtime == mtime:
+        _INDEX_CACHE.move_to_end(key)
+        return index
+
+    sidecar = f'{xml_file}{INDEX_SUFFIX}'
+    index = None
+    try:
+        with _open(fs, sidecar, 'rb') as f:
+            data = json.loads(f.read())
+        if (
+            data.get('version') == INDEX_VERSION
+            and data.get('size') == size
+            and data.get('mtime') == mtime
+        ):
+            index = RoleIndex.from_dict(data)
+    except (OSError, ValueError, KeyError, TypeError):
+        index = None
+
+    if index is None:
+        index = build_role_index(xml_file, fs=fs)
+        if persist:
+            try:
+                with _open(fs, sidecar, 'wb') as f:
+                    f.write(json.dumps(index.to_dict()).encode('utf-8'))
+            except OSError:
+                pass  # Read-only location: keep the in-process copy only
+
+    if key is not None:
+        _INDEX_CACHE[key] = index
+        _INDEX_CACHE.move_to_end(key)
+        if len(_INDEX_CACHE) > INDEX_CACHE_SIZE:
+            _INDEX_CACHE.popitem(last=False)
+    return index
+
+
+def read_link_fragment(
+    xml_file: str,
+    link: LinkRange,
+    index: RoleIndex,
+    fs=None,
+) -> ET.Element:
+    """
+    Parse only one extended link out of a linkbase file.
+
+    The bytes of the link are read with a single seek and wrapped in an
+    element carrying the document's namespace declarations, so prefixes
+    resolve exactly as in the full file.
+
+    Returns:
+        The parsed extended link element (e.g. <link:presentationLink>)
+    """
+    with _open(fs, xml_file) as f:
+        f.seek(link.start)
+        fragment = f.read(link.end - link.start)
+
+    declarations = ' '.join(
+        f'xmlns:{prefix}="{uri}"' if prefix else f'xmlns="{uri}"'
+        for prefix, uri in index.namespaces.items()
+    )
+    head = f'<?xml version="1.0" encoding="{index.encoding}"?><fragment {declarations}>'
+    wrapper = head.encode(index.encoding) + fragment + '</fragment>'.encode(index.encoding)
+    return ET.fromstring(wrapper)[0]
+
+
+def find_role_link(
+    xml_file: str,
+    role: str,
+    tag: str | None = None,
+    fs=None,
+) -> Optional[ET.Element]:
+    """
+    Get the first extended link with the given role, parsing only that fragment.
+
+    Example:
+        >>> link = find_role_link(
+        ...     'us-gaap-stm-soi-pre-2020-01-31.xml',
+        ...     'http://fasb.org/us-gaap/role/statement/StatementOfIncome',
+        ...     tag='presentationLink',
+        ... )
+        >>> len(link.findall('{http://www.xbrl.org/2003/linkbase}presentationArc'))
+    """
+    index = load_role_index(xml_file, fs=fs)
+    links = index.find(role, tag=tag)
+    if not links:
+        return None
+    return read_link_fragment(xml_file, links[0], index, fs=fs)
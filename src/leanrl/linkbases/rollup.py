@@ -0,0 +1,306 @@
+"""
+Calculation Roll-up
+
+Derive every total of a CalculationTree from its leaf values, bottom-up.
+
+The order in which totals can be computed depends only on the tree, so it
+is worked out once (RollupPlan) and cached on the tree; each roll-up over
+the values of one context is then a single pass of additions.
+
+For every total (a concept with children) the roll-up reports one of:
+- computed:   not reported, derived from its children
+- reported:   reported, and consistent with its children (or not checkable)
+- conflict:   reported, but differing from the sum of its children
+- incomplete: not reported, and some children have no value
+- cycle:      part of a circular summation, never computed
+"""
+
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Mapping, Tuple, TypeVar
+from dataclasses import dataclass, field
+
+if TYPE_CHECKING:
+    from .calculation import CalculationTree
+
+
+# Same absolute tolerance as CalculationTree.validate_calculation()
+DEFAULT_TOLERANCE = 0.01
+
+STATUS_COMPUTED = 'computed'
+STATUS_REPORTED = 'reported'
+STATUS_CONFLICT = 'conflict'
+STATUS_INCOMPLETE = 'incomplete'
+STATUS_CYCLE = 'cycle'
+
+K = TypeVar('K')
+
+
+def _strongly_connected(graph: Mapping[str, List[str]]) -> Iterator[List[str]]:
+    """
+    Tarjan's algorithm, iterative. Components come out children first:
+    a component is yielded only after every component it points to.
+    """
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack: set = set()
+    counter = 0
+    
+    for start in graph:
+        if start in index:
+            continue
+        index[start] = low[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+        work = [(start, iter(graph.get(start, ())))]
+        
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = low[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(graph.get(succ, ()))))
+                    break
+                if succ in on_stack:
+                    low[node] = min(low[node], index[succ])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    yield component
+
+
+@dataclass
+class RollupPlan:
+    """
+    Evaluation order of the totals of a CalculationTree.
+    
+    Attributes:
+        steps: (total, ((child, weight), ...)) in bottom-up order: every
+               total comes after all totals among its children
+        cycles: Groups of concepts that sum into each other; the totals
+                in them are not part of steps
+    """
+    steps: List[Tuple[str, Tuple[Tuple[str, float], ...]]] = field(default_factory=list)
+    cycles: List[List[str]] = field(default_factory=list)
+    
+    @classmethod
+    def from_tree(cls, tree: 'CalculationTree') -> 'RollupPlan':
+        """Order the totals of a tree, setting aside circular summations."""
+        children = {
+            concept: tree.get_children(concept)
+            for concept, node in tree.nodes.items() if node.children
+        }
+        graph = {concept: [child for child, _ in kids] for concept, kids in children.items()}
+        
+        plan = cls()
+        components = list(_strongly_connected(graph))
+        in_cycle: set = set()
+        for component in components:
+            if len(component) > 1 or component[0] in graph.get(component[0], ()):
+                plan.cycles.append(component[::-1])
+                in_cycle.update(component)
+        
+        # Components come out children first; totals depending on a cycle
+        # are still evaluated, they just see no value for the cycle members
+        for component in components:
+            for concept in component:
+                if concept in children and concept not in in_cycle:
+                    plan.steps.append((concept, tuple(children[concept])))
+        return plan
+    
+    def __len__(self) -> int:
+        return len(self.steps)
+    
+    @property
+    def order(self) -> List[str]:
+        """Totals in evaluation order."""
+        return [concept for concept, _ in self.steps]
+    
+    def rollup(
+        self,
+        values: Mapping[str, float],
+        tolerance: float = DEFAULT_TOLERANCE,
+        missing: str = 'skip',
+    ) -> 'RollupResult':
+        """
+        Compute every total from the given values.
+        
+        Reported values take precedence: a reported total is passed up as
+        reported even when it conflicts with its children.
+        
+        Args:
+            values: Reported values, concept -> number
+            tolerance: Largest difference accepted between a reported
+                       total and the sum of its children
+            missing: 'skip' (default): a total needs every child to have a
+                     value. 'zero': children without value count as 0,
+                     as long as at least one child has a value.
+        
+        Returns:
+            RollupResult
+        """
+        if missing not in ('skip', 'zero'):
+            raise ValueError(f"missing must be 'skip' or 'zero', not {missing!r}")
+        zero_missing = missing == 'zero'
+        
+        known = dict(values)
+        result = RollupResult(values=known, cycles=self.cycles)
+        status = result.status
+        computed = result.computed
+        conflicts = result.conflicts
+        
+        for concept, kids in self.steps:
+            total = 0.0
+            found = 0
+            for child, weight in kids:
+                value = known.get(child)
+                if value is None:
+                    continue
+                total += value * weight
+                found += 1
+            complete = found == len(kids) or (zero_missing and found > 0)
+            
+            reported = values.get(concept)
+            if reported is None:
+                if complete:
+                    known[concept] = total
+                    computed[concept] = total
+                    status[concept] = STATUS_COMPUTED
+                else:
+                    status[concept] = STATUS_INCOMPLETE
+            elif complete and abs(total - reported) >= tolerance:
+                conflicts[concept] = (reported, total)
+                status[concept] = STATUS_CONFLICT
+            else:
+                status[concept] = STATUS_REPORTED
+        
+        for group in self.cycles:
+            for concept in group:
+                status.setdefault(concept, STATUS_CYCLE)
+        return result
+    
+    def rollup_many(
+        self,
+        values_by_key: Mapping[K, Mapping[str, float]] | Iterable[Tuple[K, Mapping[str, float]]],
+        **kwargs,
+    ) -> Dict[K, 'RollupResult']:
+        """
+        Roll up several sets of values (e.g. one per context) with the same plan.
+        
+        Args:
+            values_by_key: {key: values} or an iterable of (key, values)
+            **kwargs: tolerance / missing, as for rollup()
+        
+        Returns:
+            Dict of key -> RollupResult
+        """
+        items = values_by_key.items() if isinstance(values_by_key, Mapping) else values_by_key
+        return {key: self.rollup(values, **kwargs) for key, values in items}
+
+
+@dataclass
+class RollupResult:
+    """
+    Outcome of one roll-up.
+    
+    Attributes:
+        values: Reported values plus every computed total
+        computed: Totals derived from their children (not reported)
+        conflicts: Reported totals differing from their children,
+                   concept -> (reported, computed)
+        status: Status of every total (STATUS_* constants)
+        cycles: Circular summations of the tree
+    """
+    values: Dict[str, float] = field(default_factory=dict)
+    computed: Dict[str, float] = field(default_factory=dict)
+    conflicts: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    status: Dict[str, str] = field(default_factory=dict)
+    cycles: List[List[str]] = field(default_factory=list)
+    
+    @property
+    def reported(self) -> List[str]:
+        """Reported totals consistent with (or not checkable against) their children."""
+        return [concept for concept, s in self.status.items() if s == STATUS_REPORTED]
+    
+    @property
+    def incomplete(self) -> List[str]:
+        """Totals neither reported nor computable."""
+        return [concept for concept, s in self.status.items() if s == STATUS_INCOMPLETE]
+    
+    @property
+    def is_consistent(self) -> bool:
+        """True if no reported total conflicts with its children."""
+        return not self.conflicts
+    
+    def to_dataframe(self):
+        """
+        One row per total: concept, status, value, computed (NaN when the
+        sum was not checked or not computable).
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas is required for RollupResult.to_dataframe()")
+        
+        rows = []
+        for concept, s in self.status.items():
+            if s == STATUS_CONFLICT:
+                computed = self.conflicts[concept][1]
+            else:
+                computed = self.computed.get(concept)
+            rows.append({
+                'concept': concept,
+                'status': s,
+                'value': self.values.get(concept),
+                'computed': computed,
+            })
+        return pd.DataFrame(rows, columns=['concept', 'status', 'value', 'computed'])
+
+
+def rollup_calculation(
+    tree: 'CalculationTree',
+    values: Mapping[str, float],
+    tolerance: float = DEFAULT_TOLERANCE,
+    missing: str = 'skip',
+) -> RollupResult:
+    """
+    Compute every total of a calculation tree from leaf (and reported) values.
+    
+    The evaluation order is built on first use and cached on the tree
+    (CalculationTree.rollup_plan()), so rolling up many contexts with the
+    same tree costs only the arithmetic.
+    
+    Args:
+        tree: CalculationTree from parse_calculation_linkbase()
+        values: Reported values, concept -> number
+        tolerance: Largest accepted difference for reported totals
+        missing: 'skip' or 'zero' (see RollupPlan.rollup())
+    
+    Returns:
+        RollupResult
+    
+    Examples:
+        >>> tree = parse_calculation_linkbase('us-gaap-stm-soi-cal-2020.xml')
+        >>> result = rollup_calculation(tree, {
+        ...     'us-gaap_Revenues': 500,
+        ...     'us-gaap_CostOfRevenue': 300,
+        ... })
+        >>> result.computed['us-gaap_GrossProfit']
+        200.0
+        >>> result.status['us-gaap_GrossProfit']
+        'computed'
+    """
+    return tree.rollup_plan().rollup(values, tolerance=tolerance, missing=missing)
@@ -8,11 +8,19 @@ and metadata.
 from .schema import (
     ConceptSchema,
     parse_schema,
+    iter_schema,
+    parse_schema_index,
     parse_schema_to_dict,
     get_concept_types,
     get_schema_dataframe,
     extract_concepts_from_schema,
     MONETARY_TYPES,
+    STANDARD_PREFIXES,
+)
+
+from .schema_table import (
+    ConceptSchemaTable,
+    parse_schema_table,
 )
 
 from .constants import (
@@ -25,6 +33,7 @@ from .helper import (
     find_file_by_pattern,
     build_stm_dis_trees,
     find_concept_stm_dis,
+    TaxonomyIndex,
     build_taxonomy_dataframe,
     build_taxonomy_dataframe_from_zip,
 )
@@ -32,11 +41,16 @@ from .helper import (
 __all__ = [
     'ConceptSchema',
     'parse_schema',
+    'iter_schema',
+    'parse_schema_index',
     'parse_schema_to_dict',
     'get_concept_types',
     'get_schema_dataframe',
     'extract_concepts_from_schema',
     'MONETARY_TYPES',
+    'STANDARD_PREFIXES',
+    'ConceptSchemaTable',
+    'parse_schema_table',
     # constants
     'statement_full_names',
     'disclosure_full_names',
@@ -45,6 +59,7 @@ __all__ = [
     'find_file_by_pattern',
     'build_stm_dis_trees',
     'find_concept_stm_dis',
+    'TaxonomyIndex',
     'build_taxonomy_dataframe',
     'build_taxonomy_dataframe_from_zip',
 ]
\ No newline at end of file
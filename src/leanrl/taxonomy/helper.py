@@ -1,29 +1,42 @@
 from pathlib import Path
 import re
+import numpy as np
 import pandas as pd
 
 
-import tempfile
-import zipfile
-import os
-import shutil
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 
 
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 from ..core.namespaces import Roles
+from ..core.parser import StreamingParser
+from ..core.cache import ArtifactCache, as_cache
+from ..core.zipfs import ZipFS, ZipPath
 from ..linkbases import (
-    parse_label_linkbase,
-    parse_reference_linkbase,
+    LabelHandler,
+    ReferenceHandler,
     parse_definition_linkbase,
     parse_presentation_linkbase,
     ConceptTree,
+    CompactConceptTree,
+    compact_tree,
 )
 from ..taxonomy import (
-    extract_concepts_from_schema,
-    parse_schema_to_dict,
+    parse_schema_table,
 )
 
+# Statement trees (as opposed to disclosures) are keyed 'sfp...', 'soi...', 'scf...'
+STATEMENT_PREFIXES = ['sfp', 'soi', 'scf']
+_STATEMENT_PATTERN = re.compile('^(' + '|'.join(STATEMENT_PREFIXES) + ')')
+_STATEMENT_FULLNAMES = {
+    "sfp": "Statement of Financial Position",
+    "soi": "Statement of Income",
+    "scf": "Statement of Cash Flows",
+}
+
+
 @dataclass
 class StatementInfo:
     """Information about a concept's presence in a financial statement."""
@@ -32,9 +45,16 @@ class StatementInfo:
     depth: int
 
 
-def find_file_by_pattern(directory: Path, pattern: str) -> Optional[Path]:
+def _as_path(path: str | Path | ZipPath) -> Path | ZipPath:
+    """Local paths become Path objects; ZipPaths are used as they are."""
+    return path if isinstance(path, ZipPath) else Path(path)
+
+
+def find_file_by_pattern(directory: Path | ZipPath, pattern: str) -> Optional[Path | ZipPath]:
     """
     Find a file in a directory matching a given pattern.
+    
+    The directory can be a local Path or a ZipPath inside a taxonomy archive.
     """
     if not directory.exists():
         return None
@@ -46,19 +66,41 @@ def find_file_by_pattern(directory: Path, pattern: str) -> Optional[Path]:
     return None
 
 
-def build_stm_dis_trees(base_path: str, tree_type='def', debug = False) -> Dict[str, ConceptTree]:
+def build_stm_dis_trees(
+    base_path: str | Path | ZipPath,
+    tree_type='def',
+    debug = False,
+    workers: int | None = None,
+    cache: ArtifactCache | str | Path | None = None,
+) -> Dict[str, ConceptTree]:
     """
     Build ConceptTrees for each financial statement and disclosure type.
     
     Scans the stm_path and dis_path directories for definition linkbase files matching
     the patterns "us-gaap-stm-*-def-*.xml" and "us-gaap-dis-*-def-*.xml" respectively.
     
+    Args:
+        base_path: Path to the US-GAAP taxonomy folder (containing stm/, dis/, elts/),
+                   or a ZipPath to that folder inside a taxonomy zip. Files
+                   are then streamed out of the archive without extraction.
+        tree_type: 'def' or 'pre'
+        debug: Print one line per loaded tree
+        workers: Parse files in parallel with this many workers (None or 1 =
+                 sequential). Uses a process pool, or threads on free-threaded
+                 Python builds. Process workers send back CompactConceptTrees,
+                 which pickle as names plus flat arrays. The result is identical
+                 to the sequential one.
+        cache: ArtifactCache (or cache directory) to load trees from and
+               store newly parsed trees in. Only files without a cached
+               tree are parsed.
+    
     Returns dict mapping statement and disclosure type to its definition tree.
     """
     trees = {}
-    stm_path = Path(base_path) / 'stm'
-    dis_path = Path(base_path) / 'dis'
-    elts_path = Path(base_path) / 'elts'
+    base = _as_path(base_path)
+    stm_path = base / 'stm'
+    dis_path = base / 'dis'
+    elts_path = base / 'elts'
     if not stm_path.exists():
         print(f"Warning: Statement path does not exist: {stm_path}")
         return trees
@@ -86,6 +128,9 @@ def build_stm_dis_trees(base_path: str, tree_type='def', debug = False) -> Dict[
     for file_path in elts_path.glob('us-gaap-'+tree_type+'-*.xml'):
         if pattern_elts.match(file_path.name):
             all_files.append(file_path)
+    
+    # (statement_type, file_path) for every file to parse, in load order
+    jobs: List[tuple[str, Path | ZipPath]] = []
     for file_path in all_files:
         #file_path = Path(base_path) / "stm" / "us-gaap-stm-soi-def-2020-01-31.xml"
         match_stm = pattern_stm.match(file_path.name)
@@ -112,21 +157,45 @@ def build_stm_dis_trees(base_path: str, tree_type='def', debug = False) -> Dict[
         else:
             statement_type = "unknown"
         
-        # Load the definition linkbase
-        if tree_type == 'def':
-            #file_path = Path(base_path) / "stm" / "us-gaap-stm-soi-def-2020-01-31.xml"
-            tree = parse_definition_linkbase(str(file_path))
-            #tree.nodes['us-gaap_ResearchAndDevelopmentExpense']
-        elif tree_type == 'pre':
-            #file_path = Path(base_path) / "stm" / "us-gaap-stm-soi-pre-2020-01-31.xml"
-            tree = parse_presentation_linkbase(str(file_path))
-            #tree.nodes['us-gaap_ResearchAndDevelopmentExpense']
         # elif tree_type == 'ref':
         #     tree = parse_reference_linkbase(str(file_path))
-        else:
+        if tree_type not in ('def', 'pre'):
             print(f"Warning: Unknown tree type: {tree_type}, skipping {file_path.name}")
             continue
-        
+        jobs.append((statement_type, file_path))
+    
+    # Cached trees are stored compact and expanded on load; only misses are parsed
+    cache = as_cache(cache)
+    results: List[ConceptTree | None] = [None] * len(jobs)
+    keys: List[str] = []
+    if cache is not None:
+        keys = [cache.key(file_path, f'{tree_type}-tree') for _, file_path in jobs]
+        for i, key in enumerate(keys):
+            cached = cache.get(key)
+            if cached is not None:
+                results[i] = cached.to_tree()
+    todo = [i for i, tree in enumerate(results) if tree is None]
+    paths = [jobs[i][1] for i in todo]
+    
+    compact = False
+    if workers is not None and workers > 1 and len(paths) > 1:
+        with _tree_executor(workers) as executor:
+            compact = isinstance(executor, ProcessPoolExecutor)
+            parsed = list(executor.map(
+                _parse_tree_file,
+                paths,
+                [tree_type] * len(paths),
+                [compact] * len(paths),
+            ))
+    else:
+        parsed = [_parse_tree_file(file_path, tree_type) for file_path in paths]
+    
+    for i, tree in zip(todo, parsed):
+        if cache is not None:
+            cache.put(keys[i], tree if compact else compact_tree(tree))
+        results[i] = tree.to_tree() if compact else tree
+    
+    for (statement_type, file_path), tree in zip(jobs, results):
         if tree is not None:
             trees[statement_type] = tree
             if debug:
@@ -135,6 +204,35 @@ def build_stm_dis_trees(base_path: str, tree_type='def', debug = False) -> Dict[
     return trees
 
 
+def _parse_tree_file(
+    file_path: Path | ZipPath,
+    tree_type: str,
+    compact: bool = False,
+) -> ConceptTree | CompactConceptTree:
+    """
+    Parse one def/pre linkbase (worker function of build_stm_dis_trees).
+    
+    With compact=True the tree is returned as a CompactConceptTree with
+    its own symbol table, which is much cheaper to pickle back from a
+    worker process than a dict of ConceptNode objects.
+    """
+    if tree_type == 'def':
+        tree = parse_definition_linkbase(file_path)
+    else:
+        tree = parse_presentation_linkbase(file_path)
+    if compact:
+        return compact_tree(tree)
+    return tree
+
+
+def _tree_executor(workers: int) -> Executor:
+    """Threads on free-threaded (no-GIL) builds, processes otherwise."""
+    gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    if not gil_enabled:
+        return ThreadPoolExecutor(max_workers=workers)
+    return ProcessPoolExecutor(max_workers=workers)
+
+
 def find_concept_stm_dis(
     concept: str, 
     trees: Dict[str, ConceptTree]
@@ -145,58 +243,147 @@ def find_concept_stm_dis(
     Returns StatementInfo for the first statement found, or None.
     Priority: sfp > soi > scf-indir > scf-dir
     """
-    priority0 = ['sfp', 'soi', 'scf']
-    stmt_fullname = {"sfp": "Statement of Financial Position", "soi": "Statement of Income", "scf": "Statement of Cash Flows"}
-    stm_types = trees.keys()
-    priority = priority0.copy()
-    for st in stm_types:
-        if re.search( '^(' + '|'.join(priority0) + ')', st):
-            st0 = st.split('-')[0]
-            if st not in priority:
-                priority.append(st)
-            stmt_fullname[st] = stmt_fullname.get(st0, "unknown")
-    #return priority
-    #priority = [st for st in stm_types if re.search( '^(' + '|'.join(priority0) + ')', st)]
+    priority, stmt_fullname = _statement_priority(trees)
     for stmt_type in priority:
-        if stmt_type not in trees:
-            continue
-        
         tree = trees[stmt_type]
-        
         if concept in tree:
-            path = tree.get_ancestor_path(concept)
-            if path:
-                # Add statement type as conceptual root
-                fullname = stmt_fullname.get(stmt_type, "unknown")
-                full_path = [f'[{fullname}]'] + path
-                #print(f"Found {concept} in {fullname} with path: {full_path}")
-                return StatementInfo(
-                    statement_type=stmt_type,
-                    path=full_path,
-                    depth=len(path)
-                )
+            info = _statement_info(concept, stmt_type, tree, stmt_fullname)
+            if info:
+                return info
     return None
 
 
+def _statement_priority(trees: Dict[str, ConceptTree]) -> tuple[List[str], Dict[str, str]]:
+    """
+    Statement tree keys in lookup priority, and their full names.
     
+    Priority: the plain 'sfp', 'soi', 'scf' keys first, then every other
+    statement key (e.g. 'sfp-cls', 'scf-indir') in the order of ``trees``.
+    Disclosure trees are not statements and are left out.
+    """
+    priority = [st for st in STATEMENT_PREFIXES if st in trees]
+    stmt_fullname = dict(_STATEMENT_FULLNAMES)
+    for st in trees:
+        if _STATEMENT_PATTERN.search(st):
+            if st not in priority:
+                priority.append(st)
+            stmt_fullname[st] = _STATEMENT_FULLNAMES.get(st.split('-')[0], "unknown")
+    return priority, stmt_fullname
+
+
+def _statement_info(
+    concept: str,
+    stmt_type: str,
+    tree: ConceptTree,
+    stmt_fullname: Dict[str, str],
+) -> Optional[StatementInfo]:
+    """StatementInfo for a concept in one statement tree, or None if it has no path."""
+    path = tree.get_ancestor_path(concept)
+    if not path:
+        return None
+    # Add statement type as conceptual root
+    fullname = stmt_fullname.get(stmt_type, "unknown")
+    return StatementInfo(
+        statement_type=stmt_type,
+        path=[f'[{fullname}]'] + path,
+        depth=len(path)
+    )
+
+
+class TaxonomyIndex:
+    """
+    Inverted concept -> trees index over a set of statement/disclosure trees.
+    
+    Built once in a single pass over the nodes of every tree, it replaces
+    per-concept scans such as calling find_concept_stm_dis() for each of
+    thousands of concepts:
+    - memberships(concept): every tree key containing the concept
+    - statements(concept) / disclosures(concept): the same, split by kind
+    - primary(concept): StatementInfo for the highest-priority statement
+      containing the concept (same answer as find_concept_stm_dis())
+    
+    Examples:
+        >>> def_trees = build_stm_dis_trees(base_path, tree_type='def')
+        >>> index = TaxonomyIndex(def_trees)
+        >>> index.statements('us-gaap_Assets')
+        ['sfp-cls']
+        >>> index.primary('us-gaap_Assets').path
+        ['[Statement of Financial Position]', ..., 'us-gaap_Assets']
+    """
+    
+    def __init__(self, trees: Dict[str, ConceptTree]):
+        self.trees = trees
+        self.priority, self._fullnames = _statement_priority(trees)
+        
+        # concept -> tree keys, in the order of ``trees``
+        self._memberships: Dict[str, List[str]] = {}
+        for stmt_type, tree in trees.items():
+            for concept in tree.nodes:
+                self._memberships.setdefault(concept, []).append(stmt_type)
+        
+        # concept -> first statement key in priority order
+        self._primary: Dict[str, str] = {}
+        for stmt_type in self.priority:
+            for concept in trees[stmt_type].nodes:
+                self._primary.setdefault(concept, stmt_type)
+    
+    def __contains__(self, concept: str) -> bool:
+        return concept in self._memberships
+    
+    def __len__(self) -> int:
+        return len(self._memberships)
+    
+    def memberships(self, concept: str) -> List[str]:
+        """Keys of all trees containing the concept (empty list if none)."""
+        return list(self._memberships.get(concept, ()))
+    
+    def statements(self, concept: str) -> List[str]:
+        """Keys of the statement trees (sfp/soi/scf) containing the concept."""
+        return [st for st in self._memberships.get(concept, ()) if _STATEMENT_PATTERN.search(st)]
+    
+    def disclosures(self, concept: str) -> List[str]:
+        """Keys of the non-statement (disclosure) trees containing the concept."""
+        return [st for st in self._memberships.get(concept, ()) if not _STATEMENT_PATTERN.search(st)]
+    
+    def primary_statement(self, concept: str) -> Optional[str]:
+        """Highest-priority statement key containing the concept, or None."""
+        return self._primary.get(concept)
+    
+    def primary(self, concept: str) -> Optional[StatementInfo]:
+        """StatementInfo (type, path, depth) in the concept's primary statement."""
+        stmt_type = self._primary.get(concept)
+        if stmt_type is None:
+            return None
+        return _statement_info(concept, stmt_type, self.trees[stmt_type], self._fullnames)
+
+
 def build_taxonomy_dataframe(
-    base_path: str,
+    base_path: str | Path | ZipPath,
     output_file: str | None = None,
-    debug = False
+    debug = False,
+    cache: ArtifactCache | str | Path | None = None,
     ):
     """
     Build a comprehensive DataFrame of all US-GAAP concepts.
     
     Args:
-        base_path: Path to the US-GAAP taxonomy folder (containing elts/, stm/, etc.)
+        base_path: Path to the US-GAAP taxonomy folder (containing elts/, stm/, etc.),
+                   or a ZipPath to that folder inside a taxonomy zip
         output_file: Output CSV filename
+        cache: ArtifactCache (or cache directory) for the parsed schema,
+               labels, documentation, references and def/pre trees. Each
+               artifact is keyed by its file's content, so a warm start
+               parses no XML at all.
     
     Returns:
         pandas DataFrame with all concept information
-    """
     
+    Examples:
+        >>> df = build_taxonomy_dataframe('us-gaap-2020-01-31', cache='~/.cache/leanrl')
+    """
     
-    base = Path(base_path)
+    cache = as_cache(cache)
+    base = _as_path(base_path)
     elts_path = base / 'elts'
     
     
@@ -205,7 +392,6 @@ def build_taxonomy_dataframe(
     if not schema_file:
         schema_pattern = re.compile(r'^us-gaap-\d{4}(?:-\d{2}-\d{2})?\.xsd$')
         base = base.parent
-        base_path = str(base)
         elts_path = base / 'elts'
         for file_path in elts_path.glob('*.xsd'):
             #print(f"Checking _{file_path.name}_")
@@ -222,51 +408,76 @@ def build_taxonomy_dataframe(
         
     
     print(f"Extracting concepts from: {schema_file}")
-    all_concepts = extract_concepts_from_schema(str(schema_file), include_abstract=True)
+    # One pass over the schema gives both the concept list and the metadata
+    # (type, periodType, balance, abstract), as columns
+    if cache is not None:
+        schema_table = cache.get_or_parse(
+            schema_file, 'schema-table:include_abstract',
+            lambda: parse_schema_table(schema_file, include_abstract=True),
+        )
+    else:
+        schema_table = parse_schema_table(schema_file, include_abstract=True)
+    print(f"Loaded schema metadata for {len(schema_table)} concepts")
+    schema_table = schema_table.select(np.fromiter(
+        (name.startswith('us-gaap_') for name in schema_table.names), dtype=bool, count=len(schema_table),
+    ))
+    all_concepts = schema_table.names
     print(f"Found {len(all_concepts)} concepts")
-    
-    # Also load schema metadata (type, periodType, balance, abstract)
-    schema_dict = parse_schema_to_dict(str(schema_file), include_abstract=True)
-    print(f"Loaded schema metadata for {len(schema_dict)} concepts")
     print()
     
-    # 2. Load labels
-    print("Loading labels...")
+    # 2. Locate label, documentation and reference linkbases
     label_file = find_file_by_pattern(elts_path, r'us-gaap-lab-\d{4}(?:-\d{2}-\d{2})?\.xml')
     doc_file = find_file_by_pattern(elts_path, r'us-gaap-doc-\d{4}(?:-\d{2}-\d{2})?\.xml')
+    reference_file = find_file_by_pattern(elts_path, r'us-gaap-ref-\d{4}(?:-\d{2}-\d{2})?\.xml')
     
-    labels = {}
-    docs = {}
+    # Register every handler with the parser for its file, so each file is
+    # streamed exactly once even when it serves several handlers. Results
+    # found in the cache are not parsed at all.
+    print("Loading labels, documentation and references...")
+    loaded: Dict[str, dict] = {}
+    parsers: Dict[Path | ZipPath, tuple[StreamingParser, List[tuple[str, str | None]]]] = {}
+    for name, file_path, kind, make_handler in (
+        ('labels', label_file, f'labels:{Roles.LABEL}', lambda: LabelHandler(Roles.LABEL)),
+        ('docs', doc_file, f'labels:{Roles.DOCUMENTATION}', lambda: LabelHandler(Roles.DOCUMENTATION)),
+        ('references', reference_file, 'references', ReferenceHandler),
+    ):
+        if not file_path:
+            continue
+        key = cache.key(file_path, kind) if cache is not None else None
+        cached = cache.get(key) if key else None
+        if cached is not None:
+            loaded[name] = cached
+            continue
+        parser, pending = parsers.setdefault(file_path, (StreamingParser(file_path), []))
+        parser.register(make_handler())
+        pending.append((name, key))
+    
+    for parser, pending in parsers.values():
+        for (name, key), result in zip(pending, parser.parse()):
+            loaded[name] = result
+            if key:
+                cache.put(key, result)
+    
+    labels = loaded.get('labels', {})
+    docs = loaded.get('docs', {})
+    references_dict = loaded.get('references', {})
     
     if label_file:
-        labels = parse_label_linkbase(str(label_file), role=Roles.LABEL)
         print(f"  Labels: {len(labels)}")
-    
     if doc_file:
-        docs = parse_label_linkbase(str(doc_file), role=Roles.DOCUMENTATION)
         print(f"  Documentation: {len(docs)}")
-    print()
-    
-    # 3. Build statement trees
-    print("Loading statement and disclosure definition linkbases...")
-    def_trees = build_stm_dis_trees(base_path, tree_type='def')    
-    pre_trees = build_stm_dis_trees(base_path, tree_type='pre')
-    # if not "soi" in def_trees.keys() or not "soi" in pre_trees.keys():
-    #     raise ValueError("Statement of Income not found in definition or presentation linkbases")
-    # if 'us-gaap_ResearchAndDevelopmentExpense' not in def_trees["soi"].nodes and 'us-gaap_ResearchAndDevelopmentExpense' not in pre_trees["soi"].nodes:
-    #     raise ValueError("ResearchAndDevelopmentExpense not found in definition or presentation linkbases")
-    
-    
-    # 4. Load references
-    print("Loading references...")
-    reference_file = find_file_by_pattern(elts_path, r'us-gaap-ref-\d{4}(?:-\d{2}-\d{2})?\.xml')
     if reference_file:
-        references_dict = parse_reference_linkbase(str(reference_file))
         print(f"  References: {len(references_dict)}")
-        print()
     else:
         print(f"  References file not found matching pattern us-gaap-ref-\\d{{4}}(-\\d{{2}}-\\d{{2}})?\\.xml in {elts_path}")
-        references_dict = {}
+    print()
+    
+    # 3. Build statement trees and index them once by concept
+    print("Loading statement and disclosure definition linkbases...")
+    def_trees = build_stm_dis_trees(base, tree_type='def', cache=cache)
+    pre_trees = build_stm_dis_trees(base, tree_type='pre', cache=cache)
+    def_index = TaxonomyIndex(def_trees)
+    pre_index = TaxonomyIndex(pre_trees)
     
     # 4. Build DataFrame
     print("Building DataFrame...")
@@ -284,24 +495,10 @@ def build_taxonomy_dataframe(
         # else:
         #     reference = ''
         
-        # Get schema metadata
-        schema_info = schema_dict.get(concept)
-        if schema_info:
-            is_abstract = schema_info.abstract
-            period_type = schema_info.period_type  # 'instant' or 'duration'
-            is_monetary = schema_info.is_monetary
-            balance = schema_info.balance  # 'debit' or 'credit'
-            data_type = schema_info.type
-        else:
-            is_abstract = None
-            period_type = None
-            is_monetary = None
-            balance = None
-            data_type = None
-        
         # Find statement info
-        stm_dis_info = find_concept_stm_dis(concept, def_trees)
-        stm_dis_pre  = find_concept_stm_dis(concept, pre_trees)
+        stm_dis_pre  = pre_index.primary(concept)
+        # The definition path is only a fallback
+        stm_dis_info = def_index.primary(concept) if not stm_dis_pre else None
         
         if stm_dis_pre:
             stm_dis_type = stm_dis_pre.statement_type
@@ -318,26 +515,13 @@ def build_taxonomy_dataframe(
             depth = None
         
         # Check if it's in multiple statements
-        statements_present = []
-        disclosures_present = []
-        for stmt_type, tree in def_trees.items():
-            if re.search( '^(sfp|soi|scf)', stmt_type):
-                if concept in tree:
-                    statements_present.append(stmt_type)
-            else:
-                if concept in tree:
-                    disclosures_present.append(stmt_type)
+        statements_present = def_index.statements(concept)
+        disclosures_present = def_index.disclosures(concept)
         rows.append({
             'concept': concept,
             'label': label,
             'documentation': documentation[:4096] if documentation else '',  # Truncate long docs
             'reference': ', '.join([str (r) for r in reference]),
-            # Schema metadata
-            'data_type': data_type,
-            'is_abstract': is_abstract,
-            'period_type': period_type,
-            'is_monetary': is_monetary,
-            'balance': balance,
             # Statement/disclosure info
             'all_statements': ','.join(statements_present) if statements_present else '',
             'all_disclosures': ','.join(disclosures_present) if disclosures_present else '',
@@ -345,7 +529,19 @@ def build_taxonomy_dataframe(
             'path': path,
         })
     
-    df = pd.DataFrame(rows)
+    df = pd.DataFrame(rows, columns=[
+        'concept', 'label', 'documentation', 'reference',
+        'all_statements', 'all_disclosures', 'depth', 'path',
+    ])
+    # Schema metadata, whole columns at once from the table (the rows are in
+    # the same order): period_type is 'instant' or 'duration', balance
+    # 'debit' or 'credit'
+    schema_df = schema_table.to_dataframe()
+    df.insert(4, 'data_type', schema_df['type'])
+    df.insert(5, 'is_abstract', schema_table.is_abstract)
+    df.insert(6, 'period_type', schema_df['period_type'])
+    df.insert(7, 'is_monetary', schema_table.is_monetary)
+    df.insert(8, 'balance', schema_df['balance'])
     
     # Summary statistics
     if debug:
@@ -380,34 +576,27 @@ def build_taxonomy_dataframe(
 
 
 
-def build_taxonomy_dataframe_from_zip(zip_file: str):
+def build_taxonomy_dataframe_from_zip(
+    zip_file: str,
+    cache: ArtifactCache | str | Path | None = None,
+    ):
     """
-    Extract a taxonomy zip file and build a comprehensive DataFrame of all US-GAAP concepts.
+    Build a comprehensive DataFrame of all US-GAAP concepts from a taxonomy zip file.
     
-    This function extracts the zip file to a temporary directory, calls build_taxonomy_dataframe,
-    and then cleans up the temporary files.
+    The archive is read through a ZipFS: every schema and linkbase is
+    streamed straight out of the zip, nothing is extracted to disk. The
+    taxonomy folder is expected to be named after the zip file (e.g.
+    us-gaap-2020-01-31.zip -> us-gaap-2020-01-31/), or to sit at the
+    archive root.
     
     Args:
         zip_file: Path to the zip file containing taxonomy data
-        
+        cache: Optional ArtifactCache (or cache directory), see
+               build_taxonomy_dataframe(). Zip members are fingerprinted by
+               the CRC-32 stored in the archive, without decompressing them.
+    
     Returns:
         pandas DataFrame with all concept information (same as build_taxonomy_dataframe)
     """
-    # Create a temporary directory
-    temp_dir = tempfile.mkdtemp()
-    
-    
-    try:
-        # Extract the zip file to the temporary directory
-        with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-            zip_ref.extractall(temp_dir)
-        zip_file_name = Path(zip_file).stem
-        # Call build_taxonomy_dataframe with the temporary directory path
-        df = build_taxonomy_dataframe(os.path.join(temp_dir, zip_file_name))
-        
-        return df
-    
-    finally:
-        # Optionally clean up the temporary directory
-        # Note: If you want to keep the files for inspection, comment out the cleanup
-        shutil.rmtree(temp_dir, ignore_errors=True)
\ No newline at end of file
+    with ZipFS(zip_file) as fs:
+        return build_taxonomy_dataframe(fs.path(Path(zip_file).stem), cache=cache)
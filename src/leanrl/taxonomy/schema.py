@@ -3,12 +3,17 @@ XBRL Taxonomy Schema Parser
 
 Extract concept definitions from XBRL taxonomy schema (.xsd) files.
 Includes metadata like type, periodType, balance, and abstract status.
+
+Schemas are streamed (constant memory, 'etree' or 'expat' engine) and the
+filters are applied to the raw attributes, so ConceptSchema objects are
+only built for the concepts that are kept.
 """
 
-from typing import List, Dict, Optional, Set, Union, IO
-from dataclasses import dataclass, field, asdict
-from pathlib import Path
-import xml.etree.ElementTree as ET
+from typing import Iterator, List, Dict, Optional, Set, Tuple
+from dataclasses import dataclass, asdict
+
+from ..core.scanner import stream_fields
+from ..core.zipfs import Source
 
 
 # XML Schema namespace
@@ -30,6 +35,36 @@ MONETARY_TYPE_SUFFIXES = (
     'monetaryItemType',
 )
 
+# Prefixes of the standard (non-extension) taxonomies
+STANDARD_PREFIXES = frozenset({
+    'us-gaap', 'dei', 'srt', 'country', 'currency', 'exch', 'stpr', 'sic', 'sec',
+})
+
+TAG_ELEMENT = f'{XS_NS}element'
+ATTR_PERIOD_TYPE = f'{XBRLI_NS}periodType'
+ATTR_BALANCE = f'{XBRLI_NS}balance'
+
+# Attributes of an xs:element read by the schema parsers
+_ELEMENT_FIELDS = {
+    TAG_ELEMENT: (
+        'id',
+        'name',
+        'type',
+        'abstract',
+        'nillable',
+        'substitutionGroup',
+        ATTR_PERIOD_TYPE,
+        ATTR_BALANCE,
+    ),
+}
+
+
+def is_monetary_type(type_name: str | None) -> bool:
+    """Check if an XML Schema type name denotes a monetary item type."""
+    if not type_name:
+        return False
+    return type_name in MONETARY_TYPES or type_name.endswith(MONETARY_TYPE_SUFFIXES)
+
 
 @dataclass
 class ConceptSchema:
@@ -66,18 +101,8 @@ class ConceptSchema:
     @property
     def is_monetary(self) -> bool:
         """Check if this concept represents a monetary value."""
-        if not self.type:
-            return False
-        
-        # Exact match
-        if self.type in MONETARY_TYPES:
-            return True
-        
-        # Suffix match (handles derived types)
-        if self.type.endswith(MONETARY_TYPE_SUFFIXES):
-            return True
-        
-        return False
+        # Exact match, or suffix match (handles derived types)
+        return is_monetary_type(self.type)
     
     @property
     def is_instant(self) -> bool:
@@ -114,33 +139,126 @@ class ConceptSchema:
     @property
     def is_extension(self) -> bool:
         # If it's not standard GAAP (and not SEC standard like 'dei' or 'srt'), it's an extension
-        standard_prefixes = ['us-gaap', 'dei', 'srt', 'country', 'currency', 'exch', 'stpr', 'sic', "sec"]
         # If prefix is empty, check name, otherwise check prefix
         p = self.prefix if self.prefix else self.name.split('_')[0]
         if not p:
             return False
-        return p.lower() not in standard_prefixes
-        
+        return p.lower() not in STANDARD_PREFIXES
+    
     
     def to_dict(self) -> Dict:
         """Convert to dictionary."""
         return asdict(self)
 
 
+def _scan_schema(
+    schema_path: Source,
+    prefix: Optional[str] = None,
+    filter_monetary: bool = False,
+    filter_instant: bool = False,
+    filter_duration: bool = False,
+    include_abstract: bool = False,
+    engine: str = 'etree',
+    ) -> Iterator[Tuple[str, Optional[str], tuple]]:
+    """
+    Stream the xs:element declarations of a schema, filtered on their raw
+    attributes. Yields (name, prefix, raw attribute values).
+    """
+    name_prefix = f'{prefix}_' if prefix is not None else None
+    
+    for _tag, values in stream_fields(schema_path, _ELEMENT_FIELDS, engine=engine):
+        elem_id, raw_name, elem_type, abstract, _nillable, _group, period_type, _balance = values
+        if not raw_name:
+            continue
+        
+        # Filters first, on the raw attributes
+        if not include_abstract and abstract is not None and abstract.lower() == 'true':
+            continue
+        if filter_instant and period_type != 'instant':
+            continue
+        if filter_duration and period_type != 'duration':
+            continue
+        if filter_monetary and not is_monetary_type(elem_type):
+            continue
+        
+        # In XBRL, the 'id' attribute typically contains {prefix}_{name}
+        # e.g., id="tsla_AutomotiveSales" or id="us-gaap_Assets"
+        if elem_id:
+            name = elem_id
+        elif prefix:
+            # Fallback: if no ID but prefix provided, construct it
+            name = f'{prefix}_{raw_name}'
+        else:
+            # Fallback: just use the raw name (rare in strict XBRL)
+            name = raw_name
+        
+        # Prefix filter (if one was specifically requested)
+        if name_prefix is not None and not name.startswith(name_prefix):
+            continue
+        
+        # e.g., "us-gaap_Assets" -> "us-gaap"
+        if '_' in name:
+            current_prefix = name.split('_', 1)[0]
+        else:
+            current_prefix = prefix
+        
+        yield name, current_prefix, values
+
+
+def _concept_schema(name: str, prefix: Optional[str], values: tuple) -> ConceptSchema:
+    elem_id, _name, elem_type, abstract, nillable, substitution_group, period_type, balance = values
+    return ConceptSchema(
+        name=name,
+        prefix=prefix,
+        id=elem_id or '',
+        type=elem_type or '',
+        period_type=period_type,
+        balance=balance,
+        abstract=(abstract or 'false').lower() == 'true',
+        substitution_group=substitution_group or '',
+        nillable=(nillable or 'true').lower() == 'true',
+    )
+
+
+def iter_schema(
+    schema_path: Source,
+    prefix: Optional[str] = None,
+    filter_monetary: bool = False,
+    filter_instant: bool = False,
+    filter_duration: bool = False,
+    include_abstract: bool = False,
+    engine: str = 'etree',
+    ) -> Iterator[ConceptSchema]:
+    """
+    Stream the concept definitions of a schema, one ConceptSchema at a time.
+    
+    Same parameters as parse_schema().
+    """
+    for name, current_prefix, values in _scan_schema(
+        schema_path, prefix, filter_monetary, filter_instant, filter_duration, include_abstract, engine,
+    ):
+        yield _concept_schema(name, current_prefix, values)
+
+
 def parse_schema(
-    schema_path: str,
+    schema_path: Source,
     #prefix: str = 'us-gaap',
     prefix: Optional[str] = None,
     filter_monetary: bool = False,
     filter_instant: bool = False,
     filter_duration: bool = False,
     include_abstract: bool = False,
+    engine: str = 'etree',
     ) -> List[ConceptSchema]:
     """
     Parse an XBRL taxonomy schema and extract concept definitions.
     
+    The schema is streamed, and the filters are applied to the raw
+    attributes before any ConceptSchema is built.
+    
     Args:
-        schema_path: Path to the .xsd schema file
+        schema_path: Path to the .xsd schema file, a binary file object,
+                     or a ZipPath into a taxonomy archive
         prefix: Namespace prefix to filter by (e.g., 'us-gaap').
                 If None (default), accepts ALL concepts found in the file,
                 using the prefix defined in the element 'id'.
@@ -148,6 +266,7 @@ def parse_schema(
         filter_instant: If True, only return instant (balance sheet) concepts
         filter_duration: If True, only return duration (income statement) concepts
         include_abstract: If True, include abstract grouping elements
+        engine: Scanning engine, 'etree' (default) or 'expat'
     
     Returns:
         List of ConceptSchema objects matching the filters
@@ -171,103 +290,41 @@ def parse_schema(
         ...                         filter_monetary=True,
         ...                         filter_duration=True)
     """
-    tree = ET.parse(schema_path)
-    root = tree.getroot()
+    return list(iter_schema(
+        schema_path,
+        prefix=prefix,
+        filter_monetary=filter_monetary,
+        filter_instant=filter_instant,
+        filter_duration=filter_duration,
+        include_abstract=include_abstract,
+        engine=engine,
+    ))
+
+
+def parse_schema_index(
+    schema_path: Source,
+    **kwargs
+    ) -> Tuple[List[str], Dict[str, ConceptSchema]]:
+    """
+    Parse a schema once into both the concept names and the metadata map.
     
-    results = []
+    Same parameters as parse_schema().
     
-    # Find all xs:element declarations
-    for elem in root.iter(f'{XS_NS}element'):
-        # 1. Get fundamental identifiers
-        elem_id = elem.get('id', '')
-        raw_name = elem.get('name', '')
-        if not raw_name:
-            continue
-        #raw_name = elem.get('name')
-        # if not name:
-        #     continue
-
-        # 2. Determine the full Concept Name
-        # In XBRL, the 'id' attribute typically contains {prefix}_{name}
-        # e.g., id="tsla_AutomotiveSales" or id="us-gaap_Assets"
-        if elem_id:
-            name = elem_id
-        elif prefix:
-            # Fallback: if no ID but prefix provided, construct it
-            name = f'{prefix}_{raw_name}'
-        else:
-            # Fallback: just use the raw name (rare in strict XBRL)
-            name = raw_name
-        
-        # # Add prefix if not present
-        # if prefix and not name.startswith(f'{prefix}_'):
-        #     # Check if the element has an id with the prefix
-        #     elem_id = elem.get('id', '')
-        #     if elem_id.startswith(f'{prefix}_'):
-        #         name = elem_id
-        #     else:
-        #         name = f'{prefix}_{raw_name}'
-        # --- NEW LOGIC: Extract Prefix ---
-        current_prefix = None
-        if '_' in name:
-            # e.g., "us-gaap_Assets" -> "us-gaap"
-            current_prefix = name.split('_', 1)[0]
-        elif prefix:
-            current_prefix = prefix
-        # ---------------------------------        
-        # 3. Apply Prefix Filter (if user specifically requested one)
-        if prefix is not None:
-            # If the resulting name doesn't start with the requested prefix, skip it
-            if not name.startswith(f'{prefix}_'):
-                continue
-        
-        # Get attributes
-        #elem_id = elem.get('id', '')
-        elem_type = elem.get('type', '')
-        abstract = elem.get('abstract', 'false').lower() == 'true'
-        nillable = elem.get('nillable', 'true').lower() == 'true'
-        substitution_group = elem.get('substitutionGroup', '')
-        
-        # XBRL-specific attributes
-        period_type = elem.get(f'{XBRLI_NS}periodType')
-        balance = elem.get(f'{XBRLI_NS}balance')
-        
-        # Create concept schema
-        try:
-            schema = ConceptSchema(
-                name=name,
-                prefix=current_prefix,  # <--- Pass the extracted prefix here
-                id=elem_id,
-                type=elem_type,
-                period_type=period_type,
-                balance=balance,
-                abstract=abstract,
-                substitution_group=substitution_group,
-                nillable=nillable,
-            )
-        except Exception as e:
-            print(f"Error creating ConceptSchema for {name}: {e}")
-            continue
-        # Apply filters
-        if not include_abstract and abstract:
-            continue
-        
-        if filter_monetary and not schema.is_monetary:
-            continue
-        
-        if filter_instant and not schema.is_instant:
-            continue
-        
-        if filter_duration and not schema.is_duration:
-            continue
-        
-        results.append(schema)
+    Returns:
+        (names, schemas): concept names in document order, and a dict
+        mapping each name to its ConceptSchema
     
-    return results
+    Examples:
+        >>> names, schemas = parse_schema_index('us-gaap-2020-01-31.xsd', include_abstract=True)
+        >>> schemas[names[0]].period_type
+        'duration'
+    """
+    schemas = parse_schema_to_dict(schema_path, **kwargs)
+    return list(schemas), schemas
 
 
 def parse_schema_to_dict(
-    schema_path: str,
+    schema_path: Source,
     **kwargs
     ) -> Dict[str, ConceptSchema]:
     """
@@ -278,32 +335,34 @@ def parse_schema_to_dict(
     Returns:
         Dict mapping concept name (str) to ConceptSchema object
     """
-    schemas = parse_schema(schema_path, **kwargs)
-    #schemas_dict = {s.name: s for s in schemas}
-    # schemas_dict["is_extension"] = schemas.is_extension
-    # schemas_dict["is_usgaap"] = schemas.is_usgaap
-    #return schemas_dict
-    return {s.name: s for s in schemas}
+    return {s.name: s for s in iter_schema(schema_path, **kwargs)}
 
 
-def get_concept_types(schema_path: str) -> Dict[str, Set[str]]:
+def get_concept_types(schema_path: Source) -> Dict[str, Set[str]]:
     """
     Get a summary of all concept types in the schema.
     
     Returns:
         Dict with keys 'types', 'period_types', 'balances', 'substitution_groups'
     """
-    schemas = parse_schema(schema_path, include_abstract=True)
+    from .schema_table import parse_schema_table
+    
+    # The distinct values are the categories of the columnar table
+    categories = parse_schema_table(schema_path).categories
+    
+    def distinct(column: str) -> Set[str]:
+        table = categories[column]
+        return {value for value in map(table.name, range(len(table))) if value}
     
     return {
-        'types': set(s.type for s in schemas if s.type),
-        'period_types': set(s.period_type for s in schemas if s.period_type),
-        'balances': set(s.balance for s in schemas if s.balance),
-        'substitution_groups': set(s.substitution_group for s in schemas if s.substitution_group),
+        'types': distinct('type'),
+        'period_types': distinct('period_type'),
+        'balances': distinct('balance'),
+        'substitution_groups': distinct('substitution_group'),
     }
 
 
-def get_schema_dataframe(schema_path: str, **kwargs):
+def get_schema_dataframe(schema_path: Source, **kwargs):
     """
     Parse schema and return as pandas DataFrame.
     
@@ -324,18 +383,18 @@ def get_schema_dataframe(schema_path: str, **kwargs):
     
     # Add derived columns
     if not df.empty:
-        df['is_monetary'] = df.apply(
-            lambda r: ConceptSchema(**r).is_monetary, axis=1
-        )
+        # Once per distinct type instead of one ConceptSchema per row
+        df['is_monetary'] = df['type'].map({t: is_monetary_type(t) for t in df['type'].unique()})
     
     return df
 
 
 def extract_concepts_from_schema(
-    schema_path: str,
+    schema_path: Source,
     prefix: str = 'us-gaap',
     filter_monetary: bool = False,
     include_abstract: bool = False,
+    engine: str = 'etree',
     ) -> List[str]:
     """
     Extract concept names from an XBRL taxonomy schema.
@@ -348,6 +407,7 @@ def extract_concepts_from_schema(
         prefix: Namespace prefix (e.g., 'us-gaap')
         filter_monetary: If True, only return monetary type concepts
         include_abstract: If True, include abstract grouping elements
+        engine: Scanning engine, 'etree' (default) or 'expat'
     
     Returns:
         List of concept name strings (e.g., ['us-gaap_Assets', 'us-gaap_Liabilities', ...])
@@ -359,10 +419,13 @@ def extract_concepts_from_schema(
         >>> concepts[:3]
         ['us-gaap_AccountingStandardsUpdateExtensibleList', ...]
     """
-    schemas = parse_schema(
-        schema_path,
-        prefix=prefix,
-        filter_monetary=filter_monetary,
-        include_abstract=include_abstract,
-    )
-    return [s.name for s in schemas]
\ No newline at end of file
+    # Names only: no ConceptSchema is built
+    return [
+        name for name, _prefix, _values in _scan_schema(
+            schema_path,
+            prefix=prefix,
+            filter_monetary=filter_monetary,
+            include_abstract=include_abstract,
+            engine=engine,
+        )
+    ]
\ No newline at end of file
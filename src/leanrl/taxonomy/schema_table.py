@@ -0,0 +1,377 @@
+"""
+Columnar Concept Schema Table
+
+The concept definitions of a taxonomy schema as columns instead of one
+ConceptSchema per concept:
+
+    names, ids                  list[str]
+    prefix, type, period_type,  array('h') codes -> SymbolTable
+    balance, substitution_group (categoricals; -1 for a missing value)
+    abstract, nillable          array('B')
+
+Predicates (is_monetary, is_instant, is_extension, ...) are evaluated once
+per distinct category and broadcast to the rows as numpy boolean masks,
+so filters combine with & and | instead of running a Python loop per
+concept. ConceptSchema objects are only built on request (table[i],
+table['us-gaap_Assets'], iteration).
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from array import array
+
+import numpy as np
+
+from ..core.zipfs import Source
+from ..linkbases.compact import SymbolTable
+from .schema import STANDARD_PREFIXES, ConceptSchema, _scan_schema, is_monetary_type
+
+
+# Categorical columns, in ConceptSchema field order
+CATEGORICAL_COLUMNS = ('prefix', 'type', 'period_type', 'balance', 'substitution_group')
+
+# Columns of ConceptSchemaTable.to_dataframe() (the ConceptSchema fields)
+SCHEMA_COLUMNS = [
+    'name', 'prefix', 'id', 'type', 'period_type', 'balance', 'abstract', 'substitution_group', 'nillable',
+]
+
+
+def _take(values: array, rows: 'np.ndarray') -> array:
+    """Rows of a typed array, as a new array of the same type."""
+    taken = array(values.typecode)
+    taken.frombytes(np.frombuffer(values, dtype=values.typecode)[rows].tobytes())
+    return taken
+
+
+class ConceptSchemaTable:
+    """
+    Columnar store of concept schema metadata: one row per concept.
+    
+    Attributes:
+        names: Concept names, in document order
+        ids: Element ids
+        categories: Column name -> SymbolTable of its distinct values
+        codes: Column name -> code of each row (-1 for None)
+        abstract: 1 for abstract concepts
+        nillable: 1 for nillable concepts
+    
+    Examples:
+        >>> table = parse_schema_table('us-gaap-2020-01-31.xsd')
+        >>> balance_sheet = table.is_monetary & table.is_instant & ~table.is_abstract
+        >>> table.where(balance_sheet)[:3]
+        ['us-gaap_AccountsPayableCurrent', ...]
+        >>> table['us-gaap_Assets']
+        ConceptSchema(name='us-gaap_Assets', prefix='us-gaap', ...)
+    """
+    
+    __slots__ = ('names', 'ids', 'categories', 'codes', 'abstract', 'nillable', '_index', '_indexed')
+    
+    def __init__(self):
+        self.names: List[str] = []
+        self.ids: List[str] = []
+        self.categories: Dict[str, SymbolTable] = {column: SymbolTable() for column in CATEGORICAL_COLUMNS}
+        self.codes: Dict[str, array] = {column: array('h') for column in CATEGORICAL_COLUMNS}
+        self.abstract = array('B')
+        self.nillable = array('B')
+        # Name -> row, built on first lookup by name and extended with the
+        # rows appended since (the first _indexed rows are in the index)
+        self._index: Dict[str, int] = {}
+        self._indexed = 0
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._row_index()
+    
+    def __iter__(self) -> Iterator[ConceptSchema]:
+        for row in range(len(self.names)):
+            yield self.row(row)
+    
+    def __getitem__(self, key: int | str) -> ConceptSchema:
+        """ConceptSchema view of a row, by position or by concept name."""
+        if isinstance(key, str):
+            return self.row(self._row_index()[key])
+        return self.row(key)
+    
+    def __getstate__(self) -> tuple:
+        return (
+            self.names,
+            self.ids,
+            {column: [table.name(i) for i in range(len(table))] for column, table in self.categories.items()},
+            self.codes,
+            self.abstract,
+            self.nillable,
+        )
+    
+    def __setstate__(self, state: tuple) -> None:
+        self.names, self.ids, categories, self.codes, self.abstract, self.nillable = state
+        self.categories = {}
+        for column, values in categories.items():
+            table = self.categories[column] = SymbolTable()
+            for value in values:
+                table.intern(value)
+        self._index = {}
+        self._indexed = 0
+    
+    def _row_index(self) -> Dict[str, int]:
+        names = self.names
+        if self._indexed != len(names):
+            index = self._index
+            for row in range(self._indexed, len(names)):
+                index[names[row]] = row
+            self._indexed = len(names)
+        return self._index
+    
+    def append(
+        self,
+        name: str,
+        prefix: Optional[str] = None,
+        id: str = '',
+        type: str = '',
+        period_type: Optional[str] = None,
+        balance: Optional[str] = None,
+        abstract: bool = False,
+        substitution_group: str = '',
+        nillable: bool = True,
+    ) -> None:
+        """Add one concept (same fields as ConceptSchema)."""
+        self.names.append(name)
+        self.ids.append(id)
+        for column, value in (
+            ('prefix', prefix),
+            ('type', type),
+            ('period_type', period_type),
+            ('balance', balance),
+            ('substitution_group', substitution_group),
+        ):
+            self.codes[column].append(-1 if value is None else self.categories[column].intern(value))
+        self.abstract.append(bool(abstract))
+        self.nillable.append(bool(nillable))
+    
+    @classmethod
+    def from_schemas(cls, schemas: Iterable[ConceptSchema]) -> 'ConceptSchemaTable':
+        """Build a table from ConceptSchema objects (e.g. parse_schema())."""
+        table = cls()
+        for s in schemas:
+            table.append(
+                s.name, s.prefix, s.id, s.type, s.period_type, s.balance,
+                s.abstract, s.substitution_group, s.nillable,
+            )
+        return table
+    
+    def read(
+        self,
+        schema_path: Source,
+        prefix: Optional[str] = None,
+        include_abstract: bool = True,
+        engine: str = 'etree',
+    ) -> 'ConceptSchemaTable':
+        """
+        Add the concepts of one schema, streamed straight into the columns.
+        
+        Args:
+            schema_path: Path to the .xsd schema file, a binary file object,
+                         or a ZipPath
+            prefix: Optional namespace prefix to keep (see parse_schema())
+            include_abstract: Keep abstract elements (default True: filter
+                              later with the is_abstract mask)
+            engine: Scanning engine, 'etree' (default) or 'expat'
+        
+        Returns:
+            self, for chaining
+        """
+        append = self.append
+        for name, current_prefix, values in _scan_schema(
+            schema_path, prefix=prefix, include_abstract=include_abstract, engine=engine,
+        ):
+            elem_id, _name, elem_type, abstract, nillable, substitution_group, period_type, balance = values
+            append(
+                name,
+                current_prefix,
+                elem_id or '',
+                elem_type or '',
+                period_type,
+                balance,
+                (abstract or 'false').lower() == 'true',
+                substitution_group or '',
+                (nillable or 'true').lower() == 'true',
+            )
+        return self
+    
+    # ------------------------------------------------------------------
+    # Row views
+    # ------------------------------------------------------------------
+    
+    def _value(self, column: str, row: int) -> Optional[str]:
+        code = self.codes[column][row]
+        return None if code < 0 else self.categories[column].name(code)
+    
+    def row(self, row: int) -> ConceptSchema:
+        """ConceptSchema of one row, built on demand."""
+        value = self._value
+        return ConceptSchema(
+            name=self.names[row],
+            prefix=value('prefix', row),
+            id=self.ids[row],
+            type=value('type', row) or '',
+            period_type=value('period_type', row),
+            balance=value('balance', row),
+            abstract=bool(self.abstract[row]),
+            substitution_group=value('substitution_group', row) or '',
+            nillable=bool(self.nillable[row]),
+        )
+    
+    def get(self, name: str, default: Optional[ConceptSchema] = None) -> Optional[ConceptSchema]:
+        """ConceptSchema of a concept, or default."""
+        row = self._row_index().get(name)
+        return default if row is None else self.row(row)
+    
+    # ------------------------------------------------------------------
+    # Vectorized predicates
+    # ------------------------------------------------------------------
+    
+    def _codes(self, column: str) -> 'np.ndarray':
+        return np.frombuffer(self.codes[column], dtype=np.int16)
+    
+    def category_mask(self, column: str, predicate: Callable[[str], bool]) -> 'np.ndarray':
+        """
+        Boolean mask of the rows whose value in a categorical column
+        satisfies predicate. The predicate runs once per distinct value;
+        rows without a value are False.
+        
+        Examples:
+            >>> per_share = table.category_mask('type', lambda t: 'perShare' in t)
+        """
+        table = self.categories[column]
+        # One extra False slot, picked by the -1 code of missing values
+        lookup = np.zeros(len(table) + 1, dtype=bool)
+        for code in range(len(table)):
+            lookup[code] = bool(predicate(table.name(code)))
+        return lookup[self._codes(column)]
+    
+    def _flags(self, values: array) -> 'np.ndarray':
+        return np.frombuffer(values, dtype=np.uint8).astype(bool)
+    
+    @property
+    def is_monetary(self) -> 'np.ndarray':
+        """Mask of monetary concepts."""
+        return self.category_mask('type', is_monetary_type)
+    
+    @property
+    def is_instant(self) -> 'np.ndarray':
+        """Mask of point-in-time (balance sheet) concepts."""
+        return self.category_mask('period_type', 'instant'.__eq__)
+    
+    @property
+    def is_duration(self) -> 'np.ndarray':
+        """Mask of period (income statement) concepts."""
+        return self.category_mask('period_type', 'duration'.__eq__)
+    
+    @property
+    def is_debit(self) -> 'np.ndarray':
+        """Mask of debit-balance concepts."""
+        return self.category_mask('balance', 'debit'.__eq__)
+    
+    @property
+    def is_credit(self) -> 'np.ndarray':
+        """Mask of credit-balance concepts."""
+        return self.category_mask('balance', 'credit'.__eq__)
+    
+    @property
+    def is_abstract(self) -> 'np.ndarray':
+        """Mask of abstract grouping elements."""
+        return self._flags(self.abstract)
+    
+    @property
+    def is_nillable(self) -> 'np.ndarray':
+        """Mask of nillable elements."""
+        return self._flags(self.nillable)
+    
+    @property
+    def is_usgaap(self) -> 'np.ndarray':
+        """Mask of US GAAP concepts (the prefix holds the part of the name before '_')."""
+        return self.category_mask('prefix', lambda p: p.startswith('us-gaap'))
+    
+    @property
+    def is_extension(self) -> 'np.ndarray':
+        """Mask of concepts outside the standard taxonomies (see ConceptSchema.is_extension)."""
+        mask = self.category_mask('prefix', lambda p: p.lower() not in STANDARD_PREFIXES)
+        # Rows with an empty or missing prefix fall back to the name
+        no_prefix = ~self.category_mask('prefix', bool)
+        for row in np.flatnonzero(no_prefix).tolist():
+            p = self.names[row].split('_')[0]
+            mask[row] = bool(p) and p.lower() not in STANDARD_PREFIXES
+        return mask
+    
+    # ------------------------------------------------------------------
+    # Selection and output
+    # ------------------------------------------------------------------
+    
+    def where(self, mask: 'np.ndarray') -> List[str]:
+        """Names of the rows selected by a boolean mask."""
+        names = self.names
+        return [names[row] for row in np.flatnonzero(mask).tolist()]
+    
+    def select(self, mask: 'np.ndarray') -> 'ConceptSchemaTable':
+        """New table with the rows selected by a boolean mask."""
+        rows = np.flatnonzero(mask)
+        result = ConceptSchemaTable()
+        result.names = [self.names[row] for row in rows.tolist()]
+        result.ids = [self.ids[row] for row in rows.tolist()]
+        # Same codes, but own tables: appending to the selection must not
+        # intern values into this table
+        result.categories = {column: table.copy() for column, table in self.categories.items()}
+        result.codes = {column: _take(codes, rows) for column, codes in self.codes.items()}
+        result.abstract = _take(self.abstract, rows)
+        result.nillable = _take(self.nillable, rows)
+        return result
+    
+    def to_dataframe(self):
+        """
+        Convert the table to a pandas DataFrame (SCHEMA_COLUMNS).
+        
+        prefix, type, period_type, balance and substitution_group are
+        categoricals; missing values are NaN.
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas is required for ConceptSchemaTable.to_dataframe()")
+        
+        columns = {'name': pd.Series(self.names, dtype=object), 'id': pd.Series(self.ids, dtype=object)}
+        for column in CATEGORICAL_COLUMNS:
+            table = self.categories[column]
+            columns[column] = pd.Categorical.from_codes(
+                self._codes(column).astype(np.int32),
+                [table.name(i) for i in range(len(table))],
+            )
+        columns['abstract'] = self.is_abstract
+        columns['nillable'] = self.is_nillable
+        return pd.DataFrame(columns, columns=SCHEMA_COLUMNS)
+
+
+def parse_schema_table(
+    schema_path: Source,
+    prefix: Optional[str] = None,
+    include_abstract: bool = True,
+    engine: str = 'etree',
+) -> ConceptSchemaTable:
+    """
+    Read a taxonomy schema into a ConceptSchemaTable.
+    
+    Args:
+        schema_path: Path to the .xsd schema file, a binary file object,
+                     or a ZipPath
+        prefix: Optional namespace prefix to keep (see parse_schema())
+        include_abstract: Keep abstract elements (default True)
+        engine: Scanning engine, 'etree' (default) or 'expat'
+    
+    Returns:
+        ConceptSchemaTable
+    
+    Examples:
+        >>> table = parse_schema_table('us-gaap-2020-01-31.xsd')
+        >>> income_statement = table.where(table.is_monetary & table.is_duration & ~table.is_abstract)
+        >>> table.to_dataframe().groupby('period_type', observed=True).size()
+    """
+    return ConceptSchemaTable().read(schema_path, prefix=prefix, include_abstract=include_abstract, engine=engine)
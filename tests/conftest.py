@@ -0,0 +1,114 @@
+"""
+Shared test setup: puts src on the path and builds synthetic XBRL files
+
+The test modules import the builders with ``from conftest import ...``,
+which also works when a module is run directly for its benchmark.
+"""
+
+import sys
+from pathlib import Path
+# Add src to path if running from repo root
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+
+DATA = Path(__file__).parent / 'data'
+
+LINK_ROLE = 'http://www.xbrl.org/2003/role/link'
+DISCLOSURE_REF = 'http://www.xbrl.org/2003/role/disclosureRef'
+
+LINKBASE_HEADER = (
+    "<?xml version='1.0' encoding='UTF-8'?>\n"
+    "<link:linkbase xmlns:link='http://www.xbrl.org/2003/linkbase' "
+    "xmlns:xlink='http://www.w3.org/1999/xlink' "
+    "xmlns:ref='http://www.xbrl.org/2006/ref' "
+    "xmlns:xbrldt='http://xbrl.org/2005/xbrldt'>\n"
+)
+LINKBASE_FOOTER = "</link:linkbase>\n"
+
+# Default arcrole of each kind of arc
+ARCROLES = {
+    'presentation': 'http://www.xbrl.org/2003/arcrole/parent-child',
+    'definition': 'http://xbrl.org/int/dim/arcrole/domain-member',
+    'calculation': 'http://www.xbrl.org/2003/arcrole/summation-item',
+    'label': 'http://www.xbrl.org/2003/arcrole/concept-label',
+    'reference': 'http://www.xbrl.org/2003/arcrole/concept-reference',
+}
+
+
+def linkbase(*links: str) -> str:
+    """A complete linkbase document holding the given extended links."""
+    return LINKBASE_HEADER + ''.join(links) + LINKBASE_FOOTER
+
+
+def link(kind: str, role: str, *content: str) -> str:
+    """An extended link, e.g. kind='calculation' for link:calculationLink."""
+    return (
+        f"<link:{kind}Link xlink:type='extended' xlink:role='{role}'>\n"
+        + ''.join(content) + f"</link:{kind}Link>\n"
+    )
+
+
+def loc(label: str, concept: str) -> str:
+    return f"<link:loc xlink:type='locator' xlink:href='ex.xsd#{concept}' xlink:label='{label}'/>\n"
+
+
+def arc(kind: str, frm: str, to: str, arcrole: str | None = None, **attrs) -> str:
+    """
+    A link:<kind>Arc. The arcrole defaults to the standard one of the kind.
+    Keyword attributes are written as given; a leading 'xbrldt_' becomes
+    the xbrldt: prefix.
+    """
+    arcrole = arcrole or ARCROLES[kind]
+    extra = ''.join(
+        f" {name.replace('xbrldt_', 'xbrldt:', 1)}='{value}'" for name, value in attrs.items()
+    )
+    return (
+        f"<link:{kind}Arc xlink:type='arc' xlink:arcrole='{arcrole}' "
+        f"xlink:from='{frm}' xlink:to='{to}'{extra}/>\n"
+    )
+
+
+def label(label_id: str, role: str | None, lang: str | None, text: str) -> str:
+    attrs = f" xlink:role='{role}'" if role else ''
+    if lang:
+        attrs += f" xml:lang='{lang}'"
+    return (
+        f"<link:label xlink:type='resource' xlink:label='{label_id}'{attrs}>"
+        f"{text}</link:label>\n"
+    )
+
+
+def reference(label_id: str, role: str = DISCLOSURE_REF, **parts: str) -> str:
+    """A link:reference with one ref: part per keyword, in order."""
+    body = ''.join(f"<ref:{name}>{value}</ref:{name}>" for name, value in parts.items())
+    return (
+        f"<link:reference xlink:type='resource' xlink:label='{label_id}' xlink:role='{role}'>"
+        f"{body}</link:reference>\n"
+    )
+
+
+def schema_header(target_namespace: str = 'http://fasb.org/us-gaap/2020-01-31') -> str:
+    return (
+        "<?xml version='1.0' encoding='UTF-8'?>\n"
+        "<xs:schema xmlns:xs='http://www.w3.org/2001/XMLSchema' "
+        "xmlns:xbrli='http://www.xbrl.org/2003/instance' "
+        f"targetNamespace='{target_namespace}'>\n"
+    )
+
+
+SCHEMA_FOOTER = "</xs:schema>\n"
+
+
+def element(name: str, type_: str = 'xbrli:monetaryItemType', period: str | None = 'instant',
+            balance: str | None = None, abstract: bool = False, prefix: str = 'us-gaap',
+            with_id: bool = True) -> str:
+    attrs = f"name='{name}' type='{type_}' substitutionGroup='xbrli:item' nillable='true'"
+    if with_id:
+        attrs += f" id='{prefix}_{name}'"
+    if period:
+        attrs += f" xbrli:periodType='{period}'"
+    if balance:
+        attrs += f" xbrli:balance='{balance}'"
+    if abstract:
+        attrs += " abstract='true'"
+    return f"<xs:element {attrs}/>\n"
@@ -0,0 +1,199 @@
+"""
+Tests for the batch filing pipeline (batch.pipeline)
+
+Run the benchmark with: python tests/test_batch.py
+"""
+
+import json
+import shutil
+import time
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from conftest import DATA
+from leanrl import Filing, run_batch
+from leanrl.batch import CHECKPOINT_FILE, extract_filing, find_instance, iter_filings
+from leanrl.batch import pipeline
+
+
+def make_mirror(root: Path, n_per_quarter: int = 2) -> Path:
+    """A mirror of filing archives: native instances in 2023/QTR1, inline in 2023/QTR2."""
+    for quarter, document in (('QTR1', 'sample_instance.xml'), ('QTR2', 'sample_inline.htm')):
+        folder = root / '2023' / quarter
+        folder.mkdir(parents=True, exist_ok=True)
+        for i in range(n_per_quarter):
+            with zipfile.ZipFile(folder / f'000032019323{quarter}{i:04d}.zip', 'w', zipfile.ZIP_DEFLATED) as zf:
+                zf.writestr('ex-20230930_lab.xml', '<link:linkbase xmlns:link="http://www.xbrl.org/2003/linkbase"/>')
+                zf.write(DATA / document, f'ex-20230930{Path(document).suffix}')
+    return root
+
+
+def taxonomy_table() -> pd.DataFrame:
+    """Stand-in for load_taxonomy() (module level, so workers can unpickle it)."""
+    return pd.DataFrame({
+        'concept': ['us-gaap_Revenues', 'us-gaap_Assets'],
+        'label': ['Revenues', 'Assets'],
+        'balance': ['credit', 'debit'],
+        'period_type': ['duration', 'instant'],
+    }).set_index('concept')
+
+
+def read_dataset(output: Path) -> pd.DataFrame:
+    frames = []
+    for path in sorted(output.glob('partition=*/part-*.csv')):
+        df = pd.read_csv(path)
+        df['partition'] = path.parent.name.split('=', 1)[1]
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_iter_filings(tmp_path):
+    mirror = make_mirror(tmp_path / 'mirror', 1)
+    filings = list(iter_filings(mirror))
+    assert [(f.filing_id, f.partition) for f in filings] == [
+        ('000032019323QTR10000', '2023-QTR1'),
+        ('000032019323QTR20000', '2023-QTR2'),
+    ]
+    
+    manifest = tmp_path / 'manifest.csv'
+    manifest.write_text('path,partition\nmirror/2023/QTR1/000032019323QTR10000.zip,q1\n')
+    assert list(iter_filings(manifest)) == [Filing(str(filings[0].path), filings[0].filing_id, 'q1')]
+    manifest = tmp_path / 'manifest.jsonl'
+    manifest.write_text(json.dumps({'path': filings[1].path, 'filing_id': 'x'}) + '\n')
+    assert [(f.filing_id, f.partition) for f in iter_filings(manifest)] == [('x', 'default')]
+
+
+def test_find_and_extract(tmp_path):
+    mirror = make_mirror(tmp_path, 1)
+    native, inline = (Path(f.path) for f in iter_filings(mirror))
+    assert find_instance(native)[1] == 'instance'
+    document, kind = find_instance(inline)
+    assert kind == 'inline' and document.name == 'ex-20230930.htm'
+    assert find_instance(DATA / 'sample_instance.xml')[1] == 'instance'
+    with pytest.raises(FileNotFoundError):
+        find_instance(DATA / 'sample_calculation.xml')
+    
+    df = extract_filing(native, taxonomy=taxonomy_table())
+    assert df['filing_id'].unique().tolist() == [native.stem]
+    assert df.loc[df.fact_id == 'f2', 'label'].item() == 'Revenues'
+    assert df.loc[df.fact_id == 'f3', 'dimensions'].item() == (
+        'srt_ProductOrServiceAxis=us-gaap_ProductMember;'
+        'us-gaap_StatementBusinessSegmentsAxis=ex_AmericasSegmentMember'
+    )
+    # Same name as a fact column: prefixed
+    assert df.loc[df.fact_id == 'f4', ['period_type', 'concept_period_type']].values.tolist() == [['instant', 'instant']]
+    assert 'data_type' not in df.columns  # Not in this taxonomy table
+
+
+def test_find_instance_closes_archive_on_error(tmp_path, monkeypatch):
+    mirror = make_mirror(tmp_path, 1)
+    native = Path(next(iter_filings(mirror)).path)
+    closed = []
+    real_close = pipeline.ZipFS.close
+    
+    def close(fs):
+        closed.append(fs.archive)
+        real_close(fs)
+    
+    def unreadable(path):
+        raise OSError(f"Unreadable member: {path}")
+    
+    monkeypatch.setattr(pipeline.ZipFS, 'close', close)
+    monkeypatch.setattr(pipeline, '_sniff', unreadable)
+    with pytest.raises(OSError):
+        find_instance(native)
+    assert closed == [str(native)]
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_run_batch(tmp_path, workers):
+    mirror = make_mirror(tmp_path / 'mirror')
+    output = tmp_path / 'out'
+    result = run_batch(mirror, output, workers=workers, taxonomy=taxonomy_table, format='csv')
+    
+    assert (result.processed, result.skipped, result.failed) == (4, 0, {})
+    assert sorted(p.name for p in output.iterdir()) == [CHECKPOINT_FILE, 'partition=2023-QTR1', 'partition=2023-QTR2']
+    df = read_dataset(output)
+    assert len(df) == result.rows == 2 * 9 + 2 * 14
+    assert df.groupby('partition')['filing_id'].nunique().to_dict() == {'2023-QTR1': 2, '2023-QTR2': 2}
+    assert set(df.loc[df.concept == 'us-gaap_Revenues', 'label']) == {'Revenues'}
+    
+    # A second run has nothing left to do
+    again = run_batch(mirror, output, workers=workers, format='csv')
+    assert (again.processed, again.skipped, again.rows) == (0, 4, 0)
+
+
+def test_resume_after_crash(tmp_path, monkeypatch):
+    mirror = make_mirror(tmp_path / 'mirror', 3)
+    output = tmp_path / 'out'
+    
+    # Crash while processing the fourth filing, after one part file is written
+    real = pipeline._process_filing
+    calls = []
+    def crashing(filing):
+        calls.append(filing.filing_id)
+        if len(calls) == 4:
+            raise KeyboardInterrupt
+        return real(filing)
+    monkeypatch.setattr(pipeline, '_process_filing', crashing)
+    with pytest.raises(KeyboardInterrupt):
+        run_batch(mirror, output, format='csv', rows_per_file=1)
+    written = read_dataset(output)
+    assert written['filing_id'].nunique() == 3
+    # A part file that was written but never recorded is discarded on resume
+    orphan = output / 'partition=2023-QTR1' / 'part-00099.csv'
+    orphan.write_text('filing_id\nghost\n')
+    
+    monkeypatch.setattr(pipeline, '_process_filing', real)
+    result = run_batch(mirror, output, format='csv')
+    assert (result.processed, result.skipped) == (3, 3)
+    assert not orphan.exists()
+    df = read_dataset(output)
+    assert df['filing_id'].nunique() == 6
+    assert len(df) == 3 * 9 + 3 * 14  # No duplicates
+
+
+def test_failures_are_recorded(tmp_path):
+    mirror = make_mirror(tmp_path / 'mirror', 1)
+    bad = mirror / '2023' / 'QTR1' / 'broken.zip'
+    with zipfile.ZipFile(bad, 'w') as zf:
+        zf.writestr('readme.txt', 'no instance here')
+    output = tmp_path / 'out'
+    
+    result = run_batch(mirror, output, format='csv')
+    assert list(result.failed) == ['broken'] and 'FileNotFoundError' in result.failed['broken']
+    assert result.processed == 3
+    # Failed filings are not retried unless asked
+    assert run_batch(mirror, output, format='csv').skipped == 3
+    assert run_batch(mirror, output, format='csv', retry_failed=True).failed.keys() == {'broken'}
+
+
+def test_parquet(tmp_path):
+    pytest.importorskip('pyarrow')
+    mirror = make_mirror(tmp_path / 'mirror', 1)
+    result = run_batch(mirror, tmp_path / 'out', workers=2)
+    assert all(p.suffix == '.parquet' for p in result.files)
+    df = pd.read_parquet(tmp_path / 'out')
+    assert len(df) == result.rows and set(df['partition']) == {'2023-QTR1', '2023-QTR2'}
+
+
+def benchmark(n_filings: int = 200, workers: int = 4) -> None:
+    """Time run_batch on a generated mirror, in-process and with worker processes."""
+    import tempfile
+    with tempfile.TemporaryDirectory() as d:
+        mirror = make_mirror(Path(d) / 'mirror', n_filings // 2)
+        for label, kwargs in (('in process', {}), (f'{workers} workers', {'workers': workers})):
+            output = Path(d) / 'out'
+            shutil.rmtree(output, ignore_errors=True)
+            start = time.perf_counter()
+            result = run_batch(mirror, output, format='csv', taxonomy=taxonomy_table, **kwargs)
+            elapsed = time.perf_counter() - start
+            print(f"{label:>10}: {result.processed} filings, {result.rows:,} rows in "
+                  f"{elapsed:.2f} s ({result.processed / elapsed:.0f} filings/s)")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,89 @@
+"""
+Tests for parallel build_stm_dis_trees (taxonomy.helper)
+
+Builds a synthetic taxonomy folder (stm/, dis/, elts/) and checks that
+workers= gives exactly the sequential result.
+
+Run the scaling benchmark with: python tests/test_build_trees.py
+"""
+
+import pickle
+import random
+import time
+from pathlib import Path
+
+from conftest import arc, link, linkbase, loc
+from leanrl import build_stm_dis_trees, compact_tree, parse_definition_linkbase
+
+
+LINKS = {'def': 'definition', 'pre': 'presentation'}
+
+
+def write_linkbase(path: Path, kind: str, n: int, seed: int) -> None:
+    """Write a def/pre linkbase holding one random tree of n concepts."""
+    rng = random.Random(seed)
+    kind = LINKS[kind]
+    content = [loc(f'loc_{i}', f'us-gaap_C{seed}x{i}') for i in range(n)]
+    for i in range(1, n):
+        parent = rng.randrange(max(0, i - 50), i)
+        content.append(arc(kind, f'loc_{parent}', f'loc_{i}', order=rng.randint(1, 20)))
+    path.write_text(
+        linkbase(link(kind, f'http://example.com/role/{seed}', *content)), encoding='utf-8',
+    )
+
+
+def make_taxonomy(base: Path, n_files: int, n_concepts: int, kind: str = 'def') -> Path:
+    """Synthetic taxonomy folder with n_files statement/disclosure linkbases."""
+    for sub in ('stm', 'dis', 'elts'):
+        (base / sub).mkdir(parents=True, exist_ok=True)
+    for i in range(n_files):
+        if i % 2:
+            path = base / 'dis' / f'us-gaap-dis-d{i}-{kind}-2020-01-31.xml'
+        else:
+            path = base / 'stm' / f'us-gaap-stm-soi{i}-{kind}-2020-01-31.xml'
+        write_linkbase(path, kind, n_concepts, seed=i)
+    return base
+
+
+def test_workers_match_sequential(tmp_path):
+    base = make_taxonomy(tmp_path / 'tax', n_files=6, n_concepts=200)
+    
+    sequential = build_stm_dis_trees(str(base), tree_type='def')
+    parallel = build_stm_dis_trees(str(base), tree_type='def', workers=2)
+    
+    assert len(sequential) == 6
+    assert list(parallel) == list(sequential)
+    for key, tree in sequential.items():
+        assert parallel[key] == tree
+        assert parallel[key].print_tree() == tree.print_tree()
+
+
+def test_compact_tree_pickles_small(tmp_path):
+    xml_file = tmp_path / 'def.xml'
+    write_linkbase(xml_file, 'def', 2_000, seed=1)
+    tree = parse_definition_linkbase(str(xml_file))
+    compact = compact_tree(tree)
+    
+    restored = pickle.loads(pickle.dumps(compact))
+    assert restored.to_tree() == tree
+    assert len(pickle.dumps(compact)) < len(pickle.dumps(tree)) * 0.75
+
+
+def benchmark(n_files: int = 64, n_concepts: int = 3_000) -> None:
+    """Print build time for 1, 2, 4 and 8 workers on a synthetic taxonomy."""
+    import os
+    import tempfile
+    with tempfile.TemporaryDirectory() as d:
+        base = make_taxonomy(Path(d) / 'tax', n_files, n_concepts)
+        print(f"{n_files} files x {n_concepts:,} concepts, {os.cpu_count()} CPUs")
+        baseline = None
+        for workers in (1, 2, 4, 8):
+            start = time.perf_counter()
+            build_stm_dis_trees(str(base), tree_type='def', workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"workers={workers}: {elapsed:6.2f} s ({baseline / elapsed:.2f}x)")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,143 @@
+"""
+Tests for the persistent artifact cache (core.cache)
+
+Run the cold/warm benchmark with: python tests/test_cache.py
+"""
+
+import contextlib
+import io
+import os
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+
+# Puts src on the path when run directly
+import conftest  # noqa: F401
+import leanrl
+from leanrl import ArtifactCache, ZipFS, build_stm_dis_trees
+from leanrl.taxonomy import helper
+from test_build_trees import make_taxonomy
+
+
+def test_round_trip(tmp_path):
+    source = tmp_path / 'a.xml'
+    source.write_bytes(b'<a/>')
+    cache = ArtifactCache(tmp_path / 'cache')
+    key = cache.key(source, 'labels')
+    
+    assert cache.get(key) is None
+    cache.put(key, {'us-gaap_Assets': 'Assets'})
+    assert cache.get(key) == {'us-gaap_Assets': 'Assets'}
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(cache) == 1
+    
+    # The kind and the content are part of the key, the file name is not
+    assert cache.key(source, 'docs') != key
+    copy = tmp_path / 'b.xml'
+    copy.write_bytes(b'<a/>')
+    assert cache.key(copy, 'labels') == key
+    source.write_bytes(b'<b/>')
+    assert cache.key(source, 'labels') != key
+    
+    # A fresh instance reuses the stored fingerprints
+    assert ArtifactCache(tmp_path / 'cache').key(copy, 'labels') == key
+
+
+def test_key_includes_version(tmp_path, monkeypatch):
+    source = tmp_path / 'a.xml'
+    source.write_bytes(b'<a/>')
+    cache = ArtifactCache(tmp_path / 'cache')
+    key = cache.key(source, 'labels')
+    
+    monkeypatch.setattr(leanrl, '__version__', '99.0')
+    assert cache.key(source, 'labels') != key
+
+
+def test_zip_members_use_crc(tmp_path):
+    archive = tmp_path / 't.zip'
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('t/a.xml', b'<a/>')
+        zf.writestr('t/b.xml', b'<a/>')
+    source = tmp_path / 'a.xml'
+    source.write_bytes(b'<a/>')
+    cache = ArtifactCache(tmp_path / 'cache')
+    fs = ZipFS(archive)
+    
+    assert cache.key(fs.path('t/a.xml'), 'labels') == cache.key(fs.path('t/b.xml'), 'labels')
+    assert cache.fingerprint(fs.path('t/a.xml')).startswith('zip-crc32:')
+    with pytest.raises(TypeError):
+        cache.key(io.BytesIO(b'<a/>'), 'labels')
+
+
+def test_lru_eviction(tmp_path):
+    cache = ArtifactCache(tmp_path / 'cache', max_bytes=10_000)
+    blob = b'x' * 3_000
+    for i, name in enumerate('abc'):
+        cache.put(name, blob)
+        # Deterministic, well separated use times
+        os.utime(cache.directory / f'{name}.pkl', ns=(i * 10**9, i * 10**9))
+    
+    assert cache.get('a') == blob  # 'a' is now the most recently used
+    cache.put('d', blob)
+    
+    assert cache.get('b') is None
+    assert all(cache.get(name) == blob for name in 'acd')
+    assert cache.size <= 10_000
+    
+    assert cache.evict(max_bytes=0) == 3
+    assert len(cache) == 0
+
+
+def test_corrupt_entry_is_dropped(tmp_path):
+    cache = ArtifactCache(tmp_path / 'cache')
+    (cache.directory / 'bad.pkl').write_bytes(b'not a pickle')
+    
+    assert cache.get('bad') is None
+    assert not (cache.directory / 'bad.pkl').exists()
+
+
+def test_warm_trees_skip_parsing(tmp_path, monkeypatch):
+    base = make_taxonomy(tmp_path / 'tax', n_files=4, n_concepts=100, kind='pre')
+    expected = build_stm_dis_trees(str(base), tree_type='pre')
+    cache = ArtifactCache(tmp_path / 'cache')
+    
+    cold = build_stm_dis_trees(str(base), tree_type='pre', cache=cache)
+    assert len(cache) == 4
+    
+    def fail(*args, **kwargs):
+        raise AssertionError('parsed despite a warm cache')
+    monkeypatch.setattr(helper, '_parse_tree_file', fail)
+    warm = build_stm_dis_trees(str(base), tree_type='pre', cache=cache)
+    
+    assert cache.hits == 4
+    for trees in (cold, warm):
+        assert list(trees) == list(expected)
+        for key, tree in expected.items():
+            assert trees[key] == tree
+            assert trees[key].print_tree() == tree.print_tree()
+
+
+def benchmark(n_files: int = 64, n_concepts: int = 3_000) -> None:
+    """Print cold and warm build_stm_dis_trees times with a cache directory."""
+    import tempfile
+    with tempfile.TemporaryDirectory() as d:
+        base = make_taxonomy(Path(d) / 'tax', n_files, n_concepts)
+        cache = ArtifactCache(Path(d) / 'cache')
+        print(f"{n_files} files x {n_concepts:,} concepts")
+        for label, kwargs in (
+            ('no cache', {}),
+            ('cold    ', {'cache': cache}),
+            ('warm    ', {'cache': cache}),
+            ('warm    ', {'cache': ArtifactCache(cache.directory)}),
+        ):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_stm_dis_trees(str(base), tree_type='def', **kwargs)
+            print(f"{label}: {time.perf_counter() - start:6.3f} s")
+        print(f"cache: {len(cache)} entries, {cache.size:,} B")
+
+
+if __name__ == '__main__':
+    benchmark()
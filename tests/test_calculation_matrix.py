@@ -0,0 +1,150 @@
+"""
+Tests for vectorized calculation validation (linkbases.calculation_matrix)
+
+Run the benchmark with: python tests/test_calculation_matrix.py
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import DATA
+from leanrl import compile_calculation_tree, facts_to_matrix, parse_calculation_linkbase, parse_instance
+from leanrl.linkbases import calculation_matrix
+
+
+OPEX = 'us-gaap_OperatingCostsAndExpenses'
+RND = 'us-gaap_ResearchAndDevelopmentExpense'
+
+
+@pytest.fixture
+def tree():
+    return parse_calculation_linkbase(str(DATA / 'sample_calculation.xml'))
+
+
+def random_values(matrix, n_rows: int, seed: int = 0, missing: float = 0.1) -> np.ndarray:
+    """Consistent sums with some broken and some unreported values."""
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 1000, size=(n_rows, len(matrix.concepts))).astype(float)
+    # Make every sum consistent (a few passes, so nested sums settle)
+    for _ in range(8):
+        for i in range(len(matrix)):
+            children = slice(matrix.indptr[i], matrix.indptr[i + 1])
+            values[:, matrix.parent_columns[i]] = values[:, matrix.indices[children]] @ matrix.weights[children]
+    broken = rng.random(values.shape) < 0.05
+    values[broken] += 7
+    values[rng.random(values.shape) < missing] = np.nan
+    return values
+
+
+@pytest.fixture(params=['numpy', 'scipy'])
+def backend(request, monkeypatch):
+    if request.param == 'scipy':
+        pytest.importorskip('scipy')
+    else:
+        monkeypatch.setattr(calculation_matrix, '_sparse', lambda: None)
+    return request.param
+
+
+def test_compile(tree):
+    matrix = compile_calculation_tree(tree, concepts=['us-gaap_Revenues', 'x_Extra'])
+    assert matrix.concepts[:2] == ['us-gaap_Revenues', 'x_Extra']
+    assert set(matrix.concepts) == set(tree.nodes) | {'x_Extra'}
+    assert set(matrix.parents) == {c for c, node in tree.nodes.items() if node.children}
+    i = matrix.parents.index('us-gaap_NetIncomeLoss')
+    children = slice(matrix.indptr[i], matrix.indptr[i + 1])
+    assert {matrix.concepts[c]: w for c, w in zip(matrix.indices[children], matrix.weights[children])} == \
+        tree.get_components('us-gaap_NetIncomeLoss')
+
+
+def test_matches_validate_calculation(tree, backend):
+    matrix = compile_calculation_tree(tree)
+    values = random_values(matrix, 300)
+    result = matrix.validate(values, only_inconsistent=False)
+    
+    expected = {}
+    for row in range(len(values)):
+        facts = {c: values[row, j] for j, c in enumerate(matrix.concepts) if not np.isnan(values[row, j])}
+        for parent in matrix.parents:
+            check = tree.validate_calculation(parent, facts)
+            if check is not None:
+                expected[(row, parent)] = check
+    
+    got = {
+        (r.row, r.parent): (r.consistent, r.computed, r.reported)
+        for r in result.itertuples()
+    }
+    assert got.keys() == expected.keys()
+    for key, (valid, computed, actual) in expected.items():
+        assert got[key][0] == valid
+        assert got[key][1] == pytest.approx(computed) and got[key][2] == actual
+    assert 0 < (~result['consistent']).sum() < len(result)
+    assert len(matrix.validate(values)) == (~result['consistent']).sum()
+
+
+def test_decimals_tolerance(tree, backend):
+    matrix = compile_calculation_tree(tree)
+    values = np.full((2, len(matrix.concepts)), np.nan)
+    for concept, value in {
+        RND: 16e6,
+        'us-gaap_ResearchAndDevelopmentExpenseExcludingAcquiredInProcessCost': 10e6,
+        'us-gaap_ResearchAndDevelopmentExpenseSoftwareExcludingAcquiredInProcessCost': 5e6,
+        'us-gaap_ResearchAndDevelopmentInProcess': 2e6,
+    }.items():
+        values[:, matrix.column(concept)] = value
+    decimals = np.full_like(values, -6)
+    decimals[1] = np.inf  # Exact values: the 1M difference is an error
+    
+    result = matrix.validate(values, decimals, rows=['rounded', 'exact'], only_inconsistent=False)
+    assert result.set_index('row')['consistent'].to_dict() == {'rounded': True, 'exact': False}
+    # 0.5M for the parent + 3 x 0.5M for the children
+    assert result.loc[result.row == 'rounded', 'tolerance'].item() == 2e6
+    assert result.loc[result.row == 'exact', 'tolerance'].item() == 0.01
+    
+    # Unreported children: skipped, or counted as zero
+    values[:, matrix.column('us-gaap_ResearchAndDevelopmentInProcess')] = np.nan
+    assert matrix.validate(values, only_inconsistent=False).empty
+    zero = matrix.validate(values, missing='zero', only_inconsistent=False)
+    assert zero['computed'].tolist() == [15e6, 15e6]
+
+
+def test_facts_to_matrix(tree):
+    df = parse_instance(DATA / 'sample_instance.xml').to_dataframe()
+    df = pd.concat([df.assign(filing_id='a'), df.assign(filing_id='b')], ignore_index=True)
+    matrix = compile_calculation_tree(tree)
+    values, decimals, rows = facts_to_matrix(df, matrix.concepts, by=['filing_id', 'context_id'])
+    
+    revenues = matrix.column('us-gaap_Revenues')
+    assert list(rows) == [(f, c) for f in 'ab' for c in ('FY2023', 'FY2023_Americas_Products', 'FY2022_Typed')]
+    assert values[:, revenues].tolist() == [383285e6, 109458e6, 394328e6] * 2
+    assert (decimals[:, revenues] == -6).all()
+    assert np.isnan(np.delete(values, revenues, axis=1)).all()
+
+
+def benchmark(n_rows: int = 100_000) -> None:
+    """Vectorized validate() vs a Python loop over validate_calculation()."""
+    tree = parse_calculation_linkbase(str(DATA / 'us-gaap-stm-soi-cal-2020-01-31.xml'))
+    matrix = compile_calculation_tree(tree)
+    values = random_values(matrix, n_rows, missing=0.02)
+    decimals = np.full_like(values, -3)
+    print(f"{len(matrix)} summations, {matrix.nnz} weights, {n_rows:,} rows")
+    
+    start = time.perf_counter()
+    result = matrix.validate(values, decimals)
+    vectorized = time.perf_counter() - start
+    print(f"validate()          : {vectorized:7.3f} s, {len(result):,} inconsistencies")
+    
+    sample = 2_000
+    start = time.perf_counter()
+    for row in values[:sample]:
+        facts = {c: v for c, v in zip(matrix.concepts, row) if v == v}
+        for parent in matrix.parents:
+            tree.validate_calculation(parent, facts)
+    loop = (time.perf_counter() - start) * n_rows / sample
+    print(f"validate_calculation: {loop:7.3f} s (extrapolated from {sample:,} rows) -> {loop / vectorized:.0f}x")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,230 @@
+"""
+Tests for the role-aware calculation network (linkbases.calculation)
+
+Run the benchmark with: python tests/test_calculation_network.py
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from conftest import DATA, arc, link, linkbase, loc
+from leanrl import (
+    CalculationHandler,
+    CalculationNetwork,
+    CalculationNetworkHandler,
+    StreamingParser,
+    get_calculation_dataframe,
+    parse_calculation_linkbase,
+    parse_calculation_network,
+)
+from leanrl.core import ENGINES
+from leanrl.linkbases import CalculationRelationship
+
+
+ROLE_IS = 'http://example.com/role/IncomeStatement'
+ROLE_SEG = 'http://example.com/role/SegmentDetails'
+
+
+# Revenues has a product breakdown in one role and a segment breakdown in
+# the other; Services contributes to Revenues and to RecurringRevenues.
+# Locator labels are link-local: 'l2' is Products in one link and
+# SegmentA in the other. In the second link the arcs come first.
+CAL_XML = linkbase(link(
+    'calculation', ROLE_IS,
+    loc('l1', 'ex_Revenues'), loc('l2', 'ex_Products'), loc('l3', 'ex_Services'),
+    loc('l4', 'ex_RecurringRevenues'), loc('l5', 'ex_Subscriptions'),
+    arc('calculation', 'l1', 'l3', order=2), arc('calculation', 'l1', 'l2', order=1),
+    arc('calculation', 'l4', 'l3', order=2), arc('calculation', 'l4', 'l5', order=1),
+    # Duplicate arc
+    arc('calculation', 'l1', 'l2', order=1),
+), link(
+    'calculation', ROLE_SEG,
+    arc('calculation', 'l1', 'l2', order=1), arc('calculation', 'l1', 'l3', order=2),
+    arc('calculation', 'l1', 'l6', weight=-1.0, order=3),
+    loc('l1', 'ex_Revenues'), loc('l2', 'ex_SegmentA'), loc('l3', 'ex_SegmentB'),
+    loc('l6', 'ex_Eliminations'),
+))
+
+
+@pytest.fixture
+def cal_file(tmp_path):
+    path = tmp_path / 'ex_cal.xml'
+    path.write_text(CAL_XML, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_network(cal_file, engine):
+    network = parse_calculation_network(cal_file, engine=engine)
+    assert network.roles == [ROLE_IS, ROLE_SEG]
+    assert len(network) == 7
+    assert network.get_summations('ex_Revenues') == {
+        ROLE_IS: [('ex_Products', 1.0), ('ex_Services', 1.0)],
+        ROLE_SEG: [('ex_SegmentA', 1.0), ('ex_SegmentB', 1.0), ('ex_Eliminations', -1.0)],
+    }
+    assert network.get_children('ex_RecurringRevenues', ROLE_IS) == [('ex_Subscriptions', 1.0), ('ex_Services', 1.0)]
+    assert network.get_children('ex_RecurringRevenues', ROLE_SEG) == []
+    assert [rel.parent for rel in network.get_parents('ex_Services')] == ['ex_Revenues', 'ex_RecurringRevenues']
+    assert network.get_parents('ex_Services', role=ROLE_SEG) == []
+    assert 'ex_Eliminations' in network and 'ex_RecurringRevenues' in network
+    assert 'ex_Other' not in network
+
+
+def test_role_filter(cal_file):
+    network = parse_calculation_network(cal_file, roles=ROLE_SEG)
+    assert network.roles == [ROLE_SEG]
+    assert all(rel.role == ROLE_SEG for rel in network.relationships())
+
+
+def test_role_views(cal_file):
+    network = parse_calculation_network(cal_file)
+    tree = network.tree(ROLE_SEG)
+    assert tree is network.tree(ROLE_SEG)
+    assert tree.role == ROLE_SEG
+    assert tree.roots == ['ex_Revenues']
+    assert tree.get_formula('ex_Revenues') == 'Revenues = SegmentA + SegmentB - Eliminations'
+    
+    income = network.trees()[ROLE_IS]
+    assert set(income.roots) == {'ex_Revenues', 'ex_RecurringRevenues'}
+    # Two parents in the same role: the first is `parent`, both are kept
+    assert income.get_parent('ex_Services') == 'ex_Revenues'
+    assert income.get_parents('ex_Services') == ['ex_Revenues', 'ex_RecurringRevenues']
+    
+    # Each breakdown is validated on its own
+    values = {
+        'ex_Revenues': 100, 'ex_Products': 60, 'ex_Services': 40,
+        'ex_SegmentA': 70, 'ex_SegmentB': 35, 'ex_Eliminations': 5,
+    }
+    assert network.validate_calculation('ex_Revenues', values) == {
+        ROLE_IS: (True, 100.0, 100),
+        ROLE_SEG: (True, 100.0, 100),
+    }
+    # The merged tree sums both breakdowns
+    merged = parse_calculation_linkbase(cal_file)
+    assert merged.validate_calculation('ex_Revenues', values)[0] is False
+
+
+def test_merged_tree(cal_file):
+    tree = parse_calculation_linkbase(cal_file)
+    assert tree.role is None
+    assert tree.get_children('ex_Revenues') == [
+        ('ex_Products', 1.0), ('ex_SegmentA', 1.0), ('ex_Services', 1.0),
+        ('ex_SegmentB', 1.0), ('ex_Eliminations', -1.0),
+    ]
+    # The first parent wins; later summations no longer overwrite it
+    assert tree.get_parent('ex_Services') == 'ex_Revenues'
+    assert tree.get_parents('ex_Services') == ['ex_Revenues', 'ex_RecurringRevenues']
+    
+    df = get_calculation_dataframe(parse_calculation_network(cal_file))
+    assert list(df.columns) == ['role', 'parent', 'child', 'weight', 'order']
+    assert len(df) == 7
+    assert df[df.child == 'ex_Services'].order.tolist() == [2.0, 2.0]
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_handlers_match_functions(tmp_path, engine):
+    # Both links use the labels 'p'/'c': A -> B in one, X -> Y in the other
+    path = tmp_path / 'reused_cal.xml'
+    path.write_text(linkbase(
+        link('calculation', ROLE_IS,
+             loc('p', 'ex_A'), loc('c', 'ex_B'), arc('calculation', 'p', 'c')),
+        link('calculation', ROLE_SEG,
+             loc('p', 'ex_X'), loc('c', 'ex_Y'), arc('calculation', 'p', 'c')),
+    ), encoding='utf-8')
+    
+    parser = StreamingParser(path, engine=engine)
+    parser.register(CalculationNetworkHandler())
+    parser.register(CalculationHandler())
+    network, tree = parser.parse()
+    
+    expected = parse_calculation_network(str(path), engine=engine)
+    assert list(network.relationships()) == list(expected.relationships())
+    assert network.get_children('ex_A', ROLE_IS) == [('ex_B', 1.0)]
+    assert network.get_children('ex_X', ROLE_SEG) == [('ex_Y', 1.0)]
+    
+    expected_tree = parse_calculation_linkbase(str(path), engine=engine)
+    assert tree.nodes == expected_tree.nodes
+    assert tree.get_children('ex_A') == [('ex_B', 1.0)]
+    assert tree.get_children('ex_X') == [('ex_Y', 1.0)]
+
+
+def test_multi_parent_child_order():
+    # Concepts with two parents used to sort under the last parent's order
+    tree = parse_calculation_linkbase(str(DATA / 'us-gaap-stm-scf-inv-cal-2020-01-31.xml'))
+    network = parse_calculation_network(str(DATA / 'us-gaap-stm-scf-inv-cal-2020-01-31.xml'))
+    multi = [c for c, node in tree.nodes.items() if len(node.parents) > 1]
+    assert multi
+    for (role, parent), children in network.summations.items():
+        assert [c for c, _ in tree.get_children(parent)] == [rel.child for rel in children]
+
+
+def test_add_deduplicates():
+    network = CalculationNetwork()
+    assert network.add(CalculationRelationship('A', 'B', order=2, role='r'))
+    assert network.add(CalculationRelationship('A', 'C', order=1, role='r'))
+    assert not network.add(CalculationRelationship('A', 'B', order=2, role='r'))
+    assert network.add(CalculationRelationship('A', 'B', role='other'))
+    assert network.get_children('A', 'r') == [('C', 1.0), ('B', 1.0)]
+    assert len(network) == 3
+
+
+def synthetic_calculation(path: Path, n_roles: int = 200, n_children: int = 400) -> Path:
+    """Extension-style calc file: every role breaks the same totals down again."""
+    links = []
+    for r in range(n_roles):
+        content = [loc('total', 'ex_Total'), loc('sub', f'ex_Subtotal{r % 10}')]
+        content += [loc(f'c{i}', f'ex_Item{i}') for i in range(n_children)]
+        content.append(arc('calculation', 'total', 'sub'))
+        content += [arc('calculation', 'sub', f'c{i}', order=i) for i in range(n_children)]
+        links.append(link('calculation', f'http://example.com/role/R{r}', *content))
+    path.write_text(linkbase(*links), encoding='utf-8')
+    return path
+
+
+def benchmark() -> None:
+    """Tree building with hashed adjacency vs. the former linear child scan."""
+    import tempfile
+    from leanrl.linkbases.calculation import CalculationNode, CalculationTree
+    
+    def old_build_tree(loc_map, arcs):
+        tree = CalculationTree()
+        for from_label, to_label, weight, order in arcs:
+            parent, child = loc_map[from_label], loc_map[to_label]
+            tree.nodes.setdefault(parent, CalculationNode(concept=parent))
+            tree.nodes.setdefault(child, CalculationNode(concept=child))
+            child_tuple = (child, weight)
+            if child_tuple not in tree.nodes[parent].children:
+                tree.nodes[parent].children.append(child_tuple)
+        return tree
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_file = str(synthetic_calculation(Path(tmp) / 'big_cal.xml'))
+        network = parse_calculation_network(xml_file)
+        arcs = [(r.parent, r.child, r.weight, r.order) for r in network.relationships()]
+        loc_map = {c: c for r in network.relationships() for c in (r.parent, r.child)}
+        print(f"{len(network.roles)} roles, {len(arcs):,} relationships")
+        
+        start = time.perf_counter()
+        old_build_tree(loc_map, arcs)
+        old = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        merged = CalculationNetwork()
+        for parent, child, weight, order in arcs:
+            merged.add(CalculationRelationship(parent, child, weight, order))
+        merged.to_tree()
+        new = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        parse_calculation_network(xml_file)
+        parse = time.perf_counter() - start
+    
+    print(f"linear child scan : {old:7.3f} s")
+    print(f"hashed adjacency  : {new:7.3f} s -> {old / new:.1f}x")
+    print(f"full parse        : {parse:7.3f} s")
+
+
+if __name__ == '__main__':
+    benchmark()
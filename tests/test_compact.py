@@ -0,0 +1,145 @@
+"""
+Tests for the array-backed CompactConceptTree (linkbases.compact)
+
+Checks that a compact tree answers every ConceptTree query identically
+on the def/pre linkbases in tests/data, and that it takes less memory.
+
+Run the memory benchmark with: python tests/test_compact.py
+"""
+
+import gc
+import pickle
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from conftest import DATA
+from leanrl import (
+    parse_definition_linkbase,
+    parse_presentation_linkbase,
+    compact_tree,
+)
+from leanrl.linkbases import SymbolTable
+
+
+PARSERS = {
+    'def': parse_definition_linkbase,
+    'pre': parse_presentation_linkbase,
+}
+
+
+def linkbase_files(kind: str) -> list[Path]:
+    return sorted(DATA.glob(f'us-gaap-*-{kind}-*.xml'))
+
+
+@pytest.mark.parametrize('kind', sorted(PARSERS))
+def test_compact_matches_tree(kind):
+    symbols = SymbolTable()
+    for xml_file in linkbase_files(kind):
+        tree = PARSERS[kind](str(xml_file))
+        compact = compact_tree(tree, symbols)
+        
+        assert len(compact) == len(tree)
+        assert compact.roots == tree.roots
+        assert compact.print_tree() == tree.print_tree()
+        assert compact.to_dict() == tree.to_dict()
+        
+        concepts = list(tree.nodes)
+        for concept in concepts:
+            assert concept in compact
+            assert compact.get_parent(concept) == tree.get_parent(concept)
+            assert compact.get_children(concept) == tree.get_children(concept)
+            assert compact.get_ancestor_path(concept) == tree.get_ancestor_path(concept)
+            assert compact.get_descendants(concept) == tree.get_descendants(concept)
+            assert compact.get_descendants(concept, max_depth=1) == tree.get_descendants(concept, max_depth=1)
+            assert compact.get_siblings(concept) == tree.get_siblings(concept)
+            assert compact.get_depth(concept) == tree.get_depth(concept)
+        
+        for a, b in zip(concepts, reversed(concepts)):
+            assert compact.find_common_ancestor(a, b) == tree.find_common_ancestor(a, b)
+        
+        compact.build_index()
+        for a, b in zip(concepts, reversed(concepts)):
+            assert compact.find_common_ancestor(a, b) == tree.find_common_ancestor(a, b)
+            assert compact.is_ancestor(a, b) == tree.is_ancestor(a, b)
+        
+        assert compact.get('us-gaap_NotAConcept') is None
+        assert compact.get_descendants('us-gaap_NotAConcept') is None
+
+
+def test_symbols_are_shared():
+    symbols = SymbolTable()
+    files = linkbase_files('pre')
+    trees = [compact_tree(parse_presentation_linkbase(str(f)), symbols) for f in files]
+    
+    distinct = set().union(*(set(t.nodes) for t in trees))
+    assert len(symbols) == len(distinct)
+    assert sum(len(t) for t in trees) >= len(symbols)
+
+
+def test_default_symbols_are_per_tree():
+    files = linkbase_files('pre')
+    trees = [compact_tree(parse_presentation_linkbase(str(f))) for f in files]
+    assert trees[0].symbols is not trees[1].symbols
+    assert all(len(t.symbols) == len(t) for t in trees)
+    
+    # Unpickled trees do not intern into any table outside themselves
+    restored = pickle.loads(pickle.dumps(trees))
+    assert restored[0].symbols is not restored[1].symbols
+    assert [len(t.symbols) for t in restored] == [len(t) for t in trees]
+    assert restored[0].print_tree() == trees[0].print_tree()
+
+
+def test_round_trip():
+    tree = parse_definition_linkbase(str(linkbase_files('def')[0]))
+    back = compact_tree(tree, SymbolTable()).to_tree()
+    
+    assert back.roots == tree.roots
+    assert back.print_tree() == tree.print_tree()
+
+
+def traced_size(build) -> int:
+    """Memory still held (per tracemalloc) by the object build() returns."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def _load_dict_trees() -> list:
+    return [PARSERS[kind](str(f)) for kind in PARSERS for f in linkbase_files(kind)]
+
+
+def _load_compact_trees() -> list:
+    symbols = SymbolTable()
+    trees = []
+    for kind in PARSERS:
+        for f in linkbase_files(kind):
+            trees.append(compact_tree(PARSERS[kind](str(f)), symbols))
+    return trees
+
+
+def test_compact_uses_less_memory():
+    assert traced_size(_load_compact_trees) < traced_size(_load_dict_trees) / 1.5
+
+
+def benchmark() -> None:
+    """Print memory held by all def/pre trees in tests/data, per representation."""
+    dict_size = traced_size(_load_dict_trees)
+    compact_size = traced_size(_load_compact_trees)
+    n_nodes = sum(len(t) for t in _load_dict_trees())
+    print(f"{n_nodes:,} nodes in {len(_load_dict_trees())} trees")
+    print(f"ConceptTree        : {dict_size:>12,} B ({dict_size / n_nodes:7.1f} B/node)")
+    print(f"CompactConceptTree : {compact_size:>12,} B ({compact_size / n_nodes:7.1f} B/node)")
+    print(f"ratio              : {dict_size / compact_size:.2f}x")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,179 @@
+"""
+Tests for the one-pass dimensional model (linkbases.dimensions)
+
+Run the benchmark with: python tests/test_dimensions.py
+"""
+
+import time
+
+import pytest
+
+from conftest import DATA, arc, link, linkbase, loc
+from leanrl import ArcRoles, parse_definition_linkbase, parse_dimensional_model
+from leanrl.core import ENGINES
+from leanrl.linkbases import DimensionalRelationship
+
+
+SOI_DEF = str(DATA / 'us-gaap-stm-soi-def-2020-01-31.xml')
+ROLE_SEG = 'http://example.com/role/Segments'
+ROLE_DOM = 'http://example.com/role/SegmentDomain'
+ROLE_DEF = 'http://example.com/role/Defaults'
+
+# Segment table: Revenues and Costs are line items, Costs excludes the
+# Elimination member (notAll). The domain of the axis lives in another
+# role (targetRole); Segment is a domain member declared unusable.
+DEF_XML = linkbase(link(
+    'definition', ROLE_SEG,
+    loc('li', 'ex_LineItems'), loc('rev', 'ex_Revenues'), loc('cost', 'ex_Costs'),
+    loc('tbl', 'ex_SegmentTable'), loc('ax', 'ex_SegmentAxis'), loc('dom', 'ex_SegmentDomain'),
+    loc('xtbl', 'ex_EliminationTable'), loc('xax', 'ex_SegmentAxis'),
+    loc('elim', 'ex_EliminationMember'),
+    arc('definition', 'li', 'tbl', ArcRoles.ALL,
+        xbrldt_closed='true', xbrldt_contextElement='segment'),
+    arc('definition', 'li', 'rev', ArcRoles.DOMAIN_MEMBER, order=1),
+    arc('definition', 'li', 'cost', ArcRoles.DOMAIN_MEMBER, order=2),
+    arc('definition', 'tbl', 'ax', ArcRoles.HYPERCUBE_DIMENSION),
+    arc('definition', 'ax', 'dom', ArcRoles.DIMENSION_DOMAIN, xbrldt_targetRole=ROLE_DOM),
+    arc('definition', 'cost', 'xtbl', ArcRoles.NOT_ALL, xbrldt_closed='false',
+        xbrldt_contextElement='segment', xbrldt_targetRole=ROLE_DOM),
+), link(
+    'definition', ROLE_DOM,
+    arc('definition', 'dom', 'seg', ArcRoles.DOMAIN_MEMBER, xbrldt_usable='false'),
+    arc('definition', 'seg', 'east', ArcRoles.DOMAIN_MEMBER, order=1),
+    arc('definition', 'seg', 'west', ArcRoles.DOMAIN_MEMBER, order=2),
+    arc('definition', 'dom', 'elim', ArcRoles.DOMAIN_MEMBER, order=2),
+    arc('definition', 'xtbl', 'xax', ArcRoles.HYPERCUBE_DIMENSION),
+    arc('definition', 'xax', 'elim', ArcRoles.DIMENSION_DOMAIN, xbrldt_usable='true'),
+    loc('dom', 'ex_SegmentDomain'), loc('seg', 'ex_Segment'), loc('east', 'ex_EastMember'),
+    loc('west', 'ex_WestMember'), loc('elim', 'ex_EliminationMember'),
+    loc('xtbl', 'ex_EliminationTable'), loc('xax', 'ex_SegmentAxis'),
+), link(
+    'definition', ROLE_DEF,
+    loc('ax', 'ex_SegmentAxis'), loc('dom', 'ex_SegmentDomain'),
+    arc('definition', 'ax', 'dom', ArcRoles.DIMENSION_DEFAULT),
+))
+
+
+@pytest.fixture
+def def_file(tmp_path):
+    path = tmp_path / 'ex_def.xml'
+    path.write_text(DEF_XML, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_model(def_file, engine):
+    model = parse_dimensional_model(def_file, engine=engine)
+    assert model.roles == [ROLE_SEG]
+    # Line items inherit the table of their LineItems abstract
+    assert model.tables('ex_Revenues') == ['ex_SegmentTable']
+    assert model.tables('ex_Costs') == ['ex_SegmentTable']
+    assert [rel.arcrole for rel in model.hypercubes('ex_Costs')] == [ArcRoles.NOT_ALL, ArcRoles.ALL]
+    assert model.tables('ex_Other') == []
+    
+    has_hypercube = model.hypercubes('ex_LineItems')[0]
+    assert has_hypercube.closed and has_hypercube.context_element == 'segment'
+    assert model.axes('ex_SegmentTable') == ['ex_SegmentAxis']
+    assert model.domains('ex_SegmentAxis', ROLE_SEG) == ['ex_SegmentDomain']
+    assert model.default('ex_SegmentAxis') == 'ex_SegmentDomain'
+    assert model.default('ex_OtherAxis') is None
+
+
+def test_member_closure(def_file):
+    model = parse_dimensional_model(def_file)
+    # Follows the targetRole; the unusable Segment is left out, its children are not
+    members = model.members('ex_SegmentAxis', ROLE_SEG)
+    assert members == ['ex_SegmentDomain', 'ex_EastMember', 'ex_WestMember', 'ex_EliminationMember']
+    assert model.members('ex_SegmentAxis', ROLE_DOM) == ['ex_EliminationMember']
+    assert model.is_member('ex_SegmentAxis', 'ex_WestMember', ROLE_SEG)
+    assert not model.is_member('ex_SegmentAxis', 'ex_Segment', ROLE_SEG)
+    # Memoized
+    assert model._member_set('ex_SegmentAxis', ROLE_SEG) is model._member_set('ex_SegmentAxis', ROLE_SEG)
+
+
+def test_is_valid(def_file):
+    model = parse_dimensional_model(def_file)
+    axis = 'ex_SegmentAxis'
+    assert model.is_valid('ex_Revenues')
+    assert model.is_valid('ex_Revenues', {axis: 'ex_EastMember'})
+    assert model.is_valid('ex_Revenues', {axis: 'ex_EliminationMember'})
+    assert not model.is_valid('ex_Revenues', {axis: 'ex_Segment'})
+    # Closed table: no other axes
+    assert not model.is_valid('ex_Revenues', {axis: 'ex_EastMember', 'ex_OtherAxis': 'ex_X'})
+    # notAll excludes eliminations for Costs only
+    assert model.is_valid('ex_Costs', {axis: 'ex_WestMember'})
+    assert not model.is_valid('ex_Costs', {axis: 'ex_EliminationMember'})
+    # No hypercube: no dimensional constraint
+    assert model.is_valid('ex_Other', {axis: 'ex_Anything'})
+
+
+def test_add_resets_memoized_results(def_file):
+    model = parse_dimensional_model(def_file)
+    assert not model.is_valid('ex_Revenues', {'ex_SegmentAxis': 'ex_NorthMember'})
+    assert model.add(DimensionalRelationship(
+        ArcRoles.DOMAIN_MEMBER, 'ex_Segment', 'ex_NorthMember', ROLE_DOM, order=3,
+    ))
+    assert not model.add(DimensionalRelationship(
+        ArcRoles.DOMAIN_MEMBER, 'ex_Segment', 'ex_NorthMember', ROLE_DOM, order=3,
+    ))
+    assert not model.add(DimensionalRelationship(ArcRoles.PARENT_CHILD, 'a', 'b'))
+    assert model.is_valid('ex_Revenues', {'ex_SegmentAxis': 'ex_NorthMember'})
+    assert model.members('ex_SegmentAxis', ROLE_SEG)[3] == 'ex_NorthMember'
+
+
+def test_us_gaap_statement():
+    model = parse_dimensional_model(SOI_DEF)
+    assert model.tables('us-gaap_Revenues') == ['us-gaap_StatementTable']
+    assert model.axes('us-gaap_StatementTable') == ['srt_RestatementAxis', 'srt_ProductOrServiceAxis']
+    assert model.default('srt_ProductOrServiceAxis') == 'srt_ProductsAndServicesDomain'
+    # Same members as the single-arcrole parse of domain-member arcs
+    tree = parse_definition_linkbase(SOI_DEF)
+    members = model.members('srt_ProductOrServiceAxis')
+    assert set(members[1:]) == set(tree.get_descendants('srt_ProductsAndServicesDomain'))
+    assert model.is_valid('us-gaap_Revenues', {'srt_ProductOrServiceAxis': 'us-gaap_ServiceMember'})
+    assert not model.is_valid('us-gaap_Revenues', {'us-gaap_StatementBusinessSegmentsAxis': 'x'})
+
+
+def benchmark(n_contexts: int = 200_000) -> None:
+    """One pass vs. one pass per arcrole, and memoized vs. fresh validation."""
+    arcroles = (
+        ArcRoles.ALL, ArcRoles.HYPERCUBE_DIMENSION, ArcRoles.DIMENSION_DOMAIN,
+        ArcRoles.DOMAIN_MEMBER, ArcRoles.DIMENSION_DEFAULT,
+    )
+    start = time.perf_counter()
+    for arcrole in arcroles:
+        parse_definition_linkbase(SOI_DEF, arcrole=arcrole)
+    per_arcrole = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    model = parse_dimensional_model(SOI_DEF)
+    one_pass = time.perf_counter() - start
+    
+    concepts = [c for c in parse_definition_linkbase(SOI_DEF).get_descendants('us-gaap_StatementLineItems')]
+    members = model.members('srt_ProductOrServiceAxis')
+    contexts = [
+        (concepts[i % len(concepts)], {'srt_ProductOrServiceAxis': members[i % len(members)]} if i % 3 else {})
+        for i in range(n_contexts)
+    ]
+    
+    start = time.perf_counter()
+    for concept, dims in contexts:
+        model.is_valid(concept, dims)
+    memoized = time.perf_counter() - start
+    
+    n_fresh = n_contexts // 100
+    start = time.perf_counter()
+    for concept, dims in contexts[:n_fresh]:
+        model._cache.clear()
+        model.is_valid(concept, dims)
+    fresh = (time.perf_counter() - start) * n_contexts / n_fresh
+    
+    print(f"{len(model):,} dimensional relationships, {len(concepts)} line items, {len(members)} members")
+    print(f"{len(arcroles)} passes, one arcrole each: {per_arcrole * 1e3:7.1f} ms")
+    print(f"one pass, every arcrole    : {one_pass * 1e3:7.1f} ms -> {per_arcrole / one_pass:.1f}x")
+    print(f"is_valid x {n_contexts:,}, memoized: {memoized:6.2f} s")
+    print(f"is_valid x {n_contexts:,}, re-walked: {fresh:6.2f} s (extrapolated) -> {fresh / memoized:.0f}x")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,249 @@
+"""
+Tests for ConceptTree (linkbases.hierarchy)
+
+Checks the AncestorIndex against the parent-pointer walks on the def/pre
+linkbases in tests/data.
+
+Run the benchmark with: python tests/test_hierarchy.py
+"""
+
+import io
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from conftest import DATA
+from leanrl import (
+    ConceptNode,
+    ConceptTree,
+    get_hierarchy_dataframe,
+    parse_definition_linkbase,
+    parse_presentation_linkbase,
+)
+from leanrl.linkbases import AncestorIndex
+
+
+PARSERS = {
+    'def': parse_definition_linkbase,
+    'pre': parse_presentation_linkbase,
+}
+
+
+def linkbase_files(kind: str) -> list[Path]:
+    return sorted(DATA.glob(f'us-gaap-*-{kind}-*.xml'))
+
+
+def make_tree(edges: list[tuple[str, str]]) -> ConceptTree:
+    """Build a ConceptTree from (parent, child) pairs, without depth/order."""
+    tree = ConceptTree()
+    for parent, child in edges:
+        for concept in (parent, child):
+            tree.nodes.setdefault(concept, ConceptNode(concept=concept))
+        tree.nodes[child].parent = parent
+        tree.nodes[parent].children.append(child)
+    children = {child for _, child in edges}
+    tree.roots = [c for c in tree.nodes if c not in children]
+    return tree
+
+
+@pytest.mark.parametrize('kind', sorted(PARSERS))
+def test_index_matches_walk(kind):
+    for xml_file in linkbase_files(kind):
+        tree = PARSERS[kind](str(xml_file))
+        concepts = list(tree.nodes)
+        
+        expected_paths = {c: tree.get_ancestor_path(c) for c in concepts}
+        pairs = list(zip(concepts, reversed(concepts))) + list(zip(concepts, concepts[1:]))
+        expected_lca = [tree.find_common_ancestor(a, b) for a, b in pairs]
+        expected_under = [tree.is_ancestor(a, b) for a, b in pairs]
+        
+        tree.build_index()
+        
+        for concept in concepts:
+            assert tree.get_ancestor_path(concept) == expected_paths[concept]
+            for ancestor in expected_paths[concept][:-1]:
+                assert tree.is_ancestor(ancestor, concept)
+                assert not tree.is_ancestor(concept, ancestor)
+        assert [tree.find_common_ancestor(a, b) for a, b in pairs] == expected_lca
+        assert [tree.is_ancestor(a, b) for a, b in pairs] == expected_under
+
+
+def test_index_basics():
+    tree = make_tree([('R', 'A'), ('R', 'B'), ('A', 'A1'), ('A', 'A2'), ('B', 'B1'), ('S', 'S1')])
+    index = tree.build_index()
+    
+    assert index.is_ancestor('R', 'A2')
+    assert not index.is_ancestor('A2', 'A2')
+    assert not index.is_ancestor('B', 'A1')
+    assert index.common_ancestor('A1', 'A2') == 'A'
+    assert index.common_ancestor('A1', 'B1') == 'R'
+    assert index.common_ancestor('A', 'A2') == 'A'
+    assert index.common_ancestor('A1', 'S1') is None
+    assert index.path('B1') == ['R', 'B', 'B1']
+    assert index.depth('A1') == 2
+    assert tree.find_common_ancestor('Missing', 'A1') is None
+
+
+def test_index_survives_cycles():
+    # X -> Y -> Z -> X has no root; a plain parent walk must stop on revisits
+    tree = make_tree([('X', 'Y'), ('Y', 'Z'), ('Z', 'X')])
+    index = AncestorIndex(tree)
+    
+    assert len(index) == 3
+    assert sorted(index.path('Z')) == ['X', 'Y', 'Z']
+
+
+def test_traversals_match_lists():
+    tree = parse_definition_linkbase(str(DATA / 'us-gaap-stm-scf-indir-def-2020-01-31.xml'))
+    
+    lines = [f"{'  ' * level}{concept}" for concept, level in tree.iter_dfs()]
+    assert "\n".join(lines) == tree.print_tree()
+    
+    for root in tree.roots:
+        bfs = [concept for concept, level in tree.iter_bfs(root) if level]
+        assert bfs == tree.get_descendants(root)
+        assert list(tree.iter_descendants(root, max_depth=2)) == tree.get_descendants(root, max_depth=2)
+        assert max(level for _, level in tree.iter_dfs(root, max_depth=2)) <= 2
+    
+    assert list(tree.iter_dfs('us-gaap_NotAConcept')) == []
+
+
+def test_print_tree_to_file():
+    tree = parse_presentation_linkbase(str(DATA / 'us-gaap-stm-soi-pre-2020-01-31.xml'))
+    out = io.StringIO()
+    
+    assert tree.print_tree(file=out) is None
+    assert out.getvalue() == tree.print_tree() + "\n"
+
+
+def test_deep_and_cyclic_trees():
+    # Far deeper than the recursion limit
+    chain = [f'C{i}' for i in range(5 * sys.getrecursionlimit())]
+    tree = make_tree(list(zip(chain, chain[1:])))
+    tree.set_depths()
+    
+    assert tree.get_depth(chain[-1]) == len(chain) - 1
+    assert len(tree.print_tree().splitlines()) == len(chain)
+    assert tree.to_dict()['roots'][0]['concept'] == 'C0'
+    
+    # A child pointing back at the root must not loop forever
+    cyclic = make_tree([('R', 'A'), ('A', 'B'), ('B', 'R')])
+    cyclic.roots = ['R']
+    cyclic.set_depths()
+    
+    assert cyclic.print_tree() == "R\n  A\n    B"
+    assert cyclic.get_descendants('A') == ['B', 'R']
+    assert [level for _, level in cyclic.iter_bfs()] == [0, 1, 2]
+
+
+def test_sorted_children():
+    tree = make_tree([('R', 'B'), ('R', 'A')])
+    tree.nodes['A'].order = 1.0
+    tree.nodes['B'].order = 2.0
+    
+    assert tree.get_children('R') == ['A', 'B']  # Sorted on the fly
+    tree.sort_children()
+    assert tree.nodes['R'].children == ['A', 'B']
+    assert tree.get_children('R') == ['A', 'B']
+
+
+def test_hierarchy_dataframe():
+    tree = parse_definition_linkbase(str(DATA / 'us-gaap-stm-soi-def-2020-01-31.xml'))
+    df = get_hierarchy_dataframe(tree)
+    
+    assert list(df['concept']) == list(tree.nodes)
+    assert str(df['concept'].dtype) == 'category'
+    assert str(df['parent'].dtype) == 'category'
+    assert list(df['path']) == [' > '.join(tree.get_ancestor_path(c)) for c in tree.nodes]
+    
+    # path_id/parent_id rebuild every path; subtrees are contiguous id ranges
+    by_id = df.set_index('path_id')
+    for row in df.itertuples():
+        names = []
+        pid = row.path_id
+        while pid >= 0:
+            names.append(by_id.at[pid, 'concept'])
+            pid = by_id.at[pid, 'parent_id']
+        assert ' > '.join(reversed(names)) == row.path
+    
+    for root in df[df['parent_id'] < 0].itertuples():
+        subtree = df[df['root_id'] == root.path_id]['path_id']
+        assert sorted(subtree) == list(range(root.path_id, root.path_id + len(subtree)))
+    
+    lean = get_hierarchy_dataframe(tree, path_strings=False)
+    assert 'path' not in lean.columns
+    assert lean['path_id'].equals(df['path_id'])
+
+
+def _legacy_hierarchy_dataframe(tree: ConceptTree):
+    """The previous per-node get_ancestor_path() implementation, for the benchmark."""
+    import pandas as pd
+    return pd.DataFrame([
+        {
+            'concept': concept,
+            'parent': node.parent,
+            'depth': node.depth,
+            'order': node.order,
+            'path': ' > '.join(tree.get_ancestor_path(concept) or [concept]),
+        }
+        for concept, node in tree.nodes.items()
+    ])
+
+
+def _best_time(fn, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark() -> None:
+    """Time is_ancestor / find_common_ancestor over a grid of concept pairs, walk vs index."""
+    xml_file = DATA / 'us-gaap-stm-scf-indir-def-2020-01-31.xml'
+    tree = parse_definition_linkbase(str(xml_file))
+    concepts = list(tree.nodes)
+    pairs = [(a, b) for a in concepts[::7] for b in concepts[::11]]
+    
+    def run():
+        for a, b in pairs:
+            tree.is_ancestor(a, b)
+            tree.find_common_ancestor(a, b)
+    
+    t_walk = _best_time(run, 3)
+    t_build = _best_time(tree.build_index, 3)
+    t_index = _best_time(run, 3)
+    print(f"{len(concepts):,} concepts, {len(pairs):,} pairs")
+    print(f"walk : {t_walk * 1e3:8.1f} ms")
+    print(f"index: {t_index * 1e3:8.1f} ms (+ {t_build * 1e3:.1f} ms build) "
+          f"-> {t_walk / t_index:.1f}x")
+    
+    # Traversals: children re-sorted on every call vs pre-sorted at build time
+    unsorted = parse_definition_linkbase(str(xml_file))
+    unsorted._children_sorted = False
+    for label, t in (('re-sorting', unsorted), ('pre-sorted', tree)):
+        timings = {
+            'get_children': _best_time(lambda: [t.get_children(c) for c in concepts]),
+            'get_descendants': _best_time(lambda: [t.get_descendants(r) for r in t.roots]),
+            'iter_dfs': _best_time(lambda: sum(1 for _ in t.iter_dfs())),
+            'print_tree': _best_time(lambda: t.print_tree(file=io.StringIO())),
+        }
+        print(f"{label}: " + " | ".join(f"{name} {secs * 1e3:6.2f} ms" for name, secs in timings.items()))
+    
+    # Hierarchy DataFrame: per-node ancestor walks vs one DFS pass
+    fresh = parse_definition_linkbase(str(xml_file))
+    for label, build in (
+        ('legacy      ', lambda: _legacy_hierarchy_dataframe(fresh)),
+        ('dfs + paths ', lambda: get_hierarchy_dataframe(fresh)),
+        ('dfs, ids    ', lambda: get_hierarchy_dataframe(fresh, path_strings=False)),
+    ):
+        secs = _best_time(build)
+        size = build().memory_usage(deep=True).sum()
+        print(f"hierarchy df {label}: {secs * 1e3:6.2f} ms, {size:>10,} B")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,174 @@
+"""
+Tests for the streaming Inline XBRL extractor (instance.inline, instance.transforms)
+
+Run the benchmark with: python tests/test_inline.py [filing.htm ...]
+Without arguments it runs on a generated filing.
+"""
+
+import math
+import sys
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from conftest import DATA
+from leanrl import ZipFS, get_inline_dataframe, parse_inline, parse_instance
+from leanrl.instance import FACT_COLUMNS, apply_transform
+
+
+SAMPLE = DATA / 'sample_inline.htm'
+
+
+@pytest.mark.parametrize('fmt, text, expected', [
+    ('ixt:num-dot-decimal', '1,234.50', '1234.50'),
+    ('ixt:numdotdecimal', '1 234', '1234'),
+    ('ixt:num-comma-decimal', '1.234,5', '1234.5'),
+    ('ixt:num-unit-decimal', '5 dollars 25 cents', '5.25'),
+    ('ixt:fixed-zero', '—', '0'),
+    ('ixt:zerodash', '-', '0'),
+    ('ixt-sec:numwordsen', 'twenty-one', '21'),
+    ('ixt-sec:numwordsen', 'None', '0'),
+    ('ixt:date-monthname-day-year-en', 'September 30, 2023', '2023-09-30'),
+    ('ixt:datelonguk', '30 Sept. 2023', '2023-09-30'),
+    ('ixt:date-month-day-year', '09/30/23', '2023-09-30'),
+    ('ixt:date-day-month-year', '30.09.2023', '2023-09-30'),
+    ('ixt:date-monthname-year-en', 'March 2024', '2024-03'),
+    ('ixt:date-monthname-day-en', 'June 5', '--06-05'),
+    ('ixt-sec:boolballotbox', '☐', 'false'),
+    ('ixt:fixed-true', 'Yes', 'true'),
+    ('ixt:some-unknown-rule', 'as is', 'as is'),
+    (None, 'as is', 'as is'),
+])
+def test_transforms(fmt, text, expected):
+    assert apply_transform(fmt, text) == expected
+
+
+@pytest.mark.parametrize('fmt, text', [
+    ('ixt:num-dot-decimal', 'n/a'),
+    ('ixt:date-monthname-day-year-en', 'Smarch 1, 2023'),
+    ('ixt:date-month-day-year', '13/01/2023'),
+    ('ixt-sec:boolballotbox', 'x'),
+])
+def test_transform_errors(fmt, text):
+    with pytest.raises(ValueError):
+        apply_transform(fmt, text)
+
+
+def test_facts():
+    table = parse_inline(SAMPLE)
+    rows = {table.fact_id[i]: i for i in range(len(table))}
+    
+    # scale, sign and transforms
+    assert table.value[rows['f2']] == 383_285_000_000
+    assert table.value[rows['f6']] == 15_550_061_000 and table.decimals[rows['f6']] == math.inf
+    assert table.value[rows['f11']] == -1_100_000
+    assert table.value[rows['f12']] == 0
+    assert table.value[rows['f14']] == 5  # nested in a text block
+    assert math.isnan(table.value[rows['f7']]) and table.text[rows['f7']] is None
+    
+    assert table.text[rows['f9']] == '2023-09-30'
+    assert table.text[rows['f10']] == 'true'
+    assert table.text[rows['h1']] == 'false'  # ix:hidden
+    
+    # ix:exclude is left out, the continuation is appended
+    block = table.text[rows['f13']]
+    assert 'Page 42' not in block
+    assert 'five segments.' in block and block.endswith('Continued on the next page.')
+    
+    assert table.context_of(rows['f3']).dimensions == (
+        ('srt_ProductOrServiceAxis', 'us-gaap_ProductMember'),
+        ('us-gaap_StatementBusinessSegmentsAxis', 'ex_AmericasSegmentMember'),
+    )
+    assert table.unit_of(rows['f5']).measure == 'iso4217:USD/xbrli:shares'
+
+
+def test_matches_native_instance():
+    pd = pytest.importorskip('pandas')
+    inline = get_inline_dataframe(SAMPLE, dimension_columns=True)
+    native = parse_instance(DATA / 'sample_instance.xml').to_dataframe(dimension_columns=True)
+    assert list(inline.columns[:len(FACT_COLUMNS)]) == FACT_COLUMNS
+    
+    # The facts reported in both documents agree on every column
+    ids = ['f1', 'f2', 'f3', 'f4', 'f5', 'f6', 'f7']
+    columns = FACT_COLUMNS + ['srt_ProductOrServiceAxis', 'us-gaap_StatementBusinessSegmentsAxis']
+    left = inline.set_index('fact_id').loc[ids, columns[1:]].astype(object)
+    right = native.set_index('fact_id').loc[ids, columns[1:]].astype(object)
+    pd.testing.assert_frame_equal(left, right)
+
+
+def test_concept_filter_and_sources(tmp_path):
+    table = parse_inline(SAMPLE, concepts={'us-gaap_Revenues'})
+    assert len(table) == 2 and table.concepts == ['us-gaap_Revenues']
+    
+    archive = tmp_path / 'filing.zip'
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.write(SAMPLE, 'filing/sample_inline.htm')
+    with ZipFS(archive) as fs:
+        from_zip = parse_inline(fs.path('filing/sample_inline.htm'))
+    assert from_zip.fact_id == parse_inline(SAMPLE).fact_id
+
+
+def make_inline(path: Path, n_facts: int, n_contexts: int = 200) -> Path:
+    """A generated iXBRL filing: n_facts numeric facts in table rows of HTML."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<html xmlns="http://www.w3.org/1999/xhtml" '
+                'xmlns:ix="http://www.xbrl.org/2013/inlineXBRL" '
+                'xmlns:ixt="http://www.xbrl.org/inlineXBRL/transformation/2020-02-12" '
+                'xmlns:xbrli="http://www.xbrl.org/2003/instance" '
+                'xmlns:us-gaap="http://fasb.org/us-gaap/2023"><body>'
+                '<div style="display:none"><ix:header><ix:resources>\n')
+        for c in range(n_contexts):
+            f.write(f'<xbrli:context id="c{c}"><xbrli:entity>'
+                    f'<xbrli:identifier scheme="http://www.sec.gov/CIK">1</xbrli:identifier>'
+                    f'</xbrli:entity><xbrli:period><xbrli:instant>2023-12-31</xbrli:instant>'
+                    f'</xbrli:period></xbrli:context>\n')
+        f.write('<xbrli:unit id="usd"><xbrli:measure>iso4217:USD</xbrli:measure></xbrli:unit>\n'
+                '</ix:resources></ix:header></div><table>\n')
+        for i in range(n_facts):
+            f.write(f'<tr><td style="padding:0 2px"><span>Line item {i}</span></td>'
+                    f'<td><span>$</span></td><td style="text-align:right"><span>'
+                    f'<ix:nonFraction name="us-gaap:Concept{i % 500}" contextRef="c{i % n_contexts}" '
+                    f'unitRef="usd" decimals="-3" scale="3" format="ixt:num-dot-decimal" id="f{i}">'
+                    f'{i:,}</ix:nonFraction></span></td></tr>\n')
+        f.write('</table></body></html>\n')
+    return path
+
+
+def test_large_document(tmp_path):
+    htm = make_inline(tmp_path / 'big.htm', n_facts=3_000)
+    table = parse_inline(htm)
+    assert len(table) == 3_000
+    assert table.value[2_999] == 2_999_000
+
+
+def _measure(fn) -> tuple[float, float]:
+    """(seconds, peak traced MB) of one call."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def benchmark(paths: list[str] | None = None) -> None:
+    """Compare parse_inline with loading the whole tree (ET.parse), on local filings or a generated one."""
+    import tempfile
+    import xml.etree.ElementTree as ET
+    with tempfile.TemporaryDirectory() as d:
+        files = [Path(p) for p in paths] if paths else [make_inline(Path(d) / 'generated.htm', 200_000)]
+        for htm in files:
+            n_facts = len(parse_inline(htm))
+            print(f"{htm.name}: {htm.stat().st_size / 1e6:.1f} MB, {n_facts:,} facts")
+            for label, fn in (('ET.parse    ', lambda: ET.parse(htm)), ('parse_inline', lambda: parse_inline(htm))):
+                elapsed, peak = _measure(fn)
+                print(f"  {label}: {elapsed:6.2f} s, peak {peak:7.1f} MB")
+
+
+if __name__ == '__main__':
+    benchmark(sys.argv[1:])
@@ -0,0 +1,187 @@
+"""
+Tests for the streaming XBRL instance fact extractor (instance.facts)
+
+Run the benchmark with: python tests/test_instance.py
+"""
+
+import io
+import math
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from conftest import DATA
+from leanrl import ZipFS, get_instance_dataframe, parse_instance
+from leanrl.core import stream_children
+
+
+SAMPLE = DATA / 'sample_instance.xml'
+
+
+def test_contexts_and_units():
+    table = parse_instance(SAMPLE)
+    contexts = {c.id: c for c in table.contexts}
+    units = {u.id: u for u in table.units}
+    
+    assert contexts['FY2023'].period_type == 'duration'
+    assert (contexts['FY2023'].start, contexts['FY2023'].end) == ('2022-09-25', '2023-09-30')
+    assert contexts['I2023'].instant == '2023-09-30'
+    assert contexts['FY2023'].entity == '0000320193'
+    assert contexts['FY2023_Americas_Products'].dimensions == (
+        ('srt_ProductOrServiceAxis', 'us-gaap_ProductMember'),
+        ('us-gaap_StatementBusinessSegmentsAxis', 'ex_AmericasSegmentMember'),
+    )
+    # Typed members keep their stripped text; defined after its facts
+    assert contexts['FY2022_Typed'].dimensions == (('ex_ContractIdAxis', 'C-42'),)
+    assert contexts['FY2022_Typed'].start == '2021-09-26'
+    
+    assert units['usd'].measure == 'iso4217:USD'
+    assert units['usdPerShare'].measure == 'iso4217:USD/xbrli:shares'
+    assert units['shares'].measure == 'xbrli:shares'
+
+
+def test_facts():
+    table = parse_instance(SAMPLE)
+    assert len(table) == 9
+    facts = {table.fact_id[i]: i for i in range(len(table))}
+    
+    i = facts['f2']
+    assert table.concepts[table.concept[i]] == 'us-gaap_Revenues'
+    assert table.value[i] == 383285000000.0
+    assert table.decimals[i] == -6
+    assert table.context_of(i).id == 'FY2023'
+    assert table.unit_of(i).id == 'usd'
+    
+    assert table.decimals[facts['f6']] == math.inf
+    assert math.isnan(table.value[facts['f7']])  # xsi:nil
+    assert table.unit_of(facts['f8']).id == 'usd'
+    assert table.context_of(facts['f8']).id == 'FY2022_Typed'
+    
+    # Non-numeric facts: text, no unit, no value
+    i = facts['f1']
+    assert table.text[i] == '10-K' and table.unit_of(i) is None
+    assert math.isnan(table.value[i]) and math.isnan(table.decimals[i])
+    
+    # Facts inside tuples are flattened; footnotes are not facts
+    assert 'ex_OfficerName' in table.concepts
+    assert 'ex_ManagementTuple' not in table.concepts
+    assert not any(t == 'Not a fact.' for t in table.text)
+
+
+def test_dataframe():
+    pd = pytest.importorskip('pandas')
+    df = get_instance_dataframe(SAMPLE)
+    
+    assert len(df) == 9
+    assert df['value'].dtype == 'float64'
+    assert isinstance(df['concept'].dtype, pd.CategoricalDtype)
+    row = df[df['fact_id'] == 'f4'].iloc[0]
+    assert row['instant'] == pd.Timestamp('2023-09-30')
+    assert pd.isna(row['start']) and row['unit'] == 'iso4217:USD'
+    row = df[df['fact_id'] == 'f8'].iloc[0]
+    assert row['end'] == pd.Timestamp('2022-09-24')
+    assert pd.isna(df[df['fact_id'] == 'f1'].iloc[0]['unit'])
+    
+    wide = get_instance_dataframe(SAMPLE, dimension_columns=True)
+    assert wide['srt_ProductOrServiceAxis'].notna().sum() == 1
+    assert wide.loc[wide['fact_id'] == 'f8', 'ex_ContractIdAxis'].item() == 'C-42'
+
+
+def test_concept_filter():
+    table = parse_instance(SAMPLE, concepts={'us-gaap_Revenues'})
+    assert len(table) == 3
+    assert {table.concepts[c] for c in table.concept} == {'us-gaap_Revenues'}
+    # Contexts and units are still resolved
+    assert {c.id for c in table.contexts} >= {'FY2022_Typed', 'FY2023'}
+
+
+def _same(a, b) -> bool:
+    # NaN != NaN, so compare the float columns by their bytes
+    return (
+        (a.concepts, a.contexts, a.units, a.concept, a.context, a.unit, a.text, a.fact_id)
+        == (b.concepts, b.contexts, b.units, b.concept, b.context, b.unit, b.text, b.fact_id)
+        and a.value.tobytes() == b.value.tobytes()
+        and a.decimals.tobytes() == b.decimals.tobytes()
+    )
+
+
+def test_sources(tmp_path):
+    expected = parse_instance(SAMPLE)
+    archive = tmp_path / 'filing.zip'
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.write(SAMPLE, 'filing/sample_instance.xml')
+    
+    with ZipFS(archive) as fs:
+        assert _same(parse_instance(fs.path('filing/sample_instance.xml')), expected)
+    assert _same(parse_instance(io.BytesIO(SAMPLE.read_bytes())), expected)
+    assert _same(parse_instance(str(SAMPLE)), expected)
+
+
+def test_stream_children_detaches():
+    ns = {}
+    seen = []
+    for tag, elem in stream_children(SAMPLE, ns):
+        seen.append(tag)
+        # Each child is complete when yielded
+        if tag.endswith('}context'):
+            assert elem.find('.//{*}period') is not None
+    assert ns['us-gaap'] == 'http://fasb.org/us-gaap/2023'
+    assert len(seen) == 18
+
+
+def make_instance(path: Path, n_facts: int, n_contexts: int = 200) -> Path:
+    """A synthetic instance with n_facts numeric facts spread over contexts."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance" '
+                'xmlns:xbrldi="http://xbrl.org/2006/xbrldi" '
+                'xmlns:us-gaap="http://fasb.org/us-gaap/2023">\n')
+        for c in range(n_contexts):
+            f.write(f'<xbrli:context id="c{c}"><xbrli:entity>'
+                    f'<xbrli:identifier scheme="http://www.sec.gov/CIK">1</xbrli:identifier>'
+                    f'<xbrli:segment><xbrldi:explicitMember dimension="us-gaap:SegmentAxis">'
+                    f'us-gaap:M{c % 10}Member</xbrldi:explicitMember></xbrli:segment>'
+                    f'</xbrli:entity><xbrli:period><xbrli:startDate>2022-01-01</xbrli:startDate>'
+                    f'<xbrli:endDate>2022-12-31</xbrli:endDate></xbrli:period></xbrli:context>\n')
+        f.write('<xbrli:unit id="usd"><xbrli:measure>iso4217:USD</xbrli:measure></xbrli:unit>\n')
+        for i in range(n_facts):
+            f.write(f'<us-gaap:Concept{i % 500} contextRef="c{i % n_contexts}" unitRef="usd" '
+                    f'decimals="-3" id="f{i}">{i * 1000}</us-gaap:Concept{i % 500}>\n')
+        f.write('</xbrli:xbrl>\n')
+    return path
+
+
+def test_large_instance(tmp_path):
+    xml_file = make_instance(tmp_path / 'big.xml', n_facts=5_000)
+    table = parse_instance(xml_file)
+    assert len(table) == 5_000
+    assert len(table.contexts) == 200 and len(table.concepts) == 500
+    assert table.value[4_999] == 4_999_000.0
+
+
+def benchmark(n_facts: int = 500_000) -> None:
+    """Time parse_instance on a large synthetic instance and report peak memory."""
+    import tempfile
+    with tempfile.TemporaryDirectory() as d:
+        xml_file = make_instance(Path(d) / 'big.xml', n_facts)
+        size = xml_file.stat().st_size
+        
+        tracemalloc.start()
+        start = time.perf_counter()
+        table = parse_instance(xml_file)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{size / 1e6:.1f} MB, {len(table):,} facts")
+        print(f"parse_instance: {elapsed:6.2f} s ({len(table) / elapsed:,.0f} facts/s)")
+        print(f"peak traced memory: {peak / 1e6:.1f} MB")
+        
+        start = time.perf_counter()
+        table.to_dataframe()
+        print(f"to_dataframe  : {time.perf_counter() - start:6.2f} s")
+
+
+if __name__ == '__main__':
+    benchmark()
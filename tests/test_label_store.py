@@ -0,0 +1,187 @@
+"""
+Tests for the columnar label store (linkbases.label_store)
+
+Run the benchmark with: python tests/test_label_store.py
+"""
+
+import pickle
+import time
+from pathlib import Path
+
+import pytest
+
+from conftest import LINK_ROLE, arc, label, link, linkbase, loc
+from leanrl import Roles, parse_all_labels, parse_label_linkbase, parse_label_store
+from leanrl.core import ENGINES
+
+
+# Two links reuse the labels 'loc'/'lab' for different concepts; one label
+# id names a standard and a terse label; Revenue has no terse label; the
+# arc of the second link comes before its resources.
+LAB_XML = linkbase(link(
+    'label', LINK_ROLE,
+    loc('loc', 'ex_Assets'),
+    label('lab', Roles.LABEL, 'en', 'Assets'),
+    label('lab', Roles.TERSE_LABEL, 'en', 'Assets, terse'),
+    label('lab', Roles.LABEL, 'fr', 'Actifs'),
+    label('lab', Roles.DOCUMENTATION, 'en', 'Sum of the assets.'),
+    arc('label', 'loc', 'lab'),
+), link(
+    'label', LINK_ROLE,
+    arc('label', 'loc', 'lab'),
+    loc('loc', 'ex_Revenue'),
+    label('lab', Roles.LABEL, 'en', 'Revenue'),
+    label('lab', Roles.LABEL, 'de', 'Umsatzerlöse'),
+), link(
+    'label', LINK_ROLE,
+    loc('x', 'ex_Untagged'),
+    label('y', None, None, 'No role, no language'),
+    arc('label', 'x', 'y'),
+))
+
+
+@pytest.fixture
+def lab_file(tmp_path):
+    path = tmp_path / 'ex_lab.xml'
+    path.write_text(LAB_XML, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_store(lab_file, engine):
+    store = parse_label_store(lab_file, engine=engine)
+    assert len(store) == 7
+    assert len(store.roles) == 3 and len(store.langs) == 4
+    assert store.get('ex_Assets') == 'Assets'
+    assert store.get('ex_Assets', lang='fr') == 'Actifs'
+    assert store.get('ex_Revenue', lang='de') == 'Umsatzerlöse'
+    assert store.get('ex_Revenue', lang='fr') is None
+    # A label without role is a standard label, without language ''
+    assert store.get('ex_Untagged', lang='') == 'No role, no language'
+    assert store.get('ex_Nope', default='?') == '?'
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_all_labels_per_link(lab_file, engine):
+    # Locators and resources are resolved per link, every resource of a
+    # label id included; the last language read wins a role
+    assert parse_all_labels(lab_file, engine=engine) == {
+        'ex_Assets': {
+            Roles.LABEL: 'Actifs',
+            Roles.TERSE_LABEL: 'Assets, terse',
+            Roles.DOCUMENTATION: 'Sum of the assets.',
+        },
+        'ex_Revenue': {Roles.LABEL: 'Umsatzerlöse'},
+    }
+
+
+def test_lookup_fallbacks(lab_file):
+    store = parse_label_store(lab_file)
+    concepts = ['ex_Assets', 'ex_Revenue', 'ex_Nope']
+    assert store.lookup(concepts, roles=[Roles.TERSE_LABEL, Roles.LABEL], lang='en') == [
+        'Assets, terse', 'Revenue', None,
+    ]
+    assert store.lookup(concepts, lang=['fr', 'en'], default='') == ['Actifs', 'Revenue', '']
+    assert store.lookup(concepts, roles='http://example.com/no-such-role') == [None, None, None]
+    assert store.lookup([]) == []
+
+
+def test_filters_while_streaming(lab_file):
+    store = parse_label_store(lab_file, roles=Roles.LABEL, langs=['en', 'de'])
+    assert len(store) == 3
+    assert [store.roles.name(i) for i in range(len(store.roles))] == [Roles.LABEL]
+    store = parse_label_store(lab_file, langs=lambda lang: lang.startswith('f'))
+    assert store.texts == ['Actifs']
+
+
+def test_to_dict(lab_file):
+    store = parse_label_store(lab_file, langs='en')
+    assert store.to_dict(Roles.DOCUMENTATION) == {'ex_Assets': 'Sum of the assets.'}
+    assert store.to_dict(Roles.LABEL) == {'ex_Assets': 'Assets', 'ex_Revenue': 'Revenue'}
+    assert parse_label_store(lab_file).to_dict(Roles.LABEL, lang='fr') == {'ex_Assets': 'Actifs'}
+
+
+def test_dataframe(lab_file):
+    store = parse_label_store(lab_file)
+    df = store.to_dataframe()
+    assert list(df.columns) == ['concept', 'role', 'lang', 'text']
+    assert len(df) == 7
+    assert str(df['role'].dtype) == 'category'
+    assert df[(df.concept == 'ex_Assets') & (df.lang == 'fr')].text.tolist() == ['Actifs']
+    
+    wide = store.to_dataframe(wide=True, lang='en')
+    assert wide.loc['ex_Assets', Roles.TERSE_LABEL] == 'Assets, terse'
+    assert sorted(wide.index) == ['ex_Assets', 'ex_Revenue']
+
+
+def test_pickle_and_duplicates(lab_file):
+    store = parse_label_store([lab_file, lab_file])
+    assert len(store) == 7
+    restored = pickle.loads(pickle.dumps(store))
+    assert restored.texts == store.texts
+    assert restored.get('ex_Assets', lang='fr') == 'Actifs'
+    assert not restored.add('ex_Assets', Roles.LABEL, 'fr', 'Autre')
+    assert restored.add('ex_Assets', Roles.LABEL, 'it', 'Attività')
+
+
+def synthetic_labels(path: Path, n_concepts: int = 20_000, langs=('en', 'fr', 'de', 'es', 'it', 'ja')) -> Path:
+    """IFRS-style label linkbase: three roles per language per concept."""
+    roles = (Roles.LABEL, Roles.TERSE_LABEL, Roles.DOCUMENTATION)
+    parts = []
+    for i in range(n_concepts):
+        parts.append(loc(f'loc{i}', f'ex_Concept{i}'))
+        for lang in langs:
+            for role in roles:
+                parts.append(label(f'lab{i}', role, lang, f'Concept {i} {role[-10:]} {lang}'))
+        parts.append(arc('label', f'loc{i}', f'lab{i}'))
+    path.write_text(linkbase(link('label', LINK_ROLE, *parts)), encoding='utf-8')
+    return path
+
+
+def benchmark() -> None:
+    """One LabelStore pass vs. the per-role and nested-dict parsers."""
+    import tempfile
+    import tracemalloc
+    
+    def _retained(parse):
+        tracemalloc.start()
+        result = parse()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return result, size
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_file = str(synthetic_labels(Path(tmp) / 'big_lab.xml'))
+        roles = (Roles.LABEL, Roles.TERSE_LABEL, Roles.DOCUMENTATION)
+        
+        start = time.perf_counter()
+        for role in roles:
+            parse_label_linkbase(xml_file, role=role, engine='expat')
+        per_role_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        parse_all_labels(xml_file, engine='expat')
+        nested_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        store = parse_label_store(xml_file, engine='expat')
+        store_time = time.perf_counter() - start
+        
+        nested, nested_size = _retained(lambda: parse_all_labels(xml_file, engine='expat'))
+        store, store_size = _retained(lambda: parse_label_store(xml_file, engine='expat'))
+        n_nested = sum(len(roles) for roles in nested.values())
+        
+        concepts = [f'ex_Concept{i}' for i in range(0, 20_000, 2)]
+        start = time.perf_counter()
+        store.lookup(concepts, roles=[Roles.TERSE_LABEL, Roles.LABEL], lang=['ja', 'en'])
+        lookup_time = time.perf_counter() - start
+    
+    print(f"{len(store):,} labels, {len(store.langs)} languages, {len(store.roles)} roles")
+    print(f"parse_label_linkbase x{len(roles)}: {per_role_time:6.2f} s, languages mixed up")
+    print(f"parse_all_labels     : {nested_time:6.2f} s, {nested_size / n_nested:4.0f} B/label, {n_nested:,} labels kept (one language)")
+    print(f"parse_label_store    : {store_time:6.2f} s, {store_size / len(store):4.0f} B/label, {len(store):,} labels kept")
+    print(f"lookup with fallbacks: {lookup_time * 1e3:6.1f} ms for {len(concepts):,} concepts")
+
+
+if __name__ == '__main__':
+    benchmark()
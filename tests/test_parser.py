@@ -0,0 +1,83 @@
+"""
+Tests for the single-pass StreamingParser dispatcher (core.parser)
+"""
+
+import pytest
+
+from conftest import DATA
+from leanrl import (
+    ArcRoles,
+    CalculationHandler,
+    DefinitionHandler,
+    LabelHandler,
+    PresentationHandler,
+    ReferenceHandler,
+    StreamingParser,
+    parse_calculation_linkbase,
+    parse_definition_linkbase,
+    parse_presentation_linkbase,
+)
+from leanrl.core import ENGINES
+from leanrl.core.parser import ElementHandler
+
+
+def test_handlers_share_one_pass():
+    def_file = DATA / 'us-gaap-stm-soi-def-2020-01-31.xml'
+    
+    parser = StreamingParser(def_file)
+    parser.register(DefinitionHandler(ArcRoles.DOMAIN_MEMBER))
+    parser.register(DefinitionHandler(ArcRoles.HYPERCUBE_DIMENSION))
+    parser.register(PresentationHandler())
+    members, dims, pre = parser.parse()
+    
+    expected = parse_definition_linkbase(str(def_file))
+    assert members.nodes == expected.nodes
+    assert members.roots == expected.roots
+    
+    expected_dims = parse_definition_linkbase(str(def_file), arcrole=ArcRoles.HYPERCUBE_DIMENSION)
+    assert dims.nodes == expected_dims.nodes
+    # A definition linkbase has no presentation arcs
+    assert len(pre) == 0
+
+
+def test_calculation_handler():
+    cal_file = DATA / 'us-gaap-stm-soi-cal-2020-01-31.xml'
+    
+    parser = StreamingParser(cal_file)
+    parser.register(CalculationHandler())
+    tree, = parser.parse()
+    
+    assert tree.nodes == parse_calculation_linkbase(str(cal_file)).nodes
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_engine_and_roles_are_shared(engine):
+    pre_file = DATA / 'us-gaap-stm-soi-pre-2020-01-31.xml'
+    role = 'http://fasb.org/us-gaap/role/statement/StatementOfIncome'
+    
+    parser = StreamingParser(pre_file, engine=engine, roles=role)
+    parser.register(PresentationHandler())
+    tree, = parser.parse()
+    
+    expected = parse_presentation_linkbase(str(pre_file), engine=engine, roles=role)
+    assert tree.nodes == expected.nodes
+    assert len(tree) > 0
+    
+    parser = StreamingParser(pre_file, engine=engine, roles=role + 'Other')
+    parser.register(PresentationHandler())
+    assert len(parser.parse()[0]) == 0
+
+
+def test_element_handlers_need_etree():
+    parser = StreamingParser(DATA / 'us-gaap-stm-soi-def-2020-01-31.xml', engine='expat')
+    parser.register(ReferenceHandler())
+    with pytest.raises(ValueError):
+        parser.parse()
+
+
+def test_handlers_own_their_fields():
+    # fields and text_tags are per instance, not class-level defaults
+    assert not hasattr(ElementHandler, 'fields') and not hasattr(ElementHandler, 'text_tags')
+    label_handler, presentation = LabelHandler(), PresentationHandler()
+    assert label_handler.text_tags and not presentation.text_tags
+    assert label_handler.fields.keys() != presentation.fields.keys()
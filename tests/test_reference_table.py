@@ -0,0 +1,160 @@
+"""
+Tests for the columnar reference table (linkbases.reference_table)
+
+Run the benchmark with: python tests/test_reference_table.py
+"""
+
+import pickle
+import time
+from pathlib import Path
+
+import pytest
+
+# Puts src on the path when run directly
+import conftest  # noqa: F401
+from leanrl import (
+    Roles,
+    parse_reference_linkbase,
+    parse_reference_linkbase_flat,
+    parse_reference_table,
+)
+from leanrl.linkbases import ReferenceTable
+
+from test_references import REF_XML, synthetic_references
+
+
+@pytest.fixture
+def ref_file(tmp_path):
+    path = tmp_path / 'ex_ref.xml'
+    path.write_text(REF_XML, encoding='utf-8')
+    return str(path)
+
+
+def test_table(ref_file):
+    table = parse_reference_table(ref_file)
+    assert len(table) == 5
+    assert table.n_references == 3
+    assert list(table.reference_offsets) == [0, 5, 10, 15]
+    assert table.to_dict() == parse_reference_linkbase_flat(ref_file)
+    assert table.references()[0] == parse_reference_linkbase(ref_file)['us-gaap_ResearchAndDevelopmentExpense'][0]
+    assert 'us-gaap_Cash' in table
+
+
+def test_role_filter(ref_file, tmp_path):
+    assert len(parse_reference_table(ref_file, roles=Roles.REFERENCE)) == 0
+    # Two files, one pool of distinct references
+    table = parse_reference_table([ref_file, ref_file], roles=[Roles.DISCLOSURE_REF])
+    assert len(table) == 10
+    assert table.n_references == 3
+
+
+def test_long_dataframe(ref_file):
+    df = parse_reference_table(ref_file).to_dataframe()
+    assert list(df.columns) == ['concept', 'citation', 'role', 'part', 'value']
+    assert len(df) == 25
+    assert str(df['part'].dtype) == 'category'
+    topic_730 = df[(df.part == 'Topic') & (df.value == '730')]
+    assert topic_730.concept.unique().tolist() == [
+        'us-gaap_ResearchAndDevelopmentExpense', 'us-gaap_ResearchAndDevelopmentInProcess',
+    ]
+    cash = df[df.concept == 'us-gaap_Cash']
+    assert cash.citation.nunique() == 1
+    assert dict(zip(cash.part, cash.value))['Section'] == '45'
+
+
+def test_wide_dataframe(ref_file):
+    wide = parse_reference_table(ref_file).to_dataframe(wide=True)
+    assert list(wide.columns) == ['concept', 'role', 'Publisher', 'Name', 'Topic', 'SubTopic', 'Section']
+    assert len(wide) == 5
+    assert wide[['Topic', 'SubTopic', 'Section']].iloc[-1].tolist() == ['305', '10', '45']
+    
+    # Missing parts are null
+    table = ReferenceTable()
+    table.add('a', Roles.REFERENCE, {'Topic': '1'})
+    table.add('b', Roles.REFERENCE, [('Paragraph', '2')])
+    wide = table.to_dataframe(wide=True)
+    assert wide['Topic'].isna().tolist() == [False, True]
+    assert wide['Paragraph'].tolist()[1] == '2'
+
+
+def test_joined(ref_file):
+    joined = parse_reference_table(ref_file).joined(fmt=lambda ref: ref.format_citation())
+    assert joined['us-gaap_ResearchAndDevelopmentExpense'] == (
+        'FASB ASC 730-10-50, FASB ASC 730-10-50'
+    )
+    refs = parse_reference_linkbase(ref_file)
+    assert parse_reference_table(ref_file).joined() == {
+        concept: ', '.join(str(r) for r in ref_list) for concept, ref_list in refs.items()
+    }
+
+
+def test_empty_and_pickle(ref_file):
+    empty = ReferenceTable()
+    assert len(empty.to_dataframe()) == 0
+    assert len(empty.to_dataframe(wide=True)) == 0
+    
+    table = parse_reference_table(ref_file)
+    restored = pickle.loads(pickle.dumps(table))
+    assert restored.to_dict() == table.to_dict()
+    # Adding to a restored table still deduplicates
+    assert restored.add('x', Roles.DISCLOSURE_REF, table.references()[2].parts) == 2
+
+
+def test_arrow(ref_file):
+    pa = pytest.importorskip('pyarrow')
+    arrow = parse_reference_table(ref_file).to_arrow()
+    assert arrow.num_rows == 25
+    assert pa.types.is_dictionary(arrow.schema.field('value').type)
+    assert arrow.to_pandas()['value'].astype(str).tolist() == (
+        parse_reference_table(ref_file).to_dataframe()['value'].tolist()
+    )
+
+
+def benchmark() -> None:
+    """Columnar extraction vs. flat dicts + DataFrame, and the joined strings."""
+    import tempfile
+    import pandas as pd
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_file = str(synthetic_references(Path(tmp) / 'big_ref.xml'))
+        
+        start = time.perf_counter()
+        flat = parse_reference_linkbase_flat(xml_file)
+        rows = [
+            {'concept': concept, 'citation': i, 'role': ref['role'], 'part': name, 'value': value}
+            for concept, refs in flat.items()
+            for i, ref in enumerate(refs)
+            for name, value in ref.items() if name != 'role'
+        ]
+        pd.DataFrame(rows)
+        flat_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        table = parse_reference_table(xml_file)
+        parse_time = time.perf_counter() - start
+        start = time.perf_counter()
+        df = table.to_dataframe()
+        long_time = time.perf_counter() - start
+        start = time.perf_counter()
+        table.to_dataframe(wide=True)
+        wide_time = time.perf_counter() - start
+        
+        refs = parse_reference_linkbase(xml_file)
+        start = time.perf_counter()
+        {concept: ', '.join(str(r) for r in ref_list) for concept, ref_list in refs.items()}
+        str_time = time.perf_counter() - start
+        start = time.perf_counter()
+        table.joined()
+        joined_time = time.perf_counter() - start
+    
+    print(f"{len(table):,} citations, {table.n_references:,} distinct references, {len(df):,} long rows")
+    print(f"flat dicts + DataFrame : {flat_time:6.2f} s")
+    print(f"parse_reference_table  : {parse_time:6.2f} s")
+    print(f"  long DataFrame       : {long_time * 1e3:6.1f} ms -> {flat_time / (parse_time + long_time):.1f}x overall")
+    print(f"  wide DataFrame       : {wide_time * 1e3:6.1f} ms")
+    print(f"str(r) per citation    : {str_time * 1e3:6.1f} ms")
+    print(f"joined()               : {joined_time * 1e3:6.1f} ms")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,193 @@
+"""
+Tests for pooled references and the citation index (linkbases.reference)
+
+Run the benchmark with: python tests/test_references.py
+"""
+
+import pickle
+import time
+from pathlib import Path
+
+import pytest
+
+from conftest import LINK_ROLE, arc, link, linkbase, loc, reference
+from leanrl import (
+    Reference,
+    ReferencePool,
+    Roles,
+    build_citation_index,
+    parse_reference_linkbase,
+)
+
+
+def asc(label: str, topic: str, subtopic: str, section: str) -> str:
+    """A disclosure reference to the FASB Accounting Standards Codification."""
+    return reference(
+        label, Publisher='FASB', Name='Accounting Standards Codification',
+        Topic=topic, SubTopic=subtopic, Section=section,
+    )
+
+
+# Two resources (r1, r3) carry the same citation; RnD cites it twice.
+REF_XML = linkbase(link(
+    'reference', LINK_ROLE,
+    loc('rnd', 'us-gaap_ResearchAndDevelopmentExpense'),
+    loc('inp', 'us-gaap_ResearchAndDevelopmentInProcess'),
+    loc('cash', 'us-gaap_Cash'),
+    asc('r1', '730', '10', '50'),
+    asc('r2', '730', '20', '25'),
+    asc('r3', '730', '10', '50'),
+    asc('r4', '305', '10', '45'),
+    arc('reference', 'rnd', 'r1'), arc('reference', 'rnd', 'r3'),
+    arc('reference', 'inp', 'r2'), arc('reference', 'inp', 'r3'),
+    arc('reference', 'cash', 'r4'),
+))
+
+
+@pytest.fixture
+def ref_file(tmp_path):
+    path = tmp_path / 'ex_ref.xml'
+    path.write_text(REF_XML, encoding='utf-8')
+    return str(path)
+
+
+def test_references_are_shared(ref_file):
+    refs = parse_reference_linkbase(ref_file)
+    rnd = refs['us-gaap_ResearchAndDevelopmentExpense']
+    assert rnd[0] is rnd[1]
+    assert refs['us-gaap_ResearchAndDevelopmentInProcess'][1] is rnd[0]
+    assert rnd[0].parts == {
+        'Publisher': 'FASB', 'Name': 'Accounting Standards Codification',
+        'Topic': '730', 'SubTopic': '10', 'Section': '50',
+    }
+    assert rnd[0].format_citation() == 'FASB ASC 730-10-50'
+    
+    # A pool shared across files hands out the same objects again
+    pool = ReferencePool()
+    first = parse_reference_linkbase(ref_file, pool=pool)
+    second = parse_reference_linkbase(ref_file, pool=pool)
+    assert first['us-gaap_Cash'][0] is second['us-gaap_Cash'][0]
+    assert len(pool) == 3
+
+
+def test_reference_is_immutable():
+    ref = Reference(Roles.REFERENCE, {'Topic': '730'})
+    with pytest.raises(AttributeError):
+        ref.role = 'other'
+    with pytest.raises(TypeError):
+        ref.parts['Topic'] = '210'
+    assert not hasattr(ref, '__dict__')
+    assert ref == Reference(Roles.REFERENCE, {'Topic': '730'})
+    assert hash(ref) == hash(Reference(Roles.REFERENCE, {'Topic': '730'}))
+    assert ref != Reference(Roles.REFERENCE, {'Topic': '210'})
+    assert repr(ref) == 'Reference(  Topic 730 Section )'
+
+
+def test_pickle(ref_file):
+    refs = parse_reference_linkbase(ref_file)
+    restored = pickle.loads(pickle.dumps(refs))
+    assert restored == refs
+    rnd = restored['us-gaap_ResearchAndDevelopmentExpense']
+    assert rnd[0] is rnd[1]
+
+
+def test_citation_index(ref_file):
+    index = build_citation_index(parse_reference_linkbase(ref_file))
+    assert index.concepts('730') == [
+        'us-gaap_ResearchAndDevelopmentExpense', 'us-gaap_ResearchAndDevelopmentInProcess',
+    ]
+    assert index.concepts('730', '20') == ['us-gaap_ResearchAndDevelopmentInProcess']
+    assert index.concepts('730', '10', '50') == [
+        'us-gaap_ResearchAndDevelopmentExpense', 'us-gaap_ResearchAndDevelopmentInProcess',
+    ]
+    assert index.concepts('305', '10', '99') == []
+    assert index.concepts('999') == []
+    assert sorted(index.topics()) == ['305', '730']
+    
+    cash_ref = parse_reference_linkbase(ref_file)['us-gaap_Cash'][0]
+    assert index.citing(cash_ref) == ['us-gaap_Cash']
+    assert len(index) == 3
+
+
+def synthetic_references(path: Path, n_concepts: int = 20_000, n_distinct: int = 500) -> Path:
+    """US-GAAP-style reference linkbase: many concepts cite few paragraphs."""
+    parts = []
+    for i in range(n_concepts):
+        parts.append(loc(f'loc{i}', f'us-gaap_C{i}'))
+        for j in range(3):
+            k = (i * 7 + j * 131) % n_distinct
+            parts.append(asc(f'ref{i}_{j}', str(100 + k % 90), str(10 + k % 5), str(k % 60)))
+            parts.append(arc('reference', f'loc{i}', f'ref{i}_{j}'))
+    path.write_text(linkbase(link('reference', LINK_ROLE, *parts)), encoding='utf-8')
+    return path
+
+
+def benchmark() -> None:
+    """Retained memory of pooled references, and index lookups vs. a full scan."""
+    import tempfile
+    import tracemalloc
+    from dataclasses import dataclass, field
+    from leanrl.linkbases import ReferenceHandler
+    from leanrl.core import StreamingParser
+    
+    @dataclass
+    class PlainReference:
+        role: str
+        parts: dict = field(default_factory=dict)
+    
+    class PlainHandler(ReferenceHandler):
+        """The former behaviour: one Reference and one parts dict per resource."""
+        def handle(self, tag, elem):
+            super().handle(tag, elem)
+            if tag == self.TAG_REFERENCE and elem.get(self.ATTR_LABEL) in self.ref_map:
+                ref = self.ref_map[elem.get(self.ATTR_LABEL)]
+                self.ref_map[elem.get(self.ATTR_LABEL)] = PlainReference(
+                    ''.join(ref.role), {''.join(k): ''.join(v) for k, v in ref.parts.items()},
+                )
+    
+    def _retained(parse):
+        tracemalloc.start()
+        result = parse()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return result, size
+    
+    def plain(xml_file):
+        parser = StreamingParser(xml_file)
+        parser.register(PlainHandler())
+        refs, = parser.parse()
+        return refs
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_file = str(synthetic_references(Path(tmp) / 'big_ref.xml'))
+        plain_refs, plain_size = _retained(lambda: plain(xml_file))
+        pooled_refs, pooled_size = _retained(lambda: parse_reference_linkbase(xml_file))
+    
+    n_refs = sum(len(refs) for refs in pooled_refs.values())
+    n_distinct = len({ref for refs in pooled_refs.values() for ref in refs})
+    print(f"{len(pooled_refs):,} concepts, {n_refs:,} citations, {n_distinct:,} distinct references")
+    print(f"one object per resource: {plain_size / 2**20:6.1f} MiB")
+    print(f"pooled references      : {pooled_size / 2**20:6.1f} MiB -> {plain_size / pooled_size:.1f}x less")
+    
+    start = time.perf_counter()
+    index = build_citation_index(pooled_refs)
+    build = time.perf_counter() - start
+    
+    topics = index.topics()
+    start = time.perf_counter()
+    for topic in topics:
+        [c for c, refs in plain_refs.items() if any(r.parts.get('Topic') == topic for r in refs)]
+    scan = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for topic in topics:
+        index.concepts(topic)
+    lookup = time.perf_counter() - start
+    
+    print(f"index build            : {build * 1e3:6.1f} ms")
+    print(f"{len(topics)} topic queries, scan  : {scan * 1e3:8.1f} ms")
+    print(f"{len(topics)} topic queries, index : {lookup * 1e3:8.1f} ms -> {scan / lookup:.0f}x")
+
+
+if __name__ == '__main__':
+    benchmark()
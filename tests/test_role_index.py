@@ -0,0 +1,79 @@
+"""
+Tests for the extended link byte-offset index (linkbases.role_index)
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+from conftest import DATA
+from leanrl import get_specific_role_tree
+from leanrl.linkbases import role_index
+from leanrl.linkbases.role_index import INDEX_SUFFIX, build_role_index, load_role_index
+
+
+def copy_pre(tmp_path) -> str:
+    target = tmp_path / 'us-gaap-stm-soi-pre-2020-01-31.xml'
+    shutil.copy(DATA / target.name, target)
+    return str(target)
+
+
+def test_index_matches_full_parse(tmp_path):
+    pre_file = copy_pre(tmp_path)
+    keywords = ['statement', 'income']
+    
+    assert get_specific_role_tree(None, pre_file, keywords) == \
+        get_specific_role_tree(None, pre_file, keywords, use_index=False)
+    assert os.path.exists(pre_file + INDEX_SUFFIX)
+
+
+def test_byte_ranges_cover_links(tmp_path):
+    pre_file = copy_pre(tmp_path)
+    index = build_role_index(pre_file)
+    data = Path(pre_file).read_bytes()
+    
+    assert index.links
+    for link in index.links:
+        fragment = data[link.start:link.end]
+        assert fragment.startswith(b'<link:presentationLink')
+        assert fragment.endswith(b'</link:presentationLink>')
+
+
+def test_index_invalidated_by_mtime(tmp_path):
+    pre_file = copy_pre(tmp_path)
+    first = load_role_index(pre_file)
+    
+    st = os.stat(pre_file)
+    os.utime(pre_file, (st.st_atime, st.st_mtime + 10))
+    second = load_role_index(pre_file)
+    
+    assert second is not first
+    assert second.mtime == st.st_mtime + 10
+    assert second.links == first.links
+
+
+class LocalFS:
+    """Minimal fs object (open/info) over the local disk."""
+    
+    def open(self, path, mode='rb'):
+        return open(path, mode)
+    
+    def info(self, path):
+        st = os.stat(path)
+        return {'size': st.st_size, 'mtime': st.st_mtime}
+
+
+def test_cache_keyed_by_fs_and_bounded(tmp_path, monkeypatch):
+    pre_file = copy_pre(tmp_path)
+    monkeypatch.setattr(role_index, '_INDEX_CACHE', role_index.OrderedDict())
+    monkeypatch.setattr(role_index, 'INDEX_CACHE_SIZE', 2)
+    
+    fs = LocalFS()
+    first = load_role_index(pre_file, fs=fs, persist=False)
+    assert load_role_index(pre_file, fs=fs, persist=False) is first
+    # Another fs object never gets the entry of the first one
+    assert load_role_index(pre_file, fs=LocalFS(), persist=False) is not first
+    
+    load_role_index(pre_file, persist=False)
+    assert len(role_index._INDEX_CACHE) == 2
+    assert load_role_index(pre_file, fs=fs, persist=False) is not first
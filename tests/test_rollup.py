@@ -0,0 +1,157 @@
+"""
+Tests for the calculation roll-up engine (linkbases.rollup)
+
+Run the benchmark with: python tests/test_rollup.py
+"""
+
+import time
+
+import pytest
+
+from conftest import DATA
+from leanrl import parse_calculation_linkbase, rollup_calculation
+from leanrl.linkbases import CalculationNode, CalculationTree, RollupPlan
+
+
+NET = 'us-gaap_NetIncomeLoss'
+REV = 'us-gaap_Revenues'
+OPEX = 'us-gaap_OperatingCostsAndExpenses'
+RND = 'us-gaap_ResearchAndDevelopmentExpense'
+SGA = 'us-gaap_SellingGeneralAndAdministrativeExpense'
+DNA = 'us-gaap_DepreciationAndAmortization'
+RND_PARTS = [
+    'us-gaap_ResearchAndDevelopmentExpenseExcludingAcquiredInProcessCost',
+    'us-gaap_ResearchAndDevelopmentExpenseSoftwareExcludingAcquiredInProcessCost',
+    'us-gaap_ResearchAndDevelopmentInProcess',
+]
+
+
+@pytest.fixture
+def tree():
+    return parse_calculation_linkbase(str(DATA / 'sample_calculation.xml'))
+
+
+def make_tree(sums) -> CalculationTree:
+    """CalculationTree from {parent: [(child, weight), ...]}."""
+    tree = CalculationTree()
+    for parent, children in sums.items():
+        for concept in [parent] + [child for child, _ in children]:
+            tree.nodes.setdefault(concept, CalculationNode(concept=concept))
+        tree.nodes[parent].children = list(children)
+    return tree
+
+
+def test_plan_order(tree):
+    plan = tree.rollup_plan()
+    assert plan is tree.rollup_plan()
+    assert set(plan.order) == {NET, OPEX, RND}
+    # Every total comes after the totals among its children
+    assert plan.order.index(RND) < plan.order.index(OPEX) < plan.order.index(NET)
+    assert plan.cycles == []
+
+
+def test_rollup_from_leaves(tree):
+    values = {REV: 1000, SGA: 200, DNA: 50, RND_PARTS[0]: 100, RND_PARTS[1]: 20, RND_PARTS[2]: 5}
+    result = tree.rollup(values)
+    assert result.computed == {RND: 125.0, OPEX: 375.0, NET: 625.0}
+    assert result.status == {RND: 'computed', OPEX: 'computed', NET: 'computed'}
+    assert result.values[NET] == 625.0
+    assert result.is_consistent
+    # The input is not modified
+    assert NET not in values
+
+
+def test_rollup_reported_and_conflicting(tree):
+    values = {REV: 1000, SGA: 200, DNA: 50, RND: 125, OPEX: 400, NET: 600}
+    result = rollup_calculation(tree, values)
+    # RND is reported and its parts are unknown: not checkable, kept as reported
+    assert result.status[RND] == 'reported'
+    assert result.status[OPEX] == 'conflict'
+    assert result.conflicts[OPEX] == (400, 375.0)
+    # The reported OPEX is passed up, so NET is consistent
+    assert result.status[NET] == 'reported'
+    assert sorted(result.reported) == [NET, RND]
+    assert not result.is_consistent
+    
+    df = result.to_dataframe()
+    assert list(df.columns) == ['concept', 'status', 'value', 'computed']
+    row = df.set_index('concept').loc[OPEX]
+    assert (row.status, row.value, row.computed) == ('conflict', 400, 375.0)
+
+
+def test_rollup_incomplete_and_missing_zero(tree):
+    values = {REV: 1000, SGA: 200, RND: 125}
+    result = tree.rollup(values)
+    assert result.status[OPEX] == 'incomplete'
+    assert result.status[NET] == 'incomplete'
+    assert result.incomplete == [OPEX, NET]
+    
+    result = tree.rollup(values, missing='zero')
+    assert result.computed[OPEX] == 325.0
+    assert result.computed[NET] == 675.0
+    
+    with pytest.raises(ValueError):
+        tree.rollup(values, missing='nan')
+
+
+def test_cycles():
+    tree = make_tree({
+        'A': [('B', 1.0), ('X', 1.0)],
+        'B': [('C', 1.0)],
+        'C': [('B', 1.0), ('Y', 1.0)],
+        'D': [('D', 1.0)],
+        'T': [('A', 1.0), ('Z', 1.0)],
+    })
+    plan = RollupPlan.from_tree(tree)
+    assert sorted(sorted(group) for group in plan.cycles) == [['B', 'C'], ['D']]
+    assert plan.order == ['A', 'T']
+    
+    result = plan.rollup({'X': 1, 'Y': 2, 'Z': 3})
+    assert result.status == {'A': 'incomplete', 'T': 'incomplete', 'B': 'cycle', 'C': 'cycle', 'D': 'cycle'}
+    result = plan.rollup({'X': 1, 'Y': 2, 'Z': 3, 'B': 10})
+    assert result.computed == {'A': 11.0, 'T': 14.0}
+
+
+def test_matches_validate_calculation():
+    tree = parse_calculation_linkbase(str(DATA / 'us-gaap-stm-soi-cal-2020-01-31.xml'))
+    leaves = [c for c, node in tree.nodes.items() if not node.children]
+    values = {concept: float(i % 97) for i, concept in enumerate(leaves)}
+    result = tree.rollup(values)
+    
+    assert len(result.computed) == len(tree.rollup_plan())
+    for concept in result.computed:
+        is_valid, expected, actual = tree.validate_calculation(concept, result.values)
+        assert is_valid and expected == actual
+    
+    many = tree.rollup_plan().rollup_many({'c1': values, 'c2': {}})
+    assert many['c1'].computed == result.computed
+    assert many['c2'].computed == {}
+
+
+def benchmark(n_contexts: int = 20_000) -> None:
+    """Cached plan vs. re-deriving the order for every context."""
+    tree = parse_calculation_linkbase(str(DATA / 'us-gaap-stm-soi-cal-2020-01-31.xml'))
+    leaves = [c for c, node in tree.nodes.items() if not node.children]
+    contexts = [
+        {concept: float((i * 31 + j) % 1000) for j, concept in enumerate(leaves) if (i + j) % 5}
+        for i in range(n_contexts)
+    ]
+    print(f"{len(tree.rollup_plan())} totals, {len(leaves)} leaves, {n_contexts:,} contexts")
+    
+    start = time.perf_counter()
+    for values in contexts:
+        tree.rollup(values)
+    cached = time.perf_counter() - start
+    
+    n_uncached = n_contexts // 20
+    start = time.perf_counter()
+    for values in contexts[:n_uncached]:
+        RollupPlan.from_tree(tree).rollup(values)
+    uncached = (time.perf_counter() - start) * n_contexts / n_uncached
+    
+    print(f"cached plan    : {cached:7.3f} s ({cached / n_contexts * 1e6:.0f} us/context)")
+    print(f"plan per call  : {uncached:7.3f} s (extrapolated) -> {uncached / cached:.1f}x")
+
+
+if __name__ == '__main__':
+    benchmark()
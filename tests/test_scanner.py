@@ -0,0 +1,176 @@
+"""
+Tests for the expat scanning engine (core.scanner)
+
+Checks that engine='expat' produces the same trees and labels as the
+default ElementTree engine on the linkbases in tests/data.
+
+Run the benchmark with: python tests/test_scanner.py
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from conftest import DATA, LINK_ROLE, SCHEMA_FOOTER, arc, label, link, linkbase, loc, schema_header
+from leanrl import (
+    Roles,
+    parse_all_labels,
+    parse_calculation_linkbase,
+    parse_definition_linkbase,
+    parse_label_linkbase,
+    parse_presentation_linkbase,
+    qname,
+)
+from leanrl.core import ENGINES, stream_fields
+
+
+PARSERS = {
+    'def': parse_definition_linkbase,
+    'pre': parse_presentation_linkbase,
+    'cal': parse_calculation_linkbase,
+}
+ARC_NAMES = {'def': 'definition', 'pre': 'presentation', 'cal': 'calculation'}
+
+LABEL_XML = linkbase(link(
+    'label', LINK_ROLE,
+    loc('loc_Assets', 'us-gaap_Assets'),
+    label('lab_Assets', Roles.LABEL, 'en-US', 'Assets'),
+    label('lab_Assets', Roles.TERSE_LABEL, 'en-US', 'Assets &amp; more'),
+    arc('label', 'loc_Assets', 'lab_Assets'),
+))
+
+ROLE_A = 'http://example.com/role/StatementA'
+ROLE_B = 'http://example.com/role/StatementB'
+
+
+def two_role_presentation(path: Path) -> Path:
+    """Write a presentation linkbase with one two-concept link per role."""
+    links = []
+    for role, concepts in ((ROLE_A, ('AAbstract', 'A1')), (ROLE_B, ('BAbstract', 'B1'))):
+        parent, child = concepts
+        links.append(link(
+            'presentation', role,
+            loc('p', f'us-gaap_{parent}'), loc('c', f'us-gaap_{child}'),
+            arc('presentation', 'p', 'c', order=1),
+        ))
+    path.write_text(linkbase(*links), encoding='utf-8')
+    return path
+
+
+def linkbase_files(kind: str) -> list[Path]:
+    return sorted(DATA.glob(f'us-gaap-*-{kind}-*.xml'))
+
+
+@pytest.mark.parametrize('kind', sorted(PARSERS))
+def test_expat_matches_etree(kind):
+    parse = PARSERS[kind]
+    for xml_file in linkbase_files(kind):
+        etree_tree = parse(str(xml_file))
+        expat_tree = parse(str(xml_file), engine='expat')
+        assert etree_tree.nodes == expat_tree.nodes, xml_file.name
+        assert etree_tree.roots == expat_tree.roots, xml_file.name
+
+
+def test_expat_labels(tmp_path):
+    xml_file = tmp_path / 'lab.xml'
+    xml_file.write_text(LABEL_XML, encoding='utf-8')
+    
+    assert parse_label_linkbase(str(xml_file), role=Roles.LABEL, engine='expat') == {'us-gaap_Assets': 'Assets'}
+    assert parse_all_labels(str(xml_file), engine='expat') == parse_all_labels(str(xml_file))
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_roles_filter(tmp_path, engine):
+    xml_file = str(two_role_presentation(tmp_path / 'pre.xml'))
+    
+    only_a = parse_presentation_linkbase(xml_file, engine=engine, roles=ROLE_A)
+    assert set(only_a.nodes) == {'us-gaap_AAbstract', 'us-gaap_A1'}
+    
+    by_predicate = parse_presentation_linkbase(xml_file, engine=engine, roles=lambda r: r.endswith('B'))
+    assert set(by_predicate.nodes) == {'us-gaap_BAbstract', 'us-gaap_B1'}
+    
+    both = parse_presentation_linkbase(xml_file, engine=engine, roles=[ROLE_A, ROLE_B])
+    assert both.nodes == parse_presentation_linkbase(xml_file, engine=engine).nodes
+    
+    assert not parse_presentation_linkbase(xml_file, engine=engine, roles='http://example.com/none').nodes
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_extended_links_reported_at_start(tmp_path, engine):
+    xml_file = str(two_role_presentation(tmp_path / 'pre.xml'))
+    TAG_LINK = qname('link', 'presentationLink')
+    TAG_LOC = qname('link', 'loc')
+    fields = {
+        TAG_LINK: (qname('xlink', 'role'),),
+        TAG_LOC: (qname('xlink', 'label'),),
+    }
+    events = list(stream_fields(xml_file, fields, engine=engine))
+    assert events == [
+        (TAG_LINK, (ROLE_A,)), (TAG_LOC, ('p',)), (TAG_LOC, ('c',)),
+        (TAG_LINK, (ROLE_B,)), (TAG_LOC, ('p',)), (TAG_LOC, ('c',)),
+    ]
+    assert list(stream_fields(xml_file, fields, engine=engine, roles=ROLE_B)) == events[3:]
+
+
+NESTED_XSD = schema_header('http://example.com/ex') + (
+    "<xs:element name='Outer'><xs:complexType><xs:sequence>"
+    "<xs:element name='Inner'><xs:complexType><xs:sequence>"
+    "<xs:element name='Innermost'/>"
+    "</xs:sequence></xs:complexType></xs:element>"
+    "<xs:element name='Sibling'/>"
+    "</xs:sequence></xs:complexType></xs:element>\n"
+    "<xs:element name='After'/>\n"
+) + SCHEMA_FOOTER
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_nested_tags_reported_outer_first(tmp_path, engine):
+    xsd_file = tmp_path / 'nested.xsd'
+    xsd_file.write_text(NESTED_XSD, encoding='utf-8')
+    fields = {qname('xs', 'element'): ('name',)}
+    names = [values[0] for _, values in stream_fields(str(xsd_file), fields, engine=engine)]
+    assert names == ['Outer', 'Inner', 'Innermost', 'Sibling', 'After']
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        parse_definition_linkbase(str(DATA / 'sample_definition.xml'), engine='lxml')
+
+
+def _best_time(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(repeat: int = 7) -> None:
+    """Print best-of-N throughput (MB/s) per engine for every linkbase in tests/data."""
+    TAG_LOC = qname('link', 'loc')
+    fields = {
+        TAG_LOC: (qname('xlink', 'label'), qname('xlink', 'href')),
+    }
+    for kind, parse in PARSERS.items():
+        files = linkbase_files(kind)
+        total_mb = sum(f.stat().st_size for f in files) / 1e6
+        arc_fields = dict(fields)
+        arc_fields[qname('link', f'{ARC_NAMES[kind]}Arc')] = (
+            qname('xlink', 'arcrole'), qname('xlink', 'from'), qname('xlink', 'to'), 'order',
+        )
+        for step, run in (
+            ('scan ', lambda engine: [list(stream_fields(str(f), arc_fields, engine=engine)) for f in files]),
+            ('parse', lambda engine: [parse(str(f), engine=engine) for f in files]),
+        ):
+            t_etree = _best_time(lambda: run('etree'), repeat)
+            t_expat = _best_time(lambda: run('expat'), repeat)
+            print(f"{kind} {step}: {len(files)} files, {total_mb:.2f} MB | "
+                  f"etree {total_mb / t_etree:6.1f} MB/s | "
+                  f"expat {total_mb / t_expat:6.1f} MB/s | "
+                  f"speedup {t_etree / t_expat:.2f}x")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,167 @@
+"""
+Tests for the streaming schema parser (taxonomy.schema)
+
+Run the benchmark with: python tests/test_schema.py
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from conftest import SCHEMA_FOOTER, element, schema_header
+from leanrl import (
+    extract_concepts_from_schema,
+    iter_schema,
+    parse_schema,
+    parse_schema_index,
+    parse_schema_to_dict,
+)
+from leanrl.core import ENGINES
+
+
+SCHEMA_XSD = schema_header() + ''.join([
+    element('Assets', balance='debit'),
+    element('Revenues', period='duration', balance='credit'),
+    element('AssetsAbstract', type_='xbrli:stringItemType', period='duration', abstract=True),
+    element('EntityRegistrantName', type_='dei:legalEntityNameItemType', period='duration', prefix='dei'),
+    element('DerivedAmount', type_='us-types:perShareMonetaryItemType', period='duration'),
+    element('NoId', type_='xbrli:stringItemType', with_id=False),
+    # Local element reference inside a complex type: no name, not a concept
+    "<xs:complexType name='T'><xs:sequence><xs:element ref='us-gaap:Assets'/></xs:sequence></xs:complexType>\n",
+]) + SCHEMA_FOOTER
+
+
+@pytest.fixture
+def xsd_file(tmp_path):
+    path = tmp_path / 'us-gaap-2020-01-31.xsd'
+    path.write_text(SCHEMA_XSD, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_parse_schema(xsd_file, engine):
+    schemas = parse_schema(xsd_file, engine=engine)
+    assert [s.name for s in schemas] == [
+        'us-gaap_Assets', 'us-gaap_Revenues', 'dei_EntityRegistrantName', 'us-gaap_DerivedAmount', 'NoId',
+    ]
+    assets = schemas[0]
+    assert (assets.prefix, assets.id, assets.type) == ('us-gaap', 'us-gaap_Assets', 'xbrli:monetaryItemType')
+    assert (assets.period_type, assets.balance, assets.abstract, assets.nillable) == ('instant', 'debit', False, True)
+    assert assets.substitution_group == 'xbrli:item'
+    assert schemas[-1].prefix is None and schemas[-1].id == ''
+    
+    with_abstract = parse_schema(xsd_file, include_abstract=True, engine=engine)
+    assert with_abstract[2].name == 'us-gaap_AssetsAbstract' and with_abstract[2].abstract
+
+
+def test_filters(xsd_file):
+    def names(**kwargs):
+        return [s.name for s in parse_schema(xsd_file, **kwargs)]
+    
+    assert names(filter_monetary=True) == ['us-gaap_Assets', 'us-gaap_Revenues', 'us-gaap_DerivedAmount']
+    assert names(filter_monetary=True, filter_instant=True) == ['us-gaap_Assets']
+    assert names(filter_duration=True) == ['us-gaap_Revenues', 'dei_EntityRegistrantName', 'us-gaap_DerivedAmount']
+    # Without id, the name is built from the requested prefix
+    assert names(prefix='dei') == ['dei_EntityRegistrantName', 'dei_NoId']
+    assert names(prefix='us-gaap')[-1] == 'us-gaap_NoId'
+    assert list(iter_schema(xsd_file, filter_instant=True, filter_duration=True)) == []
+
+
+def test_names_and_metadata_in_one_call(xsd_file):
+    names, schemas = parse_schema_index(xsd_file, include_abstract=True)
+    assert names == list(parse_schema_to_dict(xsd_file, include_abstract=True))
+    assert len(names) == 6
+    assert schemas['us-gaap_Revenues'].balance == 'credit'
+    assert extract_concepts_from_schema(xsd_file, filter_monetary=True) == [
+        'us-gaap_Assets', 'us-gaap_Revenues', 'us-gaap_DerivedAmount',
+    ]
+
+
+# A tuple whose content model declares its member inline
+TUPLE_XSD = schema_header('http://example.com/ex') + (
+    "<xs:element name='T' id='ex_T' substitutionGroup='xbrli:tuple' nillable='true'>"
+    "<xs:complexType><xs:complexContent><xs:restriction base='xs:anyType'><xs:sequence>"
+    "<xs:element name='Inner' id='ex_Inner' type='xbrli:stringItemType' substitutionGroup='xbrli:item' "
+    "xbrli:periodType='duration'/>"
+    "</xs:sequence></xs:restriction></xs:complexContent></xs:complexType></xs:element>\n"
+) + element('A', prefix='ex') + SCHEMA_FOOTER
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_tuple_members_are_concepts(tmp_path, engine):
+    path = tmp_path / 'ex-2023.xsd'
+    path.write_text(TUPLE_XSD, encoding='utf-8')
+    assert [s.name for s in parse_schema(str(path), engine=engine)] == ['ex_T', 'ex_Inner', 'ex_A']
+    assert extract_concepts_from_schema(str(path), prefix='ex', engine=engine) == ['ex_T', 'ex_Inner', 'ex_A']
+    assert parse_schema(str(path), filter_duration=True, engine=engine)[0].name == 'ex_Inner'
+
+
+def synthetic_schema(path: Path, n: int = 20_000) -> Path:
+    """us-gaap-sized schema: a mix of abstract, monetary and other concepts."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(schema_header())
+        for i in range(n):
+            f.write(element(
+                f'Concept{i}',
+                type_='xbrli:monetaryItemType' if i % 3 else 'xbrli:stringItemType',
+                period='instant' if i % 2 else 'duration',
+                balance='debit' if i % 3 == 1 else None,
+                abstract=i % 10 == 0,
+            ))
+        f.write(SCHEMA_FOOTER)
+    return path
+
+
+def benchmark() -> None:
+    """Streaming parse with early filters vs. the former ET.parse of the whole schema."""
+    import tempfile
+    import tracemalloc
+    import xml.etree.ElementTree as ET
+    from leanrl.taxonomy.schema import XS_NS, XBRLI_NS, ConceptSchema
+    
+    def old_parse_schema(path, filter_monetary=False):
+        root = ET.parse(path).getroot()
+        results = []
+        for elem in root.iter(f'{XS_NS}element'):
+            name = elem.get('id') or elem.get('name')
+            if not elem.get('name'):
+                continue
+            schema = ConceptSchema(
+                name=name, prefix=name.split('_', 1)[0], id=elem.get('id', ''), type=elem.get('type', ''),
+                period_type=elem.get(f'{XBRLI_NS}periodType'), balance=elem.get(f'{XBRLI_NS}balance'),
+                abstract=elem.get('abstract', 'false') == 'true',
+                substitution_group=elem.get('substitutionGroup', ''),
+                nillable=elem.get('nillable', 'true') == 'true',
+            )
+            if schema.abstract or (filter_monetary and not schema.is_monetary):
+                continue
+            results.append(schema)
+        return results
+    
+    def _peak(parse):
+        tracemalloc.start()
+        result = parse()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result, peak
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        xsd = str(synthetic_schema(Path(tmp) / 'big.xsd'))
+        runs = [
+            ('ET.parse, filter after building', lambda: old_parse_schema(xsd, filter_monetary=True)),
+            ('stream (etree), early filter   ', lambda: parse_schema(xsd, filter_monetary=True)),
+            ('stream (expat), early filter   ', lambda: parse_schema(xsd, filter_monetary=True, engine='expat')),
+            ('names only (expat)             ', lambda: extract_concepts_from_schema(
+                xsd, prefix='us-gaap', filter_monetary=True, engine='expat',
+            )),
+        ]
+        for label, parse in runs:
+            start = time.perf_counter()
+            parse()
+            elapsed = time.perf_counter() - start
+            result, peak = _peak(parse)
+            print(f"{label}: {elapsed * 1e3:7.1f} ms, peak {peak / 2**20:5.1f} MiB, {len(result):,} concepts")
+
+if __name__ == '__main__':
+    benchmark()
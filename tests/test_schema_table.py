@@ -0,0 +1,156 @@
+"""
+Tests for the columnar concept schema table (taxonomy.schema_table)
+
+Run the benchmark with: python tests/test_schema_table.py
+"""
+
+import pickle
+import time
+from pathlib import Path
+
+import pytest
+
+# Puts src on the path when run directly
+import conftest  # noqa: F401
+from leanrl import ConceptSchemaTable, get_concept_types, parse_schema, parse_schema_table
+from leanrl.core import ENGINES
+
+from test_schema import SCHEMA_XSD, synthetic_schema
+
+
+MASKS = ('is_monetary', 'is_instant', 'is_duration', 'is_debit', 'is_credit', 'is_extension')
+
+
+@pytest.fixture
+def xsd_file(tmp_path):
+    path = tmp_path / 'us-gaap-2020-01-31.xsd'
+    path.write_text(SCHEMA_XSD, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_rows_match_parse_schema(xsd_file, engine):
+    table = parse_schema_table(xsd_file, engine=engine)
+    schemas = parse_schema(xsd_file, include_abstract=True, engine=engine)
+    assert len(table) == len(schemas) == 6
+    assert list(table) == schemas
+    assert table['us-gaap_Assets'] == schemas[0]
+    assert table[-1].prefix is None and table[-1].id == ''
+    assert 'dei_EntityRegistrantName' in table and 'us-gaap_Nope' not in table
+    assert table.get('us-gaap_Nope') is None
+    
+    dei = parse_schema_table(xsd_file, prefix='dei', include_abstract=False, engine=engine)
+    assert list(dei) == parse_schema(xsd_file, prefix='dei', engine=engine)
+
+
+def test_masks_match_properties(xsd_file):
+    table = parse_schema_table(xsd_file)
+    for mask in MASKS:
+        assert getattr(table, mask).tolist() == [getattr(s, mask) for s in table], mask
+    assert table.is_abstract.tolist() == [s.abstract for s in table]
+    
+    assert table.where(table.is_monetary & table.is_duration & ~table.is_abstract) == [
+        'us-gaap_Revenues', 'us-gaap_DerivedAmount',
+    ]
+    assert table.where(table.is_usgaap & table.is_credit) == ['us-gaap_Revenues']
+    per_share = table.category_mask('type', lambda t: 'perShare' in t)
+    assert table.where(per_share) == ['us-gaap_DerivedAmount']
+    # Rows without a balance are never debit nor credit
+    assert not (table.is_debit & table.is_credit).any()
+    assert table.is_debit.sum() + table.is_credit.sum() == 2
+
+
+def test_select_and_empty(xsd_file):
+    table = parse_schema_table(xsd_file)
+    instant = table.select(table.is_instant)
+    assert instant.names == ['us-gaap_Assets', 'NoId']
+    assert instant['NoId'] == table['NoId']
+    assert instant.is_monetary.tolist() == [True, False]
+    # The selection owns its categories
+    instant.append('ex_New', prefix='ex', type='ex:newItemType')
+    assert 'ex' not in table.categories['prefix'] and 'ex:newItemType' not in table.categories['type']
+    assert instant['ex_New'].type == 'ex:newItemType' and len(table) == 6
+    
+    empty = table.select(table.is_debit & table.is_credit)
+    assert len(empty) == 0 and empty.where(empty.is_monetary) == []
+    assert len(ConceptSchemaTable().is_extension) == 0
+
+
+def test_lookup_with_repeated_names(xsd_file):
+    # Overlapping schemas repeat names: the index is extended, not rebuilt
+    table = parse_schema_table(xsd_file).read(xsd_file)
+    assert len(table) == 12
+    assert table['us-gaap_Assets'] == table[6]
+    index = table._row_index()
+    assert 'NoId' in table and table.get('us-gaap_Revenues') == table[7]
+    assert table._row_index() is index and table._indexed == 12
+    table.append('ext_Custom', 'ext')
+    assert table['ext_Custom'].prefix == 'ext' and table._indexed == 13
+
+
+def test_from_schemas_and_pickle(xsd_file):
+    schemas = parse_schema(xsd_file, include_abstract=True)
+    table = ConceptSchemaTable.from_schemas(schemas)
+    assert list(table) == schemas
+    
+    restored = pickle.loads(pickle.dumps(table))
+    assert list(restored) == schemas
+    assert restored.is_monetary.tolist() == table.is_monetary.tolist()
+    restored.append('ext_Custom', 'ext', type='xbrli:monetaryItemType', period_type='duration')
+    # Without a prefix the name decides: 'NoId' is not a standard prefix
+    assert restored.where(restored.is_extension) == ['NoId', 'ext_Custom']
+
+
+def test_dataframe_and_concept_types(xsd_file):
+    table = parse_schema_table(xsd_file)
+    df = table.to_dataframe()
+    assert list(df.columns) == ['name', 'prefix', 'id', 'type', 'period_type', 'balance', 'abstract',
+                                'substitution_group', 'nillable']
+    for column in ('prefix', 'type', 'period_type', 'balance', 'substitution_group'):
+        assert str(df[column].dtype) == 'category'
+    assert df.loc[df.balance == 'debit', 'name'].tolist() == ['us-gaap_Assets']
+    assert df['balance'].isna().sum() == 4
+    assert df['abstract'].tolist() == table.is_abstract.tolist()
+    
+    types = get_concept_types(xsd_file)
+    assert types['period_types'] == {'instant', 'duration'}
+    assert types['balances'] == {'debit', 'credit'}
+    assert types['substitution_groups'] == {'xbrli:item'}
+    assert len(types['types']) == 4
+
+
+def benchmark() -> None:
+    """Vectorized masks vs. ConceptSchema properties evaluated per object."""
+    import tempfile
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        xsd = str(synthetic_schema(Path(tmp) / 'big.xsd', n=100_000))
+        
+        start = time.perf_counter()
+        schemas = parse_schema(xsd, include_abstract=True, engine='expat')
+        objects_parse = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        table = parse_schema_table(xsd, engine='expat')
+        table_parse = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for _ in range(10):
+        loop = [s.name for s in schemas if s.is_monetary and s.is_instant and not s.abstract and not s.is_extension]
+    loop_time = (time.perf_counter() - start) / 10
+    
+    start = time.perf_counter()
+    for _ in range(10):
+        masked = table.where(table.is_monetary & table.is_instant & ~table.is_abstract & ~table.is_extension)
+    mask_time = (time.perf_counter() - start) / 10
+    assert masked == loop
+    
+    print(f"{len(table):,} concepts, {len(table.categories['type'])} types")
+    print(f"parse_schema (objects): {objects_parse * 1e3:7.1f} ms")
+    print(f"parse_schema_table    : {table_parse * 1e3:7.1f} ms")
+    print(f"per-object filter     : {loop_time * 1e3:7.2f} ms")
+    print(f"vectorized masks      : {mask_time * 1e3:7.2f} ms ({loop_time / mask_time:.0f}x), {len(masked):,} concepts")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,120 @@
+"""
+Memory tests for core.streaming.stream_xml
+
+Builds synthetic reference linkbases of increasing size and checks that
+the bounded-memory (prune=True) mode keeps peak memory flat.
+
+Run with: python -m pytest tests/test_streaming.py
+"""
+
+import tracemalloc
+from pathlib import Path
+
+from conftest import DATA, LINK_ROLE, arc, link, linkbase, loc, reference
+from leanrl import stream_xml, qname, parse_reference_linkbase
+
+
+def write_reference_linkbase(path: Path, n: int) -> Path:
+    """Write a reference linkbase with n concepts, each citing one reference."""
+    content = []
+    for i in range(n):
+        content += [
+            loc(f'loc_{i}', f'us-gaap_C{i}'),
+            reference(f'ref_{i}', Publisher='FASB', Topic=str(i % 900), Section=str(i % 50)),
+            arc('reference', f'loc_{i}', f'ref_{i}'),
+        ]
+    path.write_text(linkbase(link('reference', LINK_ROLE, *content)), encoding='utf-8')
+    return path
+
+
+def peak_stream_memory(xml_file: Path, prune: bool) -> int:
+    """Peak traced memory while streaming every loc/reference/arc element."""
+    tags = {qname('link', 'loc'), qname('link', 'reference'), qname('link', 'referenceArc')}
+    tracemalloc.start()
+    try:
+        for _tag, _elem in stream_xml(xml_file, tags_of_interest=tags, prune=prune):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def test_pruned_stream_memory_is_flat(tmp_path):
+    small = write_reference_linkbase(tmp_path / 'small.xml', 2_000)
+    large = write_reference_linkbase(tmp_path / 'large.xml', 20_000)
+
+    peak_small = peak_stream_memory(small, prune=True)
+    peak_large = peak_stream_memory(large, prune=True)
+
+    # 10x more input, but peak memory should stay (roughly) the same
+    assert peak_large < peak_small * 1.5, (peak_small, peak_large)
+
+
+def test_unpruned_stream_memory_grows(tmp_path):
+    small = write_reference_linkbase(tmp_path / 'small.xml', 2_000)
+    large = write_reference_linkbase(tmp_path / 'large.xml', 20_000)
+
+    # Sanity check that the test actually detects growth
+    assert peak_stream_memory(large, prune=False) > 3 * peak_stream_memory(small, prune=False)
+
+
+def test_pruned_reference_parts_survive(tmp_path):
+    xml_file = write_reference_linkbase(tmp_path / 'refs.xml', 10)
+    refs = parse_reference_linkbase(str(xml_file))
+
+    assert len(refs) == 10
+    ref = refs['us-gaap_C7'][0]
+    assert ref.parts == {'Publisher': 'FASB', 'Topic': '7', 'Section': '7'}
+
+
+def test_on_start_sees_links_before_their_children(tmp_path):
+    xml_file = write_reference_linkbase(tmp_path / 'refs.xml', 3)
+    link = qname('link', 'referenceLink')
+    events = []
+
+    def on_start(elem):
+        if elem.tag == link:
+            events.append(('start', elem.get(qname('xlink', 'role'))))
+
+    def skip(elem):
+        return elem.tag == qname('link', 'reference')
+
+    tags = {qname('link', 'loc'), qname('link', 'reference')}
+    for tag, elem in stream_xml(xml_file, tags_of_interest=tags, skip=skip, on_start=on_start):
+        events.append(('end', elem.get(qname('xlink', 'label'))))
+
+    # The link is reported once, first; skipped references are never seen
+    assert events == [
+        ('start', 'http://www.xbrl.org/2003/role/link'),
+        ('end', 'loc_0'), ('end', 'loc_1'), ('end', 'loc_2'),
+    ]
+
+
+
+def test_pruned_stream_yields_nested_elements():
+    # The presentationArcs live inside the presentationLink of interest
+    xml_file = DATA / 'us-gaap-stm-soi-pre-2020-01-31.xml'
+    tags = {qname('link', 'presentationLink'), qname('link', 'presentationArc')}
+
+    def streamed(**kwargs):
+        return [tag for tag, _elem in stream_xml(xml_file, tags_of_interest=tags, **kwargs)]
+
+    unpruned = streamed()
+    assert unpruned.count(qname('link', 'presentationArc')) == 549
+    assert streamed(prune=True) == unpruned
+    assert streamed(on_start=lambda elem: None) == unpruned
+
+    # Nested elements are still attached when the outer one is yielded
+    for tag, elem in stream_xml(xml_file, tags_of_interest=tags, prune=True):
+        if tag == qname('link', 'presentationLink'):
+            assert len(elem.findall(qname('link', 'presentationArc'))) == 549
+
+
+if __name__ == '__main__':
+    import tempfile
+    with tempfile.TemporaryDirectory() as d:
+        for n in (2_000, 20_000, 200_000):
+            f = write_reference_linkbase(Path(d) / f'ref-{n}.xml', n)
+            print(f"{n:>8} refs: pruned peak={peak_stream_memory(f, True):>10,} B  "
+                  f"unpruned peak={peak_stream_memory(f, False):>12,} B")
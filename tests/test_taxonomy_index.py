@@ -0,0 +1,102 @@
+"""
+Tests for TaxonomyIndex (taxonomy.helper)
+
+Checks that the inverted index gives the same answers as the per-concept
+find_concept_stm_dis() scan on the def/pre linkbases in tests/data.
+
+Run the benchmark with: python tests/test_taxonomy_index.py
+"""
+
+import re
+import time
+
+import pytest
+
+from conftest import DATA
+from leanrl import (
+    TaxonomyIndex,
+    find_concept_stm_dis,
+    parse_definition_linkbase,
+    parse_presentation_linkbase,
+)
+
+
+PARSERS = {
+    'def': parse_definition_linkbase,
+    'pre': parse_presentation_linkbase,
+}
+
+
+def load_trees(kind: str) -> dict:
+    """Statement trees keyed like build_stm_dis_trees(), plus one 'disclosure'."""
+    trees = {}
+    for xml_file in sorted(DATA.glob(f'us-gaap-stm-*-{kind}-*.xml')):
+        key = re.match(rf'us-gaap-stm-(.+)-{kind}-', xml_file.name).group(1)
+        trees[key] = PARSERS[kind](str(xml_file))
+    # Reuse a statement file as a stand-in disclosure tree
+    trees['dis-cf'] = trees['scf-inv']
+    return trees
+
+
+def all_concepts(trees: dict) -> list:
+    return sorted(set().union(*(tree.nodes for tree in trees.values()))) + ['us-gaap_NotAConcept']
+
+
+@pytest.mark.parametrize('kind', sorted(PARSERS))
+def test_index_matches_scan(kind):
+    trees = load_trees(kind)
+    index = TaxonomyIndex(trees)
+    
+    for concept in all_concepts(trees):
+        assert index.primary(concept) == find_concept_stm_dis(concept, trees)
+        
+        present = [key for key, tree in trees.items() if concept in tree]
+        assert index.memberships(concept) == present
+        assert index.statements(concept) == [k for k in present if not k.startswith('dis-')]
+        assert index.disclosures(concept) == [k for k in present if k.startswith('dis-')]
+
+
+def test_priority():
+    trees = load_trees('def')
+    index = TaxonomyIndex(trees)
+    
+    assert index.priority == ['soi', 'scf-indir', 'scf-inv', 'sfp-cls']
+    concept = next(c for c in trees['soi'].nodes if c in trees['sfp-cls'])
+    assert index.primary_statement(concept) == 'soi'
+    assert index.primary(concept).path[0] == '[Statement of Income]'
+
+
+def _best_time(fn, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark() -> None:
+    """Time per-concept lookups: find_concept_stm_dis() scan vs TaxonomyIndex."""
+    trees = load_trees('def')
+    concepts = all_concepts(trees)
+    
+    def scan():
+        for concept in concepts:
+            find_concept_stm_dis(concept, trees)
+            [key for key, tree in trees.items() if concept in tree]
+    
+    def indexed():
+        index = TaxonomyIndex(trees)
+        for concept in concepts:
+            index.primary(concept)
+            index.memberships(concept)
+    
+    t_scan = _best_time(scan)
+    t_index = _best_time(indexed)
+    print(f"{len(concepts):,} concepts, {len(trees)} trees")
+    print(f"scan : {t_scan * 1e3:8.1f} ms")
+    print(f"index: {t_index * 1e3:8.1f} ms (including build) -> {t_scan / t_index:.1f}x")
+
+
+if __name__ == '__main__':
+    benchmark()
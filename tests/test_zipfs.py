@@ -0,0 +1,190 @@
+"""
+Tests for the zip-backed virtual filesystem (core.zipfs)
+
+Packs the linkbases in tests/data into a taxonomy-shaped zip and checks
+that every reader gives the same result from the archive as from disk,
+without extracting anything.
+
+Run the benchmark with: python tests/test_zipfs.py
+"""
+
+import io
+import pickle
+import shutil
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from conftest import DATA
+from leanrl import (
+    ZipFS,
+    ZipPath,
+    build_stm_dis_trees,
+    find_file_by_pattern,
+    get_specific_role_tree,
+    parse_calculation_linkbase,
+    parse_definition_linkbase,
+    parse_presentation_linkbase,
+)
+from leanrl.core import ENGINES, as_sources
+
+
+ROOT = 'us-gaap-2020-01-31'
+
+PARSERS = {
+    'def': parse_definition_linkbase,
+    'pre': parse_presentation_linkbase,
+    'cal': parse_calculation_linkbase,
+}
+
+
+def make_taxonomy(tmp_path: Path) -> tuple[Path, Path]:
+    """The tests/data statements as <root>/stm/ on disk and in a zip (no directory entries)."""
+    folder = tmp_path / ROOT
+    (folder / 'stm').mkdir(parents=True)
+    archive = tmp_path / f'{ROOT}.zip'
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for xml_file in sorted(DATA.glob('us-gaap-stm-*.xml')):
+            shutil.copy(xml_file, folder / 'stm' / xml_file.name)
+            zf.write(xml_file, f'{ROOT}/stm/{xml_file.name}')
+    return folder, archive
+
+
+def test_listing(tmp_path):
+    _, archive = make_taxonomy(tmp_path)
+    fs = ZipFS(archive)
+    
+    # Directories exist even without their own zip entries
+    assert fs.ls('') == [ROOT]
+    assert fs.isdir(f'{ROOT}/stm') and not fs.isfile(f'{ROOT}/stm')
+    assert fs.glob(f'{ROOT}/*/us-gaap-stm-soi-*.xml') == [
+        f'{ROOT}/stm/us-gaap-stm-soi-{kind}-2020-01-31.xml' for kind in ('cal', 'def', 'pre')
+    ]
+    assert fs.glob('*.xml') == []  # '*' does not cross '/'
+    
+    name = f'{ROOT}/stm/us-gaap-stm-soi-def-2020-01-31.xml'
+    assert fs.info(name)['size'] == (DATA / Path(name).name).stat().st_size
+    
+    base = fs.path(ROOT)
+    assert [p.name for p in base.iterdir()] == ['stm']
+    xml = base / 'stm' / 'us-gaap-stm-soi-def-2020-01-31.xml'
+    assert xml.exists() and xml.is_file()
+    assert (xml.stem, xml.suffix, xml.parent) == ('us-gaap-stm-soi-def-2020-01-31', '.xml', base / 'stm')
+    assert xml.read_bytes() == (DATA / xml.name).read_bytes()
+    assert find_file_by_pattern(base / 'stm', r'us-gaap-stm-sfp-cls-pre-') == base / 'stm' / 'us-gaap-stm-sfp-cls-pre-2020-01-31.xml'
+    assert find_file_by_pattern(base / 'elts', r'.*') is None
+    
+    with pytest.raises(FileNotFoundError):
+        fs.open(f'{ROOT}/stm/missing.xml')
+    with pytest.raises(IsADirectoryError):
+        fs.open(f'{ROOT}/stm')
+    with pytest.raises(OSError):
+        fs.open(name, 'wb')
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('kind', sorted(PARSERS))
+def test_parsers_read_members(tmp_path, kind, engine):
+    _, archive = make_taxonomy(tmp_path)
+    fs = ZipFS(archive)
+    parse = PARSERS[kind]
+    
+    for name in fs.glob(f'{ROOT}/stm/*-{kind}-*.xml'):
+        expected = parse(str(DATA / Path(name).name), engine=engine)
+        assert parse(fs.path(name), engine=engine) == expected
+        with fs.open(name) as f:
+            assert parse(f, engine=engine) == expected
+        assert parse(io.BytesIO(fs.path(name).read_bytes()), engine=engine) == expected
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_build_trees_from_zip(tmp_path, workers):
+    folder, archive = make_taxonomy(tmp_path)
+    on_disk = build_stm_dis_trees(str(folder), tree_type='pre')
+    before = sorted(tmp_path.rglob('*'))
+    
+    with ZipFS(archive) as fs:
+        in_zip = build_stm_dis_trees(fs.path(ROOT), tree_type='pre', workers=workers)
+    
+    assert len(in_zip) == 4
+    assert sorted(in_zip) == sorted(on_disk)
+    for key, tree in on_disk.items():
+        assert in_zip[key] == tree
+    # Nothing was extracted
+    assert sorted(tmp_path.rglob('*')) == before
+
+
+def test_role_tree_from_zip(tmp_path):
+    folder, archive = make_taxonomy(tmp_path)
+    name = 'us-gaap-stm-soi-pre-2020-01-31.xml'
+    keywords = ['statement', 'income']
+    expected = get_specific_role_tree(None, str(folder / 'stm' / name), keywords, use_index=False)
+    
+    fs = ZipFS(archive)
+    # The sidecar index cannot be written into the archive; it stays in memory
+    assert get_specific_role_tree(fs, f'{ROOT}/stm/{name}', keywords) == expected
+    assert get_specific_role_tree(fs, f'{ROOT}/stm/{name}', keywords, use_index=False) == expected
+
+
+def test_pickle(tmp_path):
+    _, archive = make_taxonomy(tmp_path)
+    xml = ZipFS(archive).path(f'{ROOT}/stm/us-gaap-stm-soi-def-2020-01-31.xml')
+    xml.fs.ls('')  # Open the archive before pickling
+    
+    restored = pickle.loads(pickle.dumps(xml))
+    assert restored == xml and isinstance(restored, ZipPath)
+    assert restored.read_bytes() == xml.read_bytes()
+
+
+def test_as_sources(tmp_path):
+    _, archive = make_taxonomy(tmp_path)
+    member = ZipFS(archive).path(f'{ROOT}/stm/us-gaap-stm-soi-def-2020-01-31.xml')
+    f = io.BytesIO(b'<x/>')
+    # Single sources are wrapped, iterables listed
+    for single in ('a.xml', b'a.xml', Path('a.xml'), member, f):
+        assert as_sources(single) == [single]
+    assert as_sources(('a.xml', member)) == ['a.xml', member]
+    assert as_sources(iter([f])) == [f]
+
+
+def _best_time(fn, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark() -> None:
+    """Time building all statement trees from a zip: extract-to-disk vs streaming members."""
+    import contextlib
+    import tempfile
+    with tempfile.TemporaryDirectory() as d:
+        _, archive = make_taxonomy(Path(d))
+        
+        def extracted():
+            with tempfile.TemporaryDirectory() as target:
+                with zipfile.ZipFile(archive) as zf:
+                    zf.extractall(target)
+                for kind in ('def', 'pre'):
+                    build_stm_dis_trees(str(Path(target) / ROOT), tree_type=kind)
+        
+        def streamed():
+            with ZipFS(archive) as fs:
+                for kind in ('def', 'pre'):
+                    build_stm_dis_trees(fs.path(ROOT), tree_type=kind)
+        
+        # Silence the missing dis/ folder warnings
+        with contextlib.redirect_stdout(io.StringIO()):
+            t_extract = _best_time(extracted)
+            t_stream = _best_time(streamed)
+        print(f"{archive.stat().st_size:,} B archive")
+        print(f"extract + parse: {t_extract * 1e3:8.1f} ms")
+        print(f"stream members : {t_stream * 1e3:8.1f} ms -> {t_extract / t_stream:.2f}x")
+
+
+if __name__ == '__main__':
+    benchmark()